@@ -0,0 +1,74 @@
+from fastapi import HTTPException, Request
+import json
+
+# Tipo de conteúdo aceito para envio das strings uma por linha
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+# Função para extrair a lista de strings de uma requisição de teste em lote
+async def read_input_strings(request: Request) -> list[str]:
+    """
+    Lê as strings a serem testadas a partir do corpo da requisição. Aceita:
+      - JSON: { "input_strings": ["101", "100", ...] }
+      - NDJSON (application/x-ndjson): uma string JSON ou { "input_string": ... } por linha
+    """
+    content_type = request.headers.get("content-type", "")
+
+    if content_type.startswith(NDJSON_MEDIA_TYPE):
+        # Cada linha é lida e convertida conforme o corpo chega; só a linha incompleta fica guardada
+        input_strings = []
+        buffer = bytearray()
+        number = 0
+        async for data in request.stream():
+            buffer += data
+            end = buffer.rfind(b"\n")
+            if end < 0:
+                continue
+            for line in bytes(buffer[:end]).split(b"\n"):
+                number += 1
+                _append_ndjson_line(input_strings, line, number)
+            del buffer[:end + 1]
+        _append_ndjson_line(input_strings, bytes(buffer), number + 1)
+        return input_strings
+
+    body = await request.body()
+    try:
+        payload = json.loads(body)
+    except json.JSONDecodeError:
+        raise HTTPException(status_code=400, detail="Corpo da requisição não é um JSON válido")
+    input_strings = payload.get("input_strings") if isinstance(payload, dict) else None
+    if not isinstance(input_strings, list) or not all(isinstance(s, str) for s in input_strings):
+        raise HTTPException(status_code=400, detail="Campo 'input_strings' (lista de strings) é necessário")
+    return input_strings
+
+
+# Função para converter uma linha NDJSON na string a ser testada
+def _append_ndjson_line(input_strings: list[str], line: bytes, number: int):
+    """Linhas em branco são ignoradas; `number` (a partir de 1) aparece nas mensagens de erro."""
+    if not line.strip():
+        return
+    try:
+        item = json.loads(line)
+    except json.JSONDecodeError:
+        raise HTTPException(status_code=400, detail=f"Linha {number} não é um JSON válido")
+    if isinstance(item, dict):
+        item = item.get("input_string")
+    if not isinstance(item, str):
+        raise HTTPException(status_code=400, detail=f"Linha {number} não contém uma 'input_string'")
+    input_strings.append(item)
+
+
+# Função para montar a resposta de um teste em lote
+def batch_response(input_strings: list[str], results: list[bool]) -> dict:
+    """
+    Monta a resposta com o resultado de cada string, na ordem de envio.
+    Um resultado None indica execução interrompida por limite de recursos.
+    """
+    return {
+        "total": len(input_strings),
+        "accepted_count": sum(1 for accepted in results if accepted is True),
+        "results": [
+            {"input_string": s, "accepted": accepted}
+            for s, accepted in zip(input_strings, results)
+        ]
+    }
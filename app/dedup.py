@@ -0,0 +1,65 @@
+import json
+import threading
+import uuid
+
+# Namespace fixo dos ids derivados do conteúdo (uuid5): a mesma definição gera
+# sempre o mesmo id, em qualquer processo ou reinício do servidor
+AUTOMATA_NAMESPACE = uuid.UUID("5b0f3c1e-8d2a-4f6e-9c47-0a1d2e3f4b5c")
+
+
+# Função para ordenar uma lista de valores que representa um conjunto
+def canonical_set(values) -> list:
+    """Remove repetições e ordena (listas internas são comparadas como tuplas)."""
+    unique = {tuple(v) if isinstance(v, (list, tuple)) else v for v in values}
+    return [list(v) if isinstance(v, tuple) else v for v in sorted(unique, key=repr)]
+
+
+# Função para gerar o id de um autômato a partir da sua definição canônica
+def content_id(kind: str, definition: dict, attempt: int = 0) -> str:
+    """
+    Serializa a definição (já canônica: conjuntos como listas ordenadas) em JSON
+    com chaves ordenadas e deriva dela um uuid5. Definições iguais têm o mesmo id.
+    `attempt` > 0 gera os ids alternativos usados por `content_slot`.
+    """
+    canonical = json.dumps(definition, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    prefix = kind if attempt == 0 else f"{kind}#{attempt}"
+    return str(uuid.uuid5(AUTOMATA_NAMESPACE, f"{prefix}:{canonical}"))
+
+
+# Função para escolher o id de uma definição sem reaproveitar um autômato já alterado
+def content_slot(kind: str, definition: dict, store) -> str:
+    """
+    Um autômato alterado (PATCH) mantém o id derivado da sua definição original,
+    que não descreve mais o seu conteúdo. Nesse caso, a mesma definição passa
+    para o próximo id alternativo (content_id com attempt 1, 2, ...), que continua
+    determinístico e deduplicado.
+    """
+    attempt = 0
+    automata_id = content_id(kind, definition)
+    while store.revision(automata_id) > 0:
+        attempt += 1
+        automata_id = content_id(kind, definition, attempt)
+    return automata_id
+
+
+# Contadores de criações e de definições repetidas, reportados em GET /stats
+class DedupStats:
+    """Conta as criações recebidas e quantas reaproveitaram um autômato já armazenado."""
+
+    def __init__(self):
+        self.created = 0
+        self.deduplicated = 0
+        self._lock = threading.Lock()
+
+    def record(self, duplicate: bool):
+        with self._lock:
+            self.created += 1
+            if duplicate:
+                self.deduplicated += 1
+
+    def stats(self) -> dict:
+        return {
+            "created": self.created,
+            "deduplicated": self.deduplicated,
+            "dedup_ratio": round(self.deduplicated / self.created, 4) if self.created else 0.0
+        }
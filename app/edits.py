@@ -0,0 +1,103 @@
+from fastapi import HTTPException
+from functools import lru_cache
+import inspect
+import threading
+from app.storage import EditConflict
+from app.metrics import persist_seconds
+
+# Alterações (PATCH) são aplicadas uma de cada vez neste processo; entre processos,
+# a revisão esperada por persist_edit detecta alterações concorrentes
+edit_lock = threading.Lock()
+
+
+# Função para listar os campos do construtor de uma classe da automata-lib
+@lru_cache(maxsize=None)
+def _fields(cls) -> tuple:
+    return tuple(name for name in inspect.signature(cls.__init__).parameters if name != "self")
+
+
+# Função para criar uma cópia de um autômato da automata-lib com alguns campos trocados
+def rebuild(automaton, **changes):
+    """
+    Cria um objeto da mesma classe sem passar pelo construtor: os campos não
+    alterados já estão congelados e validados, e os alterados (já congelados:
+    frozenset, frozendict, tuplas) foram verificados por quem chama. Assim nem a
+    cópia de `freeze_value` nem `validate()` percorrem o autômato inteiro de novo.
+    """
+    cls = type(automaton)
+    new = object.__new__(cls)
+    for name in _fields(cls):
+        object.__setattr__(new, name, changes[name] if name in changes else getattr(automaton, name))
+    if hasattr(new, "clear_cache"):
+        new.clear_cache()
+    return new
+
+
+# Função para validar as alterações no conjunto de estados e nos estados finais
+def check_state_edit(automaton, edit: dict) -> tuple:
+    """
+    Retorna (estados após a alteração, estados adicionados, estados removidos).
+    Levanta ValueError se um estado adicionado já existir, se um removido não
+    existir ou for o inicial, ou se um estado final alterado não existir.
+    """
+    added = set(edit.get("add_states", ()))
+    removed = set(edit.get("remove_states", ()))
+    if added & automaton.states:
+        raise ValueError(f"Estados já existentes: {sorted(added & automaton.states)}")
+    if removed - automaton.states:
+        raise ValueError(f"Estados inexistentes: {sorted(removed - automaton.states)}")
+    if automaton.initial_state in removed:
+        raise ValueError(f"O estado inicial '{automaton.initial_state}' não pode ser removido")
+    states = (automaton.states - removed) | added
+
+    for state in edit.get("add_final_states", ()):
+        if state not in states:
+            raise ValueError(f"O estado final '{state}' não existe")
+    for state in edit.get("remove_final_states", ()):
+        if state not in automaton.final_states:
+            raise ValueError(f"O estado '{state}' não é final")
+    return states, added, removed
+
+
+# Função para calcular os estados finais após a alteração
+def edited_final_states(automaton, edit: dict) -> frozenset:
+    final_states = automaton.final_states
+    removed = set(edit.get("remove_states", ())) | set(edit.get("remove_final_states", ()))
+    added = set(edit.get("add_final_states", ()))
+    if removed or added:
+        final_states = frozenset((final_states - removed) | added)
+    return final_states
+
+
+# Função para aplicar um PATCH: valida, grava o delta e retorna o novo autômato
+def patch_automaton(kind: str, store, automata_id: str, edit: dict, apply, not_found: str,
+                    expected_revision: int = None):
+    """
+    `apply(autômato, edit)` valida a alteração (ValueError -> 400) e retorna
+    (novo autômato, after), onde `after` é None ou uma função chamada logo após
+    gravar o delta (ainda sem outra alteração em andamento), por exemplo para
+    guardar o simulador já atualizado. O delta `edit` é gravado com a próxima
+    revisão. Se `expected_revision` for informada e não for a atual, ou se outro
+    processo gravar uma alteração antes, responde 409. Retorna (novo autômato, revisão).
+    """
+    if not edit:
+        raise HTTPException(status_code=400, detail="Nenhuma alteração informada")
+    with edit_lock:
+        current = store.get(automata_id)
+        if current is None:
+            raise HTTPException(status_code=404, detail=not_found)
+        revision = store.revision(automata_id)
+        if expected_revision is not None and expected_revision != revision:
+            raise HTTPException(status_code=409, detail=f"Revisão atual é {revision}, não {expected_revision}")
+        try:
+            automaton, after = apply(current, edit)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        try:
+            with persist_seconds.time(kind):
+                store.persist_edit(automata_id, automaton, edit, revision + 1)
+        except EditConflict:
+            raise HTTPException(status_code=409, detail="Autômato alterado por outra requisição, tente novamente")
+        if after is not None:
+            after()
+    return automaton, revision + 1
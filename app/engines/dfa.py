@@ -0,0 +1,720 @@
+from array import array
+import mmap
+import os
+import threading
+from app.engines.trace import Trace, zigzag
+from app.engines.language import shortlex_words
+from app.engines.nfa import StateExplosion
+
+# NumPy é opcional: sem ele, os lotes usam apenas o caminho escalar
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Estado "morto": símbolo inválido ou transição ausente
+DEAD = -1
+
+# Tamanho mínimo de um grupo de strings de mesmo tamanho para usar o caminho vetorizado
+VECTORIZE_MIN_GROUP = 64
+
+# Origens de uma transição do autômato de busca em que resta apenas a execução nova
+RESTART = (-1,)
+
+# Estados guardados pelo autômato de busca (scan) de um AFD; além disso ele recomeça vazio
+SCAN_MAX_STATES = int(os.environ.get("SCAN_MAX_STATES", "10000"))
+
+# Quantidade máxima de estados (pares alcançáveis) do AFD gerado por uma operação (produto)
+PRODUCT_MAX_STATES = int(os.environ.get("PRODUCT_MAX_STATES", "1000000"))
+
+# Aceitação de um par (p, q) do produto para cada operação, dado se p e q são finais
+PRODUCT_OPERATIONS = {
+    "union": lambda a, b: a or b,
+    "intersection": lambda a, b: a and b,
+    "difference": lambda a, b: a and not b,
+    "symmetric_difference": lambda a, b: a != b,
+}
+
+
+# AFD compilado em tabela de transições indexada por inteiros
+class CompiledDFA:
+    """
+    Representação compacta de um AFD para execução rápida:
+      - estados e símbolos são mapeados para inteiros densos (0..n-1, 0..k-1);
+      - `table` é a tabela de transições achatada (array de n*k inteiros, DEAD se ausente);
+      - `rows` guarda, para cada estado, um dicionário símbolo -> próximo estado (inteiro),
+        usado no caminho escalar (uma única consulta por caractere).
+    """
+
+    def __init__(self, states, input_symbols, transitions: dict, initial_state, final_states):
+        self.states = sorted(states, key=str)
+        self.state_index = {state: i for i, state in enumerate(self.states)}
+        self.symbols = sorted(input_symbols, key=str)
+        self.symbol_index = {symbol: j for j, symbol in enumerate(self.symbols)}
+
+        n, k = len(self.states), len(self.symbols)
+        self.table = array("i", [DEAD]) * (n * k)
+        self.rows = [{} for _ in range(n)]
+        for state, paths in transitions.items():
+            i = self.state_index[state]
+            for symbol, next_state in paths.items():
+                j = self.state_index[next_state]
+                self.table[i * k + self.symbol_index[symbol]] = j
+                self.rows[i][symbol] = j
+
+        self.initial = self.state_index[initial_state]
+        self.accepting = bytearray(n)
+        for state in final_states:
+            self.accepting[self.state_index[state]] = 1
+        self._dense = None
+        self._search = None
+        self._productive = None
+
+    def __getstate__(self):
+        # O autômato de busca é um cache: não é enviado aos processos do pool
+        state = self.__dict__.copy()
+        state["_search"] = None
+        return state
+
+    # Função para compilar um AFD da biblioteca automata
+    @classmethod
+    def from_automaton(cls, dfa) -> "CompiledDFA":
+        """Compila um objeto DFA (automata-lib)."""
+        return cls(dfa.states, dfa.input_symbols, dfa.transitions, dfa.initial_state, dfa.final_states)
+
+    # Função para compilar um AFD a partir do dicionário serializável (afd_to_dict)
+    @classmethod
+    def from_dict(cls, data: dict) -> "CompiledDFA":
+        """Compila um AFD descrito no formato de afd_to_dict."""
+        return cls(data["states"], data["input_symbols"], data["transitions"],
+                   data["initial_state"], data["final_states"])
+
+    # Função para aplicar uma alteração (PATCH) sem recompilar a tabela inteira
+    def edited(self, transitions: dict, add_final_states=(), remove_final_states=()) -> "CompiledDFA":
+        """
+        Retorna uma cópia com as transições de `transitions` (estado -> {símbolo:
+        destino}) substituídas e os estados finais alterados. O conjunto de estados
+        não muda (se mudar, o AFD é recompilado). A cópia evita alterar uma tabela
+        que pode estar em uso por outra requisição; os caches derivados recomeçam.
+        """
+        edited = object.__new__(CompiledDFA)
+        edited.__dict__.update(self.__dict__)
+        edited.table = table = array("i", self.table)
+        edited.rows = rows = list(self.rows)
+        k = len(self.symbols)
+        for state, paths in transitions.items():
+            i = self.state_index[state]
+            row = rows[i] = dict(rows[i])
+            for symbol, next_state in paths.items():
+                j = self.state_index[next_state]
+                table[i * k + self.symbol_index[symbol]] = j
+                row[symbol] = j
+
+        edited.accepting = bytearray(self.accepting)
+        for state in remove_final_states:
+            edited.accepting[self.state_index[state]] = 0
+        for state in add_final_states:
+            edited.accepting[self.state_index[state]] = 1
+        edited._dense = None
+        edited._search = None
+        edited._productive = None
+        return edited
+
+    def predecessors_of(self, state) -> list:
+        """(estado, símbolo) de cada transição que leva a `state`, procurados direto na tabela."""
+        target = self.state_index[state]
+        k = len(self.symbols)
+        found = []
+        position = 0
+        while True:
+            try:
+                position = self.table.index(target, position)
+            except ValueError:
+                return found
+            found.append((self.states[position // k], self.symbols[position % k]))
+            position += 1
+
+    def run(self, input_string, state: int = None) -> int:
+        """Lê a entrada a partir de `state` (ou do estado inicial) e retorna o estado final ou DEAD."""
+        if state is None:
+            state = self.initial
+        if state == DEAD:
+            return DEAD
+        rows = self.rows
+        try:
+            for symbol in input_string:
+                state = rows[state][symbol]
+        except KeyError:
+            return DEAD
+        return state
+
+    def is_accepting(self, state: int) -> bool:
+        return state != DEAD and self.accepting[state] == 1
+
+    def accepts(self, input_string) -> bool:
+        """Retorna True se o AFD aceita a string."""
+        return self.is_accepting(self.run(input_string))
+
+    def trace(self, input_string):
+        """
+        Executa a entrada registrando o estado após cada símbolo e retorna
+        (aceita, Trace). O trace termina onde o AFD parar (símbolo inválido ou
+        transição ausente).
+        """
+        trace = Trace("afd", {"initial_state": self.states[self.initial]}, context=(self.initial,),
+                      names={"states": self.states, "symbols": self.symbols})
+        table = self.table
+        symbol_index = self.symbol_index
+        k = len(self.symbols)
+        state = self.initial
+        for symbol in input_string:
+            j = symbol_index.get(symbol)
+            next_state = DEAD if j is None else table[state * k + j]
+            if next_state == DEAD:
+                return False, trace
+            trace.append((j, zigzag(next_state - state)), (next_state,))
+            state = next_state
+        return self.accepting[state] == 1, trace
+
+    def productive_states(self) -> bytearray:
+        """productive[q] = 1 se algum estado final é alcançável a partir de q."""
+        if self._productive is None:
+            predecessors = [[] for _ in self.states]
+            for i, row in enumerate(self.rows):
+                for target in row.values():
+                    predecessors[target].append(i)
+            productive = bytearray(self.accepting)
+            stack = [q for q in range(len(self.states)) if productive[q]]
+            while stack:
+                for p in predecessors[stack.pop()]:
+                    if not productive[p]:
+                        productive[p] = 1
+                        stack.append(p)
+            self._productive = productive
+        return self._productive
+
+    def _search_automaton(self, reset: bool = False) -> "SearchAutomaton":
+        if self._search is None or reset:
+            self._search = SearchAutomaton(self)
+        return self._search
+
+    def scan(self, text, offset: int = 0, configuration=None):
+        """
+        Busca no texto, numa única passada, as ocorrências não vazias de palavras da
+        linguagem do AFD. Cada posição em que termina uma ocorrência é informada uma
+        vez, com o menor início possível (a maior ocorrência que termina ali). As
+        posições são índices de caractere somados a `offset`; `configuration`
+        (retornada pela chamada anterior) continua a busca num trecho seguinte do
+        mesmo texto. Retorna (inícios, fins, configuração).
+        """
+        search = self._search_automaton()
+        if configuration is None:
+            states, starts = (self.initial,), [offset]
+        else:
+            states, starts = configuration
+        sid = search.intern(tuple(states))
+        steps = search.steps
+        found_starts, found_ends = array("q"), array("q")
+        position = offset
+        for symbol in text:
+            position += 1
+            step = steps[sid].get(symbol)
+            if step is None:
+                if len(search.tuples) >= SCAN_MAX_STATES:
+                    states = search.tuples[sid]
+                    search = self._search_automaton(reset=True)
+                    steps = search.steps
+                    sid = search.intern(states)
+                step = search.step(sid, symbol)
+            sid, origins, match = step
+            if origins is None:  # mesmas execuções, na mesma ordem
+                pass
+            elif origins is RESTART:
+                starts = [position]
+            else:
+                starts = [starts[o] if o >= 0 else position for o in origins]
+            if match >= 0:
+                found_starts.append(starts[match])
+                found_ends.append(position)
+        return found_starts, found_ends, (search.tuples[sid], starts)
+
+    def scan_carried(self, text, offset: int, configuration):
+        """
+        Continua apenas as execuções de `configuration`, sem iniciar novas, até todas
+        morrerem ou o texto acabar (usado para juntar buscas feitas em paralelo por
+        trechos). Retorna (inícios, fins, configuração); sem execuções vivas, a
+        configuração é vazia.
+        """
+        states, starts = configuration
+        rows, accepting, productive = self.rows, self.accepting, self.productive_states()
+        found_starts, found_ends = array("q"), array("q")
+        position = offset
+        for symbol in text:
+            if not states:
+                break
+            position += 1
+            reached, reached_starts = [], []
+            for state, start in zip(states, starts):
+                target = rows[state].get(symbol)
+                if target is not None and productive[target] and target not in reached:
+                    reached.append(target)
+                    reached_starts.append(start)
+            states, starts = reached, reached_starts
+            for state, start in zip(states, starts):
+                if accepting[state]:
+                    found_starts.append(start)
+                    found_ends.append(position)
+                    break
+        return found_starts, found_ends, (tuple(states), starts)
+
+    def scan_file(self, path: str, start: int, end: int):
+        """
+        Busca (scan) nos bytes start..end-1 de um arquivo UTF-8 (mapeado em memória),
+        com posições relativas ao início do trecho. Retorna (inícios, fins,
+        configuração, caracteres lidos).
+        """
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            text = str(data[start:end], "utf-8")
+        found_starts, found_ends, configuration = self.scan(text)
+        return found_starts, found_ends, configuration, len(text)
+
+    def accepts_batch(self, input_strings: list) -> list:
+        """
+        Testa várias strings. Grupos grandes de strings de mesmo tamanho avançam juntos
+        pela tabela (NumPy); as demais são percorridas em ordem lexicográfica,
+        reaproveitando o caminho de estados do prefixo comum com a string anterior.
+        """
+        results = [False] * len(input_strings)
+        remaining = range(len(input_strings))
+
+        if np is not None:
+            groups = {}
+            for index, input_string in enumerate(input_strings):
+                groups.setdefault(len(input_string), []).append(index)
+            remaining = []
+            for length, indexes in groups.items():
+                if length == 0 or len(indexes) < VECTORIZE_MIN_GROUP:
+                    remaining.extend(indexes)
+                    continue
+                accepted = self.accepts_equal_length([input_strings[i] for i in indexes])
+                for index, value in zip(indexes, accepted):
+                    results[index] = value
+
+        rows = self.rows
+        accepting = self.accepting
+        previous = ""
+        path = [self.initial]  # path[i] = estado após ler os i primeiros símbolos
+        for index in sorted(remaining, key=input_strings.__getitem__):
+            input_string = input_strings[index]
+
+            # Tamanho do prefixo comum com a string anterior
+            common = 0
+            limit = min(len(previous), len(input_string))
+            while common < limit and previous[common] == input_string[common]:
+                common += 1
+            del path[common + 1:]
+
+            state = path[-1]
+            for symbol in input_string[common:]:
+                if state == DEAD:
+                    break
+                state = rows[state].get(symbol, DEAD)
+                path.append(state)
+
+            results[index] = state != DEAD and accepting[state] == 1
+            previous = input_string
+        return results
+
+    def _dense_tables(self):
+        """Tabelas NumPy com um estado/símbolo extra absorvente para entradas inválidas."""
+        if self._dense is None:
+            n, k = len(self.states), len(self.symbols)
+            dense = np.full((n + 1, k + 1), n, dtype=np.int32)
+            table = np.frombuffer(self.table, dtype=np.int32).reshape(n, k) if n and k else None
+            if table is not None:
+                dense[:n, :k] = np.where(table == DEAD, n, table)
+
+            # Símbolos de um caractere são traduzidos por code point; o resto cai na coluna k
+            codes = {ord(s): j for j, s in enumerate(self.symbols) if isinstance(s, str) and len(s) == 1}
+            lookup = np.full(max(codes, default=0) + 2, k, dtype=np.int32)
+            for code, j in codes.items():
+                lookup[code] = j
+
+            accepting = np.zeros(n + 1, dtype=bool)
+            accepting[:n] = np.frombuffer(bytes(self.accepting), dtype=np.uint8) == 1
+            self._dense = (dense, lookup, accepting)
+        return self._dense
+
+    def accepts_equal_length(self, input_strings: list) -> list:
+        """Caminho vetorizado: avança todas as strings (de mesmo tamanho) um símbolo por vez."""
+        if np is None or not input_strings:
+            return [self.accepts(s) for s in input_strings]
+        dense, lookup, accepting = self._dense_tables()
+        length = len(input_strings[0])
+        points = np.frombuffer("".join(input_strings).encode("utf-32-le"), dtype=np.uint32)
+        points = np.minimum(points, len(lookup) - 1).reshape(len(input_strings), length)
+        columns = lookup[points]
+
+        states = np.full(len(input_strings), self.initial, dtype=np.int32)
+        for j in range(length):
+            states = dense[states, columns[:, j]]
+        return accepting[states].tolist()
+
+    def _successors(self) -> list:
+        """Para cada estado, os estados alcançados por cada símbolo (sem DEAD, com repetições)."""
+        return [list(row.values()) for row in self.rows]
+
+    def count_by_length(self, max_length: int) -> list:
+        """
+        Número de palavras aceitas de cada tamanho 0..max_length, por programação
+        dinâmica sobre a tabela de transições: ways_r[q] é o número de palavras de
+        tamanho r aceitas a partir de q, e ways_{r+1}[q] soma ways_r sobre as
+        transições de q. Inteiros do Python, sem estouro. O(max_length · |δ|).
+        """
+        successors = self._successors()
+        ways = list(self.accepting)
+        counts = [ways[self.initial]]
+        for _ in range(max_length):
+            ways = [sum(ways[target] for target in targets) for targets in successors]
+            counts.append(ways[self.initial])
+        return counts
+
+    def language(self, max_length: int) -> "DFALanguage":
+        """Contagem e enumeração das palavras aceitas de tamanho até max_length (ver DFALanguage)."""
+        return DFALanguage(self, max_length)
+
+    def _complete_table(self):
+        """Tabela de transições como listas por símbolo, com o estado extra n (poço) no lugar de DEAD."""
+        n, k = len(self.states), len(self.symbols)
+        table = self.table
+        columns = []
+        for j in range(k):
+            column = [n] * (n + 1)
+            for i in range(n):
+                target = table[i * k + j]
+                if target != DEAD:
+                    column[i] = target
+            columns.append(column)
+        return columns
+
+    def _columns(self, symbols: list) -> tuple:
+        """
+        (colunas, estado inicial, finais) sobre o alfabeto `symbols`, com o poço n
+        no lugar de DEAD e nas colunas dos símbolos fora do alfabeto deste AFD.
+        """
+        n = len(self.states)
+        own = self._complete_table()
+        sink = [n] * (n + 1)
+        columns = [own[self.symbol_index[symbol]] if symbol in self.symbol_index else sink for symbol in symbols]
+        return columns, self.initial, list(self.accepting) + [0]
+
+    # Função para combinar dois AFDs pela construção do produto
+    def product(self, other: "CompiledDFA", operation: str, max_states: int = PRODUCT_MAX_STATES) -> dict:
+        """
+        AFD da união, interseção, diferença (self - other) ou diferença simétrica
+        das linguagens (ver PRODUCT_OPERATIONS), sobre a união dos alfabetos. Um
+        símbolo fora do alfabeto de um dos AFDs leva ao seu poço. Retorna um AFD
+        completo no formato de afd_to_dict (ver _reachable_product).
+        """
+        symbols = sorted(set(self.symbols) | set(other.symbols), key=str)
+        return _reachable_product(symbols, self._columns(symbols), other._columns(symbols),
+                                  PRODUCT_OPERATIONS[operation], max_states)
+
+    # Função para calcular o complemento do AFD
+    def complement(self, max_states: int = PRODUCT_MAX_STATES) -> dict:
+        """
+        AFD que aceita exatamente as palavras (sobre o mesmo alfabeto) rejeitadas
+        por este: a diferença entre o AFD universal de um estado e este AFD.
+        """
+        universal = ([[0]] * len(self.symbols), 0, [1])
+        return _reachable_product(self.symbols, universal, self._columns(self.symbols),
+                                  PRODUCT_OPERATIONS["difference"], max_states)
+
+    def minimize(self) -> dict:
+        """
+        Minimiza o AFD pelo algoritmo de Hopcroft (refinamento de partições,
+        O(n·k·log n)) e retorna o resultado no formato de afd_to_dict. Estados
+        inalcançáveis são descartados; cada estado do AFD mínimo recebe o nome do
+        menor estado original da sua classe.
+        """
+        n, k = len(self.states), len(self.symbols)
+        columns = self._complete_table()
+
+        # Estados alcançáveis a partir do inicial (o poço n entra se alguma transição faltar)
+        reachable = bytearray(n + 1)
+        reachable[self.initial] = 1
+        stack = [self.initial]
+        while stack:
+            state = stack.pop()
+            for column in columns:
+                target = column[state]
+                if not reachable[target]:
+                    reachable[target] = 1
+                    stack.append(target)
+        alive = [q for q in range(n + 1) if reachable[q]]
+
+        # Transições inversas: inverse[j][q] = estados que vão para q lendo o símbolo j
+        inverse = []
+        for column in columns:
+            predecessors = {}
+            for q in alive:
+                predecessors.setdefault(column[q], []).append(q)
+            inverse.append(predecessors)
+
+        accepting = self.accepting
+        final = [q for q in alive if q < n and accepting[q]]
+        other = [q for q in alive if q == n or not accepting[q]]
+        blocks = [set(b) for b in (final, other) if b]
+        block_of = [0] * (n + 1)
+        for b, members in enumerate(blocks):
+            for q in members:
+                block_of[q] = b
+
+        # Lista de trabalho de Hopcroft: basta refinar pelo menor bloco de cada divisão
+        waiting = [len(blocks) - 1] if len(blocks) == 2 and len(blocks[1]) < len(blocks[0]) else [0]
+        in_waiting = [False] * len(blocks)
+        for b in waiting:
+            in_waiting[b] = True
+        while waiting:
+            splitter = waiting.pop()
+            in_waiting[splitter] = False
+            members = list(blocks[splitter])
+            for predecessors in inverse:
+                touched = {}
+                for q in members:
+                    for p in predecessors.get(q, ()):
+                        touched.setdefault(block_of[p], []).append(p)
+                for b, inside in touched.items():
+                    if len(inside) == len(blocks[b]):
+                        continue
+                    new_block = set(inside)
+                    blocks[b] -= new_block
+                    created = len(blocks)
+                    blocks.append(new_block)
+                    in_waiting.append(False)
+                    for p in new_block:
+                        block_of[p] = created
+                    if in_waiting[b] or len(new_block) <= len(blocks[b]):
+                        target = created
+                    else:
+                        target = b
+                    if not in_waiting[target]:
+                        in_waiting[target] = True
+                        waiting.append(target)
+
+        # Um representante por bloco; o bloco que contém apenas o poço é descartado
+        names = {}
+        for members in blocks:
+            real = [q for q in members if q < n]
+            if real:
+                representative = min(real, key=lambda q: str(self.states[q]))
+                for q in members:
+                    names[q] = self.states[representative]
+        transitions = {}
+        for members in blocks:
+            representative = next(iter(members))
+            if representative not in names:
+                continue
+            if representative == n:
+                representative = next(q for q in members if q < n)
+            paths = {}
+            for j, column in enumerate(columns):
+                target = column[representative]
+                if target in names:
+                    paths[self.symbols[j]] = names[target]
+            transitions[names[representative]] = paths
+
+        return {
+            "states": list(transitions),
+            "input_symbols": list(self.symbols),
+            "transitions": transitions,
+            "initial_state": names[self.initial],
+            "final_states": [names[q] for q in final if self.states[q] == names[q]]
+        }
+
+    def equivalent_to(self, other: "CompiledDFA"):
+        """
+        Verifica se dois AFDs reconhecem a mesma linguagem (algoritmo de
+        Hopcroft-Karp com union-find). Retorna (True, None) ou (False, w), onde w
+        é uma string aceita por apenas um dos dois. Símbolos ausentes no alfabeto
+        de um dos AFDs levam ao seu estado morto.
+        """
+        symbols = sorted(set(self.symbols) | set(other.symbols), key=str)
+        n = len(self.states)
+        offset = n + 1  # estados de `other` vêm depois dos de `self` (cada um com seu poço)
+        m = len(other.states)
+
+        def step(dfa, size, state, symbol):
+            if state == size:
+                return size
+            target = dfa.rows[state].get(symbol, DEAD)
+            return size if target == DEAD else target
+
+        def accepts(dfa, size, state):
+            return state != size and dfa.accepting[state] == 1
+
+        parent = list(range(offset + m + 1))
+
+        def find(x):
+            while parent[x] != x:
+                parent[x] = parent[parent[x]]
+                x = parent[x]
+            return x
+
+        start = (self.initial, other.initial)
+        parent[find(offset + other.initial)] = find(self.initial)
+        pairs = [start]
+        origin = [(-1, None)]  # (índice do par anterior, símbolo lido) para montar o contraexemplo
+        index = 0
+        while index < len(pairs):
+            p, q = pairs[index]
+            if accepts(self, n, p) != accepts(other, m, q):
+                word = []
+                while index > 0:
+                    index, symbol = origin[index]
+                    word.append(symbol)
+                return False, "".join(reversed(word))
+            for symbol in symbols:
+                p2, q2 = step(self, n, p, symbol), step(other, m, q, symbol)
+                root_p, root_q = find(p2), find(offset + q2)
+                if root_p != root_q:
+                    parent[root_q] = root_p
+                    pairs.append((p2, q2))
+                    origin.append((index, symbol))
+            index += 1
+        return True, None
+
+
+# Função para montar o produto de dois AFDs a partir do par inicial (apenas os pares alcançáveis)
+def _reachable_product(symbols: list, left: tuple, right: tuple, accept, max_states: int) -> dict:
+    """
+    `left` e `right` são (colunas, inicial, finais) como em CompiledDFA._columns.
+    Os pares (p, q) são descobertos por busca em largura a partir do par inicial,
+    codificados como p·(m+1)+q, e numerados na ordem de descoberta ("p0", "p1",
+    ...): o produto cartesiano completo (n+1)·(m+1) nunca é montado. Ao passar de
+    `max_states` pares, a construção é interrompida (StateExplosion).
+    """
+    left_columns, left_initial, left_accepting = left
+    right_columns, right_initial, right_accepting = right
+    width = len(right_accepting)
+    columns = list(zip(left_columns, right_columns))
+
+    start = left_initial * width + right_initial
+    index = {start: 0}
+    order = [start]
+    targets = []  # targets[i * k + j]: número do par alcançado a partir do par i lendo o símbolo j
+    position = 0
+    while position < len(order):
+        p, q = divmod(order[position], width)
+        for left_column, right_column in columns:
+            pair = left_column[p] * width + right_column[q]
+            number = index.get(pair)
+            if number is None:
+                if len(order) >= max_states:
+                    raise StateExplosion(f"O AFD excede o limite de {max_states} estados (PRODUCT_MAX_STATES)")
+                number = index[pair] = len(order)
+                order.append(pair)
+            targets.append(number)
+        position += 1
+
+    k = len(symbols)
+    names = [f"p{i}" for i in range(len(order))]
+    transitions = {
+        name: {symbol: names[target] for symbol, target in zip(symbols, targets[i * k:(i + 1) * k])}
+        for i, name in enumerate(names)
+    }
+    final_states = [names[i] for i, pair in enumerate(order)
+                    if accept(left_accepting[pair // width] == 1, right_accepting[pair % width] == 1)]
+    return {
+        "states": names,
+        "input_symbols": list(symbols),
+        "transitions": transitions,
+        "initial_state": "p0",
+        "final_states": final_states
+    }
+
+
+# Linguagem de um CompiledDFA limitada por tamanho
+class DFALanguage:
+    """
+    Guarda a tabela table[r][q] de count_by_length para todos os r até max_length
+    (memória O(max_length · |Q|)), usada para enumerar as palavras aceitas em ordem
+    shortlex sem gerar as anteriores à página pedida.
+    """
+
+    def __init__(self, dfa: CompiledDFA, max_length: int):
+        self.dfa = dfa
+        self.max_length = max_length
+        successors = dfa._successors()
+        self.table = [list(dfa.accepting)]
+        for _ in range(max_length):
+            ways = self.table[-1]
+            self.table.append([sum(ways[target] for target in targets) for targets in successors])
+
+    def count_by_length(self) -> list:
+        return [ways[self.dfa.initial] for ways in self.table]
+
+    def words(self, start: int = 0):
+        """
+        Gerador das palavras aceitas em ordem shortlex (por tamanho e, entre as de mesmo
+        tamanho, pela ordem dos símbolos), a partir da de número `start`. Símbolos de
+        vários caracteres são concatenados.
+        """
+        rows, symbols, table = self.dfa.rows, self.dfa.symbols, self.table
+        return shortlex_words(self.dfa.initial, symbols, lambda q, j: rows[q].get(symbols[j]),
+                              lambda q, r: table[r][q], self.max_length, start)
+
+# Autômato de busca de um AFD, determinizado sob demanda
+class SearchAutomaton:
+    """
+    Reconhece Σ*L lendo o texto uma única vez, como o autômato de Aho-Corasick faz
+    para um conjunto de palavras. Cada estado é a tupla dos estados do AFD em que
+    estão as execuções ainda vivas (uma por posição de início, as de mesmo estado
+    fundidas na mais antiga), em ordem de início; a execução que começa na posição
+    atual fica no fim; execuções em estados a partir dos quais nenhum estado final é
+    alcançável são descartadas. A transição por um caractere é calculada no primeiro uso e
+    guardada com a origem de cada elemento na tupla anterior (-1: a execução nova)
+    (None se as execuções são as mesmas, na mesma ordem) e o primeiro elemento final
+    antes de incluir a nova execução (-1 se nenhum).
+    """
+
+    def __init__(self, dfa: CompiledDFA):
+        self.rows = dfa.rows
+        self.accepting = dfa.accepting
+        self.initial = dfa.initial
+        self.productive = dfa.productive_states()
+        self.tuples = []
+        self.ids = {}
+        self.steps = []  # por estado: caractere -> (próximo estado, origens, primeiro final)
+        self._lock = threading.Lock()
+
+    def intern(self, states: tuple) -> int:
+        with self._lock:
+            sid = self.ids.get(states)
+            if sid is None:
+                sid = self.ids[states] = len(self.tuples)
+                self.tuples.append(states)
+                self.steps.append({})
+            return sid
+
+    def step(self, sid: int, symbol):
+        rows, accepting, productive = self.rows, self.accepting, self.productive
+        reached, origins, seen = [], [], set()
+        for index, state in enumerate(self.tuples[sid]):
+            target = rows[state].get(symbol)
+            if target is not None and productive[target] and target not in seen:
+                seen.add(target)
+                reached.append(target)
+                origins.append(index)
+        match = next((i for i, state in enumerate(reached) if accepting[state]), -1)
+        if self.initial not in seen and productive[self.initial]:
+            reached.append(self.initial)
+            origins.append(-1)
+        if origins == list(range(len(self.tuples[sid]))):
+            origins = None
+        elif origins == [-1]:
+            origins = RESTART
+        else:
+            origins = tuple(origins)
+        step = self.steps[sid][symbol] = (self.intern(tuple(reached)), origins, match)
+        return step
@@ -0,0 +1,81 @@
+import os
+
+# Maior tamanho de palavra aceito na contagem/enumeração da linguagem de um AFD
+LANGUAGE_MAX_LENGTH = int(os.environ.get("LANGUAGE_MAX_LENGTH", "1000"))
+
+# Tamanho máximo (tamanho × estados) da tabela de contagens usada na enumeração de um AFD
+LANGUAGE_MAX_CELLS = int(os.environ.get("LANGUAGE_MAX_CELLS", "10000000"))
+
+# Maior tamanho de palavra na contagem/enumeração da linguagem de um PDA
+PDA_LANGUAGE_MAX_LENGTH = int(os.environ.get("PDA_LANGUAGE_MAX_LENGTH", "30"))
+
+# Conjuntos de configurações distintos memorizados na contagem de um PDA
+PDA_LANGUAGE_MAX_SETS = int(os.environ.get("PDA_LANGUAGE_MAX_SETS", "200000"))
+
+
+# Função para enumerar palavras em ordem shortlex (por tamanho, depois lexicográfica)
+def shortlex_words(initial, symbols: list, child, count, max_length: int, start: int = 0):
+    """
+    Gerador das palavras de tamanho até `max_length` aceitas a partir do nó `initial`
+    de um autômato determinístico (um AFD, ou a simulação por conjuntos de um PDA),
+    a partir da palavra de número `start` (0 = a primeira):
+      - child(nó, j) é o nó alcançado lendo symbols[j] (None se nenhum);
+      - count(nó, r) é o número de palavras de tamanho r aceitas a partir do nó.
+    As palavras anteriores a `start` não são geradas: as contagens levam direto a
+    ela. Depois, cada palavra seguinte custa O(tamanho · |símbolos|) no pior caso,
+    pois apenas ramos com alguma palavra aceita são visitados.
+    """
+    k = len(symbols)
+
+    def viable(node, j, r):
+        target = child(node, j)
+        return target if target is not None and count(target, r) > 0 else None
+
+    for length in range(max_length + 1):
+        total = count(initial, length)
+        if start >= total:
+            start -= total
+            continue
+
+        # Desce até a palavra de número `start` entre as de tamanho `length`
+        nodes, choices = [initial], []
+        for r in range(length - 1, -1, -1):
+            for j in range(k):
+                target = child(nodes[-1], j)
+                words = count(target, r) if target is not None else 0
+                if start < words:
+                    nodes.append(target)
+                    choices.append(j)
+                    break
+                start -= words
+        start = 0
+
+        while True:
+            yield "".join(symbols[j] for j in choices)
+
+            # Posição mais à direita que pode avançar para o próximo símbolo viável
+            depth = length
+            while depth > 0:
+                depth -= 1
+                r = length - depth - 1
+                for j in range(choices[depth] + 1, k):
+                    target = viable(nodes[depth], j, r)
+                    if target is not None:
+                        break
+                else:
+                    continue
+                del nodes[depth + 1:], choices[depth:]
+                nodes.append(target)
+                choices.append(j)
+                break
+            else:
+                break
+
+            # Completa com os menores símbolos viáveis
+            for r in range(length - depth - 2, -1, -1):
+                for j in range(k):
+                    target = viable(nodes[-1], j, r)
+                    if target is not None:
+                        nodes.append(target)
+                        choices.append(j)
+                        break
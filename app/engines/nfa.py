@@ -0,0 +1,447 @@
+import os
+import threading
+
+# Quantidade máxima de estados do AFD gerado a partir de uma expressão regular.
+# A construção de subconjuntos pode crescer exponencialmente; acima deste limite ela é interrompida.
+REGEX_MAX_STATES = int(os.environ.get("REGEX_MAX_STATES", "100000"))
+
+# Quantidade máxima de estados do AFD descobertos e mantidos em cache por AFN (LazyDFA).
+# Ao atingir o limite o cache é esvaziado e reconstruído conforme a simulação avança.
+AFN_CACHE_STATES = int(os.environ.get("AFN_CACHE_STATES", "10000"))
+
+# Caracteres com significado especial nas expressões regulares aceitas
+SPECIAL = set("()|*+?{}[].\\")
+
+
+# Erro de sintaxe na expressão regular
+class RegexError(ValueError):
+    pass
+
+
+# A construção de subconjuntos excedeu o limite de estados
+class StateExplosion(ValueError):
+    pass
+
+
+# Analisador sintático (descendente recursivo) das expressões regulares
+class _Parser:
+    """
+    Gramática aceita:
+      alternativa := sequência ('|' sequência)*
+      sequência   := fator*
+      fator       := átomo ('*' | '+' | '?' | '{n}' | '{n,}' | '{n,m}')*
+      átomo       := símbolo | '\\' símbolo | '.' | '[...]' | '[^...]' | '(' alternativa ')'
+    O resultado é uma árvore de tuplas: ("sym", símbolos), ("eps",), ("cat", a, b),
+    ("alt", a, b), ("star", a) e ("rep", a, min, max).
+    """
+
+    def __init__(self, pattern: str, alphabet):
+        self.pattern = pattern
+        self.alphabet = alphabet
+        self.pos = 0
+
+    def error(self, message: str):
+        raise RegexError(f"{message} (posição {self.pos} da expressão regular)")
+
+    def peek(self):
+        return self.pattern[self.pos] if self.pos < len(self.pattern) else None
+
+    def take(self):
+        char = self.peek()
+        if char is None:
+            self.error("Fim inesperado")
+        self.pos += 1
+        return char
+
+    def parse(self):
+        tree = self.alternation()
+        if self.peek() is not None:
+            self.error(f"Caractere inesperado '{self.peek()}'")
+        return tree
+
+    def alternation(self):
+        tree = self.sequence()
+        while self.peek() == "|":
+            self.pos += 1
+            tree = ("alt", tree, self.sequence())
+        return tree
+
+    def sequence(self):
+        tree = ("eps",)
+        while self.peek() is not None and self.peek() not in "|)":
+            factor = self.factor()
+            tree = factor if tree == ("eps",) else ("cat", tree, factor)
+        return tree
+
+    def factor(self):
+        tree = self.atom()
+        while self.peek() is not None and self.peek() in "*+?{":
+            char = self.take()
+            if char == "*":
+                tree = ("star", tree)
+            elif char == "+":
+                tree = ("rep", tree, 1, None)
+            elif char == "?":
+                tree = ("rep", tree, 0, 1)
+            else:
+                low, high = self.bounds()
+                tree = ("rep", tree, low, high)
+        return tree
+
+    def bounds(self):
+        start = self.pos
+        while self.peek() is not None and self.peek() != "}":
+            self.pos += 1
+        text = self.pattern[start:self.pos]
+        if self.peek() != "}":
+            self.error("Repetição sem '}'")
+        self.pos += 1
+        low, comma, high = text.partition(",")
+        try:
+            low = int(low)
+            high = low if not comma else (int(high) if high.strip() else None)
+        except ValueError:
+            self.error(f"Repetição inválida '{{{text}}}'")
+        if low < 0 or (high is not None and high < low):
+            self.error(f"Repetição inválida '{{{text}}}'")
+        return low, high
+
+    def atom(self):
+        char = self.take()
+        if char == "(":
+            tree = self.alternation()
+            if self.peek() != ")":
+                self.error("Parêntese não fechado")
+            self.pos += 1
+            return tree
+        if char == "[":
+            return ("sym", self.char_class())
+        if char == ".":
+            if not self.alphabet:
+                self.error("'.' exige um alfabeto (input_symbols)")
+            return ("sym", frozenset(self.alphabet))
+        if char == "\\":
+            return ("sym", frozenset(self.take()))
+        if char in SPECIAL:
+            self.error(f"Caractere especial '{char}' fora de lugar")
+        return ("sym", frozenset(char))
+
+    def char_class(self):
+        negated = self.peek() == "^"
+        if negated:
+            self.pos += 1
+        symbols = set()
+        while self.peek() != "]":
+            char = self.take()
+            if char == "\\":
+                char = self.take()
+            if self.peek() == "-" and self.pattern[self.pos + 1:self.pos + 2] not in ("", "]"):
+                self.pos += 1
+                last = self.take()
+                if ord(last) < ord(char):
+                    self.error(f"Intervalo inválido '{char}-{last}'")
+                symbols.update(chr(code) for code in range(ord(char), ord(last) + 1))
+            else:
+                symbols.add(char)
+        self.pos += 1
+        if negated:
+            if not self.alphabet:
+                self.error("'[^...]' exige um alfabeto (input_symbols)")
+            symbols = set(self.alphabet) - symbols
+        return frozenset(symbols)
+
+
+# Função para listar os símbolos usados numa árvore de expressão regular
+def _tree_symbols(tree, found: set):
+    if tree[0] == "sym":
+        found.update(tree[1])
+    else:
+        for child in tree[1:]:
+            if isinstance(child, tuple):
+                _tree_symbols(child, found)
+    return found
+
+
+# AFN com estados inteiros e conjuntos de estados representados como bitsets (int)
+class CompiledNFA:
+    """
+    AFN com ε-transições. `moves[q]` é um dicionário símbolo -> bitset dos destinos
+    já fechados por ε; assim um passo da simulação é apenas o OU dos bitsets dos
+    estados ativos. `start` é o fecho-ε do estado inicial e `accepting` o bitset
+    dos estados finais.
+    """
+
+    def __init__(self, size: int, symbols, moves: list, epsilon: list, initial: int, final):
+        self.size = size
+        self.symbols = sorted(symbols, key=str)
+
+        # Fecho-ε de cada estado, como bitset
+        closures = []
+        for q in range(size):
+            mask = 1 << q
+            stack = [q]
+            while stack:
+                for target in epsilon[stack.pop()]:
+                    if not mask >> target & 1:
+                        mask |= 1 << target
+                        stack.append(target)
+            closures.append(mask)
+
+        self.moves = []
+        for q in range(size):
+            row = {}
+            for symbol, targets in moves[q].items():
+                mask = 0
+                for target in targets:
+                    mask |= closures[target]
+                row[symbol] = mask
+            self.moves.append(row)
+        self.start = closures[initial]
+        self.accepting = 0
+        for q in final:
+            self.accepting |= 1 << q
+
+    # Função para compilar um AFN da biblioteca automata
+    @classmethod
+    def from_automaton(cls, nfa) -> "CompiledNFA":
+        """Compila um objeto NFA (automata-lib); o símbolo "" representa a ε-transição."""
+        states = sorted(nfa.states, key=str)
+        state_index = {state: i for i, state in enumerate(states)}
+        moves = [{} for _ in states]
+        epsilon = [[] for _ in states]
+        for state, paths in nfa.transitions.items():
+            i = state_index[state]
+            for symbol, targets in paths.items():
+                targets = [state_index[target] for target in targets]
+                if symbol == "":
+                    epsilon[i] += targets
+                else:
+                    moves[i][symbol] = targets
+        return cls(len(states), nfa.input_symbols, moves, epsilon,
+                   state_index[nfa.initial_state], [state_index[q] for q in nfa.final_states])
+
+    # Função para construir o AFN de Thompson de uma expressão regular
+    @classmethod
+    def from_regex(cls, pattern: str, input_symbols=None) -> "CompiledNFA":
+        """
+        Constrói o AFN de Thompson da expressão. O alfabeto é `input_symbols` ou,
+        se omitido, os símbolos que aparecem na expressão.
+        """
+        alphabet = set(input_symbols) if input_symbols else None
+        tree = _Parser(pattern, alphabet).parse()
+        used = _tree_symbols(tree, set())
+        if alphabet is None:
+            alphabet = used
+        elif not used <= alphabet:
+            raise RegexError(f"Símbolos fora do alfabeto: {sorted(used - alphabet)}")
+
+        moves, epsilon = [], []
+
+        def new_state():
+            moves.append({})
+            epsilon.append([])
+            return len(moves) - 1
+
+        def build(node):
+            """Retorna (início, fim) do fragmento de Thompson de `node`."""
+            kind = node[0]
+            if kind == "sym" or kind == "eps":
+                start, end = new_state(), new_state()
+                if kind == "eps":
+                    epsilon[start].append(end)
+                for symbol in node[1] if kind == "sym" else ():
+                    moves[start].setdefault(symbol, []).append(end)
+                return start, end
+            if kind == "cat":
+                first_start, first_end = build(node[1])
+                second_start, second_end = build(node[2])
+                epsilon[first_end].append(second_start)
+                return first_start, second_end
+            if kind == "alt":
+                start, end = new_state(), new_state()
+                for child in node[1:]:
+                    child_start, child_end = build(child)
+                    epsilon[start].append(child_start)
+                    epsilon[child_end].append(end)
+                return start, end
+            if kind == "star":
+                start, end = new_state(), new_state()
+                child_start, child_end = build(node[1])
+                epsilon[start] += [child_start, end]
+                epsilon[child_end] += [child_start, end]
+                return start, end
+            # ("rep", a, min, max): min cópias obrigatórias seguidas das opcionais (ou de a*)
+            _, child, low, high = node
+            parts = [child] * low
+            if high is None:
+                parts.append(("star", child))
+            else:
+                parts += [("alt", child, ("eps",))] * (high - low)
+            if not parts:
+                return build(("eps",))
+            start, end = build(parts[0])
+            for part in parts[1:]:
+                part_start, part_end = build(part)
+                epsilon[end].append(part_start)
+                end = part_end
+            return start, end
+
+        start, end = build(tree)
+        return cls(len(moves), alphabet, moves, epsilon, start, [end])
+
+    def step(self, subset: int, symbol) -> int:
+        """Bitset dos estados alcançados a partir de `subset` lendo `symbol`."""
+        moves = self.moves
+        result = 0
+        while subset:
+            low = subset & -subset
+            result |= moves[low.bit_length() - 1].get(symbol, 0)
+            subset ^= low
+        return result
+
+    def _step_all(self, subset: int) -> dict:
+        """Como `step`, mas para todos os símbolos de uma vez (um único percurso dos bits)."""
+        moves = self.moves
+        result = dict.fromkeys(self.symbols, 0)
+        while subset:
+            low = subset & -subset
+            for symbol, mask in moves[low.bit_length() - 1].items():
+                result[symbol] |= mask
+            subset ^= low
+        return result
+
+    def accepts(self, input_string) -> bool:
+        """Simula o AFN diretamente sobre os bitsets (sem construir o AFD)."""
+        subset = self.start
+        for symbol in input_string:
+            subset = self.step(subset, symbol)
+            if not subset:
+                return False
+        return bool(subset & self.accepting)
+
+    def determinize(self, max_states: int = REGEX_MAX_STATES) -> dict:
+        """
+        Construção de subconjuntos sob demanda: apenas os subconjuntos alcançáveis a
+        partir do estado inicial são criados, em ordem de descoberta, e a construção
+        é interrompida (StateExplosion) ao passar de `max_states` estados. Retorna um
+        AFD completo no formato de afd_to_dict (o conjunto vazio vira um estado poço).
+        """
+        index = {self.start: 0}
+        order = [self.start]
+        transitions = {}
+        position = 0
+        while position < len(order):
+            row = {}
+            for symbol, target in self._step_all(order[position]).items():
+                number = index.get(target)
+                if number is None:
+                    if len(order) >= max_states:
+                        raise StateExplosion(
+                            f"O AFD excede o limite de {max_states} estados (REGEX_MAX_STATES)")
+                    number = index[target] = len(order)
+                    order.append(target)
+                row[symbol] = f"s{number}"
+            transitions[f"s{position}"] = row
+            position += 1
+
+        return {
+            "states": list(transitions),
+            "input_symbols": list(self.symbols),
+            "transitions": transitions,
+            "initial_state": "s0",
+            "final_states": [f"s{i}" for i, subset in enumerate(order) if subset & self.accepting]
+        }
+
+
+# Estado do AFD descoberto pela simulação: um subconjunto de estados do AFN
+class _LazyState:
+    __slots__ = ("subset", "accepting", "row")
+
+    def __init__(self, subset: int, accepting: bool):
+        self.subset = subset
+        self.accepting = accepting
+        self.row = {}  # símbolo -> _LazyState
+
+
+# AFD construído sob demanda a partir de um AFN, com cache limitado de estados
+class LazyDFA:
+    """
+    Simula o AFN determinizando-o conforme a entrada é lida: cada subconjunto de
+    estados (bitset) alcançado vira um estado do AFD e cada transição calculada
+    fica guardada em `row`, então entradas repetidas rodam na velocidade de um AFD
+    sem que o conjunto das partes seja construído. Quando o cache passa de
+    `max_states` estados ele é esvaziado por inteiro (as simulações em andamento
+    continuam, recalculando o que precisarem).
+    """
+
+    def __init__(self, nfa: CompiledNFA, max_states: int = AFN_CACHE_STATES):
+        self.nfa = nfa
+        self.max_states = max_states
+        self._states = {}
+        self._lock = threading.Lock()
+        self.steps = 0
+        self.misses = 0
+        self.flushes = 0
+        self.evicted_states = 0
+        self.initial = self._intern(nfa.start)
+
+    def __reduce__(self):
+        # Ao ser enviado a outro processo, o LazyDFA parte de um cache vazio
+        return (LazyDFA, (self.nfa, self.max_states))
+
+    def _intern(self, subset: int) -> _LazyState:
+        """Retorna o estado do AFD para `subset`, criando-o (e esvaziando o cache se cheio)."""
+        with self._lock:
+            state = self._states.get(subset)
+            if state is None:
+                if len(self._states) >= self.max_states:
+                    for old in self._states.values():
+                        old.row.clear()
+                    self.evicted_states += len(self._states)
+                    self.flushes += 1
+                    self._states.clear()
+                state = self._states[subset] = _LazyState(subset, bool(subset & self.nfa.accepting))
+            return state
+
+    def run(self, input_string, state: _LazyState = None) -> _LazyState:
+        """Lê a entrada a partir de `state` (ou do estado inicial) e retorna o estado alcançado."""
+        if state is None:
+            state = self.initial
+        misses = 0
+        read = len(input_string)
+        for position, symbol in enumerate(input_string):
+            following = state.row.get(symbol)
+            if following is None:
+                if not state.subset:
+                    read = position  # conjunto vazio: a entrada já foi rejeitada
+                    break
+                misses += 1
+                following = self._intern(self.nfa.step(state.subset, symbol))
+                state.row[symbol] = following
+            state = following
+        self.steps += read  # apenas os símbolos realmente lidos
+        self.misses += misses
+        return state
+
+    def is_dead(self, state: _LazyState) -> bool:
+        return not state.subset
+
+    def accepts(self, input_string) -> bool:
+        """Retorna True se o AFN aceita a string."""
+        return self.run(input_string).accepting
+
+    def accepts_batch(self, input_strings: list) -> list:
+        """Testa várias strings, compartilhando o cache de estados entre elas."""
+        return [self.run(input_string).accepting for input_string in input_strings]
+
+    def stats(self) -> dict:
+        return {
+            "cached_states": len(self._states),
+            "max_states": self.max_states,
+            "nfa_states": self.nfa.size,
+            "symbols_read": self.steps,
+            "transitions_computed": self.misses,
+            "hit_rate": round(1 - self.misses / self.steps, 4) if self.steps else 0.0,
+            "flushes": self.flushes,
+            "evicted_states": self.evicted_states
+        }
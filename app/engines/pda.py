@@ -0,0 +1,632 @@
+from array import array
+import os
+import time
+from app.engines.trace import Trace, TRACE_MAX_CONFIGURATIONS
+from app.engines.language import shortlex_words, PDA_LANGUAGE_MAX_SETS
+
+# Limites padrão (e máximos) de execução de um Autômato com Pilha
+PDA_MAX_STACK_DEPTH = int(os.environ.get("PDA_MAX_STACK_DEPTH", "100000"))
+PDA_MAX_CONFIGURATIONS = int(os.environ.get("PDA_MAX_CONFIGURATIONS", "100000"))
+PDA_TIMEOUT = float(os.environ.get("PDA_TIMEOUT", "5"))
+
+# Resultados possíveis de uma execução
+ACCEPTED = "accepted"
+REJECTED = "rejected"
+UNDECIDED = "undecided"  # algum limite foi atingido antes de a execução terminar
+
+# Limites que interrompem a execução inteira (os demais, como max_stack_depth e
+# epsilon_cycle, descartam apenas configurações)
+STOPPING_LIMITS = ("max_configurations", "timeout", "cancelled", "max_trace")
+
+# Pilha vazia (raiz das pilhas internadas) e código do topo de uma pilha vazia
+EMPTY_STACK = 0
+NO_SYMBOL = -1
+
+
+# Função para montar os limites de uma execução a partir do payload do teste
+def pda_limits(payload: dict, max_timeout: float = PDA_TIMEOUT) -> dict:
+    """
+    Lê os limites opcionais enviados pelo cliente (max_stack_depth,
+    max_configurations, timeout). Valores acima dos limites do servidor são reduzidos
+    a eles; `max_timeout` substitui PDA_TIMEOUT (ex.: execuções em segundo plano).
+    """
+    defaults = {
+        "max_stack_depth": PDA_MAX_STACK_DEPTH,
+        "max_configurations": PDA_MAX_CONFIGURATIONS,
+        "timeout": max_timeout,
+    }
+    limits = {}
+    for name, server_max in defaults.items():
+        value = payload.get(name, server_max)
+        if not isinstance(value, (int, float)) or isinstance(value, bool) or value <= 0:
+            raise ValueError(f"Limite '{name}' deve ser um número positivo")
+        limits[name] = min(value, server_max)
+    return limits
+
+
+# Simulador de Autômatos com Pilha (não determinísticos) com memoização de configurações
+class PDAEngine:
+    """
+    Decide a aceitação como NPDA.accepts_input, mas processando a entrada uma
+    posição por vez sobre o conjunto de configurações (estado, pilha):
+      - estados e símbolos da pilha são internados como inteiros;
+      - as pilhas são listas encadeadas compartilhadas (hash-consing): cada pilha
+        é um inteiro e pilhas iguais têm sempre o mesmo número, então configurações
+        equivalentes alcançadas por caminhos diferentes são exploradas uma única vez;
+      - um símbolo que nunca sai da pilha (toda transição com ele no topo o mantém
+        no fundo do que empilha) esconde o que está abaixo dele, então a pilha é
+        cortada nele: ciclos-ε que só o repetem (ex.: ε,Z/ZZ) não criam pilhas novas;
+      - em cada posição, o fecho-ε é calculado com um conjunto de visitados, o que
+        encerra ciclos-ε que não mudam a pilha. Ciclos-ε que empilham são detectados
+        quando a pilha cresce, dentro do mesmo fecho, mais de |Q|·|Γ| símbolos além
+        dos que o restante da entrada (se o tamanho for conhecido) poderia consumir:
+        essas configurações são mantidas, mas não expandidas (limite "epsilon_cycle").
+    Se alguma configuração for descartada por limite e nenhuma aceitar, o resultado
+    é UNDECIDED. A entrada pode ser fornecida aos poucos (start/feed/finish).
+
+    `progress`, se informado, é chamado periodicamente com (símbolos lidos,
+    configurações vivas); se retornar True a execução para com o limite "cancelled".
+    """
+
+    def __init__(self, states, input_symbols, stack_symbols, transitions: dict,
+                 initial_state, initial_stack_symbol, final_states, acceptance_mode: str = "both"):
+        self.state_names = sorted(states, key=str)
+        self.state_index = {state: i for i, state in enumerate(self.state_names)}
+        self.input_symbols = sorted(input_symbols, key=str)
+        self.stack_symbol_names = sorted(stack_symbols, key=str)
+        self.stack_symbol_index = {symbol: i for i, symbol in enumerate(self.stack_symbol_names)}
+        self.initial = self.state_index[initial_state]
+        self.initial_stack_symbol = self.stack_symbol_index[initial_stack_symbol]
+        self.accepting = bytearray(len(self.state_names))
+        for state in final_states:
+            self.accepting[self.state_index[state]] = 1
+        self.accept_by_final_state = acceptance_mode in ("final_state", "both")
+        self.accept_by_empty_stack = acceptance_mode in ("empty_stack", "both")
+
+        # moves[estado][símbolo de entrada][topo] e epsilon_moves[estado][topo] =
+        # tupla de (novo estado, símbolos empilhados do fundo para o topo)
+        self.moves = [dict() for _ in self.state_names]
+        self.epsilon_moves = [dict() for _ in self.state_names]
+        for state, input_paths in transitions.items():
+            q = self.state_index[state]
+            for input_symbol, stack_paths in input_paths.items():
+                for stack_symbol, paths in stack_paths.items():
+                    top = self.stack_symbol_index[stack_symbol]
+                    targets = tuple(sorted(
+                        (self.state_index[new_state],
+                         tuple(self.stack_symbol_index[s] for s in reversed(tuple(push))))
+                        for new_state, push in paths
+                    ))
+                    if input_symbol == "":
+                        self.epsilon_moves[q][top] = targets
+                    else:
+                        self.moves[q].setdefault(input_symbol, {})[top] = targets
+
+        # Símbolos que nunca saem da pilha: toda transição com esse topo o empilha de
+        # volta no fundo, então o que está abaixo dele nunca é lido e pode ser descartado
+        self.sticky = bytearray(b"\x01") * len(self.stack_symbol_names)
+        for paths in (*self.epsilon_moves, *(moves for q in self.moves for moves in q.values())):
+            for top, targets in paths.items():
+                if any(not push or push[0] != top for _, push in targets):
+                    self.sticky[top] = 0
+
+        # Crescimento da pilha, dentro de um fecho-ε, que garante um ciclo-ε que empilha
+        self.epsilon_growth = len(self.state_names) * max(len(self.stack_symbol_names), 1)
+
+    # Função para preparar o simulador a partir de um NPDA da biblioteca automata
+    @classmethod
+    def from_automaton(cls, npda) -> "PDAEngine":
+        """Constrói o simulador a partir de um objeto NPDA (automata-lib)."""
+        return cls(npda.states, npda.input_symbols, npda.stack_symbols, npda.transitions,
+                   npda.initial_state, npda.initial_stack_symbol, npda.final_states,
+                   npda.acceptance_mode)
+
+    def start(self, max_stack_depth: int = PDA_MAX_STACK_DEPTH,
+              max_configurations: int = PDA_MAX_CONFIGURATIONS,
+              timeout: float = PDA_TIMEOUT, progress=None, input_length: int = None) -> "PDARun":
+        """
+        Inicia uma execução incremental; a entrada é fornecida com feed(). Com
+        `input_length` (tamanho total da entrada, se conhecido), ciclos-ε que empilham
+        podem crescer o suficiente para o restante da entrada consumir a pilha.
+        """
+        return PDARun(self, max_stack_depth, max_configurations, timeout, progress, input_length)
+
+    def run(self, input_string: str, **limits) -> dict:
+        """
+        Executa o AP sobre a entrada. Retorna um dicionário com:
+          - result: ACCEPTED, REJECTED ou UNDECIDED;
+          - limit: o limite atingido (None se a execução terminou);
+          - stats: símbolos lidos, configurações vivas/máximas, configurações
+            repetidas descartadas, ciclos-ε que empilham, maior pilha e tempo gasto.
+        """
+        execution = self.start(input_length=len(input_string), **limits)
+        execution.feed(input_string)
+        return execution.finish()
+
+    def trace(self, input_string: str, **limits):
+        """
+        Executa como `run` (sem descartar pilhas e registrando a origem de cada
+        configuração) e retorna (resultado, Trace) com um caminho da computação: até
+        uma configuração de aceitação ou, senão, até onde a execução chegou.
+        """
+        execution = TracedPDARun(self, input_length=len(input_string), **limits)
+        execution.feed(input_string)
+        run = execution.finish()
+
+        trace = Trace("pilha", {
+            "initial_state": self.state_names[self.initial],
+            "initial_stack_symbol": self.stack_symbol_names[self.initial_stack_symbol],
+        }, context=(0, 1))
+        position, depth = 0, 1
+        states, stack_symbols = self.state_names, self.stack_symbol_names
+        for key in execution.path():
+            state, input_symbol, top, new_state, push = key
+            number = trace.transition(key, (
+                states[state], input_symbol, stack_symbols[top], states[new_state],
+                "".join(stack_symbols[s] for s in reversed(push)), len(push),
+            ))
+            if input_symbol:
+                position += 1
+            depth += len(push) - 1
+            if not trace.append((number,), (position, depth)):
+                break
+        return run, trace
+
+    def accepts(self, input_string: str, **limits):
+        """True/False, ou None se algum limite foi atingido."""
+        result = self.run(input_string, **limits)["result"]
+        return None if result == UNDECIDED else result == ACCEPTED
+
+    def accepts_batch(self, input_strings: list, **limits) -> list:
+        """Aplica `accepts` a cada string, com os mesmos limites."""
+        return [self.accepts(input_string, **limits) for input_string in input_strings]
+
+    def language(self, max_length: int, **limits) -> "PDALanguage":
+        """Contagem e enumeração das palavras aceitas de tamanho até max_length (ver PDALanguage)."""
+        return PDALanguage(self, max_length, **limits)
+
+
+# Execução incremental de um PDAEngine
+class PDARun:
+    """
+    Guarda apenas o conjunto atual de configurações (já fechado por transições ε)
+    e as pilhas internadas ainda alcançáveis a partir dele.
+    """
+
+    def __init__(self, engine: PDAEngine, max_stack_depth: int, max_configurations: int, timeout: float,
+                 progress=None, input_length: int = None):
+        self.engine = engine
+        self.progress = progress
+        self.input_length = input_length
+        self.max_stack_depth = max_stack_depth
+        self.max_configurations = max_configurations
+        self.started = time.monotonic()
+        self.deadline = self.started + timeout
+        # Pilhas internadas: nó -> (nó de baixo, símbolo do topo, profundidade)
+        self.nodes = [(EMPTY_STACK, NO_SYMBOL, 0)]
+        self.node_index = {}
+        self.position = 0
+        self.limit = None
+        self.collect_at = 1 << 16
+        self.pruned = 0
+        self.duplicates = 0
+        self.epsilon_cycles = 0
+        self.peak = 1
+        self.deepest = 1
+        self.configurations = self._closure({(engine.initial, self._push(EMPTY_STACK, (engine.initial_stack_symbol,)))})
+
+    def _push(self, node: int, symbols) -> int:
+        """
+        Empilha `symbols` (do fundo para o topo) sobre a pilha `node`; um símbolo
+        que nunca sai da pilha é empilhado sobre a pilha vazia (ver PDAEngine).
+        """
+        nodes = self.nodes
+        node_index = self.node_index
+        sticky = self.engine.sticky
+        for symbol in symbols:
+            if sticky[symbol]:
+                node = EMPTY_STACK
+            key = (node, symbol)
+            pushed = node_index.get(key)
+            if pushed is None:
+                pushed = len(nodes)
+                nodes.append((node, symbol, nodes[node][2] + 1))
+                node_index[key] = pushed
+            node = pushed
+        return node
+
+    def _apply(self, targets, below: int, into: set, pending: list = None) -> None:
+        """Aplica as transições `targets` a partir da pilha `below` (topo já desempilhado)."""
+        nodes = self.nodes
+        max_depth = self.max_stack_depth
+        for new_state, push in targets:
+            if push:
+                depth = nodes[below][2] + len(push)
+                if depth > max_depth:
+                    self.pruned += 1
+                    if self.limit is None:
+                        self.limit = "max_stack_depth"
+                    continue
+                if depth > self.deepest:
+                    self.deepest = depth
+            config = (new_state, self._push(below, push) if push else below)
+            if config in into:
+                self.duplicates += 1
+                continue
+            into.add(config)
+            if pending is not None:
+                pending.append(config)
+
+    def _growth_limit(self, configurations) -> int:
+        """
+        Profundidade acima da qual uma configuração do fecho-ε não é expandida: um
+        crescimento de mais de |Q|·|Γ| símbolos só acontece repetindo um ciclo-ε que
+        empilha, e mais do que o restante da entrada poderia desempilhar não é
+        expandido (sem o tamanho da entrada, apenas |Q|·|Γ|).
+        """
+        base_depth = max((self.nodes[stack][2] for _, stack in configurations), default=0)
+        remaining = max(self.input_length - self.position, 0) if self.input_length is not None else 0
+        return base_depth + self.engine.epsilon_growth + remaining
+
+    def _cut_epsilon_cycle(self, growing: bool) -> bool:
+        """Registra uma configuração não expandida por um ciclo-ε que empilha (uma vez por fecho)."""
+        if not growing:
+            self.epsilon_cycles += 1
+        if self.limit is None:
+            self.limit = "epsilon_cycle"
+        return True
+
+    def _closure(self, configurations: set) -> set:
+        """Fecha o conjunto por transições ε (cada configuração é visitada uma vez)."""
+        epsilon_moves = self.engine.epsilon_moves
+        nodes = self.nodes
+        pending = list(configurations)
+        growth_limit = self._growth_limit(pending)
+        growing = False
+        visited = 0
+        while pending:
+            visited += 1
+            if visited & 0xFFF == 0 and self._interrupted(len(configurations)):
+                break
+            state, stack = pending.pop()
+            below, top, depth = nodes[stack]
+            if depth > growth_limit:
+                growing = self._cut_epsilon_cycle(growing)
+                continue
+            targets = epsilon_moves[state].get(top)
+            if targets:
+                self._apply(targets, below, configurations, pending)
+            if len(configurations) > self.max_configurations:
+                self.limit = "max_configurations"
+                break
+        return configurations
+
+    def feed(self, chunk: str) -> bool:
+        """Consome um trecho da entrada. Retorna False se a execução já terminou."""
+        moves = self.engine.moves
+        nodes = self.nodes
+        for symbol in chunk:
+            if not self.configurations or self.limit in STOPPING_LIMITS:
+                return False
+            if self.position & 0xFF == 0 and self._interrupted(len(self.configurations)):
+                return False
+
+            following = set()
+            for state, stack in self.configurations:
+                below, top, _ = nodes[stack]
+                targets = moves[state].get(symbol)
+                if targets:
+                    targets = targets.get(top)
+                    if targets:
+                        self._apply(targets, below, following)
+            self.configurations = self._closure(following) if following else following
+            self.position += 1
+            if len(self.configurations) > self.peak:
+                self.peak = len(self.configurations)
+            if len(self.nodes) > self.collect_at:
+                self._collect()
+                nodes = self.nodes
+        return bool(self.configurations)
+
+    def _interrupted(self, live: int) -> bool:
+        """Verifica o tempo limite e informa o progresso; True se a execução deve parar."""
+        if time.monotonic() > self.deadline:
+            self.limit = "timeout"
+        elif self.progress is not None and self.progress(self.position, live):
+            self.limit = "cancelled"
+        else:
+            return False
+        return True
+
+    def _collect(self) -> None:
+        """Descarta as pilhas internadas que não são mais alcançáveis."""
+        live = {}
+        old_nodes = self.nodes
+        self.nodes = [(EMPTY_STACK, NO_SYMBOL, 0)]
+        self.node_index = {}
+
+        def copy(node):
+            path = []
+            while node != EMPTY_STACK and node not in live:
+                path.append(node)
+                node = old_nodes[node][0]
+            new = live.get(node, EMPTY_STACK)
+            for old in reversed(path):
+                new = self._push(new, (old_nodes[old][1],))
+                live[old] = new
+            return new
+
+        self.configurations = {(state, copy(stack)) for state, stack in self.configurations}
+        self.collect_at = max(1 << 16, 2 * len(self.nodes))
+
+    def finish(self) -> dict:
+        """Encerra a entrada e retorna o resultado (ver PDAEngine.run)."""
+        engine = self.engine
+        accepted = any(
+            (engine.accept_by_final_state and engine.accepting[state])
+            or (engine.accept_by_empty_stack and stack == EMPTY_STACK)
+            for state, stack in self.configurations
+        ) if self.limit not in STOPPING_LIMITS else False
+
+        if accepted:
+            result, limit = ACCEPTED, None
+        elif self.limit is not None:
+            result, limit = UNDECIDED, self.limit
+        else:
+            result, limit = REJECTED, None
+
+        stats = {
+            "symbols_read": self.position,
+            "live_configurations": len(self.configurations),
+            "peak_configurations": self.peak,
+            "duplicates_pruned": self.duplicates,
+            "epsilon_cycles": self.epsilon_cycles,
+            "depth_pruned": self.pruned,
+            "max_stack_depth": self.deepest,
+            "elapsed_ms": round((time.monotonic() - self.started) * 1000, 3),
+        }
+        return {"result": result, "limit": limit, "stats": stats}
+
+
+# Execução de um PDAEngine que registra o caminho de cada configuração
+class TracedPDARun(PDARun):
+    """
+    Além do conjunto de configurações, guarda para cada configuração alcançada a
+    anterior e a transição usada (dois arrays de inteiros), para reconstruir um
+    caminho da computação. As pilhas internadas não são descartadas, já que os
+    números das pilhas precisam continuar válidos. Usada apenas com trace ativo:
+    PDARun continua sem nenhum custo extra.
+    """
+
+    def __init__(self, engine: PDAEngine, max_configurations_logged: int = TRACE_MAX_CONFIGURATIONS,
+                 **limits):
+        self.parents = array("l")
+        self.moves = array("l")
+        self.move_keys = []
+        self.move_index = {}
+        self.max_logged = max_configurations_logged
+        self.ids = {}  # configuração atual -> número no registro
+        self.dead_end = -1  # última configuração viva, se todas morrerem
+        super().__init__(engine, **{
+            "max_stack_depth": PDA_MAX_STACK_DEPTH, "max_configurations": PDA_MAX_CONFIGURATIONS,
+            "timeout": PDA_TIMEOUT, **limits,
+        })
+
+    def _log(self, parent: int, key) -> int:
+        move = self.move_index.get(key)
+        if move is None:
+            move = self.move_index[key] = len(self.move_keys)
+            self.move_keys.append(key)
+        self.parents.append(parent)
+        self.moves.append(move)
+        return len(self.parents) - 1
+
+    def _apply_logged(self, parent: int, state: int, symbol: str, top: int, targets, below: int,
+                      into: set, pending: list = None) -> None:
+        """Como PDARun._apply, registrando a origem de cada nova configuração."""
+        nodes = self.nodes
+        ids = self.ids
+        for new_state, push in targets:
+            if push:
+                depth = nodes[below][2] + len(push)
+                if depth > self.max_stack_depth:
+                    self.pruned += 1
+                    if self.limit is None:
+                        self.limit = "max_stack_depth"
+                    continue
+                if depth > self.deepest:
+                    self.deepest = depth
+            config = (new_state, self._push(below, push) if push else below)
+            if config in into:
+                self.duplicates += 1
+                continue
+            into.add(config)
+            ids[config] = self._log(parent, (state, symbol, top, new_state, push))
+            if pending is not None:
+                pending.append(config)
+
+    def _closure(self, configurations: set) -> set:
+        epsilon_moves = self.engine.epsilon_moves
+        nodes = self.nodes
+        ids = self.ids
+        for config in configurations:
+            if config not in ids:
+                ids[config] = self._log(-1, None)  # configuração inicial
+        pending = list(configurations)
+        growth_limit = self._growth_limit(pending)
+        growing = False
+        visited = 0
+        while pending:
+            visited += 1
+            if visited & 0xFFF == 0 and self._interrupted(len(configurations)):
+                break
+            config = pending.pop()
+            state, stack = config
+            below, top, depth = nodes[stack]
+            if depth > growth_limit:
+                growing = self._cut_epsilon_cycle(growing)
+                continue
+            targets = epsilon_moves[state].get(top)
+            if targets:
+                self._apply_logged(ids[config], state, "", top, targets, below, configurations, pending)
+            if len(configurations) > self.max_configurations:
+                self.limit = "max_configurations"
+                break
+            if len(self.parents) > self.max_logged:
+                self.limit = "max_trace"
+                break
+        return configurations
+
+    def feed(self, chunk: str) -> bool:
+        moves = self.engine.moves
+        nodes = self.nodes
+        for symbol in chunk:
+            if not self.configurations or self.limit in STOPPING_LIMITS:
+                return False
+            if self.position & 0xFF == 0 and self._interrupted(len(self.configurations)):
+                return False
+
+            previous = self.ids
+            self.ids = {}
+            following = set()
+            for config in self.configurations:
+                state, stack = config
+                below, top, _ = nodes[stack]
+                targets = moves[state].get(symbol)
+                if targets:
+                    targets = targets.get(top)
+                    if targets:
+                        self._apply_logged(previous[config], state, symbol, top, targets, below, following)
+            if not following:
+                self.dead_end = min(previous[config] for config in self.configurations)
+            self.configurations = self._closure(following) if following else following
+            self.position += 1
+            if len(self.configurations) > self.peak:
+                self.peak = len(self.configurations)
+        return bool(self.configurations)
+
+    def path(self) -> list:
+        """Transições do caminho até uma configuração de aceitação (ou a última alcançada)."""
+        engine = self.engine
+        end = None
+        for config in self.configurations:
+            state, stack = config
+            if ((engine.accept_by_final_state and engine.accepting[state])
+                    or (engine.accept_by_empty_stack and stack == EMPTY_STACK)):
+                end = self.ids.get(config)
+                break
+        if end is None:
+            end = min((self.ids[config] for config in self.configurations if config in self.ids),
+                      default=self.dead_end)
+
+        keys = []
+        while end >= 0:
+            move = self.move_keys[self.moves[end]]
+            if move is None:
+                break
+            keys.append(move)
+            end = self.parents[end]
+        keys.reverse()
+        return keys
+
+
+# Linguagem de um PDAEngine limitada por tamanho
+class PDALanguage:
+    """
+    Conta e enumera as palavras aceitas de tamanho até max_length determinizando a
+    simulação: cada nó é o conjunto de configurações (fechado por ε, com as pilhas
+    internadas de um PDARun) alcançado depois de um prefixo, e os filhos de um nó são
+    calculados uma vez por símbolo. count(nó, r), o número de sufixos de tamanho r
+    aceitos a partir do nó, é memorizado por (nó, r) como na tabela do CYK; como
+    prefixos diferentes levam a nós diferentes, cada palavra é contada uma única vez,
+    mesmo com o PDA ambíguo. Com algum limite de execução atingido (por exemplo pilhas
+    descartadas por max_stack_depth), `limit` o indica e as contagens podem ser
+    menores que as reais; limites que interrompem a execução levantam ValueError.
+    """
+
+    def __init__(self, engine: PDAEngine, max_length: int, max_sets: int = PDA_LANGUAGE_MAX_SETS, **limits):
+        self.engine = engine
+        self.max_length = max_length
+        self.max_sets = max_sets
+        self.run = PDARun(engine, **{
+            "max_stack_depth": PDA_MAX_STACK_DEPTH, "max_configurations": PDA_MAX_CONFIGURATIONS,
+            "timeout": PDA_TIMEOUT, "input_length": max_length, **limits,
+        })
+        self.sets = []  # nó -> conjunto de configurações
+        self.set_index = {}
+        self.children = []  # nó -> {símbolo: nó}
+        self.memo = {}
+        self.initial = self._node(frozenset(self.run.configurations))
+
+    def _node(self, configurations: frozenset) -> int:
+        node = self.set_index.get(configurations)
+        if node is None:
+            if len(self.sets) >= self.max_sets:
+                raise ValueError(f"Enumeração interrompida: mais de {self.max_sets} conjuntos de configurações")
+            node = self.set_index[configurations] = len(self.sets)
+            self.sets.append(configurations)
+            self.children.append({})
+        return node
+
+    def child(self, node: int, symbol: str):
+        """Nó alcançado lendo `symbol` a partir de `node` (None se nenhuma configuração sobrevive)."""
+        children = self.children[node]
+        if symbol in children:
+            return children[symbol]
+        run = self.run
+        if run._interrupted(len(self.sets)) or run.limit in STOPPING_LIMITS:
+            raise ValueError(f"Enumeração interrompida pelo limite '{run.limit}'")
+        moves = self.engine.moves
+        nodes = run.nodes
+        following = set()
+        for state, stack in self.sets[node]:
+            below, top, _ = nodes[stack]
+            targets = moves[state].get(symbol)
+            if targets:
+                targets = targets.get(top)
+                if targets:
+                    run._apply(targets, below, following)
+        if following:
+            following = run._closure(following)
+            if run.limit in STOPPING_LIMITS:
+                raise ValueError(f"Enumeração interrompida pelo limite '{run.limit}'")
+        target = children[symbol] = self._node(frozenset(following)) if following else None
+        return target
+
+    def _accepting(self, node: int) -> bool:
+        engine = self.engine
+        return any(
+            (engine.accept_by_final_state and engine.accepting[state])
+            or (engine.accept_by_empty_stack and stack == EMPTY_STACK)
+            for state, stack in self.sets[node]
+        )
+
+    def count(self, node: int, r: int) -> int:
+        """Número de sufixos de tamanho r aceitos a partir de `node`."""
+        key = (node, r)
+        words = self.memo.get(key)
+        if words is None:
+            if r == 0:
+                words = 1 if self._accepting(node) else 0
+            else:
+                words = 0
+                for symbol in self.engine.input_symbols:
+                    target = self.child(node, symbol)
+                    if target is not None:
+                        words += self.count(target, r - 1)
+            self.memo[key] = words
+        return words
+
+    def count_by_length(self) -> list:
+        """Número de palavras aceitas de cada tamanho 0..max_length."""
+        return [self.count(self.initial, length) for length in range(self.max_length + 1)]
+
+    @property
+    def limit(self):
+        return self.run.limit
+
+    def words(self, start: int = 0):
+        """Gerador das palavras aceitas em ordem shortlex, a partir da de número `start`."""
+        symbols = self.engine.input_symbols
+        return shortlex_words(self.initial, symbols, lambda node, j: self.child(node, symbols[j]),
+                              self.count, self.max_length, start)
@@ -0,0 +1,450 @@
+from array import array
+import hashlib
+import os
+import time
+from app.engines.trace import Trace, TRACE_MAX_CONFIGURATIONS
+
+# Limites padrão (e máximos) de execução de uma Máquina de Turing
+TM_MAX_STEPS = int(os.environ.get("TM_MAX_STEPS", "100000"))
+TM_MAX_CONFIGURATIONS = int(os.environ.get("TM_MAX_CONFIGURATIONS", "10000"))
+TM_MAX_TAPE_LENGTH = int(os.environ.get("TM_MAX_TAPE_LENGTH", "100000"))
+TM_TIMEOUT = float(os.environ.get("TM_TIMEOUT", "5"))
+
+# Resultados possíveis de uma execução
+ACCEPTED = "accepted"
+REJECTED = "rejected"
+UNDECIDED = "undecided"  # algum limite foi atingido antes de a máquina parar
+
+# Máximo de resumos de configurações guardados para detectar repetições (~80 bytes cada)
+TM_MAX_SEEN = int(os.environ.get("TM_MAX_SEEN", "200000"))
+
+# Código (byte) usado para símbolos da entrada que não pertencem à fita; com mais
+# símbolos do que isso a fita passa a usar células largas (ver TMEngine)
+UNKNOWN_SYMBOL = 255
+
+# Deslocamento da cabeça para cada direção
+MOVES = {"L": -1, "R": 1, "N": 0}
+MOVE_NAMES = {-1: "L", 1: "R", 0: "N"}
+
+# Célula de fita (um byte) para cada código de símbolo
+WRITE_CELL = [bytes((code,)) for code in range(256)]
+
+
+# Função para montar os limites de uma execução a partir do payload do teste
+def tm_limits(payload: dict, max_timeout: float = TM_TIMEOUT) -> dict:
+    """
+    Lê os limites opcionais enviados pelo cliente (max_steps, max_configurations,
+    max_tape_length, timeout). Valores acima dos limites do servidor são reduzidos a eles;
+    `max_timeout` substitui TM_TIMEOUT (ex.: execuções em segundo plano).
+    Também aceita "beam_width", que ativa a busca em feixe (sem teto no servidor).
+    """
+    defaults = {
+        "max_steps": TM_MAX_STEPS,
+        "max_configurations": TM_MAX_CONFIGURATIONS,
+        "max_tape_length": TM_MAX_TAPE_LENGTH,
+        "timeout": max_timeout,
+    }
+    limits = {}
+    for name, server_max in defaults.items():
+        value = payload.get(name, server_max)
+        if not isinstance(value, (int, float)) or isinstance(value, bool) or value <= 0:
+            raise ValueError(f"Limite '{name}' deve ser um número positivo")
+        limits[name] = min(value, server_max)
+
+    beam_width = payload.get("beam_width")
+    if beam_width is not None:
+        if not isinstance(beam_width, int) or isinstance(beam_width, bool) or beam_width <= 0:
+            raise ValueError("Limite 'beam_width' deve ser um inteiro positivo")
+        limits["beam_width"] = beam_width
+    return limits
+
+
+# Simulador de Máquinas de Turing (não determinísticas) com recursos limitados
+class TMEngine:
+    """
+    Executa a MT em largura, como NTM.accepts_input, mas respeitando limites de
+    passos, de configurações simultâneas, de tamanho da fita e de tempo. Quando um
+    limite é atingido o resultado é UNDECIDED, junto com as estatísticas da execução.
+
+    Representação compacta das configurações (estado, cabeça, janela):
+      - estados e símbolos da fita são internados como inteiros;
+      - a fita é uma janela `bytes` (um byte por célula) sem os brancos das pontas,
+        e a cabeça é relativa ao início da janela (fora dela, lê-se branco). Assim,
+        configurações iguais têm sempre a mesma representação. Com mais de 255
+        símbolos, a janela é uma tupla de códigos (células largas), com as mesmas
+        operações (fatias, concatenação, hash);
+      - cada configuração visitada é guardada por um resumo de 128 bits (até
+        TM_MAX_SEEN resumos); uma configuração já vista em um passo anterior não é
+        explorada de novo, o que também detecta máquinas que entram em ciclo
+        (resultado REJECTED exato).
+    Com `beam_width`, apenas as configurações de fita mais curta de cada passo são
+    mantidas; se algo for descartado e a máquina não aceitar, o resultado é UNDECIDED.
+
+    `progress`, se informado, é chamado a cada 16 passos com (passos executados,
+    configurações vivas); se retornar True a execução para com o limite "cancelled".
+    """
+
+    def __init__(self, states, input_symbols, tape_symbols, transitions: dict,
+                 initial_state, blank_symbol, final_states):
+        self.state_names = sorted(states, key=str)
+        self.state_index = {state: i for i, state in enumerate(self.state_names)}
+        # O branco recebe o código 0; os símbolos de entrada fora da fita recebem
+        # códigos extras (sem transições), como na biblioteca
+        symbols = [blank_symbol] + sorted((set(tape_symbols) | set(input_symbols)) - {blank_symbol}, key=str)
+        self.symbol_names = symbols
+        self.wide = len(symbols) > UNKNOWN_SYMBOL
+        self.unknown_symbol = len(symbols) if self.wide else UNKNOWN_SYMBOL
+        self.cells = [(code,) for code in range(len(symbols))] if self.wide else WRITE_CELL
+        self.symbol_index = {symbol: i for i, symbol in enumerate(symbols)}
+        self.blank_symbol = blank_symbol
+        self.max_seen = TM_MAX_SEEN
+        self.initial = self.state_index[initial_state]
+        self.accepting = bytearray(len(self.state_names))
+        for state in final_states:
+            self.accepting[self.state_index[state]] = 1
+
+        # transitions[estado][código lido] = tupla de (novo estado, código escrito, deslocamento)
+        self.transitions = [dict() for _ in self.state_names]
+        for state, symbol_paths in transitions.items():
+            row = self.transitions[self.state_index[state]]
+            for symbol, paths in symbol_paths.items():
+                row[self.symbol_index[symbol]] = tuple(
+                    (self.state_index[new_state], self.symbol_index[write], MOVES[move])
+                    for new_state, write, move in paths
+                )
+
+    # Função para preparar o simulador a partir de uma NTM da biblioteca automata
+    @classmethod
+    def from_automaton(cls, tm) -> "TMEngine":
+        """Constrói o simulador a partir de um objeto NTM (automata-lib)."""
+        return cls(tm.states, tm.input_symbols, tm.tape_symbols, tm.transitions,
+                   tm.initial_state, tm.blank_symbol, tm.final_states)
+
+    # Função para preparar o simulador a partir do dicionário serializável (tm_to_dict)
+    @classmethod
+    def from_dict(cls, data: dict) -> "TMEngine":
+        """Constrói o simulador a partir do formato de tm_to_dict."""
+        return cls(data["states"], data["input_symbols"], data["tape_symbols"], data["transitions"],
+                   data["initial_state"], data["blank_symbol"], data["final_states"])
+
+    def encode_input(self, input_string: str):
+        """
+        Codifica a entrada como janela inicial da fita e retorna (cabeça, janela).
+        Símbolos fora do alfabeto recebem um código sem transições: a máquina para ao lê-los.
+        """
+        codes = [self.symbol_index.get(symbol, self.unknown_symbol) for symbol in input_string]
+        codes = tuple(codes) if self.wide else bytes(codes)
+        window = _lstrip(codes)
+        head = len(window) - len(codes)  # brancos iniciais removidos deslocam a cabeça
+        window = _rstrip(window)
+        return (head, window) if window else (0, window)
+
+    def run(self, input_string: str, max_steps: int = TM_MAX_STEPS,
+            max_configurations: int = TM_MAX_CONFIGURATIONS,
+            max_tape_length: int = TM_MAX_TAPE_LENGTH,
+            timeout: float = TM_TIMEOUT, beam_width: int = None, progress=None) -> dict:
+        """
+        Executa a MT sobre a entrada. Retorna um dicionário com:
+          - result: ACCEPTED, REJECTED ou UNDECIDED;
+          - limit: o limite atingido (None se a máquina parou);
+          - stats: passos executados, configurações vivas/máximas, configurações
+            repetidas descartadas, maior fita e tempo gasto.
+        """
+        started = time.monotonic()
+        deadline = started + timeout
+        transitions = self.transitions
+        accepting = self.accepting
+        max_seen = self.max_seen
+        cells = self.cells
+
+        head, window = self.encode_input(input_string)
+        current = {(self.initial, head, window)}
+        seen = {_digest(self.initial, head, window)}
+        peak = 1
+        steps = duplicates = beam_pruned = 0
+        longest = max(len(window), 1)
+        result, limit = REJECTED, None
+        accepted = accepting[self.initial] == 1
+
+        while current:
+            if accepted:
+                result = ACCEPTED
+                break
+            if len(current) > max_configurations:
+                result, limit = UNDECIDED, "max_configurations"
+                break
+            if longest > max_tape_length:
+                result, limit = UNDECIDED, "max_tape_length"
+                break
+            if steps >= max_steps:
+                result, limit = UNDECIDED, "max_steps"
+                break
+            if steps & 0xF == 0:
+                if steps & 0xFF == 0 and time.monotonic() > deadline:
+                    result, limit = UNDECIDED, "timeout"
+                    break
+                if progress is not None and progress(steps, len(current)):
+                    result, limit = UNDECIDED, "cancelled"
+                    break
+
+            following = set()
+            for state, head, window in current:
+                size = len(window)
+                paths = transitions[state].get(window[head] if 0 <= head < size else 0)
+                if not paths:
+                    continue  # a configuração para sem aceitar
+                for new_state, write, move in paths:
+                    if 0 < head < size - 1 and write:
+                        # Caso comum: escrita no interior da janela, sem alterar as pontas
+                        if window[head] == write:
+                            new_window = window
+                        else:
+                            new_window = window[:head] + cells[write] + window[head + 1:]
+                        new_head = head + move
+                    else:
+                        new_head, new_window = _write(window, head, write, cells)
+                        new_head += move
+                    config = (new_state, new_head, new_window)
+                    if config in following:
+                        continue
+                    digest = _digest(new_state, new_head, new_window)
+                    if digest in seen:
+                        duplicates += 1
+                        continue
+                    if len(seen) < max_seen:
+                        seen.add(digest)
+                    following.add(config)
+                    if accepting[new_state]:
+                        accepted = True
+                    if len(new_window) > longest:
+                        longest = len(new_window)
+
+            if beam_width is not None and len(following) > beam_width:
+                kept = sorted(following, key=lambda c: (len(c[2]), c[0], c[1], c[2]))[:beam_width]
+                beam_pruned += len(following) - beam_width
+                following = set(kept)
+
+            current = following
+            steps += 1
+            if len(current) > peak:
+                peak = len(current)
+
+        if result == REJECTED and beam_pruned:
+            # Configurações descartadas pelo feixe poderiam levar à aceitação
+            result, limit = UNDECIDED, "beam_width"
+
+        stats = {
+            "steps": steps,
+            "live_configurations": len(current),
+            "peak_configurations": peak,
+            "duplicates_pruned": duplicates,
+            "beam_pruned": beam_pruned,
+            "max_tape_length": longest,
+            "elapsed_ms": round((time.monotonic() - started) * 1000, 3),
+        }
+        return {"result": result, "limit": limit, "stats": stats}
+
+    def trace(self, input_string: str, max_steps: int = TM_MAX_STEPS,
+              max_configurations: int = TM_MAX_CONFIGURATIONS,
+              max_tape_length: int = TM_MAX_TAPE_LENGTH,
+              timeout: float = TM_TIMEOUT, beam_width: int = None, progress=None,
+              max_configurations_logged: int = TRACE_MAX_CONFIGURATIONS):
+        """
+        Executa como `run`, registrando para cada configuração alcançada a anterior e
+        a transição usada, e retorna (resultado, Trace) com um caminho da computação:
+        até a configuração de aceitação ou, senão, até a última configuração alcançada.
+        Separado de `run` para que execuções sem trace não tenham custo extra.
+        """
+        started = time.monotonic()
+        deadline = started + timeout
+        transitions = self.transitions
+        accepting = self.accepting
+        max_seen = self.max_seen
+        cells = self.cells
+
+        parents = array("l", [-1])
+        moves = array("l", [-1])
+        move_keys = []
+        move_index = {}
+
+        head, window = self.encode_input(input_string)
+        current = {(self.initial, head, window): 0}  # configuração -> número no registro
+        seen = {_digest(self.initial, head, window)}
+        peak = 1
+        steps = duplicates = beam_pruned = 0
+        longest = max(len(window), 1)
+        result, limit = REJECTED, None
+        end = 0 if accepting[self.initial] else None
+        last = 0
+
+        while current:
+            if end is not None:
+                result = ACCEPTED
+                break
+            if len(current) > max_configurations:
+                result, limit = UNDECIDED, "max_configurations"
+                break
+            if longest > max_tape_length:
+                result, limit = UNDECIDED, "max_tape_length"
+                break
+            if steps >= max_steps:
+                result, limit = UNDECIDED, "max_steps"
+                break
+            if len(parents) > max_configurations_logged:
+                result, limit = UNDECIDED, "max_trace"
+                break
+            if steps & 0xF == 0:
+                if steps & 0xFF == 0 and time.monotonic() > deadline:
+                    result, limit = UNDECIDED, "timeout"
+                    break
+                if progress is not None and progress(steps, len(current)):
+                    result, limit = UNDECIDED, "cancelled"
+                    break
+
+            following = {}
+            for (state, head, window), number in current.items():
+                size = len(window)
+                read = window[head] if 0 <= head < size else 0
+                paths = transitions[state].get(read)
+                if not paths:
+                    continue
+                for new_state, write, move in paths:
+                    new_head, new_window = _write(window, head, write, cells)
+                    config = (new_state, new_head + move, new_window)
+                    if config in following:
+                        continue
+                    digest = _digest(*config)
+                    if digest in seen:
+                        duplicates += 1
+                        continue
+                    if len(seen) < max_seen:
+                        seen.add(digest)
+                    key = (state, read, new_state, write, move)
+                    move_number = move_index.get(key)
+                    if move_number is None:
+                        move_number = move_index[key] = len(move_keys)
+                        move_keys.append(key)
+                    parents.append(number)
+                    moves.append(move_number)
+                    following[config] = len(parents) - 1
+                    if accepting[new_state] and end is None:
+                        end = len(parents) - 1
+                    if len(new_window) > longest:
+                        longest = len(new_window)
+
+            if beam_width is not None and len(following) > beam_width:
+                kept = sorted(following, key=lambda c: (len(c[2]), c[0], c[1], c[2]))[:beam_width]
+                beam_pruned += len(following) - beam_width
+                following = {config: following[config] for config in kept}
+
+            if following:
+                last = min(following.values())
+            current = following
+            steps += 1
+            if len(current) > peak:
+                peak = len(current)
+
+        if result == REJECTED and beam_pruned:
+            result, limit = UNDECIDED, "beam_width"
+
+        stats = {
+            "steps": steps,
+            "live_configurations": len(current),
+            "peak_configurations": peak,
+            "duplicates_pruned": duplicates,
+            "beam_pruned": beam_pruned,
+            "max_tape_length": longest,
+            "elapsed_ms": round((time.monotonic() - started) * 1000, 3),
+        }
+
+        # Caminho até a configuração de aceitação (ou a última alcançada)
+        path = []
+        number = end if end is not None else last
+        while number > 0:
+            path.append(move_keys[moves[number]])
+            number = parents[number]
+        path.reverse()
+
+        trace = Trace("turing", {"initial_state": self.state_names[self.initial]}, context=(0,))
+        states, symbols = self.state_names, self.symbol_names
+        position = 0
+        for key in path:
+            state, read, new_state, write, move = key
+            number = trace.transition(key, (
+                states[state], _symbol_name(symbols, read), states[new_state],
+                _symbol_name(symbols, write), MOVE_NAMES[move],
+            ))
+            position += move
+            if not trace.append((number,), (position,)):
+                break
+        return {"result": result, "limit": limit, "stats": stats}, trace
+
+    def accepts(self, input_string: str, **limits):
+        """True/False, ou None se algum limite foi atingido."""
+        run = self.run(input_string, **limits)
+        return None if run["limit"] is not None else run["result"] == ACCEPTED
+
+    def accepts_batch(self, input_strings: list, **limits) -> list:
+        """Aplica `accepts` a cada string, com os mesmos limites."""
+        return [self.accepts(input_string, **limits) for input_string in input_strings]
+
+
+# Função para escrever um símbolo na janela da fita, mantendo-a sem brancos nas pontas
+def _write(window, head: int, code: int, cells=WRITE_CELL):
+    """
+    Retorna (cabeça, janela) após escrever `code` na posição `head`. `cells` traz a
+    célula de cada código, no tipo da janela (bytes ou, com células largas, tupla).
+    """
+    size = len(window)
+    if 0 <= head < size:
+        if window[head] == code:
+            return head, window
+        window = window[:head] + cells[code] + window[head + 1:]
+    elif code == 0:
+        return head, window  # escrever branco fora da janela não muda a fita
+    elif head < 0:
+        window = cells[code] + cells[0] * (-head - 1) + window
+        return 0, window
+    else:
+        window = window + cells[0] * (head - size) + cells[code]
+        return head, window
+
+    if code == 0 and (head == 0 or head == size - 1):
+        stripped = _lstrip(window)
+        head -= len(window) - len(stripped)
+        window = _rstrip(stripped)
+    return head, window
+
+
+# Funções para remover os brancos do início e do fim da janela da fita
+def _lstrip(window):
+    if isinstance(window, bytes):
+        return window.lstrip(b"\x00")
+    start = 0
+    while start < len(window) and window[start] == 0:
+        start += 1
+    return window[start:]
+
+
+def _rstrip(window):
+    if isinstance(window, bytes):
+        return window.rstrip(b"\x00")
+    end = len(window)
+    while end > 0 and window[end - 1] == 0:
+        end -= 1
+    return window[:end]
+
+
+# Função para obter o nome de um código de símbolo da fita
+def _symbol_name(symbols: list, code: int):
+    return symbols[code] if code < len(symbols) else None
+
+
+# Função para calcular o resumo (128 bits) de uma configuração
+def _digest(state: int, head: int, window) -> bytes:
+    if not isinstance(window, bytes):
+        window = array("I", window).tobytes()
+    return hashlib.blake2b(
+        state.to_bytes(4, "little") + head.to_bytes(8, "little", signed=True) + window,
+        digest_size=16,
+    ).digest()
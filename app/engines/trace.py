@@ -0,0 +1,140 @@
+import os
+
+# Passos entre dois pontos de retomada (checkpoints) de um trace
+TRACE_CHECKPOINT_INTERVAL = int(os.environ.get("TRACE_CHECKPOINT_INTERVAL", "1024"))
+
+# Tamanho máximo (bytes) da codificação de um trace; os passos seguintes não são gravados
+TRACE_MAX_BYTES = int(os.environ.get("TRACE_MAX_BYTES", str(16 * 1024 * 1024)))
+
+# Configurações registradas (origem de cada uma) para reconstruir o caminho de um PDA/MT
+TRACE_MAX_CONFIGURATIONS = int(os.environ.get("TRACE_MAX_CONFIGURATIONS", "5000000"))
+
+
+# Funções de codificação (varint LEB128 e zigzag para valores com sinal)
+def zigzag(value: int) -> int:
+    return value << 1 if value >= 0 else (-value << 1) - 1
+
+
+def unzigzag(value: int) -> int:
+    return value >> 1 if not value & 1 else -((value + 1) >> 1)
+
+
+def read_varint(data, offset: int):
+    """Retorna (valor, posição seguinte)."""
+    value = shift = 0
+    while True:
+        byte = data[offset]
+        offset += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, offset
+        shift += 7
+
+
+# Caminho de uma computação, codificado de forma compacta
+class Trace:
+    """
+    Cada passo é gravado como uma sequência curta de varints com apenas o que mudou:
+      - afd: (símbolo lido, variação do número do estado);
+      - pilha e turing: (número da transição usada), numa tabela com apenas as
+        transições que aparecem no caminho.
+    A cada `interval` passos guarda-se um checkpoint (posição nos bytes e o contexto:
+    estado do AFD, símbolos lidos e altura da pilha do PDA, posição da cabeça da MT),
+    de modo que uma página do trace é decodificada a partir do checkpoint mais próximo.
+    """
+
+    def __init__(self, kind: str, header: dict, context: tuple, names: dict = None,
+                 interval: int = TRACE_CHECKPOINT_INTERVAL, max_bytes: int = TRACE_MAX_BYTES):
+        self.kind = kind
+        self.header = header  # configuração inicial (estado inicial, ...)
+        self.names = names or {}  # nomes usados na decodificação do AFD (estados e símbolos)
+        self.transitions = []
+        self._transition_ids = {}
+        self.data = bytearray()
+        self.steps = 0
+        self.truncated = False
+        self.interval = interval
+        self.max_bytes = max_bytes
+        self.checkpoints = [(0, context)]
+
+    def transition(self, key, description: tuple) -> int:
+        """Número da transição `key` na tabela do trace (incluída no primeiro uso)."""
+        number = self._transition_ids.get(key)
+        if number is None:
+            number = self._transition_ids[key] = len(self.transitions)
+            self.transitions.append(description)
+        return number
+
+    def append(self, record: tuple, context: tuple) -> bool:
+        """Grava um passo; `context` é o contexto depois dele. False se o trace está cheio."""
+        if self.truncated:
+            return False
+        data = self.data
+        if len(data) >= self.max_bytes:
+            self.truncated = True
+            return False
+        for value in record:
+            while value >= 0x80:
+                data.append((value & 0x7F) | 0x80)
+                value >>= 7
+            data.append(value)
+        self.steps += 1
+        if self.steps % self.interval == 0:
+            self.checkpoints.append((len(data), context))
+        return True
+
+    def page(self, start: int, end: int) -> list:
+        """Decodifica os passos start..end-1 (o passo 1 é a primeira transição)."""
+        start = max(start, 1)
+        end = min(end, self.steps + 1)
+        if start >= end:
+            return []
+        step = (start - 1) // self.interval * self.interval
+        offset, context = self.checkpoints[step // self.interval]
+        data = self.data
+        arity = 2 if self.kind == "afd" else 1
+        decode = getattr(self, f"_decode_{self.kind}")
+        steps = []
+        while step + 1 < end:
+            record = []
+            for _ in range(arity):
+                value, offset = read_varint(data, offset)
+                record.append(value)
+            step += 1
+            context, description = decode(context, record)
+            if step >= start:
+                description["step"] = step
+                steps.append(description)
+        return steps
+
+    def _decode_afd(self, context, record):
+        symbol, delta = record
+        state = context[0] + unzigzag(delta)
+        return (state,), {"symbol": self.names["symbols"][symbol], "state": self.names["states"][state]}
+
+    def _decode_pilha(self, context, record):
+        position, depth = context
+        state, input_symbol, pop, new_state, push, pushed = self.transitions[record[0]]
+        if input_symbol:
+            position += 1
+        depth += pushed - 1
+        return (position, depth), {
+            "state": state, "input": input_symbol, "pop": pop, "push": push,
+            "to": new_state, "position": position, "stack_depth": depth,
+        }
+
+    def _decode_turing(self, context, record):
+        head = context[0]
+        state, read, new_state, write, move = self.transitions[record[0]]
+        return (head + {"L": -1, "R": 1}.get(move, 0),), {
+            "state": state, "head": head, "read": read, "write": write, "move": move, "to": new_state,
+        }
+
+    def summary(self) -> dict:
+        return {
+            "kind": self.kind,
+            "steps": self.steps,
+            "encoded_bytes": len(self.data),
+            "truncated": self.truncated,
+            **self.header,
+        }
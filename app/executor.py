@@ -0,0 +1,163 @@
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from fastapi import HTTPException
+from fastapi.concurrency import run_in_threadpool
+import asyncio
+import multiprocessing
+import os
+import threading
+import time
+from app.metrics import acceptance_seconds
+
+# Processos que executam os testes de aceitação (0 = no próprio processo, no threadpool)
+ACCEPTANCE_WORKERS = int(os.environ.get("ACCEPTANCE_WORKERS", str(os.cpu_count() or 1)))
+
+# Simuladores mantidos em memória por processo do pool
+ACCEPTANCE_CACHE_SIZE = int(os.environ.get("ACCEPTANCE_CACHE_SIZE", "256"))
+
+# Trabalho (em símbolos) abaixo do qual AFDs/AFNs rodam direto no event loop:
+# enviar a outro processo custaria mais que a própria execução
+ACCEPTANCE_INLINE_MAX = int(os.environ.get("ACCEPTANCE_INLINE_MAX", "10000"))
+
+
+# O processo do pool ainda não tem o simulador pedido
+class EngineMissing(Exception):
+    pass
+
+
+# Simuladores já recebidos por este processo do pool, por (tipo, id)
+_worker_engines = OrderedDict()
+
+
+# Função executada ao iniciar cada processo do pool
+def _watch_parent(parent_pid: int):
+    """Encerra o processo se o servidor que o criou terminar sem desligar o pool."""
+    def watch():
+        while os.getppid() == parent_pid:
+            time.sleep(1)
+        os._exit(0)
+    threading.Thread(target=watch, daemon=True).start()
+
+
+# Função executada nos processos do pool
+def _call(key, engine, method: str, args: tuple, kwargs: dict):
+    """
+    Chama `engine.method(*args, **kwargs)`. Sem `engine`, usa o simulador guardado
+    para `key` ou levanta EngineMissing para que ele seja enviado.
+    """
+    if engine is None:
+        engine = _worker_engines.get(key)
+        if engine is None:
+            raise EngineMissing(key)
+        _worker_engines.move_to_end(key)
+    else:
+        _worker_engines[key] = engine
+        while len(_worker_engines) > ACCEPTANCE_CACHE_SIZE:
+            _worker_engines.popitem(last=False)
+    return getattr(engine, method)(*args, **kwargs)
+
+
+# Pool de processos para os testes de aceitação
+class AcceptancePool:
+    """
+    Executa simulações (métodos dos simuladores de app/engines) num
+    ProcessPoolExecutor, para que execuções longas de MTs e PDAs não disputem o GIL
+    com o event loop e as demais rotas. O simulador de um id é enviado (pickle) a
+    cada processo apenas na primeira vez que esse processo o usa e fica num LRU
+    local; quando o autômato é alterado (PATCH), `invalidate` muda a chave usada nos
+    processos, de modo que a versão anterior nunca é executada (e sai do LRU).
+    """
+
+    def __init__(self, workers: int = ACCEPTANCE_WORKERS, inline_max: int = ACCEPTANCE_INLINE_MAX):
+        self.workers = workers
+        self.inline_max = inline_max
+        self._executor = None
+        self._lock = threading.Lock()
+        self._generations = {}  # (tipo, id) -> número de alterações desde o início do servidor
+        self.submitted = 0
+        self.shipped = 0
+        self.inline = 0
+        self.restarts = 0
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                # "spawn" evita herdar threads e locks do servidor (e funciona no Windows)
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_watch_parent, initargs=(os.getpid(),))
+            return self._executor
+
+    async def run(self, key, engine, method: str, *args, cost: int = None, **kwargs):
+        """
+        Executa `engine.method(*args, **kwargs)`. Com `cost` (tamanho da entrada)
+        até `inline_max`, roda direto no event loop; sem processos configurados,
+        roda no threadpool; senão, num processo do pool. O tempo gasto é observado
+        em automata_acceptance_seconds.
+        """
+        if cost is not None and cost <= self.inline_max:
+            mode = "inline"
+        elif self.workers <= 0:
+            mode = "threadpool"
+        else:
+            mode = "pool"
+        start = time.perf_counter()
+        try:
+            return await self._dispatch(mode, key, engine, method, args, kwargs)
+        finally:
+            acceptance_seconds.observe(time.perf_counter() - start, key[0], method, mode)
+
+    async def _dispatch(self, mode: str, key, engine, method: str, args: tuple, kwargs: dict):
+        if mode == "inline":
+            self.inline += 1
+            return getattr(engine, method)(*args, **kwargs)
+        if mode == "threadpool":
+            return await run_in_threadpool(getattr(engine, method), *args, **kwargs)
+
+        generation = self._generations.get(key)
+        if generation is not None:
+            key = (*key, generation)
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+        self.submitted += 1
+        try:
+            try:
+                return await loop.run_in_executor(executor, _call, key, None, method, args, kwargs)
+            except EngineMissing:
+                self.shipped += 1
+                return await loop.run_in_executor(executor, _call, key, engine, method, args, kwargs)
+        except BrokenProcessPool:
+            # Um processo morreu (ex.: sem memória); o pool é recriado na próxima chamada
+            with self._lock:
+                if self._executor is executor:
+                    self._executor = None
+                    self.restarts += 1
+            executor.shutdown(wait=False, cancel_futures=True)
+            raise HTTPException(status_code=503, detail="Processo de simulação interrompido, tente novamente",
+                                headers={"Retry-After": "1"})
+
+    def invalidate(self, key):
+        """Descarta (nos processos do pool) o simulador de `key`, cujo autômato foi alterado."""
+        with self._lock:
+            self._generations[key] = self._generations.get(key, 0) + 1
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "inline_max": self.inline_max,
+            "submitted": self.submitted,
+            "engines_shipped": self.shipped,
+            "inline": self.inline,
+            "restarts": self.restarts,
+        }
+
+
+# Pool compartilhado pelos routers
+acceptance_pool = AcceptancePool()
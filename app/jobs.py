@@ -0,0 +1,296 @@
+from concurrent.futures import CancelledError, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from fastapi import HTTPException
+import multiprocessing
+import os
+import threading
+import time
+import uuid
+from app.executor import _watch_parent
+
+# Simulações em segundo plano executadas ao mesmo tempo
+JOB_WORKERS = int(os.environ.get("JOB_WORKERS", "2"))
+
+# Jobs aguardando um worker; além disso a criação recebe 503
+JOB_QUEUE_DEPTH = int(os.environ.get("JOB_QUEUE_DEPTH", "100"))
+
+# Tempo máximo (s) de uma simulação em segundo plano (substitui PDA_TIMEOUT/TM_TIMEOUT)
+JOB_TIMEOUT = float(os.environ.get("JOB_TIMEOUT", "600"))
+
+# Tempo (s) durante o qual o resultado de um job terminado continua disponível
+JOB_RESULT_TTL = float(os.environ.get("JOB_RESULT_TTL", "3600"))
+
+# Executa os jobs em processos próprios (0 = em threads do servidor)
+JOB_PROCESSES = os.environ.get("JOB_PROCESSES", "1") != "0"
+
+# Situações possíveis de um job
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+# Campos de cada posição da memória compartilhada de progresso
+SLOT_STEPS = 0
+SLOT_LIVE = 1
+SLOT_CANCEL = 2  # 1 quando o cancelamento foi pedido
+SLOT_STARTED = 3  # início da execução (ms desde a época), 0 enquanto na fila
+SLOT_FIELDS = 4
+
+# Memória de progresso recebida por este processo de jobs
+_worker_slots = None
+
+
+# Função executada ao iniciar cada processo de jobs
+def _init_job_worker(parent_pid: int, slots):
+    global _worker_slots
+    _worker_slots = slots
+    _watch_parent(parent_pid)
+
+
+# Função executada nos processos (ou threads) de jobs
+def _run_job(slot: int, engine, input_string, limits: dict, slots=None):
+    """
+    Executa `engine.run(input_string, progress=..., **limits)`. O progresso é
+    escrito na posição `slot` da memória compartilhada, onde também é lido o
+    pedido de cancelamento.
+    """
+    slots = _worker_slots if slots is None else slots
+    base = slot * SLOT_FIELDS
+
+    def progress(steps: int, live_configurations: int) -> bool:
+        slots[base + SLOT_STEPS] = steps
+        slots[base + SLOT_LIVE] = live_configurations
+        return slots[base + SLOT_CANCEL] != 0
+
+    if slots[base + SLOT_CANCEL]:
+        return None  # cancelado antes de começar
+    slots[base + SLOT_STARTED] = int(time.time() * 1000)
+    return engine.run(input_string, progress=progress, **limits)
+
+
+# Uma simulação executada em segundo plano
+class Job:
+    """
+    Guarda a situação e o resultado de uma simulação. O progresso (passos executados
+    e configurações vivas) e o pedido de cancelamento ficam na posição `slot` da
+    memória compartilhada com os processos de jobs enquanto o job não termina.
+    """
+
+    def __init__(self, kind: str, automata_id: str, slots, slot: int):
+        self.id = str(uuid.uuid4())
+        self.kind = kind
+        self.automata_id = automata_id
+        self.status = QUEUED
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.steps = 0
+        self.live_configurations = 0
+        self.cancel_requested = False
+        self.result = None
+        self.error = None
+        self.future = None
+        self._slots = slots
+        self.slot = slot
+
+    def _read_slot(self):
+        """Atualiza situação e progresso a partir da memória compartilhada (job não terminado)."""
+        base = self.slot * SLOT_FIELDS
+        started = self._slots[base + SLOT_STARTED]
+        if started and self.status == QUEUED:
+            self.status = RUNNING
+            self.started_at = started / 1000
+        self.steps = self._slots[base + SLOT_STEPS]
+        self.live_configurations = self._slots[base + SLOT_LIVE]
+
+    def to_dict(self) -> dict:
+        now = self.finished_at or time.time()
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "automata_id": self.automata_id,
+            "status": self.status,
+            "cancel_requested": self.cancel_requested,
+            "progress": {"steps": self.steps, "live_configurations": self.live_configurations},
+            "elapsed_s": round(now - self.started_at, 3) if self.started_at else 0.0,
+            "result": self.result,
+            "error": self.error,
+            "expires_in_s": round(self.finished_at + JOB_RESULT_TTL - time.time(), 1) if self.finished_at else None,
+        }
+
+
+# Fila local de simulações em segundo plano
+class JobManager:
+    """
+    Executa os jobs num ProcessPoolExecutor próprio (no máximo `workers` ao mesmo
+    tempo, até `queue_depth` aguardando), para que simulações de minutos não
+    disputem o GIL com o event loop. Cada job recebe uma posição numa memória
+    compartilhada (multiprocessing.RawArray) entregue aos processos na criação:
+    o simulador escreve nela o progresso e lê o pedido de cancelamento a cada
+    verificação. Com `processes=False`, os jobs rodam em threads do servidor.
+    Os jobs terminados são descartados `ttl` segundos depois de terminar; a
+    limpeza acontece a cada criação ou consulta.
+    """
+
+    def __init__(self, workers: int = JOB_WORKERS, queue_depth: int = JOB_QUEUE_DEPTH,
+                 ttl: float = JOB_RESULT_TTL, processes: bool = JOB_PROCESSES):
+        self.workers = workers
+        self.queue_depth = queue_depth
+        self.ttl = ttl
+        self.processes = processes
+        self._context = multiprocessing.get_context("spawn")
+        self._slots = self._context.RawArray("q", (workers + queue_depth) * SLOT_FIELDS)
+        self._free_slots = list(range(workers + queue_depth - 1, -1, -1))
+        self._executor = None
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self.completed = 0
+        self.failed = 0
+        self.cancelled = 0
+        self.rejected = 0
+        self.expired = 0
+        self.restarts = 0
+
+    def _get_executor(self):
+        """Cria o pool na primeira submissão (ou depois que um processo morreu); chamado com o lock."""
+        if self._executor is None:
+            if self.processes:
+                # "spawn" evita herdar threads e locks do servidor (e funciona no Windows)
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=self._context,
+                    initializer=_init_job_worker, initargs=(os.getpid(), self._slots))
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="job")
+        return self._executor
+
+    def submit(self, kind: str, automata_id: str, engine, input_string, finish, steps_stat: str,
+               **limits) -> Job:
+        """
+        Agenda `engine.run(input_string, **limits)` (o simulador é enviado ao processo
+        por pickle); `finish(run)`, chamado no servidor, monta o resultado do job, e
+        `run["stats"][steps_stat]` é o progresso final. Responde 503 se a fila estiver cheia.
+        """
+        with self._lock:
+            self._purge()
+            if not self._free_slots:  # uma posição por job na fila ou em execução
+                self.rejected += 1
+                raise HTTPException(status_code=503, detail="Fila de jobs cheia, tente novamente mais tarde",
+                                    headers={"Retry-After": "5"})
+            slot = self._free_slots.pop()
+            base = slot * SLOT_FIELDS
+            self._slots[base:base + SLOT_FIELDS] = [0] * SLOT_FIELDS
+            job = Job(kind, automata_id, self._slots, slot)
+            self._jobs[job.id] = job
+            executor = self._get_executor()
+            slots = None if self.processes else self._slots
+            job.future = executor.submit(_run_job, slot, engine, input_string, limits, slots)
+        job.future.add_done_callback(lambda future: self._finish(job, future, finish, steps_stat, executor))
+        return job
+
+    def _finish(self, job: Job, future, finish, steps_stat: str, executor):
+        """Registra o resultado de um job terminado e libera sua posição de progresso."""
+        run = result = error = None
+        try:
+            run = future.result()
+            if run is not None:
+                result = finish(run)
+        except CancelledError:
+            pass
+        except BrokenProcessPool:
+            # Um processo morreu (ex.: sem memória); o pool é recriado na próxima submissão
+            error = "Processo de simulação interrompido"
+            with self._lock:
+                if self._executor is executor:
+                    self._executor = None
+                    self.restarts += 1
+            executor.shutdown(wait=False, cancel_futures=True)
+        except Exception as e:
+            error = str(e)
+
+        with self._lock:
+            job._read_slot()
+            if run is not None:
+                job.steps = run["stats"][steps_stat]
+                job.live_configurations = run["stats"]["live_configurations"]
+            job.result = result
+            job.error = error
+            if error is not None:
+                job.status = FAILED
+                self.failed += 1
+            elif job.cancel_requested or result is None:
+                job.status = CANCELLED
+                self.cancelled += 1
+            else:
+                job.status = DONE
+                self.completed += 1
+            job.finished_at = time.time()
+            self._free_slots.append(job.slot)
+
+    def get(self, job_id: str):
+        """Retorna o job ou None (inexistente ou expirado)."""
+        with self._lock:
+            self._purge()
+            job = self._jobs.get(job_id)
+            if job is not None and job.finished_at is None:
+                job._read_slot()
+            return job
+
+    def cancel(self, job_id: str):
+        """
+        Pede o cancelamento do job. Um job na fila é cancelado na hora; um job em
+        execução para na próxima vez que o simulador informar o progresso.
+        """
+        with self._lock:
+            self._purge()
+            job = self._jobs.get(job_id)
+            if job is None or job.finished_at is not None:
+                return job
+            self._slots[job.slot * SLOT_FIELDS + SLOT_CANCEL] = 1
+            job.cancel_requested = True
+            job._read_slot()
+        # Um job que ainda não começou nunca vai rodar; _finish o registra como cancelado
+        job.future.cancel()
+        return job
+
+    def _purge(self):
+        """Descarta os jobs terminados há mais de `ttl` segundos (chamado com o lock)."""
+        limit = time.time() - self.ttl
+        expired = [job_id for job_id, job in self._jobs.items()
+                   if job.finished_at is not None and job.finished_at < limit]
+        for job_id in expired:
+            del self._jobs[job_id]
+        self.expired += len(expired)
+
+    def shutdown(self):
+        with self._lock:
+            for job in self._jobs.values():
+                if job.finished_at is None:
+                    self._slots[job.slot * SLOT_FIELDS + SLOT_CANCEL] = 1
+                    job.cancel_requested = True
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> dict:
+        with self._lock:
+            for job in self._jobs.values():
+                if job.finished_at is None:
+                    job._read_slot()
+            return {
+                "workers": self.workers,
+                "processes": self.processes,
+                "queue_depth": self.queue_depth,
+                "queued": sum(1 for job in self._jobs.values() if job.status == QUEUED),
+                "running": sum(1 for job in self._jobs.values() if job.status == RUNNING),
+                "completed": self.completed,
+                "failed": self.failed,
+                "cancelled": self.cancelled,
+                "rejected": self.rejected,
+                "expired": self.expired,
+                "restarts": self.restarts,
+            }
+
+
+# Fila compartilhada pelos routers
+job_manager = JobManager()
@@ -0,0 +1,50 @@
+from fastapi import HTTPException
+from fastapi.responses import StreamingResponse
+from itertools import islice
+import json
+import os
+from app.batch import NDJSON_MEDIA_TYPE
+
+# Palavras retornadas por página na enumeração (padrão e máximo)
+LANGUAGE_PAGE_SIZE = 1000
+LANGUAGE_PAGE_MAX = int(os.environ.get("LANGUAGE_PAGE_MAX", "1000000"))
+
+# Palavras enviadas em cada bloco da resposta em streaming
+STREAM_BLOCK_WORDS = 512
+
+
+# Função para validar os parâmetros de contagem/enumeração
+def check_language_params(max_length: int, server_max: int, offset: int = 0, limit: int = 0):
+    if max_length < 0 or max_length > server_max:
+        raise HTTPException(status_code=400, detail=f"'max_length' deve estar entre 0 e {server_max}")
+    if offset < 0:
+        raise HTTPException(status_code=400, detail="'offset' deve ser maior ou igual a 0")
+    if limit < 0 or limit > LANGUAGE_PAGE_MAX:
+        raise HTTPException(status_code=400, detail=f"'limit' deve estar entre 0 e {LANGUAGE_PAGE_MAX}")
+
+
+# Função para montar a resposta com as contagens por tamanho
+def counts_response(max_length: int, counts: list, **extra) -> dict:
+    return {"max_length": max_length, "counts": counts, "total": sum(counts), **extra}
+
+
+# Função para enviar uma página da enumeração em streaming (uma palavra JSON por linha)
+def words_response(words, total: int, offset: int, limit: int) -> StreamingResponse:
+    """
+    `words` é o gerador das palavras a partir de `offset`; apenas `limit` são
+    consumidas, conforme a resposta é enviada. O total de palavras e o início da
+    próxima página vão nos cabeçalhos X-Total-Count e X-Next-Offset.
+    """
+    headers = {"X-Total-Count": str(total)}
+    if offset + limit < total:
+        headers["X-Next-Offset"] = str(offset + limit)
+    return StreamingResponse(_ndjson_blocks(islice(words, limit)), media_type=NDJSON_MEDIA_TYPE, headers=headers)
+
+
+# Função para agrupar as linhas em blocos (cada item do gerador custa uma passagem pelo threadpool)
+def _ndjson_blocks(words):
+    while True:
+        block = "".join(json.dumps(word) + "\n" for word in islice(words, STREAM_BLOCK_WORDS))
+        if not block:
+            return
+        yield block
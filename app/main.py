@@ -1,5 +1,11 @@
 from fastapi import FastAPI
-from app.routers import afd, pilha, turing
+from fastapi.responses import PlainTextResponse
+from app.routers import afd, afn, pilha, turing, jobs
+from app.render import render_cache, render_pool
+from app.executor import acceptance_pool
+from app.jobs import job_manager
+from app.traces import trace_store
+from app.metrics import MetricsMiddleware, register_collector, render_metrics
 
 # Inicializa a aplicação FastAPI com metadados para documentação
 app = FastAPI(
@@ -8,15 +14,80 @@ app = FastAPI(
     version="1.0.0"
 )
 
+# Mede o tempo de cada requisição (exportado em /metrics)
+app.add_middleware(MetricsMiddleware)
+
 # Routers das diferentes implementações de autômatos
 app.include_router(afd.router, prefix="/afd", tags=["AFD"])
+app.include_router(afn.router, prefix="/afn", tags=["AFN"])
 app.include_router(pilha.router, prefix="/pilha", tags=["pilha"])
 app.include_router(turing.router, prefix="/turing", tags=["Máquina de Turing"])
+app.include_router(jobs.router, prefix="/jobs", tags=["jobs"])
+
+# Encerra os processos do pool de aceitação e os jobs junto com o servidor
+@app.on_event("shutdown")
+def shutdown_acceptance_pool():
+    acceptance_pool.shutdown()
+    job_manager.shutdown()
 
 @app.get("/")
 def read_root():
     return {"message": "Bem-vindo à API de Autômatos!"}
 
+# Estatísticas internas da API (contadores de cache etc.)
+@app.get("/stats", summary="Estatísticas internas da API")
+def read_stats():
+    return {
+        "render_cache": render_cache.stats(),
+        "render_pool": render_pool.stats(),
+        "acceptance_pool": acceptance_pool.stats(),
+        "jobs": job_manager.stats(),
+        "traces": trace_store.stats(),
+        "storage": {
+            "afd": afd.afd_store.stats(),
+            "afn": afn.afn_store.stats(),
+            "pilha": pilha.pda_store.stats(),
+            "turing": turing.tm_store.stats()
+        },
+        "dedup": {
+            "afd": afd.afd_dedup.stats(),
+            "afn": afn.afn_dedup.stats(),
+            "pilha": pilha.pda_dedup.stats(),
+            "turing": turing.tm_dedup.stats()
+        }
+    }
+
+# Função que exporta as estatísticas de /stats como gauges em /metrics
+def collect_stats():
+    """
+    Tamanhos dos armazenamentos e contadores de cache e deduplicação ganham o rótulo
+    "kind"; as demais seções viram automata_<seção>_<campo>.
+    """
+    stats = read_stats()
+    for section in ("storage", "dedup"):
+        for kind, values in stats[section].items():
+            for name, value in values.items():
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    yield f"automata_{section}_{name}", {"kind": kind}, value
+    for section, values in stats.items():
+        if section in ("storage", "dedup"):
+            continue
+        for name, value in values.items():
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                yield f"automata_{section}_{name}", {}, value
+
+register_collector(collect_stats)
+
+# Métricas no formato de exposição do Prometheus
+@app.get("/metrics", summary="Métricas no formato do Prometheus", response_class=PlainTextResponse)
+def read_metrics():
+    """
+    Histogramas do tempo de resposta por rota, da persistência (save_*_store), das
+    simulações e das renderizações, mais os valores de /stats (tamanhos dos
+    armazenamentos, acertos de cache, filas).
+    """
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
 # Executa a aplicação se este arquivo for rodado diretamente
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,163 @@
+from bisect import bisect_left
+import threading
+import time
+
+# Limites (s) dos intervalos dos histogramas de tempo
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+# Histograma em memória no formato do Prometheus
+class Histogram:
+    """
+    Conta as observações por intervalo (`buckets`) para cada combinação de rótulos,
+    além da soma e do total. Uma observação custa uma busca binária e três somas.
+    """
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple, buckets: tuple = DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = buckets
+        self._series = {}  # rótulos -> [contagem por intervalo (+Inf no fim), soma]
+        self._lock = threading.Lock()
+        registry.append(self)
+
+    def observe(self, value: float, *labels):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def time(self, *labels):
+        """Context manager que observa o tempo gasto no bloco."""
+        return _Timer(self, labels)
+
+    def samples(self):
+        with self._lock:
+            series = [(labels, list(counts), total) for labels, (counts, total) in self._series.items()]
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        for labels, counts, total in sorted(series):
+            pairs = list(zip(self.labelnames, labels))
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f"{self.name}_bucket{_labels(pairs + [('le', le)])} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(pairs)} {total}")
+            lines.append(f"{self.name}_count{_labels(pairs)} {cumulative}")
+        return lines
+
+
+class _Timer:
+    __slots__ = ("histogram", "labels", "start")
+
+    def __init__(self, histogram: Histogram, labels: tuple):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.start, *self.labels)
+
+
+# Função para formatar os rótulos de uma amostra
+def _labels(pairs) -> str:
+    if not pairs:
+        return ""
+    escaped = []
+    for name, value in pairs:
+        value = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        escaped.append(f'{name}="{value}"')
+    return "{" + ",".join(escaped) + "}"
+
+
+# Histogramas registrados e funções que fornecem os demais valores no momento da coleta
+registry = []
+collectors = []
+
+# Tempo de cada requisição, por rota (o caminho com parâmetros, ex.: /afd/{automata_id}/test)
+request_seconds = Histogram("automata_http_request_duration_seconds", "Tempo de resposta por rota",
+                            ("method", "route", "status"))
+
+# Tempo gravando um autômato recém-criado (save_*_store)
+persist_seconds = Histogram("automata_persist_seconds", "Tempo de persistência de um autômato", ("kind",))
+
+# Tempo das simulações (teste de aceitação, lotes e traces), por modo de execução
+acceptance_seconds = Histogram("automata_acceptance_seconds", "Tempo das simulações de aceitação",
+                               ("kind", "method", "mode"))
+
+# Tempo para gerar o DOT e renderizá-lo com o Graphviz (apenas quando não está em cache)
+render_seconds = Histogram("automata_render_seconds", "Tempo de renderização de um diagrama", ("kind", "format"))
+
+
+# Função para registrar uma fonte de valores instantâneos (tamanhos, contadores de cache, ...)
+def register_collector(collect):
+    """`collect()` gera tuplas (nome, rótulos (dict), valor), exportadas como gauges."""
+    collectors.append(collect)
+
+
+# Função para gerar o texto de /metrics (formato de exposição do Prometheus)
+def render_metrics() -> str:
+    lines = []
+    for histogram in registry:
+        lines.extend(histogram.samples())
+    gauges = {}
+    for collect in collectors:
+        for name, labels, value in collect():
+            gauges.setdefault(name, []).append((labels, value))
+    for name, samples in gauges.items():
+        lines.append(f"# TYPE {name} gauge")
+        for labels, value in samples:
+            lines.append(f"{name}{_labels(sorted(labels.items()))} {float(value)}")
+    return "\n".join(lines) + "\n"
+
+
+# Middleware ASGI que mede o tempo de cada requisição HTTP
+class MetricsMiddleware:
+    """
+    Observa o tempo até o fim da resposta e o status, rotulados pela rota
+    encontrada (caminhos sem rota ficam como "unmatched", para não criar uma
+    série por URL).
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            request_seconds.observe(time.perf_counter() - start, scope["method"],
+                                    _route_template(scope), str(status))
+
+
+# Função para obter o caminho da rota encontrada (ex.: /afd/{automata_id}/test)
+def _route_template(scope) -> str:
+    """
+    Conforme a versão do FastAPI, o caminho da rota de um router incluído pode vir sem
+    o prefixo do router; nesse caso o prefixo (fixo) é retirado do caminho da requisição.
+    """
+    template = getattr(scope.get("route"), "path", None)
+    if template is None:
+        return "unmatched"
+    path = scope["path"]
+    prefix_segments = path.count("/") - template.count("/")
+    return "/".join(path.split("/")[:prefix_segments + 1]) + template if prefix_segments > 0 else template
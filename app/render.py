@@ -0,0 +1,296 @@
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from fastapi import HTTPException, Request
+from fastapi.responses import Response
+import asyncio
+import hashlib
+import os
+import shutil
+import subprocess
+import threading
+import time
+from app.metrics import render_seconds
+
+# Diretório onde as imagens dos autômatos serão armazenadas (camada em disco do cache)
+IMAGES_DIR = "automata_images"
+
+# Criar pasta para armazenar imagens dos autômatos, se não existir
+os.makedirs(IMAGES_DIR, exist_ok=True)
+
+# Limites do cache de renderização em memória
+RENDER_CACHE_MAX_ENTRIES = int(os.environ.get("RENDER_CACHE_MAX_ENTRIES", "256"))
+RENDER_CACHE_MAX_BYTES = int(os.environ.get("RENDER_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+
+# Camada opcional em disco (IMAGES_DIR), desativada por padrão
+RENDER_CACHE_DISK = os.environ.get("RENDER_CACHE_DISK", "0") == "1"
+
+# Limites do pool de renderização: processos "dot" simultâneos, fila de espera e tempo máximo (s)
+RENDER_CONCURRENCY = int(os.environ.get("RENDER_CONCURRENCY", str(min(4, os.cpu_count() or 1))))
+RENDER_QUEUE_DEPTH = int(os.environ.get("RENDER_QUEUE_DEPTH", "32"))
+RENDER_TIMEOUT = float(os.environ.get("RENDER_TIMEOUT", "30"))
+
+# Formatos aceitos por /visualize e o media type de cada um
+RENDER_FORMATS = {"svg": "image/svg+xml", "png": "image/png"}
+
+
+# Função para validar o formato pedido a /visualize
+def render_format(format: str) -> str:
+    """Retorna o formato normalizado (minúsculo) ou responde 400 se não for suportado."""
+    normalized = format.lower()
+    if normalized not in RENDER_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Formato '{format}' não suportado. Use: "
+                            + ", ".join(RENDER_FORMATS))
+    return normalized
+
+
+# Função para converter uma string DOT em imagem usando o Graphviz
+def render_dot(dot_str: str, format: str, timeout: float = RENDER_TIMEOUT) -> bytes:
+    """
+    Renderiza o DOT no formato pedido (um de RENDER_FORMATS) executando o "dot" do
+    Graphviz num subprocesso, que é encerrado se ultrapassar `timeout` segundos.
+    """
+    format = render_format(format)
+
+    # Adiciona explicitamente o caminho para o Graphviz, se necessário
+    graphviz_path = r"C:\Program Files\Graphviz\bin"
+    if graphviz_path not in os.environ["PATH"]:
+        os.environ["PATH"] += os.pathsep + graphviz_path
+
+    dot_executable = shutil.which("dot")
+    if dot_executable is None:
+        raise HTTPException(status_code=500, detail="O Graphviz (executável 'dot') não está instalado.")
+
+    try:
+        result = subprocess.run(
+            [dot_executable, f"-T{format}"],
+            input=dot_str.encode(),
+            capture_output=True,
+            timeout=timeout,
+        )
+    except subprocess.TimeoutExpired:
+        raise HTTPException(status_code=504, detail="Tempo limite de renderização excedido")
+    if result.returncode != 0:
+        error = result.stderr.decode(errors="replace").strip()
+        raise HTTPException(status_code=500, detail=f"Erro ao renderizar o gráfico: {error}")
+    return result.stdout
+
+
+# Função para calcular o ETag de uma imagem a partir do DOT que a gera
+def dot_etag(dot_str: str, format: str) -> str:
+    """O ETag depende apenas do DOT e do formato, então pode ser calculado sem renderizar."""
+    return '"' + hashlib.sha256(f"{format}\n{dot_str}".encode()).hexdigest()[:32] + '"'
+
+
+# Cache LRU das imagens renderizadas, por tipo + id do autômato + formato
+class RenderCache:
+    """
+    Cache das imagens geradas pelos endpoints /visualize. A imagem de (tipo, id,
+    formato) é reaproveitada até o autômato ser alterado (PATCH), quando os routers
+    chamam `invalidate`. Mantém um LRU limitado em memória e, opcionalmente, uma
+    cópia em disco em IMAGES_DIR que sobrevive a reinícios.
+    """
+
+    def __init__(self, max_entries: int = RENDER_CACHE_MAX_ENTRIES,
+                 max_bytes: int = RENDER_CACHE_MAX_BYTES,
+                 disk_dir: str = IMAGES_DIR if RENDER_CACHE_DISK else None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.disk_dir = disk_dir
+        self._entries = OrderedDict()  # (tipo, id, formato) -> (etag, conteúdo)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.not_modified = 0
+
+    def _disk_path(self, key) -> str:
+        """
+        O id entra no nome do arquivo apenas pelo seu hash e o formato precisa estar
+        em RENDER_FORMATS, então o caminho fica sempre dentro de `disk_dir`.
+        """
+        kind, automata_id, format = key
+        if format not in RENDER_FORMATS or not kind.isalnum():
+            raise ValueError(f"Chave inválida para o cache de renderização: {key!r}")
+        digest = hashlib.sha256(automata_id.encode()).hexdigest()[:32]
+        return os.path.join(self.disk_dir, f"{kind}-{digest}.{format}")
+
+    def get(self, key):
+        """Retorna (etag, conteúdo) ou None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.memory_hits += 1
+                return entry
+
+        if self.disk_dir is not None:
+            path = self._disk_path(key)
+            if os.path.exists(path):
+                with open(path, "rb") as f:
+                    etag_line, content = f.read().split(b"\n", 1)
+                entry = (etag_line.decode(), content)
+                self._put_memory(key, entry)
+                with self._lock:
+                    self.disk_hits += 1
+                return entry
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key, etag: str, content: bytes):
+        path = self._disk_path(key) if self.disk_dir is not None else None
+        self._put_memory(key, (etag, content))
+        if path is not None:
+            tmp_path = path + ".tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(etag.encode() + b"\n" + content)
+            os.replace(tmp_path, path)
+
+    def _put_memory(self, key, entry):
+        size = len(entry[1])
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= len(old[1])
+            self._entries[key] = entry
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted[1])
+
+    def invalidate(self, kind: str, automata_id: str):
+        """Descarta todas as imagens de um autômato (em memória e em disco)."""
+        with self._lock:
+            keys = [key for key in self._entries if key[0] == kind and key[1] == automata_id]
+            for key in keys:
+                self._bytes -= len(self._entries.pop(key)[1])
+        if self.disk_dir is not None:
+            digest = hashlib.sha256(automata_id.encode()).hexdigest()[:32]
+            prefix = f"{kind}-{digest}."
+            for name in os.listdir(self.disk_dir):
+                if name.startswith(prefix):
+                    os.remove(os.path.join(self.disk_dir, name))
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.memory_hits + self.disk_hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "not_modified": self.not_modified,
+                "hit_rate": (self.memory_hits + self.disk_hits) / lookups if lookups else 0.0,
+            }
+
+
+# Cache compartilhado pelos três routers
+render_cache = RenderCache()
+
+
+# Pool limitado de renderização, separado do threadpool que atende as demais rotas
+class RenderPool:
+    """
+    Executa as renderizações em um pool próprio de threads (cada uma apenas aguarda
+    o subprocesso "dot"), de modo que diagramas grandes não ocupam os workers usados
+    pelos endpoints de teste. No máximo `concurrency` renderizações rodam ao mesmo
+    tempo e até `queue_depth` aguardam; além disso a requisição recebe 503.
+    """
+
+    def __init__(self, concurrency: int = RENDER_CONCURRENCY,
+                 queue_depth: int = RENDER_QUEUE_DEPTH,
+                 timeout: float = RENDER_TIMEOUT):
+        self.concurrency = concurrency
+        self.queue_depth = queue_depth
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="render")
+        self._pending = 0
+        self._lock = threading.Lock()
+        self.completed = 0
+        self.rejected = 0
+        self.timeouts = 0
+
+    async def run(self, fn, *args):
+        """Executa `fn(*args)` no pool, ou responde 503 se a fila estiver cheia."""
+        with self._lock:
+            if self._pending >= self.concurrency + self.queue_depth:
+                self.rejected += 1
+                raise HTTPException(
+                    status_code=503,
+                    detail="Fila de renderização cheia, tente novamente em instantes",
+                    headers={"Retry-After": "1"},
+                )
+            self._pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, fn, *args)
+        except HTTPException as e:
+            if e.status_code == 504:
+                with self._lock:
+                    self.timeouts += 1
+            raise
+        finally:
+            with self._lock:
+                self._pending -= 1
+                self.completed += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "concurrency": self.concurrency,
+                "queue_depth": self.queue_depth,
+                "pending": self._pending,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "timeouts": self.timeouts,
+            }
+
+
+# Pool compartilhado pelos três routers
+render_pool = RenderPool()
+
+
+# Função executada no pool: gera o DOT e, se o cliente ainda não tiver a imagem, renderiza
+def _build_and_render(kind: str, build_dot, format: str, if_none_match: str):
+    start = time.perf_counter()
+    dot_str = build_dot()
+    etag = dot_etag(dot_str, format)
+    if if_none_match == etag:
+        return etag, None
+    content = render_dot(dot_str, format, render_pool.timeout)
+    render_seconds.observe(time.perf_counter() - start, kind, format)
+    return etag, content
+
+
+# Função para responder a um pedido de visualização usando o cache
+async def render_response(request: Request, kind: str, automata_id: str, format: str, build_dot) -> Response:
+    """
+    Retorna a imagem do autômato, renderizando-a apenas se não estiver em cache.
+    Responde 304 quando o cliente já possui a versão atual (If-None-Match).
+    `build_dot` é uma função sem argumentos que gera o DOT do autômato; ela e a
+    renderização rodam no pool de renderização, fora do event loop. Formatos fora
+    de RENDER_FORMATS recebem 400.
+    """
+    format = render_format(format)
+    key = (kind, automata_id, format)
+    if_none_match = request.headers.get("if-none-match")
+
+    entry = render_cache.get(key)
+    if entry is None:
+        etag, content = await render_pool.run(_build_and_render, kind, build_dot, format, if_none_match)
+        if content is None:
+            render_cache.not_modified += 1
+            return Response(status_code=304, headers={"ETag": etag})
+        render_cache.put(key, etag, content)
+    else:
+        etag, content = entry
+        if if_none_match == etag:
+            render_cache.not_modified += 1
+            return Response(status_code=304, headers={"ETag": etag})
+
+    return Response(content=content, media_type=RENDER_FORMATS[format], headers={"ETag": etag})
@@ -1,45 +1,57 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request, Query, Depends
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import Response, FileResponse
 from pydantic import BaseModel
 from automata.fa.dfa import DFA  # Importando o Autômato Finito Determinístico
+from frozendict import frozendict
 import json
 import os
-import uuid
 import graphviz
+from app.storage import open_store, LRUCache
+from app.batch import read_input_strings, batch_response
+from app.engines.dfa import CompiledDFA, DEAD, PRODUCT_OPERATIONS, PRODUCT_MAX_STATES
+from app.engines.nfa import CompiledNFA, REGEX_MAX_STATES
+from app.stream import iter_input_chunks
+from app.scan import scan_stream, scan_parallel, SCAN_MATCHES_DEFAULT, SCAN_MAX_MATCHES
+from app.engines.language import LANGUAGE_MAX_LENGTH, LANGUAGE_MAX_CELLS
+from app.language import check_language_params, counts_response, words_response, LANGUAGE_PAGE_SIZE
+from app.executor import acceptance_pool
+from app.traces import store_trace, read_trace
+from app.render import render_response, render_cache
+from app.dedup import content_slot, canonical_set, DedupStats
+from app.edits import rebuild, check_state_edit, edited_final_states, patch_automaton
+from app.metrics import persist_seconds
+from app.serialization import definition_body, definition_openapi, wants_binary, binary_response
 
 # Criação do roteador para o AFD 
 router = APIRouter()
 
-# Armazenamento em memória dos AFDs criados
-afd_store = {}
-
-# Nome do arquivo para persistência dos AFDs
+# Nome do arquivo (snapshot) para persistência dos AFDs
 AFD_FILE = "afd_store.json"
 
-# Diretório onde as imagens dos autômatos serão armazenadas
-IMAGES_DIR = "automata_images"
-
-# Criar pasta para armazenar imagens dos autômatos, se não existir
-os.makedirs(IMAGES_DIR, exist_ok=True)
+# Função para persistir um AFD recém-criado (sem reescrever o armazenamento inteiro)
+def save_afd_store(automata_id: str):
+    """Grava o AFD no armazenamento configurado (AUTOMATA_STORAGE)"""
+    with persist_seconds.time("afd"):
+        afd_store.persist(automata_id)
 
-# Função para salvar o estado atual dos AFDs no arquivo JSON
-def save_afd_store():
-    """Salva os AFDs no arquivo JSON"""
-    with open(AFD_FILE, "w") as f:
-        json.dump({k: afd_to_dict(v) for k, v in afd_store.items()}, f)
-
-# Função para carregar os AFDs armazenados no JSON ao iniciar o servidor
+# Função para carregar os AFDs armazenados ao iniciar o servidor
 def load_afd_store():
-    """Carrega os AFDs do arquivo JSON"""
-    global afd_store
-    if os.path.exists(AFD_FILE):
-        with open(AFD_FILE, "r") as f:
-            try:
-                data = json.load(f)
-                for key, value in data.items():
-                    afd_store[key] = afd_from_dict(value)
-            except json.JSONDecodeError:
-                afd_store = {}  # Se houver erro, reinicia o armazenamento
+    """Prepara o armazenamento dos AFDs (cada um é reconstruído no primeiro acesso)"""
+    afd_store.load()
+    compiled_afd_store.clear()
+
+# Função para obter a tabela de transições compilada de um AFD armazenado
+def get_compiled_afd(automata_id: str):
+    """Retorna o AFD compilado (compilando-o na primeira vez, se necessário) ou None"""
+    afd_store.sync()
+    compiled = compiled_afd_store.get(automata_id)
+    if compiled is None:
+        afd = afd_store.get(automata_id)
+        if afd is None:
+            return None
+        compiled = compiled_afd_store[automata_id] = CompiledDFA.from_automaton(afd)
+    return compiled
 
 # Função para converter um AFD em um dicionário serializável
 def afd_to_dict(afd: DFA) -> dict:
@@ -63,6 +75,49 @@ def afd_from_dict(data: dict) -> DFA:
         final_states=set(data["final_states"])
     )
 
+# Função para aplicar uma alteração (PATCH) já validada a um AFD
+def afd_apply_edit(afd: DFA, edit: dict) -> DFA:
+    """
+    Retorna o AFD alterado, copiando apenas as linhas de transições que mudaram
+    (usada também ao reconstruir um AFD a partir dos deltas gravados).
+    """
+    added = set(edit.get("add_states", ()))
+    removed = set(edit.get("remove_states", ()))
+    transitions = afd.transitions
+    if removed or edit.get("add_transitions"):
+        transitions = {state: paths for state, paths in transitions.items() if state not in removed}
+        for state, paths in edit.get("add_transitions", {}).items():
+            transitions[state] = frozendict({**transitions.get(state, {}), **paths})
+        transitions = frozendict(transitions)
+    states = afd.states
+    if added or removed:
+        states = frozenset((states - removed) | added)
+    return rebuild(afd, states=states, transitions=transitions, final_states=edited_final_states(afd, edit))
+
+# Armazenamento dos AFDs criados, persistido conforme AUTOMATA_STORAGE (journal ou SQLite) e carregado sob demanda
+afd_store = open_store("afd", AFD_FILE, afd_to_dict, afd_from_dict, apply_edit=afd_apply_edit)
+
+# AFDs compilados em tabelas de transição indexadas por inteiros (mesmas chaves de afd_store),
+# mantidos num LRU para limitar a memória
+compiled_afd_store = LRUCache()
+
+# Ids dos AFDs já gerados para cada expressão regular (padrão, alfabeto, minimização)
+regex_afd_cache = LRUCache()
+
+# Id e tamanho do produto dos AFDs já gerados por cada operação (operação, (id, revisão) dos operandos, minimização)
+ops_afd_cache = LRUCache()
+
+# Criações recebidas e quantas reaproveitaram um AFD idêntico já armazenado
+afd_dedup = DedupStats()
+
+# Função para descartar o que foi derivado da versão anterior de um AFD alterado
+def invalidate_afd(automata_id: str):
+    compiled_afd_store.pop(automata_id)
+    render_cache.invalidate("afd", automata_id)
+    acceptance_pool.invalidate(("afd", automata_id))
+
+afd_store.on_edit(invalidate_afd)
+
 # Carregar os AFDs ao iniciar o servidor
 load_afd_store()
 
@@ -74,43 +129,252 @@ class AFDModel(BaseModel):
     initial_state: str  # Estado inicial
     final_states: list[str]  # Estados finais
 
-# Endpoint para criar um AFD e armazená-lo na memória
-@router.post("/create", summary="Cria um AFD")
-def create_afd(data: AFDModel):
-    try:
-        afd = DFA(
-            states=set(data.states),
-            input_symbols=set(data.input_symbols),
-            transitions=data.transitions,
-            initial_state=data.initial_state,
-            final_states=set(data.final_states)
-        )
-        automata_id = str(uuid.uuid4())   # Gera um identificador único
+# Função para obter a forma canônica da definição de um AFD (base do seu id)
+def afd_canonical(data: dict) -> dict:
+    """Estados e símbolos como listas ordenadas; as chaves das transições são ordenadas na serialização."""
+    return {
+        "states": canonical_set(data["states"]),
+        "input_symbols": canonical_set(data["input_symbols"]),
+        "transitions": data["transitions"],
+        "initial_state": data["initial_state"],
+        "final_states": canonical_set(data["final_states"])
+    }
+
+# Função para armazenar um AFD descrito no formato de afd_to_dict
+def store_afd(data: dict):
+    """
+    Retorna (id, AFD, deduplicated). Se um AFD idêntico já estiver armazenado,
+    ele é reaproveitado; senão o AFD é construído, compilado e persistido.
+    """
+    automata_id = content_slot("afd", afd_canonical(data), afd_store)
+    afd = afd_store.get(automata_id)
+    deduplicated = afd is not None
+
+    if not deduplicated:
+        afd = afd_from_dict(data)
         afd_store[automata_id] = afd
+        compiled_afd_store[automata_id] = CompiledDFA.from_automaton(afd)
 
-        save_afd_store()   # Salva o novo AFD no arquivo JSON
+        save_afd_store(automata_id)   # Persiste o novo AFD
+    afd_dedup.record(deduplicated)
+    return automata_id, afd, deduplicated
+
+# Endpoint para criar um AFD e armazená-lo na memória
+@router.post("/create", summary="Cria um AFD", openapi_extra=definition_openapi(AFDModel))
+def create_afd(data: AFDModel = Depends(definition_body("afd", AFDModel)), minimize: bool = False):
+    """
+    O id é derivado da definição canônica do AFD: enviar o mesmo AFD outra vez
+    (mesmo com estados/símbolos em outra ordem) retorna o id já existente, sem
+    armazenar nem compilar uma nova cópia ("deduplicated": true).
+    Com `?minimize=true`, o AFD é minimizado antes de ser armazenado.
+    Aceita também um AFD exportado no formato binário (Content-Type
+    application/vnd.automata+binary).
+    """
+    try:
+        definition = data.model_dump()
+        if minimize:
+            definition = CompiledDFA.from_automaton(afd_from_dict(definition)).minimize()
+        automata_id, afd, deduplicated = store_afd(definition)
 
         return {
-            "message": "AFD criado com sucesso!",
+            "message": "AFD já existente, id reaproveitado" if deduplicated else "AFD criado com sucesso!",
             "id": automata_id,
+            "deduplicated": deduplicated,
             "automata": afd_to_dict(afd)
         }
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+# Modelo de dados para gerar um AFD a partir de uma expressão regular
+class RegexModel(BaseModel):
+    pattern: str  # Expressão regular (|, *, +, ?, {n,m}, [...], ., parênteses)
+    input_symbols: list[str] | None = None  # Alfabeto (padrão: símbolos da expressão)
+    minimize: bool = True  # Minimiza o AFD gerado
+    max_states: int | None = None  # Limite de estados (nunca acima de REGEX_MAX_STATES)
+
+# Endpoint para gerar um AFD a partir de uma expressão regular
+@router.post("/from-regex", summary="Cria um AFD a partir de uma expressão regular")
+def create_afd_from_regex(data: RegexModel):
+    """
+    Constrói o AFN de Thompson da expressão e o determiniza sob demanda (apenas os
+    subconjuntos alcançáveis). Se o AFD passar do limite de estados, a construção é
+    interrompida com erro 400. Expressões já processadas retornam o id em cache.
+    """
+    alphabet = tuple(sorted(set(data.input_symbols))) if data.input_symbols else None
+    cache_key = (data.pattern, alphabet, data.minimize)
+    automata_id = regex_afd_cache.get(cache_key)
+    afd = afd_store.get(automata_id) if automata_id is not None else None
+    if afd is not None and afd_store.revision(automata_id) == 0:  # um AFD alterado não serve mais
+        return {"message": "AFD já gerado para esta expressão", "id": automata_id,
+                "deduplicated": True, "automata": afd_to_dict(afd)}
+
+    max_states = min(data.max_states or REGEX_MAX_STATES, REGEX_MAX_STATES)
+    try:
+        definition = CompiledNFA.from_regex(data.pattern, alphabet).determinize(max_states)
+        if data.minimize:
+            definition = CompiledDFA.from_dict(definition).minimize()
+        automata_id, afd, deduplicated = store_afd(definition)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    regex_afd_cache[cache_key] = automata_id
+    return {
+        "message": "AFD criado com sucesso!",
+        "id": automata_id,
+        "deduplicated": deduplicated,
+        "automata": afd_to_dict(afd)
+    }
+
+# Modelo de dados para combinar AFDs armazenados
+class OpsModel(BaseModel):
+    operation: str  # union, intersection, difference, symmetric_difference ou complement
+    ids: list[str]  # Operandos (um para complement; dois ou mais, combinados da esquerda para a direita)
+    minimize: bool = False  # Minimiza o AFD gerado
+    max_states: int | None = None  # Limite de estados (nunca acima de PRODUCT_MAX_STATES)
+
+# Endpoint para combinar AFDs armazenados pela construção do produto
+@router.post("/ops", summary="Combina AFDs armazenados (união, interseção, diferença, complemento)")
+def afd_operation(data: OpsModel):
+    """
+    Monta apenas os pares de estados alcançáveis a partir do par inicial (busca em
+    largura), nunca o produto cartesiano completo, sobre a união dos alfabetos.
+    Com mais de dois ids, a operação é aplicada da esquerda para a direita
+    (a - b - c para difference). O AFD gerado é armazenado com seu próprio id;
+    se passar do limite de estados, a construção é interrompida com erro 400.
+    """
+    if data.operation != "complement" and data.operation not in PRODUCT_OPERATIONS:
+        raise HTTPException(status_code=400, detail=f"Operação '{data.operation}' não suportada. Use: "
+                            + ", ".join([*PRODUCT_OPERATIONS, "complement"]))
+    if data.operation == "complement" and len(data.ids) != 1:
+        raise HTTPException(status_code=400, detail="O complemento recebe exatamente um AFD")
+    if data.operation != "complement" and len(data.ids) < 2:
+        raise HTTPException(status_code=400, detail=f"A operação '{data.operation}' recebe pelo menos dois AFDs")
+
+    operands = [get_compiled_afd(automata_id) for automata_id in data.ids]
+    if any(compiled is None for compiled in operands):
+        raise HTTPException(status_code=404, detail="AFD não encontrado")
+
+    max_states = min(data.max_states or PRODUCT_MAX_STATES, PRODUCT_MAX_STATES)
+    cache_key = (data.operation, tuple((automata_id, afd_store.revision(automata_id)) for automata_id in data.ids),
+                 data.minimize)
+    automata_id, product_states = ops_afd_cache.get(cache_key) or (None, None)
+    afd = afd_store.get(automata_id) if automata_id is not None else None
+    # Um AFD alterado não serve mais; acima do limite pedido, a construção é refeita para gerar o erro
+    if afd is not None and afd_store.revision(automata_id) == 0 and product_states <= max_states:
+        return {"message": "AFD já gerado para esta operação", "id": automata_id, "operation": data.operation,
+                "product_states": product_states, "deduplicated": True, "automata": afd_to_dict(afd)}
+
+    try:
+        if data.operation == "complement":
+            definition = operands[0].complement(max_states)
+        else:
+            definition = operands[0].product(operands[1], data.operation, max_states)
+            for other in operands[2:]:
+                definition = CompiledDFA.from_dict(definition).product(other, data.operation, max_states)
+        product_states = len(definition["states"])
+        if data.minimize:
+            definition = CompiledDFA.from_dict(definition).minimize()
+        automata_id, afd, deduplicated = store_afd(definition)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    ops_afd_cache[cache_key] = (automata_id, product_states)
+    return {
+        "message": "AFD criado com sucesso!",
+        "id": automata_id,
+        "operation": data.operation,
+        "product_states": product_states,
+        "deduplicated": deduplicated,
+        "automata": afd_to_dict(afd)
+    }
+
 # Endpoint para recuperar um AFD armazenado
 @router.get("/{automata_id}", summary="Recupera informações do AFD")
-def get_afd(automata_id: str):
+def get_afd(automata_id: str, request: Request):
+    """Com `Accept: application/vnd.automata+binary`, o AFD é exportado no formato binário."""
     afd = afd_store.get(automata_id)
     if afd is None:
         raise HTTPException(status_code=404, detail="AFD não encontrado")
+    if wants_binary(request):
+        return binary_response("afd", afd_to_dict(afd))
     return afd_to_dict(afd)
 
+# Modelo de dados para alterar um AFD armazenado (PATCH); todos os campos são opcionais
+class AFDEditModel(BaseModel):
+    add_states: list[str] = []  # Estados novos (com transições para todos os símbolos)
+    remove_states: list[str] = []  # Estados removidos (nenhuma transição pode continuar chegando neles)
+    add_transitions: dict[str, dict[str, str]] = {}  # Transições adicionadas ou substituídas
+    add_final_states: list[str] = []  # Estados que passam a ser finais
+    remove_final_states: list[str] = []  # Estados que deixam de ser finais
+
+# Função para validar uma alteração olhando apenas as partes afetadas do AFD
+def afd_check_edit(afd: DFA, compiled: CompiledDFA, edit: dict):
+    """
+    Levanta ValueError se a alteração deixar o AFD inválido: estados e símbolos
+    inexistentes, estado novo sem todas as transições, ou estado removido que
+    ainda é destino de alguma transição (procurada na tabela compilada).
+    """
+    states, added, removed = check_state_edit(afd, edit)
+    add_transitions = edit.get("add_transitions", {})
+    for state, paths in add_transitions.items():
+        if state not in states:
+            raise ValueError(f"O estado '{state}' não existe")
+        for symbol, next_state in paths.items():
+            if symbol not in afd.input_symbols:
+                raise ValueError(f"Símbolo inválido '{symbol}' na transição do estado '{state}'")
+            if next_state not in states:
+                raise ValueError(f"O estado de destino '{next_state}' não existe")
+    for state in added:
+        missing = afd.input_symbols - set(add_transitions.get(state, {}))
+        if missing:
+            raise ValueError(f"O estado '{state}' precisa de transições para os símbolos {sorted(missing)}")
+    for state in removed:
+        for source, symbol in compiled.predecessors_of(state):
+            if source not in removed and symbol not in add_transitions.get(source, {}):
+                raise ValueError(f"O estado '{state}' ainda é destino da transição de '{source}' com '{symbol}'")
+
+# Endpoint para alterar um AFD armazenado sem reenviar a definição inteira
+@router.patch("/{automata_id}", summary="Altera estados, transições e estados finais do AFD")
+def patch_afd(automata_id: str, data: AFDEditModel, revision: int | None = None):
+    """
+    Aplica a alteração mantendo o id (a resposta traz a nova "revision"). Apenas
+    as partes afetadas são validadas e apenas a alteração é gravada. Se os estados
+    não mudarem, a tabela compilada é corrigida nas linhas alteradas; senão, é
+    recompilada no próximo uso. Com `?revision=n`, a alteração só é aplicada se a
+    revisão atual for n (senão, 409).
+    """
+    def apply(afd, edit):
+        compiled = get_compiled_afd(automata_id)
+        afd_check_edit(afd, compiled, edit)
+        edited = afd_apply_edit(afd, edit)
+        if edit.get("add_states") or edit.get("remove_states"):
+            return edited, None
+        patched = compiled.edited(edit.get("add_transitions", {}), edit.get("add_final_states", ()),
+                                  edit.get("remove_final_states", ()))
+
+        def store_compiled():
+            compiled_afd_store[automata_id] = patched
+        return edited, store_compiled
+
+    afd, revision = patch_automaton("afd", afd_store, automata_id, data.model_dump(exclude_defaults=True),
+                                    apply, "AFD não encontrado", revision)
+    return {
+        "message": "AFD alterado com sucesso!",
+        "id": automata_id,
+        "revision": revision,
+        "states": len(afd.states),
+        "final_states": len(afd.final_states)
+    }
+
 # Endpoint para testar a aceitação de uma string pelo AFD
 @router.post("/{automata_id}/test", summary="Testa a aceitação de uma string pelo AFD")
-def test_afd(automata_id: str, payload: dict):
-    afd = afd_store.get(automata_id)
-    if afd is None:
+async def test_afd(automata_id: str, payload: dict):
+    """
+    Com "trace": true no payload, a sequência de estados é registrada e pode ser
+    consultada em GET /afd/{automata_id}/traces/{trace_id}.
+    """
+    compiled = get_compiled_afd(automata_id)
+    if compiled is None:
         raise HTTPException(status_code=404, detail="AFD não encontrado")
     
     input_string = payload.get("input_string")
@@ -118,12 +382,159 @@ def test_afd(automata_id: str, payload: dict):
         raise HTTPException(status_code=400, detail="Campo 'input_string' é necessário")
     
     try:
-        # método 'accepts_input' para verificar se a string é aceita
-        result = afd.accepts_input(input_string)
+        # Executa a tabela de transições compilada (no pool de processos se a entrada for grande)
+        if payload.get("trace"):
+            result, trace = await acceptance_pool.run(("afd", automata_id), compiled, "trace", input_string,
+                                                      cost=len(input_string))
+            return {"input_string": input_string, "accepted": result,
+                    "trace": store_trace("afd", automata_id, trace)}
+        result = await acceptance_pool.run(("afd", automata_id), compiled, "accepts", input_string,
+                                           cost=len(input_string))
         return {"input_string": input_string, "accepted": result}
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+# Endpoint para consultar, por páginas, o trace de um teste
+@router.get("/{automata_id}/traces/{trace_id}", summary="Consulta o trace de um teste do AFD")
+def get_afd_trace(automata_id: str, trace_id: str, start: int = Query(1, alias="from"),
+                  end: int = Query(None, alias="to")):
+    """Passos `from` até `to` (exclusivo): símbolo lido e estado alcançado em cada um."""
+    return read_trace("afd", automata_id, trace_id, start, end)
+
+# Endpoint para minimizar um AFD armazenado
+@router.post("/{automata_id}/minimize", summary="Minimiza o AFD (algoritmo de Hopcroft)")
+def minimize_afd(automata_id: str):
+    """
+    Calcula o AFD mínimo equivalente, armazena-o (com seu próprio id) e o retorna.
+    O AFD original continua disponível.
+    """
+    compiled = get_compiled_afd(automata_id)
+    if compiled is None:
+        raise HTTPException(status_code=404, detail="AFD não encontrado")
+
+    try:
+        minimized_id, afd, deduplicated = store_afd(compiled.minimize())
+        return {
+            "message": "AFD minimizado com sucesso!",
+            "id": minimized_id,
+            "original_id": automata_id,
+            "original_states": len(compiled.states),
+            "minimized_states": len(afd.states),
+            "deduplicated": deduplicated,
+            "automata": afd_to_dict(afd)
+        }
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+# Endpoint para verificar se dois AFDs reconhecem a mesma linguagem
+@router.post("/{automata_id}/equivalent/{other_id}", summary="Verifica se dois AFDs são equivalentes")
+def equivalent_afd(automata_id: str, other_id: str):
+    """
+    Retorna "equivalent" e, quando os AFDs diferem, um "counterexample": uma
+    string aceita por apenas um deles.
+    """
+    compiled = get_compiled_afd(automata_id)
+    other = get_compiled_afd(other_id)
+    if compiled is None or other is None:
+        raise HTTPException(status_code=404, detail="AFD não encontrado")
+
+    equivalent, counterexample = compiled.equivalent_to(other)
+    return {"equivalent": equivalent, "counterexample": counterexample}
+
+# Endpoint para testar várias strings de uma vez pelo AFD
+@router.post("/{automata_id}/test-batch", summary="Testa a aceitação de várias strings pelo AFD")
+async def test_afd_batch(automata_id: str, request: Request):
+    compiled = get_compiled_afd(automata_id)
+    if compiled is None:
+        raise HTTPException(status_code=404, detail="AFD não encontrado")
+
+    input_strings = await read_input_strings(request)
+    results = await acceptance_pool.run(("afd", automata_id), compiled, "accepts_batch", input_strings,
+                                        cost=sum(map(len, input_strings)))
+    return batch_response(input_strings, results)
+
+# Endpoint para testar uma entrada enviada como corpo da requisição, lida em trechos
+@router.post("/{automata_id}/test-stream", summary="Testa a aceitação de uma entrada enviada em streaming pelo AFD")
+async def test_afd_stream(automata_id: str, request: Request, ignore_newlines: bool = False):
+    """
+    O corpo da requisição (texto UTF-8, sem JSON) é a própria entrada. Ela é lida
+    trecho a trecho e apenas o estado atual é mantido, então a memória usada não
+    depende do tamanho da entrada. A leitura para assim que o AFD não tem transição
+    para o símbolo lido (a entrada já está rejeitada).
+    """
+    compiled = get_compiled_afd(automata_id)
+    if compiled is None:
+        raise HTTPException(status_code=404, detail="AFD não encontrado")
+
+    state = compiled.initial
+    bytes_processed = 0
+    async for size, text in iter_input_chunks(request, ignore_newlines):
+        state = await run_in_threadpool(compiled.run, text, state)
+        bytes_processed += size
+        if state == DEAD:
+            break
+    return {"accepted": compiled.is_accepting(state), "bytes_processed": bytes_processed}
+
+# Endpoint para buscar num texto grande as ocorrências de palavras aceitas pelo AFD
+@router.post("/{automata_id}/scan", summary="Busca no texto as ocorrências de palavras aceitas pelo AFD")
+async def scan_afd(automata_id: str, request: Request, parallel: bool = False, limit: int = SCAN_MATCHES_DEFAULT):
+    """
+    O corpo da requisição (texto UTF-8, sem JSON) é lido uma única vez por um
+    autômato de busca derivado do AFD, sem testar cada substring. Para cada posição
+    em que termina uma ocorrência (não vazia) retorna [início, fim), com o menor
+    início possível; as posições são índices de caractere. São retornadas até
+    `limit` ocorrências e "match_count" conta todas. Com `?parallel=true`, o texto
+    é dividido em trechos buscados nos processos do pool.
+    """
+    compiled = get_compiled_afd(automata_id)
+    if compiled is None:
+        raise HTTPException(status_code=404, detail="AFD não encontrado")
+    if limit < 0:
+        raise HTTPException(status_code=400, detail="'limit' deve ser maior ou igual a 0")
+
+    limit = min(limit, SCAN_MAX_MATCHES)
+    if parallel:
+        return await scan_parallel(request, ("afd", automata_id), compiled, limit)
+    return await scan_stream(request, compiled, limit)
+
+# Endpoint para contar as palavras aceitas pelo AFD de cada tamanho
+@router.get("/{automata_id}/language", summary="Conta as palavras aceitas pelo AFD por tamanho")
+async def language_afd(automata_id: str, max_length: int = 10):
+    """
+    "counts"[n] é o número de palavras de tamanho n aceitas, para n de 0 a
+    `max_length`, calculado por programação dinâmica sobre a tabela de transições
+    (inteiros exatos, sem testar as palavras uma a uma).
+    """
+    compiled = get_compiled_afd(automata_id)
+    if compiled is None:
+        raise HTTPException(status_code=404, detail="AFD não encontrado")
+    check_language_params(max_length, LANGUAGE_MAX_LENGTH)
+
+    counts = await run_in_threadpool(compiled.count_by_length, max_length)
+    return counts_response(max_length, counts)
+
+# Endpoint para listar as palavras aceitas pelo AFD, por páginas
+@router.get("/{automata_id}/language/words", summary="Lista as palavras aceitas pelo AFD (ordem shortlex)")
+async def language_words_afd(automata_id: str, max_length: int = 10, offset: int = 0,
+                             limit: int = LANGUAGE_PAGE_SIZE):
+    """
+    Envia, em streaming (NDJSON, uma palavra por linha), as palavras aceitas de
+    tamanho até `max_length` em ordem shortlex, a partir da de número `offset`.
+    As anteriores não são geradas; o total e a próxima página vão nos cabeçalhos
+    X-Total-Count e X-Next-Offset.
+    """
+    compiled = get_compiled_afd(automata_id)
+    if compiled is None:
+        raise HTTPException(status_code=404, detail="AFD não encontrado")
+    check_language_params(max_length, LANGUAGE_MAX_LENGTH, offset, limit)
+    if (max_length + 1) * len(compiled.states) > LANGUAGE_MAX_CELLS:
+        raise HTTPException(status_code=400, detail="'max_length' grande demais para enumerar este AFD")
+
+    language = await run_in_threadpool(compiled.language, max_length)
+    return words_response(language.words(offset), sum(language.count_by_length()), offset, limit)
+
 # Função para gerar um diagrama visual do AFD no formato DOT
 def afd_to_dot(afd: DFA) -> str:
     """
@@ -160,29 +571,10 @@ def afd_to_dot(afd: DFA) -> str:
 
 # Endpoint para visualizar o AFD em formato gráfico (SVG ou PNG)
 @router.get("/{automata_id}/visualize", summary="Visualiza o AFD em formato gráfico (SVG ou PNG)")
-def visualize_afd(automata_id: str, format: str = "svg"):
+async def visualize_afd(automata_id: str, request: Request, format: str = "svg"):
     afd = afd_store.get(automata_id)
     if afd is None:
         raise HTTPException(status_code=404, detail="AFD não encontrado")
-    
-    dot_str = afd_to_dot(afd)
-    
-    # Adiciona explicitamente o caminho para o Graphviz, se necessário
-    graphviz_path = r"C:\Program Files\Graphviz\bin"
-    if graphviz_path not in os.environ["PATH"]:
-        os.environ["PATH"] += os.pathsep + graphviz_path
 
-    try:
-        from graphviz import Source
-    except ImportError:
-        raise HTTPException(status_code=500, detail="O pacote graphviz não está instalado.")
-    
-    try:
-        # Cria o objeto Source e gera o gráfico no formato especificado
-        graph = Source(dot_str, format=format, engine="dot")
-        output = graph.pipe(format=format)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Erro ao renderizar o gráfico: {str(e)}")
-    
-    mime = "image/svg+xml" if format.lower() == "svg" else "image/png"
-    return Response(content=output, media_type=mime)
+    # A imagem é reaproveitada do cache de renderização sempre que possível
+    return await render_response(request, "afd", automata_id, format, lambda: afd_to_dot(afd))
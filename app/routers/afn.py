@@ -0,0 +1,261 @@
+from fastapi import APIRouter, HTTPException, Request, Depends
+from fastapi.concurrency import run_in_threadpool
+from pydantic import BaseModel
+from automata.fa.nfa import NFA  # Importando o Autômato Finito Não Determinístico
+from app.storage import open_store, LRUCache
+from app.batch import read_input_strings, batch_response
+from app.engines.nfa import CompiledNFA, LazyDFA
+from app.stream import iter_input_chunks
+from app.executor import acceptance_pool
+from app.render import render_response
+from app.dedup import content_id, canonical_set, DedupStats
+from app.metrics import persist_seconds
+from app.serialization import definition_body, definition_openapi, wants_binary, binary_response
+
+# Criação do roteador para o AFN
+router = APIRouter()
+
+# Nome do arquivo (snapshot) para persistência dos AFNs
+AFN_FILE = "afn_store.json"
+
+# Função para persistir um AFN recém-criado (sem reescrever o armazenamento inteiro)
+def save_afn_store(automata_id: str):
+    """Grava o AFN no armazenamento configurado (AUTOMATA_STORAGE)"""
+    with persist_seconds.time("afn"):
+        afn_store.persist(automata_id)
+
+# Função para carregar os AFNs armazenados ao iniciar o servidor
+def load_afn_store():
+    """Prepara o armazenamento dos AFNs (cada um é reconstruído no primeiro acesso)"""
+    afn_store.load()
+    afn_engine_store.clear()
+
+# Função para converter um AFN em um dicionário serializável
+def afn_to_dict(afn: NFA) -> dict:
+    """Converte um objeto AFN para um dicionário serializável."""
+    return {
+        "states": list(afn.states),
+        "input_symbols": list(afn.input_symbols),
+        "transitions": {
+            state: {symbol: list(targets) for symbol, targets in paths.items()}
+            for state, paths in afn.transitions.items()
+        },
+        "initial_state": afn.initial_state,
+        "final_states": list(afn.final_states)
+    }
+
+# Função para reconstruir um AFN a partir de um dicionário
+def afn_from_dict(data: dict) -> NFA:
+    """Reconstrói um objeto AFN a partir de um dicionário serializável."""
+    return NFA(
+        states=set(data["states"]),
+        input_symbols=set(data["input_symbols"]),
+        transitions={
+            state: {symbol: set(targets) for symbol, targets in paths.items()}
+            for state, paths in data["transitions"].items()
+        },
+        initial_state=data["initial_state"],
+        final_states=set(data["final_states"])
+    )
+
+# Armazenamento dos AFNs criados, persistido conforme AUTOMATA_STORAGE (journal ou SQLite) e carregado sob demanda
+afn_store = open_store("afn", AFN_FILE, afn_to_dict, afn_from_dict)
+
+# AFDs construídos sob demanda (LazyDFA) a partir de cada AFN, mantidos num LRU (mesmas chaves de afn_store)
+afn_engine_store = LRUCache()
+
+# Função para obter o AFD sob demanda de um AFN armazenado
+def get_afn_engine(automata_id: str):
+    """Retorna o LazyDFA do AFN (preparando-o na primeira vez) ou None"""
+    engine = afn_engine_store.get(automata_id)
+    if engine is None:
+        afn = afn_store.get(automata_id)
+        if afn is None:
+            return None
+        engine = afn_engine_store[automata_id] = LazyDFA(CompiledNFA.from_automaton(afn))
+    return engine
+
+# Criações recebidas e quantas reaproveitaram um AFN idêntico já armazenado
+afn_dedup = DedupStats()
+
+# Carregar os AFNs ao iniciar o servidor
+load_afn_store()
+
+# Modelo de dados para definir um AFN na API
+class AFNModel(BaseModel):
+    states: list[str]  # Lista de estados
+    input_symbols: list[str]  # Alfabeto de entrada
+    transitions: dict  # Tabela de transições: estado -> símbolo ("" para ε) -> lista de estados
+    initial_state: str  # Estado inicial
+    final_states: list[str]  # Estados finais
+
+# Função para obter a forma canônica da definição de um AFN (base do seu id)
+def afn_canonical(data: AFNModel) -> dict:
+    """Estados, símbolos e cada lista de destinos ordenados."""
+    return {
+        "states": canonical_set(data.states),
+        "input_symbols": canonical_set(data.input_symbols),
+        "transitions": {
+            state: {symbol: canonical_set(targets) for symbol, targets in paths.items()}
+            for state, paths in data.transitions.items()
+        },
+        "initial_state": data.initial_state,
+        "final_states": canonical_set(data.final_states)
+    }
+
+# Endpoint para criar um AFN e armazená-lo na memória
+@router.post("/create", summary="Cria um AFN", openapi_extra=definition_openapi(AFNModel))
+def create_afn(data: AFNModel = Depends(definition_body("afn", AFNModel))):
+    """
+    As transições levam cada estado e símbolo a uma lista de estados; o símbolo ""
+    representa a ε-transição. O id é derivado da definição canônica do AFN.
+    Aceita também um AFN exportado no formato binário.
+    """
+    try:
+        automata_id = content_id("afn", afn_canonical(data))
+        afn = afn_store.get(automata_id)
+        deduplicated = afn is not None
+
+        if not deduplicated:
+            afn = afn_from_dict(data.model_dump())
+            afn_store[automata_id] = afn
+            save_afn_store(automata_id)   # Persiste o novo AFN
+        afn_dedup.record(deduplicated)
+
+        return {
+            "message": "AFN já existente, id reaproveitado" if deduplicated else "AFN criado com sucesso!",
+            "id": automata_id,
+            "deduplicated": deduplicated,
+            "automata": afn_to_dict(afn)
+        }
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+# Endpoint para recuperar um AFN armazenado
+@router.get("/{automata_id}", summary="Recupera informações do AFN")
+def get_afn(automata_id: str, request: Request):
+    """Com `Accept: application/vnd.automata+binary`, o AFN é exportado no formato binário."""
+    afn = afn_store.get(automata_id)
+    if afn is None:
+        raise HTTPException(status_code=404, detail="AFN não encontrado")
+    if wants_binary(request):
+        return binary_response("afn", afn_to_dict(afn))
+    return afn_to_dict(afn)
+
+# Endpoint para testar a aceitação de uma string pelo AFN
+@router.post("/{automata_id}/test", summary="Testa a aceitação de uma string pelo AFN")
+async def test_afn(automata_id: str, payload: dict):
+    """
+    A simulação determiniza o AFN sob demanda: os subconjuntos de estados já
+    visitados ficam em cache, então testes repetidos rodam na velocidade de um AFD.
+    Entradas de até ACCEPTANCE_INLINE_MAX símbolos rodam direto neste processo; as
+    maiores, no pool de processos de aceitação, cada processo com o seu cache.
+    """
+    engine = get_afn_engine(automata_id)
+    if engine is None:
+        raise HTTPException(status_code=404, detail="AFN não encontrado")
+
+    input_string = payload.get("input_string")
+    if input_string is None:
+        raise HTTPException(status_code=400, detail="Campo 'input_string' é necessário")
+
+    try:
+        result = await acceptance_pool.run(("afn", automata_id), engine, "accepts", input_string,
+                                           cost=len(input_string))
+        return {"input_string": input_string, "accepted": result}
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+# Endpoint para testar várias strings de uma vez pelo AFN
+@router.post("/{automata_id}/test-batch", summary="Testa a aceitação de várias strings pelo AFN")
+async def test_afn_batch(automata_id: str, request: Request):
+    engine = get_afn_engine(automata_id)
+    if engine is None:
+        raise HTTPException(status_code=404, detail="AFN não encontrado")
+
+    input_strings = await read_input_strings(request)
+    results = await acceptance_pool.run(("afn", automata_id), engine, "accepts_batch", input_strings,
+                                        cost=sum(map(len, input_strings)))
+    return batch_response(input_strings, results)
+
+# Endpoint para testar uma entrada enviada como corpo da requisição, lida em trechos
+@router.post("/{automata_id}/test-stream", summary="Testa a aceitação de uma entrada enviada em streaming pelo AFN")
+async def test_afn_stream(automata_id: str, request: Request, ignore_newlines: bool = False):
+    """
+    O corpo da requisição (texto UTF-8, sem JSON) é a própria entrada, lida trecho
+    a trecho. A leitura para assim que nenhum estado do AFN continua ativo.
+    """
+    engine = get_afn_engine(automata_id)
+    if engine is None:
+        raise HTTPException(status_code=404, detail="AFN não encontrado")
+
+    state = engine.initial
+    bytes_processed = 0
+    async for size, text in iter_input_chunks(request, ignore_newlines):
+        state = await run_in_threadpool(engine.run, text, state)
+        bytes_processed += size
+        if engine.is_dead(state):
+            break
+    return {"accepted": state.accepting, "bytes_processed": bytes_processed}
+
+# Endpoint com as estatísticas do cache de estados do AFD construído sob demanda
+@router.get("/{automata_id}/cache", summary="Estatísticas do cache de estados do AFN")
+def get_afn_cache(automata_id: str):
+    """
+    Retorna quantos estados do AFD (subconjuntos de estados do AFN) estão em cache,
+    a taxa de acerto das transições e quantas vezes o cache foi esvaziado por
+    atingir AFN_CACHE_STATES. Refere-se apenas ao cache deste processo, usado por
+    /test e /test-batch até ACCEPTANCE_INLINE_MAX símbolos, pelo streaming e por
+    todos os testes quando ACCEPTANCE_WORKERS=0. Os testes maiores rodam nos
+    processos do pool, que mantêm caches próprios e não entram nestes números.
+    """
+    engine = get_afn_engine(automata_id)
+    if engine is None:
+        raise HTTPException(status_code=404, detail="AFN não encontrado")
+    return engine.stats()
+
+# Função para gerar um diagrama visual do AFN no formato DOT
+def afn_to_dot(afn: NFA) -> str:
+    """
+    Gera uma representação no formato DOT do AFN.
+      - Cria um nó inicial invisível que aponta para o estado inicial.
+      - Desenha cada estado (estados finais com dupla borda).
+      - Cria uma aresta para cada destino de cada transição ("ε" para o símbolo vazio).
+    """
+    dot_lines = []
+    dot_lines.append("digraph NFA {")
+    dot_lines.append("  rankdir=LR;")
+    dot_lines.append("  size=\"8,5\";")
+    dot_lines.append("  node [shape = circle];")
+    # Nó inicial (invisível)
+    dot_lines.append("  __start__ [shape = point];")
+    dot_lines.append(f"  __start__ -> \"{afn.initial_state}\";")
+
+    # Estados (estados finais com dupla borda)
+    for state in afn.states:
+        if state in afn.final_states:
+            dot_lines.append(f"  \"{state}\" [shape = doublecircle];")
+        else:
+            dot_lines.append(f"  \"{state}\" [shape = circle];")
+
+    # Adiciona as transições (arestas)
+    for state, paths in afn.transitions.items():
+        for input_symbol, targets in paths.items():
+            label = input_symbol if input_symbol != "" else "ε"
+            for next_state in targets:
+                dot_lines.append(f"  \"{state}\" -> \"{next_state}\" [ label = \"{label}\" ];")
+
+    dot_lines.append("}")
+    return "\n".join(dot_lines)
+
+# Endpoint para visualizar o AFN em formato gráfico (SVG ou PNG)
+@router.get("/{automata_id}/visualize", summary="Visualiza o AFN em formato gráfico (SVG ou PNG)")
+async def visualize_afn(automata_id: str, request: Request, format: str = "svg"):
+    afn = afn_store.get(automata_id)
+    if afn is None:
+        raise HTTPException(status_code=404, detail="AFN não encontrado")
+
+    # A imagem é reaproveitada do cache de renderização sempre que possível
+    return await render_response(request, "afn", automata_id, format, lambda: afn_to_dot(afn))
@@ -0,0 +1,31 @@
+from fastapi import APIRouter, HTTPException
+from app.jobs import job_manager
+
+# Criação do roteador para os jobs (testes em segundo plano)
+router = APIRouter()
+
+# Endpoint para consultar a situação, o progresso e o resultado de um job
+@router.get("/{job_id}", summary="Consulta um job")
+def get_job(job_id: str):
+    """
+    "status" é queued, running, done, failed ou cancelled. Enquanto o job roda,
+    "progress" mostra os passos executados (símbolos lidos, no PDA) e as
+    configurações vivas; ao terminar, "result" tem a mesma forma da resposta de
+    /test (sem a entrada). Jobs terminados expiram após JOB_RESULT_TTL segundos.
+    """
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job não encontrado")
+    return job.to_dict()
+
+# Endpoint para cancelar um job
+@router.delete("/{job_id}", summary="Cancela um job")
+def cancel_job(job_id: str):
+    """
+    Um job na fila é cancelado imediatamente; um job em execução para logo em
+    seguida (o resultado parcial fica em "result", com limit "cancelled").
+    """
+    job = job_manager.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job não encontrado")
+    return job.to_dict()
@@ -1,18 +1,30 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request, Query, Depends
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
-import uuid
 from automata.pda.npda import NPDA  # Importando o Autômato com Pilha
+from frozendict import frozendict
 import json
 import os
 from fastapi.responses import Response
+from app.storage import open_store, LRUCache
+from app.batch import read_input_strings, batch_response
+from app.render import render_response, render_cache
+from app.engines.pda import PDAEngine, pda_limits, ACCEPTED
+from app.stream import iter_input_chunks
+from app.executor import acceptance_pool
+from app.traces import store_trace, read_trace
+from app.jobs import job_manager, JOB_TIMEOUT
+from app.dedup import content_slot, canonical_set, DedupStats
+from app.edits import rebuild, check_state_edit, edited_final_states, patch_automaton
+from app.metrics import persist_seconds
+from app.serialization import definition_body, definition_openapi, wants_binary, binary_response
+from app.engines.language import PDA_LANGUAGE_MAX_LENGTH
+from app.language import check_language_params, counts_response, words_response, LANGUAGE_PAGE_SIZE
 
 # Criação do roteador para o AP
 router = APIRouter()
 
-# Armazenamento em memória dos APs criados
-pda_store = {}  
-
-# Nome do arquivo para persistência dos APs
+# Nome do arquivo (snapshot) para persistência dos APs
 PDA_FILE = "pda_store.json"
 
 # Função para converter um AP em um dicionário serializável
@@ -26,9 +38,9 @@ def npda_to_dict(npda: NPDA) -> dict:
             state: {
                 input_symbol: {
                     stack_symbol: [list(item) for item in trans_set]  # Convertendo frozenset para list
+                    for stack_symbol, trans_set in stack_trans.items()
                 }
                 for input_symbol, stack_trans in input_dict.items()
-                for stack_symbol, trans_set in stack_trans.items()
             }
             for state, input_dict in npda.transitions.items()
         },
@@ -59,38 +71,18 @@ def npda_from_dict(data: dict) -> NPDA:
         final_states=set(data["final_states"])
     )
 
-# Função para salvar o estado atual dos APs no arquivo JSON
-def save_pda_store():
-    """Salva os PDAs no arquivo JSON"""
-    with open(PDA_FILE, "w") as f:
-        json.dump({k: npda_to_dict(v) for k, v in pda_store.items()}, f)
+# Função para persistir um AP recém-criado (sem reescrever o armazenamento inteiro)
+def save_pda_store(automata_id: str):
+    """Grava o PDA no armazenamento configurado (AUTOMATA_STORAGE)"""
+    with persist_seconds.time("pilha"):
+        pda_store.persist(automata_id)
 
-# Função para carregar os APs armazenados no JSON ao iniciar o servidor
+# Função para carregar os APs armazenados ao iniciar o servidor
 def load_pda_store():
-    """Carrega os PDAs do arquivo JSON"""
-    global pda_store
-    if os.path.exists(PDA_FILE):
-        with open(PDA_FILE, "r") as f:
-            try:
-                data = json.load(f)
-                for key, value in data.items():
-                    pda_store[key] = npda_from_dict(value)  # Reconstrói os PDAs
-            except json.JSONDecodeError:
-                pda_store = {}  # Se houver erro, reinicia o armazenamento
-
-# Chamada para carregar os PDAs ao iniciar o servidor
-load_pda_store()
-
-# Modelo de dados para definir um AP na API
-class PDAModel(BaseModel):
-    states: list[str]
-    input_symbols: list[str]
-    stack_symbols: list[str]
-    transitions: dict
-    initial_state: str
-    initial_stack_symbol: str
-    final_states: list[str]
+    """Prepara o armazenamento dos PDAs (cada um é reconstruído no primeiro acesso)"""
+    pda_store.load()
 
+# Função para converter as transições do formato da API ("entrada,pilha") para o formato aninhado
 def convert_transitions(transitions: dict) -> dict:
     """
     Converte o dicionário de transições recebido no seguinte formato:
@@ -145,10 +137,131 @@ def convert_transitions(transitions: dict) -> dict:
         converted[state] = new_trans
     return converted
 
+# Função para aplicar uma alteração (PATCH) já validada a um AP
+def pda_apply_edit(npda: NPDA, edit: dict) -> NPDA:
+    """
+    Retorna o PDA alterado, copiando apenas as transições dos estados que mudaram
+    (usada também ao reconstruir um PDA a partir dos deltas gravados).
+    """
+    added = set(edit.get("add_states", ()))
+    removed = set(edit.get("remove_states", ()))
+    add = convert_transitions(edit.get("add_transitions", {}))
+    remove = convert_transitions(edit.get("remove_transitions", {}))
+    transitions = npda.transitions
+    if removed or add or remove:
+        transitions = {state: paths for state, paths in transitions.items() if state not in removed}
+        for state in set(add) | set(remove):
+            paths = {input_symbol: dict(stack_trans) for input_symbol, stack_trans in transitions.get(state, {}).items()}
+            for input_symbol, stack_trans in remove.get(state, {}).items():
+                for stack_symbol, targets in stack_trans.items():
+                    paths[input_symbol][stack_symbol] = paths[input_symbol][stack_symbol] - targets
+            for input_symbol, stack_trans in add.get(state, {}).items():
+                for stack_symbol, targets in stack_trans.items():
+                    current = paths.setdefault(input_symbol, {}).get(stack_symbol, frozenset())
+                    paths[input_symbol][stack_symbol] = current | targets
+            paths = frozendict({
+                input_symbol: frozendict({stack_symbol: targets for stack_symbol, targets in stack_trans.items() if targets})
+                for input_symbol, stack_trans in paths.items()
+                if any(stack_trans.values())
+            })
+            if paths:
+                transitions[state] = paths
+            else:
+                transitions.pop(state, None)
+        transitions = frozendict(transitions)
+    states = npda.states
+    if added or removed:
+        states = frozenset((states - removed) | added)
+    return rebuild(npda, states=states, transitions=transitions, final_states=edited_final_states(npda, edit))
+
+# Armazenamento dos APs criados, persistido conforme AUTOMATA_STORAGE (journal ou SQLite) e carregado sob demanda
+pda_store = open_store("pilha", PDA_FILE, npda_to_dict, npda_from_dict, apply_edit=pda_apply_edit)
+
+# Simuladores com memoização de configurações, preparados sob demanda (mesmas chaves de pda_store)
+pda_engine_store = LRUCache()
+
+# Função para obter o simulador de um AP armazenado
+def get_pda_engine(automata_id: str):
+    """Retorna o simulador do PDA (preparando-o na primeira vez) ou None"""
+    pda_store.sync()
+    engine = pda_engine_store.get(automata_id)
+    if engine is None:
+        npda = pda_store.get(automata_id)
+        if npda is None:
+            return None
+        engine = pda_engine_store[automata_id] = PDAEngine.from_automaton(npda)
+    return engine
+
+# Criações recebidas e quantas reaproveitaram um PDA idêntico já armazenado
+pda_dedup = DedupStats()
+
+# Função para descartar o que foi derivado da versão anterior de um AP alterado
+def invalidate_pda(automata_id: str):
+    pda_engine_store.pop(automata_id)
+    render_cache.invalidate("pilha", automata_id)
+    acceptance_pool.invalidate(("pilha", automata_id))
+
+pda_store.on_edit(invalidate_pda)
+
+# Chamada para carregar os PDAs ao iniciar o servidor
+load_pda_store()
+
+# Modelo de dados para definir um AP na API
+class PDAModel(BaseModel):
+    states: list[str]
+    input_symbols: list[str]
+    stack_symbols: list[str]
+    transitions: dict
+    initial_state: str
+    initial_stack_symbol: str
+    final_states: list[str]
+
+# Função para voltar do formato aninhado (npda_to_dict) ao formato de PDAModel
+def pda_model_dict(data: dict) -> dict:
+    """Transições com chaves "entrada,pilha" (usada ao importar um PDA no formato binário)."""
+    return {
+        **data,
+        "transitions": {
+            state: {
+                f"{input_symbol},{stack_symbol}": targets
+                for input_symbol, stack_trans in input_dict.items()
+                for stack_symbol, targets in stack_trans.items()
+            }
+            for state, input_dict in data["transitions"].items()
+        },
+    }
+
+
+# Função para obter a forma canônica da definição de um AP (base do seu id)
+def pda_canonical(data: PDAModel, converted_transitions: dict, input_symbols: set) -> dict:
+    """Usa as transições já normalizadas por `convert_transitions`, com cada conjunto de destinos ordenado."""
+    return {
+        "states": canonical_set(data.states),
+        "input_symbols": canonical_set(input_symbols),
+        "stack_symbols": canonical_set(data.stack_symbols),
+        "transitions": {
+            state: {
+                input_symbol: {
+                    stack_symbol: canonical_set(targets)
+                    for stack_symbol, targets in stack_trans.items()
+                }
+                for input_symbol, stack_trans in input_dict.items()
+            }
+            for state, input_dict in converted_transitions.items()
+        },
+        "initial_state": data.initial_state,
+        "initial_stack_symbol": data.initial_stack_symbol,
+        "final_states": canonical_set(data.final_states)
+    }
 
 # Endpoint para criar um AP e armazená-lo na memória
-@router.post("/create", summary="Cria um Autômato com Pilha (PDA)")
-def create_pda(data: PDAModel):
+@router.post("/create", summary="Cria um Autômato com Pilha (PDA)", openapi_extra=definition_openapi(PDAModel))
+def create_pda(data: PDAModel = Depends(definition_body("pilha", PDAModel, pda_model_dict))):
+    """
+    O id é derivado da definição canônica do PDA: enviar o mesmo PDA outra vez
+    retorna o id já existente, sem armazenar uma nova cópia ("deduplicated": true).
+    Aceita também um PDA exportado no formato binário.
+    """
     try:
         converted_transitions = convert_transitions(data.transitions)
 
@@ -159,25 +272,30 @@ def create_pda(data: PDAModel):
                 if input_symbol == "ε":
                     all_input_symbols.add("ε")
 
-        npda = NPDA(
-            states=set(data.states),
-            input_symbols=all_input_symbols,
-            stack_symbols=set(data.stack_symbols),
-            transitions=converted_transitions,
-            initial_state=data.initial_state,
-            initial_stack_symbol=data.initial_stack_symbol,
-            final_states=set(data.final_states)
-        )
+        automata_id = content_slot("pilha", pda_canonical(data, converted_transitions, all_input_symbols), pda_store)
+        npda = pda_store.get(automata_id)
+        deduplicated = npda is not None
 
-        automata_id = str(uuid.uuid4())
-        pda_store[automata_id] = npda
+        if not deduplicated:
+            npda = NPDA(
+                states=set(data.states),
+                input_symbols=all_input_symbols,
+                stack_symbols=set(data.stack_symbols),
+                transitions=converted_transitions,
+                initial_state=data.initial_state,
+                initial_stack_symbol=data.initial_stack_symbol,
+                final_states=set(data.final_states)
+            )
+            pda_store[automata_id] = npda
 
-        # 🔹 Salvar no arquivo para persistência
-        save_pda_store()
+            # 🔹 Salvar no arquivo para persistência
+            save_pda_store(automata_id)
+        pda_dedup.record(deduplicated)
 
         return {
-            "message": "PDA criado com sucesso!",
+            "message": "PDA já existente, id reaproveitado" if deduplicated else "PDA criado com sucesso!",
             "id": automata_id,
+            "deduplicated": deduplicated,
             "automata": {
                 "states": list(npda.states),
                 "input_symbols": list(all_input_symbols),  # Agora inclui "ε" se necessário
@@ -194,10 +312,13 @@ def create_pda(data: PDAModel):
 
 # Endpoint para recuperar um AP armazenado
 @router.get("/{automata_id}", summary="Recupera informações do PDA")
-def get_pda(automata_id: str):
+def get_pda(automata_id: str, request: Request):
+    """Com `Accept: application/vnd.automata+binary`, o PDA é exportado no formato binário."""
     npda = pda_store.get(automata_id)
     if npda is None:
         raise HTTPException(status_code=404, detail="PDA não encontrado")
+    if wants_binary(request):
+        return binary_response("pilha", npda_to_dict(npda))
     return {
         "states": list(npda.states),
         "input_symbols": list(npda.input_symbols),
@@ -208,11 +329,98 @@ def get_pda(automata_id: str):
         "final_states": list(npda.final_states)
     }
 
+# Modelo de dados para alterar um AP armazenado (PATCH); todos os campos são opcionais
+class PDAEditModel(BaseModel):
+    add_states: list[str] = []  # Estados novos
+    remove_states: list[str] = []  # Estados removidos (nenhuma transição pode continuar chegando neles)
+    add_transitions: dict = {}  # Transições adicionadas, no formato de PDAModel ("entrada,pilha")
+    remove_transitions: dict = {}  # Transições removidas, no mesmo formato
+    add_final_states: list[str] = []  # Estados que passam a ser finais
+    remove_final_states: list[str] = []  # Estados que deixam de ser finais
+
+# Função para validar uma alteração olhando apenas as partes afetadas do AP
+def pda_check_edit(npda: NPDA, edit: dict):
+    """
+    Levanta ValueError se a alteração deixar o PDA inválido: estados ou símbolos
+    inexistentes, transição removida que não existe, ou estado removido que ainda
+    é destino de alguma transição (a única verificação que percorre todas as transições).
+    """
+    states, added, removed = check_state_edit(npda, edit)
+    add = convert_transitions(edit.get("add_transitions", {}))
+    remove = convert_transitions(edit.get("remove_transitions", {}))
+    for state, paths in add.items():
+        if state not in states:
+            raise ValueError(f"O estado '{state}' não existe")
+        for input_symbol, stack_trans in paths.items():
+            if input_symbol not in npda.input_symbols and input_symbol != "":
+                raise ValueError(f"Símbolo de entrada inválido '{input_symbol}' na transição do estado '{state}'")
+            for stack_symbol, targets in stack_trans.items():
+                if stack_symbol not in npda.stack_symbols:
+                    raise ValueError(f"Símbolo da pilha inválido '{stack_symbol}' na transição do estado '{state}'")
+                for target in targets:
+                    if len(target) != 2 or target[0] not in states:
+                        raise ValueError(f"Destino inválido {list(target)} na transição do estado '{state}'")
+    for state, paths in remove.items():
+        for input_symbol, stack_trans in paths.items():
+            for stack_symbol, targets in stack_trans.items():
+                current = npda.transitions.get(state, {}).get(input_symbol, {}).get(stack_symbol, frozenset())
+                if targets - current:
+                    raise ValueError(f"Transição inexistente: '{state}' com '{input_symbol},{stack_symbol}' "
+                                     f"para {[list(target) for target in targets - current]}")
+    if removed:
+        for state, paths in npda.transitions.items():
+            if state in removed:
+                continue
+            for input_symbol, stack_trans in paths.items():
+                for stack_symbol, targets in stack_trans.items():
+                    removing = remove.get(state, {}).get(input_symbol, {}).get(stack_symbol, ())
+                    for target in targets:
+                        if target[0] in removed and target not in removing:
+                            raise ValueError(f"O estado '{target[0]}' ainda é destino da transição de '{state}' "
+                                             f"com '{input_symbol},{stack_symbol}'")
+
+# Endpoint para alterar um AP armazenado sem reenviar a definição inteira
+@router.patch("/{automata_id}", summary="Altera estados, transições e estados finais do PDA")
+def patch_pda(automata_id: str, data: PDAEditModel, revision: int | None = None):
+    """
+    Aplica a alteração mantendo o id (a resposta traz a nova "revision"). Apenas
+    as partes afetadas são validadas e apenas a alteração é gravada; o simulador é
+    preparado de novo no próximo uso. As transições removidas precisam existir.
+    Com `?revision=n`, a alteração só é aplicada se a revisão atual for n (senão, 409).
+    """
+    def apply(npda, edit):
+        pda_check_edit(npda, edit)
+        return pda_apply_edit(npda, edit), None
+
+    npda, revision = patch_automaton("pilha", pda_store, automata_id, data.model_dump(exclude_defaults=True),
+                                     apply, "PDA não encontrado", revision)
+    return {
+        "message": "PDA alterado com sucesso!",
+        "id": automata_id,
+        "revision": revision,
+        "states": len(npda.states),
+        "final_states": len(npda.final_states)
+    }
+
+# Função para converter o resultado de uma execução limitada no campo "accepted"
+def pda_accepted(run: dict):
+    """True/False se a execução terminou; None se algum limite foi atingido."""
+    if run["limit"] is not None:
+        return None
+    return run["result"] == ACCEPTED
+
 # Endpoint para testar a aceitação de uma string pelo AP
 @router.post("/{automata_id}/test", summary="Testa a aceitação de uma string pelo PDA")
-def test_pda(automata_id: str, payload: dict):
-    npda = pda_store.get(automata_id)
-    if npda is None:
+async def test_pda(automata_id: str, payload: dict):
+    """
+    Executa o PDA com limites de profundidade da pilha, configurações simultâneas e
+    tempo (max_stack_depth, max_configurations, timeout — opcionais no payload, nunca
+    acima dos limites do servidor). Se algum limite impedir a decisão, "accepted" é
+    null, "result" é "undecided" e "limit" indica qual foi. Com "trace": true, um
+    caminho da computação é registrado (GET /pilha/{automata_id}/traces/{trace_id}).
+    """
+    engine = get_pda_engine(automata_id)
+    if engine is None:
         raise HTTPException(status_code=404, detail="PDA não encontrado")
     
     input_string = payload.get("input_string")
@@ -220,11 +428,148 @@ def test_pda(automata_id: str, payload: dict):
         raise HTTPException(status_code=400, detail="Campo 'input_string' é necessário")
     
     try:
-        result = npda.accepts_input(input_string)
-        return {"input_string": input_string, "accepted": result}
+        # A simulação roda no pool de processos, fora do event loop
+        if payload.get("trace"):
+            run, trace = await acceptance_pool.run(("pilha", automata_id), engine, "trace", input_string,
+                                                   **pda_limits(payload))
+            return {"input_string": input_string, "accepted": pda_accepted(run), **run,
+                    "trace": store_trace("pilha", automata_id, trace)}
+        run = await acceptance_pool.run(("pilha", automata_id), engine, "run", input_string,
+                                        **pda_limits(payload))
+        return {"input_string": input_string, "accepted": pda_accepted(run), **run}
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+# Endpoint para consultar, por páginas, o trace de um teste
+@router.get("/{automata_id}/traces/{trace_id}", summary="Consulta o trace de um teste do PDA")
+def get_pda_trace(automata_id: str, trace_id: str, start: int = Query(1, alias="from"),
+                  end: int = Query(None, alias="to")):
+    """
+    Passos `from` até `to` (exclusivo): transição usada (símbolo lido, "" para ε,
+    topo desempilhado e símbolos empilhados), símbolos lidos e altura da pilha.
+    """
+    return read_trace("pilha", automata_id, trace_id, start, end)
+
+# Função para montar o resultado de um teste em segundo plano
+def pda_job(run: dict) -> dict:
+    """Monta o resultado do job a partir da execução feita no processo de jobs."""
+    return {"accepted": pda_accepted(run), **run}
+
+# Endpoint para iniciar um teste em segundo plano pelo AP
+@router.post("/{automata_id}/test-async", status_code=202, summary="Inicia um teste do PDA em segundo plano")
+def test_pda_async(automata_id: str, payload: dict):
+    """
+    Mesmo payload de /test, mas responde imediatamente com o id de um job, consultado
+    em GET /jobs/{job_id}. O tempo limite pode chegar a JOB_TIMEOUT (padrão 600 s).
+    """
+    engine = get_pda_engine(automata_id)
+    if engine is None:
+        raise HTTPException(status_code=404, detail="PDA não encontrado")
+
+    input_string = payload.get("input_string")
+    if input_string is None:
+        raise HTTPException(status_code=400, detail="Campo 'input_string' é necessário")
+
+    try:
+        limits = pda_limits(payload, max_timeout=JOB_TIMEOUT)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    job = job_manager.submit("pilha", automata_id, engine, input_string, pda_job, "symbols_read", **limits)
+    return {"job_id": job.id, "status": job.status, "url": f"/jobs/{job.id}"}
+
+# Endpoint para testar várias strings de uma vez pelo PDA
+@router.post("/{automata_id}/test-batch", summary="Testa a aceitação de várias strings pelo PDA")
+async def test_pda_batch(automata_id: str, request: Request):
+    engine = get_pda_engine(automata_id)
+    if engine is None:
+        raise HTTPException(status_code=404, detail="PDA não encontrado")
+
+    input_strings = await read_input_strings(request)
+    try:
+        limits = pda_limits({})  # limites padrão do servidor para cada string
+        results = await acceptance_pool.run(("pilha", automata_id), engine, "accepts_batch", input_strings,
+                                            **limits)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return batch_response(input_strings, results)
+
+# Endpoint para testar uma entrada enviada como corpo da requisição, lida em trechos
+@router.post("/{automata_id}/test-stream", summary="Testa a aceitação de uma entrada enviada em streaming pelo PDA")
+async def test_pda_stream(automata_id: str, request: Request, ignore_newlines: bool = False,
+                          max_stack_depth: int = None, max_configurations: int = None, timeout: float = None):
+    """
+    O corpo da requisição (texto UTF-8, sem JSON) é a própria entrada, lida trecho a
+    trecho. Apenas as configurações atuais são mantidas, então a memória usada depende
+    da altura da pilha, não do tamanho da entrada. Os limites são os mesmos de /test,
+    enviados como parâmetros de consulta.
+    """
+    engine = get_pda_engine(automata_id)
+    if engine is None:
+        raise HTTPException(status_code=404, detail="PDA não encontrado")
+
+    requested = {"max_stack_depth": max_stack_depth, "max_configurations": max_configurations, "timeout": timeout}
+    try:
+        execution = engine.start(**pda_limits({k: v for k, v in requested.items() if v is not None}))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    bytes_processed = 0
+    async for size, text in iter_input_chunks(request, ignore_newlines):
+        alive = await run_in_threadpool(execution.feed, text)
+        bytes_processed += size
+        if not alive:
+            break
+    run = execution.finish()
+    return {"accepted": pda_accepted(run), "bytes_processed": bytes_processed, **run}
+
+# Função para contar as palavras aceitas por um AP até um tamanho (executada no threadpool)
+def pda_language(engine: PDAEngine, max_length: int, limits: dict):
+    """Retorna (PDALanguage, contagens por tamanho); as contagens preenchem a memória usada na enumeração."""
+    language = engine.language(max_length, **limits)
+    return language, language.count_by_length()
+
+# Função para preparar a contagem/enumeração de um AP armazenado
+async def build_pda_language(automata_id: str, max_length: int, requested: dict):
+    engine = get_pda_engine(automata_id)
+    if engine is None:
+        raise HTTPException(status_code=404, detail="PDA não encontrado")
+    try:
+        limits = pda_limits({k: v for k, v in requested.items() if v is not None})
+        return await run_in_threadpool(pda_language, engine, max_length, limits)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+# Endpoint para contar as palavras aceitas pelo AP de cada tamanho
+@router.get("/{automata_id}/language", summary="Conta as palavras aceitas pelo PDA por tamanho")
+async def language_pda(automata_id: str, max_length: int = 10, max_stack_depth: int = None,
+                       max_configurations: int = None, timeout: float = None):
+    """
+    "counts"[n] é o número de palavras de tamanho n aceitas, para n de 0 a
+    `max_length`: a simulação é determinizada (um nó por conjunto de configurações)
+    e as contagens são memorizadas por (nó, tamanho restante), sem testar as palavras
+    uma a uma. Os limites de /test valem como parâmetros de consulta; se algum
+    descartar configurações, "limit" o indica (as contagens podem ficar menores).
+    """
+    check_language_params(max_length, PDA_LANGUAGE_MAX_LENGTH)
+    requested = {"max_stack_depth": max_stack_depth, "max_configurations": max_configurations, "timeout": timeout}
+    language, counts = await build_pda_language(automata_id, max_length, requested)
+    return counts_response(max_length, counts, limit=language.limit, configuration_sets=len(language.sets))
+
+# Endpoint para listar as palavras aceitas pelo AP, por páginas
+@router.get("/{automata_id}/language/words", summary="Lista as palavras aceitas pelo PDA (ordem shortlex)")
+async def language_words_pda(automata_id: str, max_length: int = 10, offset: int = 0,
+                             limit: int = LANGUAGE_PAGE_SIZE, max_stack_depth: int = None,
+                             max_configurations: int = None, timeout: float = None):
+    """Como GET /afd/{automata_id}/language/words, com os limites de /pilha/{automata_id}/language."""
+    check_language_params(max_length, PDA_LANGUAGE_MAX_LENGTH, offset, limit)
+    requested = {"max_stack_depth": max_stack_depth, "max_configurations": max_configurations, "timeout": timeout}
+    language, counts = await build_pda_language(automata_id, max_length, requested)
+    return words_response(language.words(offset), sum(counts), offset, limit)
+
 # Função para gerar um diagrama visual do AP no formato DOT
 def npda_to_dot(npda: NPDA) -> str:
     """
@@ -268,35 +613,14 @@ def npda_to_dot(npda: NPDA) -> str:
 
 # Endpoint para visualizar o AP em formato gráfico (SVG ou PNG)
 @router.get("/{automata_id}/visualize", summary="Visualiza o PDA em formato gráfico (SVG ou PNG)")
-def visualize_pda(automata_id: str, format: str = "svg"):
+async def visualize_pda(automata_id: str, request: Request, format: str = "svg"):
     """
     Gera uma representação gráfica do PDA (usando Graphviz)
     no formato especificado (SVG ou PNG) e retorna como resposta HTTP.
+    A imagem fica em cache e o cliente pode revalidá-la com If-None-Match.
     """
     npda = pda_store.get(automata_id)
     if npda is None:
         raise HTTPException(status_code=404, detail="PDA não encontrado")
-    
-    dot_str = npda_to_dot(npda)
-    
-    # Adicione explicitamente o caminho para o executável do Graphviz ao PATH,
-    # caso ainda não esteja presente no ambiente do processo Python.
-    graphviz_path = r"C:\Program Files\Graphviz\bin"
-    if graphviz_path not in os.environ["PATH"]:
-        os.environ["PATH"] += os.pathsep + graphviz_path
 
-    try:
-        from graphviz import Source
-    except ImportError:
-        raise HTTPException(status_code=500, detail="O pacote graphviz não está instalado.")
-    
-    try:
-        # Cria o objeto Source com o DOT gerado, especificando o engine "dot"
-        graph = Source(dot_str, format=format, engine="dot")
-        output = graph.pipe(format=format)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Erro ao renderizar o gráfico: {str(e)}")
-    
-    # Define o Content-Type de acordo com o formato solicitado
-    mime = "image/svg+xml" if format.lower() == "svg" else "image/png"
-    return Response(content=output, media_type=mime)
\ No newline at end of file
+    return await render_response(request, "pilha", automata_id, format, lambda: npda_to_dot(npda))
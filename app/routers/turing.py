@@ -1,39 +1,39 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request, Query, Depends
 from fastapi.responses import Response, FileResponse
 from pydantic import BaseModel
 from automata.tm.ntm import NTM  # Importando a Máquina de Turing (NTM)
+from frozendict import frozendict
 import json
 import os
-import uuid
 import graphviz
+from app.storage import open_store, LRUCache
+from app.batch import read_input_strings, batch_response
+from app.render import render_response, render_cache
+from app.engines.tm import TMEngine, tm_limits, ACCEPTED
+from app.executor import acceptance_pool
+from app.traces import store_trace, read_trace
+from app.jobs import job_manager, JOB_TIMEOUT
+from app.dedup import content_slot, canonical_set, DedupStats
+from app.edits import rebuild, check_state_edit, edited_final_states, patch_automaton
+from app.metrics import persist_seconds
+from app.serialization import definition_body, definition_openapi, wants_binary, binary_response
 
 # Cria um roteador para as rotas relacionadas à Máquina de Turing (MT)
 router = APIRouter()
 
-# Dicionário que armazena as MTs criadas em memória.
-tm_store = {} 
-
-# Nome do arquivo para persistir (armazenar) as MTs em formato JSON.
+# Nome do arquivo (snapshot) para persistir (armazenar) as MTs em formato JSON.
 NTM_FILE = "tm_store.json"
 
-# Função para salvar o estado atual das MTs no arquivo JSON
-def save_tm_store():
-    """Salva as MTs no arquivo JSON"""
-    with open(NTM_FILE, "w") as f:
-        json.dump({k: tm_to_dict(v) for k, v in tm_store.items()}, f)
+# Função para persistir uma MT recém-criada (sem reescrever o armazenamento inteiro)
+def save_tm_store(automata_id: str):
+    """Grava a MT no armazenamento configurado (AUTOMATA_STORAGE)"""
+    with persist_seconds.time("turing"):
+        tm_store.persist(automata_id)
 
-# Função para carregar as MTs armazenados no JSON ao iniciar o servidor
+# Função para carregar as MTs armazenadas ao iniciar o servidor
 def load_tm_store():
-    """Carrega as MTs do arquivo JSON"""
-    global tm_store
-    if os.path.exists(NTM_FILE):
-        with open(NTM_FILE, "r") as f:
-            try:
-                data = json.load(f)
-                for key, value in data.items():
-                    tm_store[key] = tm_from_dict(value)
-            except json.JSONDecodeError:
-                tm_store = {}  # Se houver erro, reinicia o armazenamento
+    """Prepara o armazenamento das MTs (cada uma é reconstruída no primeiro acesso)"""
+    tm_store.load()
 
 # Função para converter uma MT em um dicionário serializável
 def tm_to_dict(tm: NTM) -> dict:
@@ -60,6 +60,67 @@ def tm_from_dict(data: dict) -> NTM:
         final_states=set(data["final_states"])
     )
 
+# Função para aplicar uma alteração (PATCH) já validada a uma MT
+def tm_apply_edit(tm: NTM, edit: dict) -> NTM:
+    """
+    Retorna a MT alterada, copiando apenas as transições dos estados que mudaram
+    (usada também ao reconstruir uma MT a partir dos deltas gravados).
+    """
+    added = set(edit.get("add_states", ()))
+    removed = set(edit.get("remove_states", ()))
+    add = edit.get("add_transitions", {})
+    remove = edit.get("remove_transitions", {})
+    transitions = tm.transitions
+    if removed or add or remove:
+        transitions = {state: paths for state, paths in transitions.items() if state not in removed}
+        for state in set(add) | set(remove):
+            paths = dict(transitions.get(state, {}))
+            for symbol, moves in remove.get(state, {}).items():
+                dropped = {tuple(move) for move in moves}
+                paths[symbol] = tuple(move for move in paths[symbol] if move not in dropped)
+            for symbol, moves in add.get(state, {}).items():
+                current = paths.get(symbol, ())
+                paths[symbol] = current + tuple(tuple(move) for move in moves if tuple(move) not in current)
+            paths = frozendict({symbol: moves for symbol, moves in paths.items() if moves})
+            if paths:
+                transitions[state] = paths
+            else:
+                transitions.pop(state, None)
+        transitions = frozendict(transitions)
+    states = tm.states
+    if added or removed:
+        states = frozenset((states - removed) | added)
+    return rebuild(tm, states=states, transitions=transitions, final_states=edited_final_states(tm, edit))
+
+# Armazenamento das MTs criadas, persistido conforme AUTOMATA_STORAGE (journal ou SQLite) e carregado sob demanda.
+tm_store = open_store("turing", NTM_FILE, tm_to_dict, tm_from_dict, apply_edit=tm_apply_edit)
+
+# Simuladores com recursos limitados, preparados sob demanda (mesmas chaves de tm_store)
+tm_engine_store = LRUCache()
+
+# Função para obter o simulador de uma MT armazenada
+def get_tm_engine(automata_id: str):
+    """Retorna o simulador da MT (preparando-o na primeira vez) ou None"""
+    tm_store.sync()
+    engine = tm_engine_store.get(automata_id)
+    if engine is None:
+        tm = tm_store.get(automata_id)
+        if tm is None:
+            return None
+        engine = tm_engine_store[automata_id] = TMEngine.from_automaton(tm)
+    return engine
+
+# Criações recebidas e quantas reaproveitaram uma MT idêntica já armazenada
+tm_dedup = DedupStats()
+
+# Função para descartar o que foi derivado da versão anterior de uma MT alterada
+def invalidate_tm(automata_id: str):
+    tm_engine_store.pop(automata_id)
+    render_cache.invalidate("turing", automata_id)
+    acceptance_pool.invalidate(("turing", automata_id))
+
+tm_store.on_edit(invalidate_tm)
+
 # Carregar as MTs ao iniciar o servidor
 load_tm_store()
 
@@ -73,26 +134,53 @@ class TMModel(BaseModel):
     blank_symbol: str
     final_states: list[str]
 
+# Função para obter a forma canônica da definição de uma MT (base do seu id)
+def tm_canonical(data: TMModel) -> dict:
+    """Estados, símbolos e cada lista de transições não determinísticas ordenados."""
+    return {
+        "states": canonical_set(data.states),
+        "input_symbols": canonical_set(data.input_symbols),
+        "tape_symbols": canonical_set(data.tape_symbols),
+        "transitions": {
+            state: {symbol: canonical_set(moves) for symbol, moves in paths.items()}
+            for state, paths in data.transitions.items()
+        },
+        "initial_state": data.initial_state,
+        "blank_symbol": data.blank_symbol,
+        "final_states": canonical_set(data.final_states)
+    }
+
 # Endpoint para criar uma MT e armazená-lo na memória
-@router.post("/create", summary="Cria uma Máquina de Turing")
-def create_tm(data: TMModel):
+@router.post("/create", summary="Cria uma Máquina de Turing", openapi_extra=definition_openapi(TMModel))
+def create_tm(data: TMModel = Depends(definition_body("turing", TMModel))):
+    """
+    O id é derivado da definição canônica da MT: enviar a mesma MT outra vez
+    retorna o id já existente, sem armazenar uma nova cópia ("deduplicated": true).
+    Aceita também uma MT exportada no formato binário.
+    """
     try:
-        tm = NTM(
-            states=set(data.states),
-            input_symbols=set(data.input_symbols),
-            tape_symbols=set(data.tape_symbols),
-            transitions=data.transitions,
-            initial_state=data.initial_state,
-            blank_symbol=data.blank_symbol,
-            final_states=set(data.final_states)
-        )
-        automata_id = str(uuid.uuid4())
-        tm_store[automata_id] = tm
-        save_tm_store()
+        automata_id = content_slot("turing", tm_canonical(data), tm_store)
+        tm = tm_store.get(automata_id)
+        deduplicated = tm is not None
+
+        if not deduplicated:
+            tm = NTM(
+                states=set(data.states),
+                input_symbols=set(data.input_symbols),
+                tape_symbols=set(data.tape_symbols),
+                transitions=data.transitions,
+                initial_state=data.initial_state,
+                blank_symbol=data.blank_symbol,
+                final_states=set(data.final_states)
+            )
+            tm_store[automata_id] = tm
+            save_tm_store(automata_id)
+        tm_dedup.record(deduplicated)
 
         return {
-            "message": "MT criada com sucesso!",
+            "message": "MT já existente, id reaproveitado" if deduplicated else "MT criada com sucesso!",
             "id": automata_id,
+            "deduplicated": deduplicated,
             "automata": tm_to_dict(tm)
         }
     except Exception as e:
@@ -100,17 +188,111 @@ def create_tm(data: TMModel):
 
 # Endpoint para recuperar uma MT armazenado
 @router.get("/{automata_id}", summary="Recupera informações da Máquina de Turing")
-def get_tm(automata_id: str):
+def get_tm(automata_id: str, request: Request):
+    """Com `Accept: application/vnd.automata+binary`, a MT é exportada no formato binário."""
     tm = tm_store.get(automata_id)
     if tm is None:
         raise HTTPException(status_code=404, detail="MT não encontrada")
+    if wants_binary(request):
+        return binary_response("turing", tm_to_dict(tm))
     return tm_to_dict(tm)
 
+# Modelo de dados para alterar uma MT armazenada (PATCH); todos os campos são opcionais
+class TMEditModel(BaseModel):
+    add_states: list[str] = []  # Estados novos
+    remove_states: list[str] = []  # Estados removidos (nenhuma transição pode continuar chegando neles)
+    add_transitions: dict[str, dict[str, list[list[str]]]] = {}  # Transições adicionadas, como em TMModel
+    remove_transitions: dict[str, dict[str, list[list[str]]]] = {}  # Transições removidas, no mesmo formato
+    add_final_states: list[str] = []  # Estados que passam a ser finais
+    remove_final_states: list[str] = []  # Estados que deixam de ser finais
+
+# Função para validar uma alteração olhando apenas as partes afetadas da MT
+def tm_check_edit(tm: NTM, edit: dict):
+    """
+    Levanta ValueError se a alteração deixar a MT inválida: estados, símbolos ou
+    direções inexistentes, transição removida que não existe, estado final com
+    transições, estado inicial sem transições ou final, ou estado removido que
+    ainda é destino de alguma transição (a única verificação que percorre todas as transições).
+    """
+    states, added, removed = check_state_edit(tm, edit)
+    final_states = edited_final_states(tm, edit)
+    add = edit.get("add_transitions", {})
+    remove = edit.get("remove_transitions", {})
+    if tm.initial_state in final_states:
+        raise ValueError(f"O estado inicial '{tm.initial_state}' não pode ser final")
+    for state, paths in add.items():
+        if state not in states:
+            raise ValueError(f"O estado '{state}' não existe")
+        for symbol, moves in paths.items():
+            if symbol not in tm.tape_symbols:
+                raise ValueError(f"Símbolo inválido '{symbol}' na transição do estado '{state}'")
+            for move in moves:
+                if (len(move) != 3 or move[0] not in states or move[1] not in tm.tape_symbols
+                        or move[2] not in ("L", "R", "N")):
+                    raise ValueError(f"Transição inválida {move} do estado '{state}' com '{symbol}'")
+    for state, paths in remove.items():
+        for symbol, moves in paths.items():
+            current = tm.transitions.get(state, {}).get(symbol, ())
+            missing = [move for move in moves if tuple(move) not in current]
+            if missing:
+                raise ValueError(f"Transição inexistente: '{state}' com '{symbol}' para {missing}")
+
+    edited = tm_apply_edit(tm, edit)
+    for state in final_states & (set(add) | set(edit.get("add_final_states", ()))):
+        if state in edited.transitions:
+            raise ValueError(f"O estado final '{state}' não pode ter transições")
+    if tm.initial_state not in edited.transitions and len(states) > 1:
+        raise ValueError(f"O estado inicial '{tm.initial_state}' precisa ter transições")
+    if removed:
+        for state, paths in edited.transitions.items():
+            for symbol, moves in paths.items():
+                for move in moves:
+                    if move[0] in removed:
+                        raise ValueError(f"O estado '{move[0]}' ainda é destino da transição de '{state}' com '{symbol}'")
+    return edited
+
+# Endpoint para alterar uma MT armazenada sem reenviar a definição inteira
+@router.patch("/{automata_id}", summary="Altera estados, transições e estados finais da MT")
+def patch_tm(automata_id: str, data: TMEditModel, revision: int | None = None):
+    """
+    Aplica a alteração mantendo o id (a resposta traz a nova "revision"). Apenas
+    as partes afetadas são validadas e apenas a alteração é gravada; o simulador é
+    preparado de novo no próximo uso. As transições removidas precisam existir.
+    Com `?revision=n`, a alteração só é aplicada se a revisão atual for n (senão, 409).
+    """
+    def apply(tm, edit):
+        return tm_check_edit(tm, edit), None
+
+    tm, revision = patch_automaton("turing", tm_store, automata_id, data.model_dump(exclude_defaults=True),
+                                   apply, "MT não encontrada", revision)
+    return {
+        "message": "MT alterada com sucesso!",
+        "id": automata_id,
+        "revision": revision,
+        "states": len(tm.states),
+        "final_states": len(tm.final_states)
+    }
+
+# Função para converter o resultado de uma execução limitada no campo "accepted"
+def tm_accepted(run: dict):
+    """True/False se a máquina parou; None se algum limite foi atingido."""
+    if run["limit"] is not None:
+        return None
+    return run["result"] == ACCEPTED
+
 # Endpoint para testar a aceitação de uma string pelo MT
 @router.post("/{automata_id}/test", summary="Testa a aceitação de uma string pela MT")
-def test_tm(automata_id: str, payload: dict):
-    tm = tm_store.get(automata_id)
-    if tm is None:
+async def test_tm(automata_id: str, payload: dict):
+    """
+    Executa a MT com limites de passos, configurações simultâneas, tamanho da fita
+    e tempo (max_steps, max_configurations, max_tape_length, timeout — opcionais no
+    payload, nunca acima dos limites do servidor). Se algum limite for atingido,
+    "accepted" é null, "result" é "undecided" e "limit" indica qual foi. Com
+    "trace": true, um caminho da computação é registrado
+    (GET /turing/{automata_id}/traces/{trace_id}).
+    """
+    engine = get_tm_engine(automata_id)
+    if engine is None:
         raise HTTPException(status_code=404, detail="MT não encontrada")
     
     input_string = payload.get("input_string")
@@ -118,10 +300,74 @@ def test_tm(automata_id: str, payload: dict):
         raise HTTPException(status_code=400, detail="Campo 'input_string' é necessário")
     
     try:
-        result = tm.accepts_input(input_string)
-        return {"input_string": input_string, "accepted": result}
+        # A simulação roda no pool de processos, fora do event loop
+        if payload.get("trace"):
+            run, trace = await acceptance_pool.run(("turing", automata_id), engine, "trace", input_string,
+                                                   **tm_limits(payload))
+            return {"input_string": input_string, "accepted": tm_accepted(run), **run,
+                    "trace": store_trace("turing", automata_id, trace)}
+        run = await acceptance_pool.run(("turing", automata_id), engine, "run", input_string,
+                                        **tm_limits(payload))
+        return {"input_string": input_string, "accepted": tm_accepted(run), **run}
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+# Endpoint para consultar, por páginas, o trace de um teste
+@router.get("/{automata_id}/traces/{trace_id}", summary="Consulta o trace de um teste da MT")
+def get_tm_trace(automata_id: str, trace_id: str, start: int = Query(1, alias="from"),
+                 end: int = Query(None, alias="to")):
+    """
+    Passos `from` até `to` (exclusivo): estado, posição da cabeça (relativa ao
+    início da entrada), símbolo lido e escrito, movimento e próximo estado.
+    """
+    return read_trace("turing", automata_id, trace_id, start, end)
+
+# Função para montar o resultado de um teste em segundo plano
+def tm_job(run: dict) -> dict:
+    """Monta o resultado do job a partir da execução feita no processo de jobs."""
+    return {"accepted": tm_accepted(run), **run}
+
+# Endpoint para iniciar um teste em segundo plano pela MT
+@router.post("/{automata_id}/test-async", status_code=202, summary="Inicia um teste da MT em segundo plano")
+def test_tm_async(automata_id: str, payload: dict):
+    """
+    Mesmo payload de /test, mas responde imediatamente com o id de um job, consultado
+    em GET /jobs/{job_id}. O tempo limite pode chegar a JOB_TIMEOUT (padrão 600 s).
+    """
+    engine = get_tm_engine(automata_id)
+    if engine is None:
+        raise HTTPException(status_code=404, detail="MT não encontrada")
+
+    input_string = payload.get("input_string")
+    if input_string is None:
+        raise HTTPException(status_code=400, detail="Campo 'input_string' é necessário")
+
+    try:
+        limits = tm_limits(payload, max_timeout=JOB_TIMEOUT)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    job = job_manager.submit("turing", automata_id, engine, input_string, tm_job, "steps", **limits)
+    return {"job_id": job.id, "status": job.status, "url": f"/jobs/{job.id}"}
+
+# Endpoint para testar várias strings de uma vez pela MT
+@router.post("/{automata_id}/test-batch", summary="Testa a aceitação de várias strings pela MT")
+async def test_tm_batch(automata_id: str, request: Request):
+    engine = get_tm_engine(automata_id)
+    if engine is None:
+        raise HTTPException(status_code=404, detail="MT não encontrada")
+
+    input_strings = await read_input_strings(request)
+    try:
+        limits = tm_limits({})  # limites padrão do servidor para cada string
+        results = await acceptance_pool.run(("turing", automata_id), engine, "accepts_batch", input_strings,
+                                            **limits)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
+    return batch_response(input_strings, results)
 
 # Função para gerar uma representação DOT da Máquina de Turing
 def tm_to_dot(tm: NTM) -> str:
@@ -169,28 +415,10 @@ def tm_to_dot(tm: NTM) -> str:
 
 # Endpoint para visualizar a Máquina de Turing em formato gráfico (SVG ou PNG)
 @router.get("/{automata_id}/visualize", summary="Visualiza a MT em formato gráfico (SVG ou PNG)")
-def visualize_tm(automata_id: str, format: str = "svg"):
+async def visualize_tm(automata_id: str, request: Request, format: str = "svg"):
     tm = tm_store.get(automata_id)
     if tm is None:
         raise HTTPException(status_code=404, detail="MT não encontrada")
-    
-    dot_str = tm_to_dot(tm)
-    
-    # Adicionar o caminho para o Graphviz, se necessário
-    graphviz_path = r"C:\Program Files\Graphviz\bin"
-    if graphviz_path not in os.environ["PATH"]:
-        os.environ["PATH"] += os.pathsep + graphviz_path
 
-    try:
-        from graphviz import Source
-    except ImportError:
-        raise HTTPException(status_code=500, detail="O pacote graphviz não está instalado.")
-    
-    try:
-        graph = Source(dot_str, format=format, engine="dot")
-        output = graph.pipe(format=format)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Erro ao renderizar o gráfico: {str(e)}")
-    
-    mime = "image/svg+xml" if format.lower() == "svg" else "image/png"
-    return Response(content=output, media_type=mime)
+    # A imagem é reaproveitada do cache de renderização sempre que possível
+    return await render_response(request, "turing", automata_id, format, lambda: tm_to_dot(tm))
@@ -0,0 +1,180 @@
+from array import array
+from fastapi import HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+import asyncio
+import codecs
+import mmap
+import os
+import tempfile
+from app.stream import iter_input_chunks
+from app.executor import acceptance_pool
+
+# Ocorrências retornadas por uma busca (padrão e máximo); as demais são apenas contadas
+SCAN_MATCHES_DEFAULT = 1000
+SCAN_MAX_MATCHES = int(os.environ.get("SCAN_MAX_MATCHES", "100000"))
+
+# Tamanho mínimo (bytes) de cada trecho de uma busca em paralelo
+SCAN_CHUNK_MIN = int(os.environ.get("SCAN_CHUNK_MIN", str(1024 * 1024)))
+
+# Bytes decodificados de cada vez ao continuar uma busca na fronteira entre trechos
+STITCH_BLOCK = 64 * 1024
+
+
+# Ocorrências encontradas por uma busca
+class ScanMatches:
+    """Conta todas as ocorrências e guarda apenas as `limit` primeiras."""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.matches = []
+        self.count = 0
+
+    def add(self, starts, ends):
+        self.count += len(ends)
+        room = self.limit - len(self.matches)
+        if room > 0:
+            self.matches.extend([start, end] for start, end in zip(starts[:room], ends[:room]))
+
+    def response(self, characters: int, **extra) -> dict:
+        return {
+            "match_count": self.count,
+            "matches": self.matches,
+            "truncated": self.count > len(self.matches),
+            "characters_processed": characters,
+            **extra,
+        }
+
+
+# Função para buscar no corpo da requisição, lido em trechos conforme chega
+async def scan_stream(request: Request, engine, limit: int) -> dict:
+    """Apenas a configuração da busca é mantida entre os trechos; a memória não depende do tamanho do texto."""
+    found = ScanMatches(limit)
+    configuration = None
+    position = 0
+    async for _, text in iter_input_chunks(request):
+        starts, ends, configuration = await run_in_threadpool(engine.scan, text, position, configuration)
+        found.add(starts, ends)
+        position += len(text)
+    return found.response(position)
+
+
+# Função para buscar em paralelo, por trechos, no corpo da requisição
+async def scan_parallel(request: Request, key, engine, limit: int) -> dict:
+    """
+    O corpo é gravado num arquivo temporário e dividido em até um trecho por processo
+    do pool de aceitação (nunca menores que SCAN_CHUNK_MIN bytes, cortados entre
+    caracteres UTF-8). Cada processo mapeia o arquivo em memória e busca no seu
+    trecho como se ele fosse o começo do texto; depois as execuções que atravessam
+    cada fronteira são continuadas no trecho seguinte até morrerem (ver stitch_scans).
+    """
+    with tempfile.NamedTemporaryFile(prefix="scan-", delete=False) as f:
+        path = f.name
+        try:
+            async for data in request.stream():
+                await run_in_threadpool(f.write, data)
+        except BaseException:
+            f.close()
+            os.unlink(path)
+            raise
+    try:
+        size = os.path.getsize(path)
+        if size == 0:
+            return ScanMatches(limit).response(0, chunks=0)
+        chunks = split_utf8(path, size, max(1, min(acceptance_pool.workers, size // SCAN_CHUNK_MIN)))
+        try:
+            results = await asyncio.gather(*(
+                acceptance_pool.run(key, engine, "scan_file", path, start, end, cost=end - start)
+                for start, end in chunks))
+            found, characters = await run_in_threadpool(stitch_scans, engine, path, chunks, results, limit)
+        except UnicodeDecodeError:
+            raise HTTPException(status_code=400, detail="Corpo da requisição não é um texto UTF-8 válido")
+        return found.response(characters, chunks=len(chunks))
+    finally:
+        os.unlink(path)
+
+
+# Função para dividir um arquivo UTF-8 em trechos de tamanho parecido
+def split_utf8(path: str, size: int, parts: int) -> list:
+    """Retorna [(início, fim)] em bytes, sem cortar um caractere de vários bytes."""
+    bounds = [0]
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        for part in range(1, parts):
+            cut = max(size * part // parts, bounds[-1])
+            while cut < size and data[cut] & 0xC0 == 0x80:  # byte de continuação
+                cut += 1
+            bounds.append(cut)
+    bounds.append(size)
+    return [(start, end) for start, end in zip(bounds, bounds[1:]) if end > start]
+
+
+# Função para juntar as buscas feitas em paralelo, trecho a trecho
+def stitch_scans(engine, path: str, chunks: list, results: list, limit: int):
+    """
+    `results` traz, para cada trecho, (inícios, fins, configuração, caracteres) com
+    posições relativas ao trecho. As execuções vivas no fim de um trecho (iniciadas
+    antes dele) são continuadas no seguinte até morrerem: onde uma delas termina uma
+    ocorrência, ela vale no lugar da encontrada no trecho (começa antes), e as que
+    continuarem vivas entram na configuração da próxima fronteira.
+    Retorna (ScanMatches, caracteres lidos).
+    """
+    found = ScanMatches(limit)
+    carried = None
+    base = 0
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        for (start, end), (starts, ends, configuration, characters) in zip(chunks, results):
+            if base:
+                starts = array("q", (position + base for position in starts))
+                ends = array("q", (position + base for position in ends))
+                configuration = (configuration[0], [position + base for position in configuration[1]])
+
+            if carried is not None:
+                # A execução iniciada no começo do trecho já faz parte da busca do próprio trecho
+                carried = tuple(zip(*[(state, position) for state, position in zip(*carried) if position < base]))
+                carried_starts, carried_ends = array("q"), array("q")
+                decoder = codecs.getincrementaldecoder("utf-8")()
+                position = base
+                offset = start
+                while carried and offset < end:
+                    # Apenas até o fim deste trecho: o seguinte continua a partir da sua configuração
+                    block_end = min(offset + STITCH_BLOCK, end)
+                    text = decoder.decode(data[offset:block_end], final=block_end == end)
+                    offset = block_end
+                    block_starts, block_ends, carried = engine.scan_carried(text, position, carried)
+                    carried_starts.extend(block_starts)
+                    carried_ends.extend(block_ends)
+                    position += len(text)
+                    carried = carried if carried[0] else None
+                if carried_ends:
+                    starts, ends = _merge_matches(carried_starts, carried_ends, starts, ends)
+                if carried:
+                    # Execuções ainda vivas no fim do trecho: as mais antigas vêm primeiro
+                    states, positions = list(carried[0]), list(carried[1])
+                    for state, position in zip(*configuration):
+                        if state not in states:
+                            states.append(state)
+                            positions.append(position)
+                    configuration = (tuple(states), positions)
+
+            found.add(starts, ends)
+            carried = configuration
+            base += characters
+    return found, base
+
+
+# Função para juntar duas listas de ocorrências ordenadas pelo fim
+def _merge_matches(first_starts, first_ends, starts, ends):
+    """Num fim presente nas duas listas, vale a ocorrência da primeira."""
+    merged_starts, merged_ends = array("q"), array("q")
+    i = j = 0
+    while i < len(first_ends) or j < len(ends):
+        if j == len(ends) or (i < len(first_ends) and first_ends[i] <= ends[j]):
+            if j < len(ends) and ends[j] == first_ends[i]:
+                j += 1
+            merged_starts.append(first_starts[i])
+            merged_ends.append(first_ends[i])
+            i += 1
+        else:
+            merged_starts.append(starts[j])
+            merged_ends.append(ends[j])
+            j += 1
+    return merged_starts, merged_ends
@@ -0,0 +1,333 @@
+from array import array
+from functools import partial
+from fastapi import HTTPException, Request, Response
+from fastapi.exceptions import RequestValidationError
+from pydantic import ValidationError
+import json
+import mmap
+import struct
+import sys
+import zlib
+
+# Tipo de conteúdo do formato binário (exportação em GET e importação em /create)
+BINARY_MEDIA_TYPE = "application/vnd.automata+binary"
+
+# Identificação e versão do formato
+MAGIC = b"AUTM"
+FORMAT_VERSION = 1
+
+# Código de cada tipo de autômato no cabeçalho
+KIND_CODES = {"afd": 1, "pilha": 2, "turing": 3, "afn": 4}
+KIND_NAMES = {code: kind for kind, code in KIND_CODES.items()}
+
+# Transição ausente na tabela de um AFD
+NONE = 0xFFFFFFFF
+
+_HEADER = struct.Struct("<4sHH")
+
+
+# Codificação de um autômato (no formato de afd_to_dict, afn_to_dict, npda_to_dict ou tm_to_dict)
+class _Writer:
+    """
+    Monta o arquivo: cabeçalho (MAGIC, versão, tipo), tabela de strings internadas,
+    seções de inteiros de 32 bits (little-endian, alinhadas em 4 bytes, cada uma
+    precedida do tamanho) e o CRC32 de tudo o que vem antes, no fim.
+    """
+
+    def __init__(self):
+        self.strings = []
+        self.string_ids = {}
+        self.sections = []
+
+    def intern(self, value: str) -> int:
+        if not isinstance(value, str):
+            raise ValueError(f"Valor {value!r} não é uma string")
+        number = self.string_ids.get(value)
+        if number is None:
+            number = self.string_ids[value] = len(self.strings)
+            self.strings.append(value)
+        return number
+
+    def ids(self, values) -> list:
+        return [self.intern(value) for value in values]
+
+    def section(self, values):
+        self.sections.append(array("I", values))
+
+    def finish(self, kind: str) -> bytes:
+        blob = b"".join(value.encode("utf-8") for value in self.strings)
+        ends, end = array("I"), 0
+        for value in self.strings:
+            end += len(value.encode("utf-8"))
+            ends.append(end)
+        parts = [_HEADER.pack(MAGIC, FORMAT_VERSION, KIND_CODES[kind]), _section_bytes(ends),
+                 blob, b"\0" * (-len(blob) % 4)]
+        parts.extend(_section_bytes(values) for values in self.sections)
+        data = b"".join(parts)
+        return data + struct.pack("<I", zlib.crc32(data))
+
+
+def _section_bytes(values: array) -> bytes:
+    if sys.byteorder == "big":
+        values = array("I", values)
+        values.byteswap()
+    return struct.pack("<I", len(values)) + values.tobytes()
+
+
+# Leitura das seções sem copiar os inteiros (o buffer pode ser um mmap)
+class _Reader:
+    def __init__(self, buffer):
+        self.view = memoryview(buffer)
+        self.offset = _HEADER.size
+        ends = self.section().tolist()
+        size = ends[-1] if ends else 0
+        blob = bytes(self.view[self.offset:self.offset + size])
+        self.offset += size + (-size % 4)
+        slices = map(slice, [0, *ends[:-1]], ends)
+        text = blob.decode("utf-8")
+        if len(text) == size:
+            self.strings = list(map(text.__getitem__, slices))  # só ASCII: posições em bytes = em caracteres
+        else:
+            self.strings = [blob[part].decode("utf-8") for part in slices]
+
+    def section(self):
+        (count,) = struct.unpack_from("<I", self.view, self.offset)
+        start = self.offset + 4
+        self.offset = start + 4 * count
+        if self.offset > len(self.view):
+            raise ValueError("Arquivo binário truncado")
+        values = self.view[start:self.offset].cast("I")
+        if sys.byteorder == "big":
+            values = array("I", values)
+            values.byteswap()
+        return values
+
+    def names(self) -> list:
+        return list(map(self.strings.__getitem__, self.section().tolist()))
+
+    def name(self) -> str:
+        return self.strings[self.section()[0]]
+
+
+# Funções de codificação de cada tipo
+def _encode_afd(writer: _Writer, data: dict):
+    states = list(data["states"])
+    symbols = list(data["input_symbols"])
+    state_position = {state: i for i, state in enumerate(states)}
+    symbol_position = {symbol: j for j, symbol in enumerate(symbols)}
+    table = array("I", [NONE]) * (len(states) * len(symbols))
+    rows = []
+    try:
+        for state, paths in data["transitions"].items():
+            i = state_position[state]
+            rows.append(i)
+            for symbol, target in paths.items():
+                table[i * len(symbols) + symbol_position[symbol]] = state_position[target]
+    except KeyError as e:
+        raise ValueError(f"Estado ou símbolo {e} não declarado")
+    writer.section(writer.ids(states))
+    writer.section(writer.ids(symbols))
+    writer.section([writer.intern(data["initial_state"])])
+    writer.section(writer.ids(data["final_states"]))
+    writer.section(rows)  # estados com transições, na ordem do dicionário
+    writer.section(table)  # tabela |estados| x |símbolos|, com posições nas listas acima
+
+
+def _decode_afd(reader: _Reader) -> dict:
+    states, symbols = reader.names(), reader.names()
+    initial_state, final_states = reader.name(), reader.names()
+    rows, table = reader.section().tolist(), reader.section().tolist()
+    k = len(symbols)
+    transitions = {}
+    if NONE not in table:
+        # AFD completo (o caso comum): as linhas viram dicionários sem laço em Python
+        lines = list(zip(*[iter(map(states.__getitem__, table))] * k))
+        transitions = dict(zip(map(states.__getitem__, rows),
+                               map(dict, map(partial(zip, symbols), map(lines.__getitem__, rows)))))
+    else:
+        for i in rows:
+            paths = transitions[states[i]] = {}
+            for j, target in enumerate(table[i * k:(i + 1) * k]):
+                if target != NONE:
+                    paths[symbols[j]] = states[target]
+    return {"states": states, "input_symbols": symbols, "transitions": transitions,
+            "initial_state": initial_state, "final_states": final_states}
+
+
+def _encode_afn(writer: _Writer, data: dict):
+    records = array("I")
+    for state, paths in data["transitions"].items():
+        for symbol, targets in paths.items():
+            for target in targets:
+                records.extend(writer.ids((state, symbol, target)))
+    writer.section(writer.ids(data["states"]))
+    writer.section(writer.ids(data["input_symbols"]))
+    writer.section([writer.intern(data["initial_state"])])
+    writer.section(writer.ids(data["final_states"]))
+    writer.section(records)  # (estado, símbolo, destino) por destino; "" é a ε-transição
+
+
+def _decode_afn(reader: _Reader) -> dict:
+    states, symbols = reader.names(), reader.names()
+    initial_state, final_states = reader.name(), reader.names()
+    records = reader.names()
+    transitions = {}
+    for state, symbol, target in zip(*[iter(records)] * 3):
+        transitions.setdefault(state, {}).setdefault(symbol, []).append(target)
+    return {"states": states, "input_symbols": symbols, "transitions": transitions,
+            "initial_state": initial_state, "final_states": final_states}
+
+
+def _encode_pilha(writer: _Writer, data: dict):
+    records = array("I")
+    for state, input_paths in data["transitions"].items():
+        for input_symbol, stack_paths in input_paths.items():
+            for stack_symbol, targets in stack_paths.items():
+                for new_state, push in targets:
+                    records.extend(writer.ids((state, input_symbol, stack_symbol, new_state, push)))
+    writer.section(writer.ids(data["states"]))
+    writer.section(writer.ids(data["input_symbols"]))
+    writer.section(writer.ids(data["stack_symbols"]))
+    writer.section([writer.intern(data["initial_state"]), writer.intern(data["initial_stack_symbol"])])
+    writer.section(writer.ids(data["final_states"]))
+    writer.section(records)  # (estado, entrada, topo, novo estado, empilhados) por destino
+
+
+def _decode_pilha(reader: _Reader) -> dict:
+    states, input_symbols, stack_symbols = reader.names(), reader.names(), reader.names()
+    initial_state, initial_stack_symbol = reader.names()
+    final_states = reader.names()
+    records = reader.names()
+    transitions = {}
+    for state, input_symbol, stack_symbol, new_state, push in zip(*[iter(records)] * 5):
+        transitions.setdefault(state, {}).setdefault(input_symbol, {}).setdefault(stack_symbol, []).append(
+            [new_state, push])
+    return {"states": states, "input_symbols": input_symbols, "stack_symbols": stack_symbols,
+            "transitions": transitions, "initial_state": initial_state,
+            "initial_stack_symbol": initial_stack_symbol, "final_states": final_states}
+
+
+def _encode_turing(writer: _Writer, data: dict):
+    records = array("I")
+    for state, paths in data["transitions"].items():
+        for symbol, moves in paths.items():
+            for new_state, write, move in moves:
+                records.extend(writer.ids((state, symbol, new_state, write, move)))
+    writer.section(writer.ids(data["states"]))
+    writer.section(writer.ids(data["input_symbols"]))
+    writer.section(writer.ids(data["tape_symbols"]))
+    writer.section([writer.intern(data["initial_state"]), writer.intern(data["blank_symbol"])])
+    writer.section(writer.ids(data["final_states"]))
+    writer.section(records)  # (estado, lido, novo estado, escrito, movimento) por transição
+
+
+def _decode_turing(reader: _Reader) -> dict:
+    states, input_symbols, tape_symbols = reader.names(), reader.names(), reader.names()
+    initial_state, blank_symbol = reader.names()
+    final_states = reader.names()
+    records = reader.names()
+    transitions = {}
+    for state, symbol, new_state, write, move in zip(*[iter(records)] * 5):
+        transitions.setdefault(state, {}).setdefault(symbol, []).append([new_state, write, move])
+    return {"states": states, "input_symbols": input_symbols, "tape_symbols": tape_symbols,
+            "transitions": transitions, "initial_state": initial_state, "blank_symbol": blank_symbol,
+            "final_states": final_states}
+
+
+_ENCODERS = {"afd": _encode_afd, "afn": _encode_afn, "pilha": _encode_pilha, "turing": _encode_turing}
+_DECODERS = {"afd": _decode_afd, "afn": _decode_afn, "pilha": _decode_pilha, "turing": _decode_turing}
+
+
+# Função para codificar um autômato no formato binário
+def encode(kind: str, data: dict) -> bytes:
+    """
+    `data` é o dicionário serializável do autômato (afd_to_dict, afn_to_dict,
+    npda_to_dict ou tm_to_dict). Cada nome (estado, símbolo, string empilhada,
+    movimento) é guardado uma única vez; as transições viram arrays de inteiros: a
+    tabela densa de um AFD ou um registro de três (AFN) ou cinco (PDA/MT) inteiros
+    por destino.
+    """
+    writer = _Writer()
+    try:
+        _ENCODERS[kind](writer, data)
+    except (KeyError, TypeError) as e:
+        raise ValueError(f"Autômato inválido para o formato binário: {e}")
+    return writer.finish(kind)
+
+
+# Função para decodificar um autômato do formato binário
+def decode(buffer, kind: str = None) -> dict:
+    """
+    Retorna o dicionário serializável. `buffer` pode ser bytes, memoryview ou um mmap
+    (ver load): os inteiros são lidos direto do buffer. Com `kind`, outro tipo de
+    autômato é rejeitado. Levanta ValueError se o conteúdo for inválido.
+    """
+    view = memoryview(buffer)
+    if len(view) < _HEADER.size + 4:
+        raise ValueError("Arquivo binário truncado")
+    magic, version, code = _HEADER.unpack_from(view)
+    if magic != MAGIC:
+        raise ValueError("Conteúdo não está no formato binário de autômatos")
+    if version != FORMAT_VERSION:
+        raise ValueError(f"Versão {version} do formato binário não suportada (esperada {FORMAT_VERSION})")
+    if struct.unpack_from("<I", view, len(view) - 4)[0] != zlib.crc32(view[:-4]):
+        raise ValueError("Arquivo binário corrompido (CRC inválido)")
+    found = KIND_NAMES.get(code)
+    if found is None or (kind is not None and found != kind):
+        raise ValueError(f"O arquivo binário contém um autômato do tipo '{found}', esperado '{kind}'")
+    try:
+        return _DECODERS[found](_Reader(view[:-4]))
+    except (IndexError, struct.error, UnicodeDecodeError) as e:
+        raise ValueError(f"Arquivo binário inválido: {e}")
+
+
+# Função para ler um autômato de um arquivo no formato binário, mapeado em memória
+def load(path: str, kind: str = None) -> dict:
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        return decode(data, kind)
+
+
+# Função para verificar se o cliente pediu a exportação no formato binário
+def wants_binary(request: Request) -> bool:
+    return BINARY_MEDIA_TYPE in request.headers.get("accept", "")
+
+
+# Função para exportar um autômato no formato binário
+def binary_response(kind: str, data: dict) -> Response:
+    return Response(encode(kind, data), media_type=BINARY_MEDIA_TYPE)
+
+
+# Função para documentar (OpenAPI) os dois formatos aceitos em /create
+def definition_openapi(model) -> dict:
+    return {"requestBody": {"required": True, "content": {
+        "application/json": {"schema": model.model_json_schema()},
+        BINARY_MEDIA_TYPE: {"schema": {"type": "string", "format": "binary"}},
+    }}}
+
+
+# Função para criar a dependência que lê a definição de um autômato em /create
+def definition_body(kind: str, model, from_stored=None):
+    """
+    Aceita o JSON de sempre ou, com Content-Type BINARY_MEDIA_TYPE, um autômato
+    exportado no formato binário (convertido por `from_stored` para o formato do
+    modelo, quando os dois diferem). Erros de validação respondem 422, como no JSON.
+    """
+    async def read(request: Request):
+        body = await request.body()
+        if request.headers.get("content-type", "").startswith(BINARY_MEDIA_TYPE):
+            try:
+                data = decode(body, kind)
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+            if from_stored is not None:
+                data = from_stored(data)
+        else:
+            try:
+                data = json.loads(body)
+            except ValueError:
+                raise HTTPException(status_code=400, detail="Corpo da requisição não é um JSON válido")
+        try:
+            return model.model_validate(data)
+        except ValidationError as e:
+            raise RequestValidationError(e.errors())
+    return read
@@ -0,0 +1,928 @@
+from collections import OrderedDict
+from collections.abc import MutableMapping
+import json
+import os
+import sqlite3
+import struct
+import threading
+from app import serialization
+
+# Quantidade mínima de registros no journal antes de disparar uma compactação
+COMPACT_MIN_RECORDS = int(os.environ.get("AUTOMATA_COMPACT_MIN_RECORDS", "1000"))
+
+# Proporção journal/snapshot a partir da qual o journal é compactado.
+# Com uma proporção fixa o custo da compactação fica amortizado em O(1) por criação.
+COMPACT_RATIO = float(os.environ.get("AUTOMATA_COMPACT_RATIO", "0.5"))
+
+# Quantidade de autômatos reconstruídos mantidos em memória por armazenamento
+CACHE_SIZE = int(os.environ.get("AUTOMATA_CACHE_SIZE", "1000"))
+
+# Backend de armazenamento: "journal" (arquivos JSONL, um processo) ou "sqlite"
+# (um banco compartilhado por vários processos/workers)
+STORAGE_BACKEND = os.environ.get("AUTOMATA_STORAGE", "journal")
+SQLITE_PATH = os.environ.get("AUTOMATA_SQLITE_PATH", "automata.db")
+
+# Formato dos registros gravados: "json" (JSONL / texto) ou "binary" (app.serialization).
+# Arquivos no outro formato são convertidos na primeira carga.
+RECORD_FORMAT = os.environ.get("AUTOMATA_FORMAT", "json")
+RECORD_FORMATS = ("json", "binary")
+
+# Alterações (PATCH) seguidas gravadas como delta; a seguinte regrava o autômato inteiro
+EDIT_CHAIN_MAX = int(os.environ.get("AUTOMATA_EDIT_CHAIN_MAX", "32"))
+
+# Prefixo de cada linha gravada por json.dumps({"id": ..., "data": ...}) e campos que podem seguir o id
+_RECORD_PREFIX = b'{"id": "'
+_REVISION_FIELD = b', "revision": '
+_DATA_FIELD = b', "data": '
+_EDIT_FIELD = b', "edit": '
+
+# Cabeçalho de cada registro binário: tamanho do conteúdo, tamanho do id e revisão (seguidos do id e
+# do conteúdo: o autômato codificado ou, num delta, o JSON da alteração)
+_BINARY_RECORD = struct.Struct("<IHI")
+
+_MISSING = object()
+
+
+# Cache LRU simples e seguro entre threads, usado para objetos reconstruídos sob demanda
+class LRUCache:
+    """Mapeamento limitado a `max_entries` itens; o menos usado recentemente é descartado."""
+
+    def __init__(self, max_entries: int = CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            value = self._entries.get(key, _MISSING)
+            if value is _MISSING:
+                return default
+            self._entries.move_to_end(key)
+            return value
+
+    def __getitem__(self, key):
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+    def pop(self, key, default=None):
+        with self._lock:
+            return self._entries.pop(key, default)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+# Outra alteração do mesmo autômato foi gravada antes (revisão esperada diferente da atual)
+class EditConflict(Exception):
+    pass
+
+
+# Interface comum dos armazenamentos de autômatos usados pelos routers
+class AutomataStore(MutableMapping):
+    """
+    Dicionário id -> autômato. `store[id] = automato` guarda o objeto e
+    `persist(id)` o grava de forma durável; `load()` prepara o armazenamento ao
+    iniciar o servidor e `stats()` retorna contadores para GET /stats.
+
+    Um autômato armazenado pode ser alterado com `persist_edit(id, novo, alteração,
+    revisão)`, que grava apenas a alteração (um delta, reaplicado com a função
+    `apply_edit` ao reconstruir o autômato) e avisa as funções registradas com
+    `on_edit` para que descartem o que dependia da versão anterior.
+    """
+
+    def load(self):
+        raise NotImplementedError
+
+    def persist(self, key: str):
+        raise NotImplementedError
+
+    def persist_edit(self, key: str, value, edit: dict, revision: int):
+        raise NotImplementedError
+
+    def revision(self, key: str) -> int:
+        """Quantas alterações o autômato já recebeu (0 se nunca foi alterado)."""
+        raise NotImplementedError
+
+    def stats(self) -> dict:
+        raise NotImplementedError
+
+    def sync(self):
+        """Descarta as cópias de autômatos alterados por outros processos (nada a fazer com um só processo)."""
+
+    def on_edit(self, callback):
+        """Registra `callback(id)`, chamada a cada alteração de um autômato."""
+        self._edit_listeners.append(callback)
+
+    def _notify_edit(self, key: str):
+        self._cache.pop(key)
+        for callback in self._edit_listeners:
+            callback(key)
+
+
+# Armazenamento de autômatos persistido em snapshot + journal append-only
+class JournaledStore(AutomataStore):
+    """
+    Dicionário de autômatos persistido em dois arquivos no formato JSONL (uma linha
+    {"id": ..., "data": ...} por autômato):
+      - o snapshot (ex.: "afd_store.jsonl");
+      - o journal (ex.: "afd_store.journal"), onde cada criação ou alteração acrescenta uma linha.
+
+    Criar um autômato custa apenas um append no journal, independentemente do tamanho
+    do armazenamento. Quando o journal cresce demais, uma thread em segundo plano o
+    compacta em um novo snapshot.
+
+    Ao carregar, apenas um índice id -> (arquivo, posição, tamanho) é montado; cada
+    autômato é lido e reconstruído (com a validação da biblioteca) no primeiro acesso
+    e mantido num LRU de `cache_size` objetos. O snapshot antigo (um único objeto JSON,
+    ex.: "afd_store.json") é convertido para o novo formato na primeira carga.
+
+    Com `record_format="binary"`, os registros usam o formato binário de
+    app.serialization (id + autômato codificado) nos arquivos "afd_store.bin" e
+    "afd_store.bin.journal"; os arquivos do outro formato, se forem os únicos
+    existentes, são convertidos na primeira carga (nos dois sentidos).
+
+    Cada alteração acrescenta um delta ({"id": ..., "revision": n, "edit": ...});
+    o índice guarda, por autômato, o último registro completo e os deltas seguintes,
+    copiados juntos pela compactação. Após EDIT_CHAIN_MAX deltas seguidos, o
+    autômato é gravado inteiro de novo.
+    """
+
+    def __init__(self, path: str, to_dict, from_dict,
+                 compact_min_records: int = COMPACT_MIN_RECORDS,
+                 compact_ratio: float = COMPACT_RATIO,
+                 cache_size: int = CACHE_SIZE,
+                 kind: str = None, record_format: str = "json", apply_edit=None):
+        base, _ = os.path.splitext(path)
+        if record_format == "binary":
+            base += ".bin"
+        self.legacy_path = path
+        self.path = base + (".jsonl" if record_format == "json" else "")
+        self.journal_path = base + ".journal"
+        # Journal "congelado" durante uma compactação em andamento
+        self.rotated_path = base + ".journal.1"
+        self.kind = kind
+        self.record_format = record_format
+        self.to_dict = to_dict
+        self.from_dict = from_dict
+        self.apply_edit = apply_edit
+        self.compact_min_records = compact_min_records
+        self.compact_ratio = compact_ratio
+        self._index = {}  # id -> (arquivo, posição, tamanho) do último registro completo
+        self._edits = {}  # id -> localizações dos deltas gravados depois dele
+        self._revisions = {}  # id -> revisão (apenas dos autômatos alterados)
+        self._edit_listeners = []
+        self._pending = {}  # criados e ainda não persistidos
+        self._cache = LRUCache(cache_size)
+        self._readers = {}
+        self._lock = threading.Lock()
+        self._journal = None
+        self._journal_records = 0
+        self._compacting = False
+        self.hits = 0
+        self.misses = 0
+
+    def __getitem__(self, key):
+        value = self._cache.get(key, _MISSING)
+        if value is not _MISSING:
+            self.hits += 1
+            return value
+
+        with self._lock:
+            value = self._pending.get(key, _MISSING)
+            if value is not _MISSING:
+                return value
+            location = self._index.get(key)
+            if location is None:
+                raise KeyError(key)
+            record = self._read(location)
+            edits = [self._read(edit) for edit in self._edits.get(key, ())]
+
+        try:
+            data = self._decode_record(record)
+            edits = [self._decode_edit(edit) for edit in edits]
+        except (ValueError, KeyError):
+            raise KeyError(key)  # registro corrompido: tratado como inexistente
+        value = self.from_dict(data)
+        for edit in edits:
+            value = self.apply_edit(value, edit)
+        self.misses += 1
+        self._cache[key] = value
+        return value
+
+    def __setitem__(self, key, value):
+        with self._lock:
+            self._pending[key] = value
+        self._cache[key] = value
+
+    def __delitem__(self, key):
+        with self._lock:
+            found = self._index.pop(key, None) is not None
+            found = self._pending.pop(key, None) is not None or found
+            self._edits.pop(key, None)
+            self._revisions.pop(key, None)
+        self._cache.pop(key)
+        if not found:
+            raise KeyError(key)
+
+    def __contains__(self, key):
+        return key in self._pending or key in self._index
+
+    def __iter__(self):
+        with self._lock:
+            keys = list(self._index)
+            keys.extend(key for key in self._pending if key not in self._index)
+        return iter(keys)
+
+    def __len__(self):
+        with self._lock:
+            return len(self._index) + sum(1 for key in self._pending if key not in self._index)
+
+    def stats(self) -> dict:
+        return {
+            "backend": "journal",
+            "stored": len(self),
+            "edited": len(self._revisions),
+            "hydrated": len(self._cache),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+    def load(self):
+        """
+        Monta o índice a partir do snapshot e dos journals, sem reconstruir os autômatos.
+        Uma última linha incompleta (escrita interrompida por uma queda) é descartada.
+        """
+        with self._lock:
+            self._close_journal()
+            self._close_readers()
+            self._index = {}
+            self._edits = {}
+            self._revisions = {}
+            self._pending = {}
+            self._cache.clear()
+            if not self._exists():
+                self._convert_other_format()
+            if self.record_format == "json" and not os.path.exists(self.path) and os.path.exists(self.legacy_path):
+                self._migrate_legacy()
+            self._scan(self.path)
+
+            interrupted = os.path.exists(self.rotated_path)
+            if interrupted:
+                self._scan(self.rotated_path)
+            self._journal_records = self._scan(self.journal_path)
+
+        # Uma compactação foi interrompida: conclui agora, antes de aceitar novas escritas
+        if interrupted:
+            self.compact()
+
+    def raw_items(self):
+        """
+        Retorna (id, dicionário serializado) de cada autômato, sem reconstruí-los
+        (exceto os que têm deltas, reconstruídos para aplicá-los).
+        """
+        with self._lock:
+            locations = list(self._index.items())
+            records = [(key, self._read(location)) for key, location in locations if key not in self._edits]
+            edited = list(self._edits)
+        for key, record in records:
+            try:
+                yield key, self._decode_record(record)
+            except (ValueError, KeyError):
+                continue  # registro corrompido
+        for key in edited:
+            try:
+                yield key, self.to_dict(self[key])
+            except KeyError:
+                continue
+
+    def revision(self, key: str) -> int:
+        return self._revisions.get(key, 0)
+
+    def _exists(self) -> bool:
+        return any(os.path.exists(path) for path in (self.path, self.journal_path, self.rotated_path))
+
+    def _convert_other_format(self):
+        """
+        Converte para o formato deste armazenamento os arquivos gravados no outro
+        formato (ex.: ao trocar AUTOMATA_FORMAT), removendo-os em seguida.
+        """
+        other = "binary" if self.record_format == "json" else "json"
+        source = JournaledStore(self.legacy_path, self.to_dict, self.from_dict, kind=self.kind, record_format=other,
+                                apply_edit=self.apply_edit)
+        if not source._exists() and not (other == "json" and os.path.exists(source.legacy_path)):
+            return
+        source.load()
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            for key, data in source.raw_items():
+                f.write(self._encode_record(key, data, source.revision(key)))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+        source._close_readers()
+        for path in (source.path, source.journal_path, source.rotated_path):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def _encode_record(self, key: str, data: dict, revision: int = 0) -> bytes:
+        """Serializa um registro (id + dicionário do autômato) no formato do armazenamento."""
+        if self.record_format == "json":
+            record = {"id": key, "revision": revision, "data": data} if revision else {"id": key, "data": data}
+            return (json.dumps(record) + "\n").encode()
+        return self._binary_record(key, revision, serialization.encode(self.kind, data))
+
+    def _encode_edit(self, key: str, edit: dict, revision: int) -> bytes:
+        """Serializa um delta: a alteração que leva o autômato à revisão `revision`."""
+        if self.record_format == "json":
+            return (json.dumps({"id": key, "revision": revision, "edit": edit}) + "\n").encode()
+        return self._binary_record(key, revision, json.dumps(edit).encode())
+
+    @staticmethod
+    def _binary_record(key: str, revision: int, payload: bytes) -> bytes:
+        key_bytes = key.encode()
+        return _BINARY_RECORD.pack(len(payload), len(key_bytes), revision) + key_bytes + payload
+
+    def _decode_record(self, record: bytes) -> dict:
+        """Retorna o dicionário do autômato; levanta ValueError/KeyError se o registro estiver corrompido."""
+        if self.record_format == "json":
+            return json.loads(record)["data"]
+        _, key_length, _ = _BINARY_RECORD.unpack_from(record)
+        return serialization.decode(memoryview(record)[_BINARY_RECORD.size + key_length:], self.kind)
+
+    def _decode_edit(self, record: bytes) -> dict:
+        if self.record_format == "json":
+            return json.loads(record)["edit"]
+        _, key_length, _ = _BINARY_RECORD.unpack_from(record)
+        return json.loads(record[_BINARY_RECORD.size + key_length:])
+
+    def _index_record(self, key: str, location, revision: int, edit: bool):
+        """Registra no índice um registro completo ou um delta lido do disco."""
+        if edit:
+            if key not in self._index:
+                return  # delta sem o registro completo anterior: ignorado
+            self._edits.setdefault(key, []).append(location)
+        else:
+            self._index[key] = location
+            self._edits.pop(key, None)
+        if revision:
+            self._revisions[key] = revision
+        else:
+            self._revisions.pop(key, None)
+
+    def _migrate_legacy(self):
+        """Converte o snapshot antigo (um único objeto JSON) para JSONL."""
+        with open(self.legacy_path, "r") as f:
+            try:
+                data = json.load(f)
+            except json.JSONDecodeError:
+                data = {}  # Se houver erro, reinicia o armazenamento
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as f:
+            for key, value in data.items():
+                f.write(json.dumps({"id": key, "data": value}) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+        os.remove(self.legacy_path)
+
+    def _scan(self, path: str) -> int:
+        """Indexa os registros de um arquivo JSONL e retorna quantos foram lidos."""
+        if not os.path.exists(path):
+            return 0
+        if self.record_format == "binary":
+            return self._scan_binary(path)
+        records = 0
+        position = 0
+        with open(path, "rb") as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # cauda incompleta
+                key, revision, edit = _record_header(line)
+                if key is not None:
+                    self._index_record(key, (path, position, len(line)), revision, edit)
+                    records += 1
+                position += len(line)
+            torn = f.tell() != position
+        # Remove a cauda corrompida para que o próximo append comece numa linha limpa
+        if torn:
+            with open(path, "r+b") as f:
+                f.truncate(position)
+        return records
+
+    def _scan_binary(self, path: str) -> int:
+        """Indexa os registros de um arquivo binário (mesmas regras de _scan)."""
+        records = 0
+        position = 0
+        size = os.path.getsize(path)
+        with open(path, "rb") as f:
+            while True:
+                header = f.read(_BINARY_RECORD.size)
+                if len(header) < _BINARY_RECORD.size:
+                    break
+                payload_length, key_length, revision = _BINARY_RECORD.unpack(header)
+                length = _BINARY_RECORD.size + key_length + payload_length
+                if position + length > size or payload_length == 0:
+                    break  # cauda incompleta
+                data = f.read(key_length + 1)
+                try:
+                    key = data[:-1].decode()
+                except UnicodeDecodeError:
+                    break  # cabeçalho corrompido: o restante do arquivo é descartado
+                # Um autômato codificado começa com serialization.MAGIC; um delta, com o "{" do JSON
+                self._index_record(key, (path, position, length), revision, data[-1:] == b"{")
+                records += 1
+                position += length
+                f.seek(position)
+        if position != size:
+            with open(path, "r+b") as f:
+                f.truncate(position)
+        return records
+
+    def _read(self, location) -> bytes:
+        """Lê um registro (chamado com o lock adquirido)."""
+        path, position, length = location
+        reader = self._readers.get(path)
+        if reader is None:
+            reader = self._readers[path] = open(path, "rb")
+        reader.seek(position)
+        return reader.read(length)
+
+    def persist(self, key: str):
+        """Acrescenta ao journal o autômato armazenado sob `key`."""
+        value = self._pending.get(key, _MISSING)
+        if value is _MISSING:
+            value = self[key]
+        line = self._encode_record(key, self.to_dict(value), self._revisions.get(key, 0))
+        with self._lock:
+            self._append(key, line, self._revisions.get(key, 0), edit=False)
+            self._pending.pop(key, None)
+            should_compact = self._should_compact()
+        if should_compact:
+            threading.Thread(target=self._compact_rotated, daemon=True).start()
+
+    def persist_edit(self, key: str, value, edit: dict, revision: int):
+        """
+        Grava a alteração `edit`, que leva o autômato `key` à revisão `revision`
+        (a atual + 1, senão levanta EditConflict), e guarda `value`, o autômato já
+        alterado. Apenas o delta é acrescentado ao journal, exceto a cada
+        EDIT_CHAIN_MAX alterações, quando o autômato é gravado inteiro.
+        """
+        with self._lock:
+            full = len(self._edits.get(key, ())) + 1 >= EDIT_CHAIN_MAX
+        if full:
+            line = self._encode_record(key, self.to_dict(value), revision)
+        else:
+            line = self._encode_edit(key, edit, revision)
+        with self._lock:
+            if key not in self._index or self._revisions.get(key, 0) != revision - 1:
+                raise EditConflict(key)
+            self._append(key, line, revision, edit=not full)
+            should_compact = self._should_compact()
+        self._notify_edit(key)
+        self._cache[key] = value
+        if should_compact:
+            threading.Thread(target=self._compact_rotated, daemon=True).start()
+
+    def _append(self, key: str, line: bytes, revision: int, edit: bool):
+        """Acrescenta um registro ao journal e ao índice (chamado com o lock adquirido)."""
+        if self._journal is None:
+            self._journal = open(self.journal_path, "ab")
+        position = self._journal.tell()
+        self._journal.write(line)
+        self._journal.flush()
+        os.fsync(self._journal.fileno())
+        self._index_record(key, (self.journal_path, position, len(line)), revision, edit)
+        self._journal_records += 1
+
+    def _should_compact(self) -> bool:
+        """Decide (com o lock adquirido) se o journal deve ser compactado agora."""
+        should_compact = (
+            not self._compacting
+            and self._journal_records >= self.compact_min_records
+            and self._journal_records >= len(self._index) * self.compact_ratio
+        )
+        if should_compact:
+            self._compacting = True
+        return should_compact
+
+    def compact(self):
+        """Reescreve o snapshot com todo o conteúdo atual e descarta o journal."""
+        with self._lock:
+            if self._compacting:
+                return
+            self._compacting = True
+        self._compact_rotated()
+
+    def _compact_rotated(self):
+        """
+        Congela o journal atual (renomeando-o) e grava o snapshot fora do lock,
+        copiando os registros já serializados, de modo que as criações continuam
+        sendo aceitas durante a compactação.
+        """
+        try:
+            with self._lock:
+                self._close_journal()
+                self._close_readers()
+                if os.path.exists(self.journal_path):
+                    offset = 0
+                    if os.path.exists(self.rotated_path):
+                        # Sobra de uma compactação que falhou: junta os dois journals
+                        offset = os.path.getsize(self.rotated_path)
+                        with open(self.rotated_path, "ab") as dst, open(self.journal_path, "rb") as src:
+                            dst.write(src.read())
+                        os.remove(self.journal_path)
+                    else:
+                        os.replace(self.journal_path, self.rotated_path)
+                    def rotated(location):
+                        path, position, length = location
+                        if path == self.journal_path:
+                            return self.rotated_path, position + offset, length
+                        return location
+
+                    for key, location in self._index.items():
+                        self._index[key] = rotated(location)
+                    for edits in self._edits.values():
+                        edits[:] = map(rotated, edits)
+                self._journal_records = 0
+                frozen = dict(self._index)
+                frozen_edits = {key: list(edits) for key, edits in self._edits.items()}
+
+            # Somente esta thread escreve no snapshot e no journal congelado
+            tmp_path = self.path + ".tmp"
+            relocated = {}
+            relocated_edits = {}
+            sources = {}
+
+            def copy(location):
+                path, position, length = location
+                source = sources.get(path)
+                if source is None:
+                    source = sources[path] = open(path, "rb")
+                source.seek(position)
+                new_location = (self.path, out.tell(), length)
+                out.write(source.read(length))
+                return new_location
+
+            try:
+                with open(tmp_path, "wb") as out:
+                    # Cada registro completo é seguido dos seus deltas, na ordem em que foram gravados
+                    for key, location in frozen.items():
+                        relocated[key] = copy(location)
+                        if key in frozen_edits:
+                            relocated_edits[key] = [copy(edit) for edit in frozen_edits[key]]
+                    out.flush()
+                    os.fsync(out.fileno())
+            finally:
+                for source in sources.values():
+                    source.close()
+
+            with self._lock:
+                self._close_readers()
+                os.replace(tmp_path, self.path)
+                for key, location in relocated.items():
+                    # Registros regravados durante a compactação continuam no journal novo
+                    if self._index.get(key) == frozen[key]:
+                        self._index[key] = location
+                        # Deltas gravados durante a compactação continuam no journal novo
+                        if key in relocated_edits:
+                            edits = self._edits[key]
+                            edits[:len(relocated_edits[key])] = relocated_edits[key]
+                if os.path.exists(self.rotated_path):
+                    os.remove(self.rotated_path)
+        finally:
+            with self._lock:
+                self._compacting = False
+
+    def _close_journal(self):
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+
+    def _close_readers(self):
+        for reader in self._readers.values():
+            reader.close()
+        self._readers = {}
+
+
+# Armazenamento de autômatos em SQLite (modo WAL), compartilhado entre processos
+class SQLiteStore(AutomataStore):
+    """
+    Guarda os autômatos na tabela `automata` (chave primária (kind, id)), de modo
+    que vários workers do uvicorn usam o mesmo conteúdo e as criações concorrentes
+    são serializadas pelo SQLite. O modo WAL permite leituras simultâneas a uma
+    escrita. Cada thread usa a sua própria conexão; os objetos reconstruídos ficam
+    num LRU local do processo, descartados quando outro processo os altera.
+    Com `record_format="binary"`, a coluna `data` recebe o autômato codificado
+    (BLOB); os dois formatos são lidos, de modo que a troca não exige conversão.
+
+    As alterações vão para a tabela `automata_edits` (o delta, ou NULL quando o
+    autômato foi regravado inteiro em `data`) e `automata.revision` guarda a revisão
+    atual. A tabela também serve de aviso aos outros processos: `sync()` descarta
+    do LRU local os autômatos alterados desde a última consulta.
+    """
+
+    def __init__(self, kind: str, to_dict, from_dict, db_path: str = SQLITE_PATH,
+                 import_path: str = None, cache_size: int = CACHE_SIZE, record_format: str = "json",
+                 apply_edit=None):
+        self.kind = kind
+        self.record_format = record_format
+        self.db_path = db_path
+        self.import_path = import_path  # arquivos do backend "journal" a importar, se houver
+        self.to_dict = to_dict
+        self.from_dict = from_dict
+        self.apply_edit = apply_edit
+        self._pending = {}
+        self._cache = LRUCache(cache_size)
+        self._local = threading.local()
+        self._edit_listeners = []
+        self._sync_lock = threading.Lock()
+        self._seen_seq = 0  # último registro de automata_edits já considerado por sync()
+        self._own_seqs = set()  # registros gravados por este processo (sync não os repete)
+        self.hits = 0
+        self.misses = 0
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def load(self):
+        """Cria a tabela, se necessário, e importa os arquivos do backend "journal"."""
+        self._pending = {}
+        self._cache.clear()
+        connection = self._connection()
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS automata ("
+            " kind TEXT NOT NULL, id TEXT NOT NULL, data TEXT NOT NULL,"
+            " revision INTEGER NOT NULL DEFAULT 0,"
+            " PRIMARY KEY (kind, id)) WITHOUT ROWID"
+        )
+        columns = [row[1] for row in connection.execute("PRAGMA table_info(automata)")]
+        if "revision" not in columns:
+            # Banco criado antes das alterações (PATCH)
+            connection.execute("ALTER TABLE automata ADD COLUMN revision INTEGER NOT NULL DEFAULT 0")
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS automata_edits ("
+            " seq INTEGER PRIMARY KEY AUTOINCREMENT, kind TEXT NOT NULL, id TEXT NOT NULL,"
+            " revision INTEGER NOT NULL, edit TEXT)"
+        )
+        connection.execute("CREATE INDEX IF NOT EXISTS automata_edits_id ON automata_edits (kind, id, revision)")
+        self._seen_seq = connection.execute("SELECT COALESCE(MAX(seq), 0) FROM automata_edits").fetchone()[0]
+        self._local.data_version = None
+        if self.import_path is None or len(self) > 0:
+            return
+        sources = [JournaledStore(self.import_path, self.to_dict, self.from_dict, kind=self.kind,
+                                  record_format=name, apply_edit=self.apply_edit)
+                   for name in RECORD_FORMATS]
+        rows = []
+        for source in sources:
+            if not source._exists() and not (source.record_format == "json" and os.path.exists(source.legacy_path)):
+                continue
+            source.load()
+            rows.extend((self.kind, key, self._encode(data), source.revision(key)) for key, data in source.raw_items())
+        if not rows:
+            return
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            connection.executemany(
+                "INSERT OR IGNORE INTO automata (kind, id, data, revision) VALUES (?, ?, ?, ?)", rows)
+            connection.execute("COMMIT")
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+
+    def __getitem__(self, key):
+        self.sync()
+        value = self._cache.get(key, _MISSING)
+        if value is not _MISSING:
+            self.hits += 1
+            return value
+        value = self._pending.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+
+        connection = self._connection()
+        connection.execute("BEGIN")  # o autômato e os seus deltas vêm do mesmo instante do banco
+        try:
+            row = connection.execute(
+                "SELECT data FROM automata WHERE kind = ? AND id = ?", (self.kind, key)
+            ).fetchone()
+            edits = connection.execute(
+                "SELECT edit FROM automata_edits WHERE kind = ? AND id = ? AND edit IS NOT NULL"
+                " ORDER BY revision", (self.kind, key)
+            ).fetchall()
+        finally:
+            connection.execute("COMMIT")
+        if row is None:
+            raise KeyError(key)
+        value = self.from_dict(self._decode(row[0]))
+        for (edit,) in edits:
+            value = self.apply_edit(value, json.loads(edit))
+        self.misses += 1
+        self._cache[key] = value
+        return value
+
+    def __setitem__(self, key, value):
+        self._pending[key] = value
+        self._cache[key] = value
+
+    def __delitem__(self, key):
+        self._pending.pop(key, None)
+        self._cache.pop(key)
+        connection = self._connection()
+        cursor = connection.execute(
+            "DELETE FROM automata WHERE kind = ? AND id = ?", (self.kind, key)
+        )
+        if cursor.rowcount == 0:
+            raise KeyError(key)
+        connection.execute("DELETE FROM automata_edits WHERE kind = ? AND id = ?", (self.kind, key))
+
+    def __contains__(self, key):
+        if key in self._pending:
+            return True
+        return self._connection().execute(
+            "SELECT 1 FROM automata WHERE kind = ? AND id = ?", (self.kind, key)
+        ).fetchone() is not None
+
+    def __iter__(self):
+        rows = self._connection().execute("SELECT id FROM automata WHERE kind = ?", (self.kind,)).fetchall()
+        return iter([row[0] for row in rows])
+
+    def __len__(self):
+        return self._connection().execute(
+            "SELECT COUNT(*) FROM automata WHERE kind = ?", (self.kind,)
+        ).fetchone()[0]
+
+    def persist(self, key: str):
+        """Grava (numa transação própria) o autômato armazenado sob `key`."""
+        value = self._pending.get(key, _MISSING)
+        if value is _MISSING:
+            value = self[key]
+        connection = self._connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            connection.execute(
+                "INSERT OR REPLACE INTO automata (kind, id, data) VALUES (?, ?, ?)",
+                (self.kind, key, self._encode(self.to_dict(value))),
+            )
+            connection.execute("DELETE FROM automata_edits WHERE kind = ? AND id = ?", (self.kind, key))
+            connection.execute("COMMIT")
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+        self._pending.pop(key, None)
+
+    def persist_edit(self, key: str, value, edit: dict, revision: int):
+        """
+        Grava a alteração `edit` (revisão `revision`, a atual + 1, senão levanta
+        EditConflict) numa transação própria; a cada EDIT_CHAIN_MAX alterações o
+        autômato `value` é regravado inteiro e os deltas anteriores são apagados.
+        """
+        connection = self._connection()
+        chain = connection.execute(
+            "SELECT COUNT(*) FROM automata_edits WHERE kind = ? AND id = ? AND edit IS NOT NULL", (self.kind, key)
+        ).fetchone()[0]
+        full = chain + 1 >= EDIT_CHAIN_MAX
+        payload = self._encode(self.to_dict(value)) if full else json.dumps(edit)
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            if full:
+                cursor = connection.execute(
+                    "UPDATE automata SET revision = ?, data = ? WHERE kind = ? AND id = ? AND revision = ?",
+                    (revision, payload, self.kind, key, revision - 1))
+            else:
+                cursor = connection.execute(
+                    "UPDATE automata SET revision = ? WHERE kind = ? AND id = ? AND revision = ?",
+                    (revision, self.kind, key, revision - 1))
+            if cursor.rowcount == 0:
+                raise EditConflict(key)
+            if full:
+                connection.execute("DELETE FROM automata_edits WHERE kind = ? AND id = ?", (self.kind, key))
+            seq = connection.execute(
+                "INSERT INTO automata_edits (kind, id, revision, edit) VALUES (?, ?, ?, ?)",
+                (self.kind, key, revision, None if full else payload)).lastrowid
+            connection.execute("COMMIT")
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+        with self._sync_lock:
+            self._own_seqs.add(seq)
+        self._notify_edit(key)
+        self._cache[key] = value
+
+    def revision(self, key: str) -> int:
+        row = self._connection().execute(
+            "SELECT revision FROM automata WHERE kind = ? AND id = ?", (self.kind, key)
+        ).fetchone()
+        return 0 if row is None else row[0]
+
+    def sync(self):
+        """
+        Descarta os autômatos alterados por outros processos desde a última
+        consulta. PRAGMA data_version só muda quando outra conexão grava no banco,
+        então a verificação custa uma consulta trivial quando nada mudou.
+        """
+        connection = self._connection()
+        version = connection.execute("PRAGMA data_version").fetchone()[0]
+        if version == getattr(self._local, "data_version", None):
+            return
+        self._local.data_version = version
+        with self._sync_lock:
+            rows = connection.execute(
+                "SELECT seq, id FROM automata_edits WHERE kind = ? AND seq > ? ORDER BY seq",
+                (self.kind, self._seen_seq)).fetchall()
+            changed = []
+            for seq, key in rows:
+                self._seen_seq = max(self._seen_seq, seq)
+                if seq in self._own_seqs:
+                    self._own_seqs.discard(seq)
+                else:
+                    changed.append(key)
+        for key in dict.fromkeys(changed):
+            self._notify_edit(key)
+
+    def _encode(self, data: dict):
+        if self.record_format == "binary":
+            return serialization.encode(self.kind, data)
+        return json.dumps(data)
+
+    def _decode(self, value) -> dict:
+        """Linhas gravadas em BLOB estão no formato binário; as de texto, em JSON."""
+        if isinstance(value, bytes):
+            return serialization.decode(value, self.kind)
+        return json.loads(value)
+
+    def stats(self) -> dict:
+        return {
+            "backend": "sqlite",
+            "stored": len(self),
+            "edited": self._connection().execute(
+                "SELECT COUNT(*) FROM automata WHERE kind = ? AND revision > 0", (self.kind,)
+            ).fetchone()[0],
+            "hydrated": len(self._cache),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+# Função para criar o armazenamento de um tipo de autômato conforme AUTOMATA_STORAGE
+def open_store(kind: str, path: str, to_dict, from_dict, apply_edit=None) -> AutomataStore:
+    """
+    `path` é o arquivo do backend "journal" (ex.: "afd_store.json"); com o backend
+    "sqlite" todos os tipos ficam em SQLITE_PATH, e os arquivos existentes em `path`
+    são importados na primeira carga. AUTOMATA_FORMAT escolhe o formato dos registros.
+    `apply_edit(automato, alteração)` reaplica os deltas gravados por persist_edit.
+    """
+    if RECORD_FORMAT not in RECORD_FORMATS:
+        raise ValueError(f"AUTOMATA_FORMAT inválido: '{RECORD_FORMAT}' (use 'json' ou 'binary')")
+    if STORAGE_BACKEND == "sqlite":
+        return SQLiteStore(kind, to_dict, from_dict, import_path=path, record_format=RECORD_FORMAT,
+                           apply_edit=apply_edit)
+    if STORAGE_BACKEND != "journal":
+        raise ValueError(f"AUTOMATA_STORAGE inválido: '{STORAGE_BACKEND}' (use 'journal' ou 'sqlite')")
+    return JournaledStore(path, to_dict, from_dict, kind=kind, record_format=RECORD_FORMAT, apply_edit=apply_edit)
+
+
+# Função para extrair id, revisão e tipo (completo ou delta) de uma linha do snapshot/journal sem decodificá-la
+def _record_header(line: bytes):
+    if line.startswith(_RECORD_PREFIX):
+        end = line.find(b'"', len(_RECORD_PREFIX))
+        key = line[len(_RECORD_PREFIX):end]
+        if end > 0 and b"\\" not in key:
+            if line.startswith(_DATA_FIELD, end + 1):
+                return key.decode(), 0, False
+            if line.startswith(_REVISION_FIELD, end + 1):
+                start = end + 1 + len(_REVISION_FIELD)
+                stop = line.find(b",", start)
+                revision = line[start:stop]
+                if stop > 0 and revision.isdigit():
+                    if line.startswith(_EDIT_FIELD, stop):
+                        return key.decode(), int(revision), True
+                    if line.startswith(_DATA_FIELD, stop):
+                        return key.decode(), int(revision), False
+    try:
+        record = json.loads(line)
+        return record["id"], record.get("revision", 0), "edit" in record
+    except (ValueError, KeyError, TypeError, AttributeError):
+        return None, 0, False  # linha corrompida: ignorada
@@ -0,0 +1,22 @@
+from fastapi import HTTPException, Request
+import codecs
+
+
+# Função para ler o corpo de uma requisição como texto, trecho a trecho
+async def iter_input_chunks(request: Request, ignore_newlines: bool = False):
+    """
+    Lê o corpo da requisição conforme ele chega, sem guardá-lo inteiro na memória,
+    e produz pares (bytes lidos, texto decodificado). A decodificação UTF-8 é
+    incremental, então um caractere dividido entre dois trechos é tratado corretamente.
+    Com `ignore_newlines`, as quebras de linha (\\r e \\n) são descartadas.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    try:
+        async for data in request.stream():
+            text = decoder.decode(data)
+            if ignore_newlines:
+                text = text.replace("\r", "").replace("\n", "")
+            yield len(data), text
+        decoder.decode(b"", final=True)
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail="Corpo da requisição não é um texto UTF-8 válido")
@@ -0,0 +1,98 @@
+from collections import OrderedDict
+from fastapi import HTTPException
+import os
+import threading
+import uuid
+
+# Limites do armazenamento de traces em memória (o menos usado recentemente é descartado)
+TRACE_STORE_MAX_ENTRIES = int(os.environ.get("TRACE_STORE_MAX_ENTRIES", "1000"))
+TRACE_STORE_MAX_BYTES = int(os.environ.get("TRACE_STORE_MAX_BYTES", str(256 * 1024 * 1024)))
+
+# Passos retornados por página (padrão e máximo)
+TRACE_PAGE_SIZE = 1000
+TRACE_PAGE_MAX = 10000
+
+
+# Traces gerados pelos testes com "trace": true
+class TraceStore:
+    """
+    Guarda os traces (app/engines/trace.py) na forma codificada, por id, limitados
+    em quantidade e em bytes. Cada trace pertence a um (tipo, id do autômato).
+    """
+
+    def __init__(self, max_entries: int = TRACE_STORE_MAX_ENTRIES, max_bytes: int = TRACE_STORE_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.created = 0
+        self.evicted = 0
+
+    def put(self, kind: str, automata_id: str, trace) -> str:
+        trace_id = str(uuid.uuid4())
+        with self._lock:
+            self._entries[trace_id] = (kind, automata_id, trace)
+            self._bytes += len(trace.data)
+            self.created += 1
+            while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+                _, (_, _, old) = self._entries.popitem(last=False)
+                self._bytes -= len(old.data)
+                self.evicted += 1
+        return trace_id
+
+    def get(self, kind: str, automata_id: str, trace_id: str):
+        with self._lock:
+            entry = self._entries.get(trace_id)
+            if entry is None or entry[0] != kind or entry[1] != automata_id:
+                return None
+            self._entries.move_to_end(trace_id)
+            return entry[2]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "created": self.created,
+                "evicted": self.evicted,
+            }
+
+
+# Armazenamento compartilhado pelos routers
+trace_store = TraceStore()
+
+
+# Função para guardar o trace de um teste e montar o trecho "trace" da resposta
+def store_trace(kind: str, automata_id: str, trace) -> dict:
+    trace_id = trace_store.put(kind, automata_id, trace)
+    return {
+        "id": trace_id,
+        "steps": trace.steps,
+        "encoded_bytes": len(trace.data),
+        "truncated": trace.truncated,
+        "url": f"/{kind}/{automata_id}/traces/{trace_id}",
+    }
+
+
+# Função para decodificar uma página de um trace armazenado
+def read_trace(kind: str, automata_id: str, trace_id: str, start: int, end: int = None) -> dict:
+    """Passos start..end-1 (no máximo TRACE_PAGE_MAX); o passo 1 é a primeira transição."""
+    trace = trace_store.get(kind, automata_id, trace_id)
+    if trace is None:
+        raise HTTPException(status_code=404, detail="Trace não encontrado")
+    if start < 1:
+        raise HTTPException(status_code=400, detail="'from' deve ser maior ou igual a 1")
+    if end is not None and end < start:
+        raise HTTPException(status_code=400, detail="'to' deve ser maior ou igual a 'from'")
+    if end is None:
+        end = start + TRACE_PAGE_SIZE
+    end = min(end, start + TRACE_PAGE_MAX, trace.steps + 1)
+    return {
+        "id": trace_id,
+        **trace.summary(),
+        "from": start,
+        "to": max(end, start),
+        "next": end if end <= trace.steps else None,
+        "path": trace.page(start, end),
+    }
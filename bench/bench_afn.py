@@ -0,0 +1,68 @@
+"""
+Benchmark da execução de AFNs com determinização sob demanda (LazyDFA) contra
+NFA.accepts_input da biblioteca automata, num AFN cujo AFD completo teria 2^(n+1)
+estados: (a|b)*a(a|b){n}. Mede a vazão em símbolos por segundo em várias
+passadas sobre as mesmas entradas (a primeira descobre os estados, as seguintes
+usam o cache) e o tamanho do cache com limites diferentes.
+
+Com n pequeno todo o AFD cabe no cache; com n grande entradas aleatórias quase
+sempre alcançam subconjuntos novos (pior caso para o cache).
+
+Uso: python bench/bench_afn.py [--n 6 20] [--inputs 200] [--length 1000] [--cache 100 10000]
+"""
+import argparse
+import json
+import random
+import time
+
+import common  # noqa: F401  (ajusta o sys.path)
+from automata.fa.nfa import NFA
+from app.engines.nfa import CompiledNFA, LazyDFA
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--n", type=int, nargs="+", default=[6, 20])
+    parser.add_argument("--inputs", type=int, default=200)
+    parser.add_argument("--length", type=int, default=1000)
+    parser.add_argument("--passes", type=int, default=3)
+    parser.add_argument("--cache", type=int, nargs="+", default=[100, 10000])
+    parser.add_argument("--library-inputs", type=int, default=10)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    inputs = ["".join(rng.choice("ab") for _ in range(args.length)) for _ in range(args.inputs)]
+    symbols = args.inputs * args.length
+
+    for n in args.n:
+        pattern = f"(a|b)*a(a|b){{{n}}}"
+        run_pattern(pattern, inputs, symbols, args)
+
+
+def run_pattern(pattern, inputs, symbols, args):
+    nfa = NFA.from_regex(pattern, input_symbols={"a", "b"})
+    sample = inputs[:args.library_inputs]
+    start = time.perf_counter()
+    expected = [nfa.accepts_input(s) for s in sample]
+    elapsed = time.perf_counter() - start
+    print(json.dumps({"engine": "library", "pattern": pattern, "nfa_states": len(nfa.states),
+                      "symbols_per_s": round(len(sample) * args.length / elapsed)}))
+
+    compiled = CompiledNFA.from_automaton(nfa)
+    for max_states in args.cache:
+        lazy = LazyDFA(compiled, max_states=max_states)
+        assert [lazy.accepts(s) for s in sample] == expected
+        for number in range(1, args.passes + 1):
+            start = time.perf_counter()
+            lazy.accepts_batch(inputs)
+            elapsed = time.perf_counter() - start
+            stats = lazy.stats()
+            print(json.dumps({
+                "engine": "lazy_dfa", "pattern": pattern, "cache_limit": max_states, "pass": number,
+                "symbols_per_s": round(symbols / elapsed), "cached_states": stats["cached_states"],
+                "hit_rate": stats["hit_rate"], "flushes": stats["flushes"],
+            }))
+
+
+if __name__ == "__main__":
+    main()
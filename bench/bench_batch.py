@@ -0,0 +1,58 @@
+"""
+Benchmark do teste em lote: N chamadas a /afd/{id}/test contra uma chamada a
+/afd/{id}/test-batch com as mesmas strings.
+
+Uso: python bench/bench_batch.py [--strings 10000] [--length 32]
+"""
+import argparse
+import json
+import random
+import time
+
+from common import make_client
+
+# AFD que aceita números binários divisíveis por 3
+DIV3 = {
+    "states": ["r0", "r1", "r2"],
+    "input_symbols": ["0", "1"],
+    "transitions": {
+        "r0": {"0": "r0", "1": "r1"},
+        "r1": {"0": "r2", "1": "r0"},
+        "r2": {"0": "r1", "1": "r2"},
+    },
+    "initial_state": "r0",
+    "final_states": ["r0"],
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--strings", type=int, default=10000)
+    parser.add_argument("--length", type=int, default=32)
+    args = parser.parse_args()
+
+    client = make_client()
+    automata_id = client.post("/afd/create", json=DIV3).json()["id"]
+    rng = random.Random(42)
+    input_strings = ["".join(rng.choice("01") for _ in range(args.length)) for _ in range(args.strings)]
+
+    start = time.perf_counter()
+    looped = [client.post(f"/afd/{automata_id}/test", json={"input_string": s}).json()["accepted"]
+              for s in input_strings]
+    loop_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    response = client.post(f"/afd/{automata_id}/test-batch", json={"input_strings": input_strings}).json()
+    batch_time = time.perf_counter() - start
+
+    assert looped == [r["accepted"] for r in response["results"]]
+    print(json.dumps({
+        "strings": args.strings,
+        "loop_strings_per_s": round(args.strings / loop_time),
+        "batch_strings_per_s": round(args.strings / batch_time),
+        "speedup": round(loop_time / batch_time, 1),
+    }))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+"""
+Benchmark das alterações incrementais (PATCH /{tipo}/{id}) em autômatos grandes
+(~50 mil transições, com os geradores de bench_suite), comparadas com reenviar a
+definição inteira alterada a /create (o único caminho antes do PATCH):
+  - latência (p50/p95) de cada tipo de alteração: trocar uma transição, alternar
+    um estado final, adicionar e remover um estado;
+  - bytes gravados no journal por alteração e por recriação;
+  - para o AFD, o primeiro teste após a alteração (tabela corrigida ou recompilada);
+  - ao final, verifica que o autômato alterado é igual ao esperado, pela API e
+    recarregado do disco (reaplicando os deltas gravados).
+
+Uso: python bench/bench_edit.py [--kinds afd pilha turing] [--transitions 50000] [--edits 50]
+"""
+import argparse
+import copy
+import json
+import os
+import random
+import sys
+import time
+
+import common
+from bench_suite import KINDS
+
+# Transições por estado de cada gerador (AFD: 2 símbolos; PDA: 2 símbolos x 2 topos; MT: 3 símbolos)
+TRANSITIONS_PER_STATE = {"afd": 2, "pilha": 4, "turing": 3}
+
+
+# Funções que sorteiam uma alteração e a aplicam também à definição local (o resultado esperado)
+def change_transition(kind: str, rng, definition: dict) -> dict:
+    state = rng.choice(list(definition["transitions"]))
+    target = rng.choice(definition["states"])
+    paths = definition["transitions"][state]
+    if kind == "afd":
+        symbol = rng.choice(definition["input_symbols"])
+        paths[symbol] = target
+        return {"add_transitions": {state: {symbol: target}}}
+    key = rng.choice(sorted(paths))
+    old = paths[key][0]
+    new = [target, old[1]] if kind == "pilha" else [target, old[1], old[2]]
+    if new == old:
+        return change_transition(kind, rng, definition)
+    paths[key] = [new]
+    return {"remove_transitions": {state: {key: [old]}}, "add_transitions": {state: {key: [new]}}}
+
+
+def toggle_final(kind: str, rng, definition: dict) -> dict:
+    finals = definition["final_states"]
+    if kind == "turing":
+        # Estados finais de uma MT não têm transições: alterna o estado de aceitação sem transições
+        state = "acc"
+    else:
+        state = rng.choice([state for state in definition["states"] if state != definition["initial_state"]])
+    if state in finals:
+        finals.remove(state)
+        return {"remove_final_states": [state]}
+    finals.append(state)
+    return {"add_final_states": [state]}
+
+
+def add_state(kind: str, rng, definition: dict) -> dict:
+    state = f"new{len(definition['states'])}"
+    target = rng.choice(definition["states"])
+    if kind == "afd":
+        paths = {symbol: target for symbol in definition["input_symbols"]}
+    elif kind == "pilha":
+        paths = {"a,Z": [[target, "Z"]]}
+    else:
+        paths = {"0": [[target, "0", "R"]]}
+    definition["states"].append(state)
+    definition["transitions"][state] = paths
+    return {"add_states": [state], "add_transitions": {state: paths}}
+
+
+def remove_state(kind: str, rng, definition: dict) -> dict:
+    # Remove o último estado adicionado por add_state (nenhuma transição chega nele)
+    state = definition["states"].pop()
+    del definition["transitions"][state]
+    return {"remove_states": [state]}
+
+
+EDITS = {
+    "transition": change_transition,
+    "final_state": toggle_final,
+    "add_state": add_state,
+    "remove_state": remove_state,
+}
+
+
+def normalized(kind: str, definition: dict) -> dict:
+    """Definição comparável com a retornada por GET (listas como conjuntos ordenados)."""
+    result = {}
+    for field, value in definition.items():
+        if field == "transitions":
+            if kind == "pilha":
+                value = {state: {key: sorted(map(list, targets)) for key, targets in paths.items()}
+                         for state, paths in value.items()}
+            elif kind == "turing":
+                value = {state: {symbol: sorted(map(list, moves)) for symbol, moves in paths.items()}
+                         for state, paths in value.items()}
+        elif isinstance(value, list):
+            value = sorted(value)
+        result[field] = value
+    return result
+
+
+def journal_bytes(store) -> int:
+    """Tamanho do snapshot + journal (0 com o backend SQLite)."""
+    paths = (getattr(store, "path", None), getattr(store, "journal_path", None))
+    return sum(os.path.getsize(path) for path in paths if path and os.path.exists(path))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--kinds", nargs="+", default=list(KINDS), choices=list(KINDS))
+    parser.add_argument("--transitions", type=int, default=50000, help="transições de cada autômato")
+    parser.add_argument("--edits", type=int, default=50, help="alterações medidas de cada tipo")
+    parser.add_argument("--recreate", type=int, default=3, help="recriações medidas para comparação")
+    args = parser.parse_args()
+
+    os.environ.setdefault("ACCEPTANCE_WORKERS", "0")
+    client = common.make_client()
+    from app.storage import JournaledStore
+    from app.routers import AFD, pilha, turing
+    from app.routers.pilha import pda_model_dict
+    routers = {
+        "afd": (AFD.afd_store, AFD.AFD_FILE, AFD.afd_to_dict, AFD.afd_from_dict, AFD.afd_apply_edit),
+        "pilha": (pilha.pda_store, pilha.PDA_FILE, pilha.npda_to_dict, pilha.npda_from_dict, pilha.pda_apply_edit),
+        "turing": (turing.tm_store, turing.NTM_FILE, turing.tm_to_dict, turing.tm_from_dict, turing.tm_apply_edit),
+    }
+
+    failures = 0
+    for kind in args.kinds:
+        store, path, to_dict, from_dict, apply_edit = routers[kind]
+        rng = random.Random(f"edit-{kind}")
+        size = args.transitions // TRANSITIONS_PER_STATE[kind]
+        definition = KINDS[kind][0](rng, size)
+        automata_id = client.post(f"/{kind}/create", json=definition).json()["id"]
+
+        # Referência: recriar o autômato inteiro com uma alteração (novo id a cada vez)
+        recreate = []
+        for _ in range(args.recreate):
+            edited = copy.deepcopy(definition)
+            change_transition(kind, rng, edited)
+            before = journal_bytes(store)
+            start = time.perf_counter()
+            response = client.post(f"/{kind}/create", json=edited)
+            recreate.append(time.perf_counter() - start)
+            if response.status_code != 200:
+                failures += 1
+        recreate_bytes = (journal_bytes(store) - before)
+
+        print(json.dumps({
+            "kind": kind, "transitions": args.transitions, "op": "recreate",
+            "p50_ms": round(common.percentile(recreate, 0.5) * 1000, 3),
+            "bytes_per_op": recreate_bytes,
+        }), flush=True)
+
+        for name, make_edit in EDITS.items():
+            latencies, first_test = [], []
+            before = journal_bytes(store)
+            for _ in range(args.edits):
+                edit = make_edit(kind, rng, definition)
+                start = time.perf_counter()
+                response = client.patch(f"/{kind}/{automata_id}", json=edit)
+                latencies.append(time.perf_counter() - start)
+                if response.status_code != 200:
+                    failures += 1
+                    print(json.dumps({"kind": kind, "op": name, "error": response.json()}), flush=True)
+                    continue
+                if kind == "afd":
+                    start = time.perf_counter()
+                    client.post(f"/afd/{automata_id}/test", json={"input_string": "01" * 50})
+                    first_test.append(time.perf_counter() - start)
+            result = {
+                "kind": kind, "transitions": args.transitions, "op": name, "edits": len(latencies),
+                "p50_ms": round(common.percentile(latencies, 0.5) * 1000, 3),
+                "p95_ms": round(common.percentile(latencies, 0.95) * 1000, 3),
+                "bytes_per_op": (journal_bytes(store) - before) // max(1, len(latencies)),
+                "speedup_vs_recreate": round(common.percentile(recreate, 0.5) / common.percentile(latencies, 0.5), 1),
+            }
+            if first_test:
+                result["first_test_p50_ms"] = round(common.percentile(first_test, 0.5) * 1000, 3)
+            print(json.dumps(result), flush=True)
+
+        # O autômato alterado é o esperado, pela API e reaplicando os deltas gravados
+        served = [store[automata_id]]
+        if isinstance(store, JournaledStore):
+            reloaded = JournaledStore(path, to_dict, from_dict, kind=kind, record_format=store.record_format,
+                                      apply_edit=apply_edit)
+            reloaded.load()
+            served.append(reloaded[automata_id])
+        expected = normalized(kind, definition)
+        for automaton in served:
+            check = json.loads(json.dumps(to_dict(automaton)))
+            if kind == "pilha":
+                check = pda_model_dict(check)
+            if normalized(kind, check) != expected:
+                failures += 1
+                print(json.dumps({"kind": kind, "error": "automato alterado diferente do esperado"}), flush=True)
+
+    if failures:
+        print(f"{failures} alterações com erro", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
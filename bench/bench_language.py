@@ -0,0 +1,73 @@
+"""
+Benchmark de GET /afd/{id}/language e /language/words: conta e lista as palavras
+aceitas até um tamanho, comparando com o que se fazia antes (testar cada string
+possível em POST /afd/{id}/test), e mede a contagem de um PDA (a^n b^n).
+
+Uso: python bench/bench_language.py [--max-length 12] [--words-length 20]
+"""
+import argparse
+import itertools
+import json
+import time
+
+import common
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--max-length", type=int, default=12, help="tamanho máximo na comparação com /test")
+    parser.add_argument("--words-length", type=int, default=20)
+    parser.add_argument("--pda-length", type=int, default=30)
+    args = parser.parse_args()
+
+    client = common.make_client()
+    # Número de 1s divisível por 3
+    dfa = {
+        "states": ["r0", "r1", "r2"], "input_symbols": ["0", "1"],
+        "transitions": {"r0": {"0": "r0", "1": "r1"}, "r1": {"0": "r1", "1": "r2"}, "r2": {"0": "r2", "1": "r0"}},
+        "initial_state": "r0", "final_states": ["r0"],
+    }
+    automata_id = client.post("/afd/create", json=dfa).json()["id"]
+
+    start = time.perf_counter()
+    counts = client.get(f"/afd/{automata_id}/language", params={"max_length": args.max_length}).json()["counts"]
+    language_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    brute = [0] * (args.max_length + 1)
+    for length in range(args.max_length + 1):
+        for word in itertools.product("01", repeat=length):
+            word = "".join(word)
+            if client.post(f"/afd/{automata_id}/test", json={"input_string": word}).json()["accepted"]:
+                brute[length] += 1
+    print(json.dumps({
+        "max_length": args.max_length, "counts_match": counts == brute, "language_seconds": round(language_seconds, 4),
+        "test_every_string_seconds": round(time.perf_counter() - start, 2), "requests_avoided": 2 ** (args.max_length + 1) - 1,
+    }))
+
+    for offset in (0, 100000):
+        start = time.perf_counter()
+        response = client.get(f"/afd/{automata_id}/language/words",
+                              params={"max_length": args.words_length, "offset": offset, "limit": 10000})
+        lines = response.text.count("\n")
+        print(json.dumps({
+            "words_max_length": args.words_length, "offset": offset, "words": lines,
+            "total": int(response.headers["x-total-count"]), "seconds": round(time.perf_counter() - start, 3),
+        }))
+
+    pda = {
+        "states": ["q0", "q1", "q2"], "input_symbols": ["a", "b"], "stack_symbols": ["Z", "A"],
+        "transitions": {"q0": {"a,Z": [["q0", "AZ"]], "a,A": [["q0", "AA"]], "b,A": [["q1", ""]]},
+                        "q1": {"b,A": [["q1", ""]], ",Z": [["q2", "Z"]]}},
+        "initial_state": "q0", "initial_stack_symbol": "Z", "final_states": ["q2"],
+    }
+    pda_id = client.post("/pilha/create", json=pda).json()["id"]
+    start = time.perf_counter()
+    response = client.get(f"/pilha/{pda_id}/language", params={"max_length": args.pda_length}).json()
+    print(json.dumps({
+        "pda_max_length": args.pda_length, "total": response["total"],
+        "configuration_sets": response["configuration_sets"], "seconds": round(time.perf_counter() - start, 3),
+    }))
+
+
+if __name__ == "__main__":
+    main()
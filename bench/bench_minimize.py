@@ -0,0 +1,78 @@
+"""
+Benchmark da minimização (Hopcroft, CompiledDFA.minimize) contra DFA.minify da
+biblioteca automata, e da verificação de equivalência (union-find,
+CompiledDFA.equivalent_to) contra o operador == da biblioteca.
+
+Os AFDs de teste têm muitos estados redundantes: cada estado de um AFD aleatório
+pequeno é copiado várias vezes e cada transição vai para uma cópia qualquer do
+destino, então o AFD mínimo tem no máximo --base estados.
+
+Uso: python bench/bench_minimize.py [--states 10000 50000] [--base 200]
+"""
+import argparse
+import json
+import random
+import time
+
+import common  # noqa: F401  (ajusta o sys.path)
+from automata.fa.dfa import DFA
+from app.engines.dfa import CompiledDFA
+
+
+def redundant_dfa(states: int, base: int, symbols: str, copy_seed: int = 0) -> DFA:
+    rng = random.Random(0)  # o AFD pequeno é sempre o mesmo; copy_seed muda só as cópias
+    copies = max(1, states // base)
+    small = {q: {s: rng.randrange(base) for s in symbols} for q in range(base)}
+    final = set(rng.sample(range(base), base // 2))
+    names = [[f"q{q}_{c}" for c in range(copies)] for q in range(base)]
+    rng = random.Random(copy_seed)
+    return DFA(
+        states={name for group in names for name in group},
+        input_symbols=set(symbols),
+        transitions={
+            names[q][c]: {s: rng.choice(names[small[q][s]]) for s in symbols}
+            for q in range(base) for c in range(copies)
+        },
+        initial_state=names[0][0],
+        final_states={name for q in final for name in names[q]},
+    )
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--states", type=int, nargs="+", default=[10000, 50000])
+    parser.add_argument("--base", type=int, default=200)
+    parser.add_argument("--symbols", default="abcd")
+    args = parser.parse_args()
+
+    for states in args.states:
+        dfa = redundant_dfa(states, args.base, args.symbols)
+        compiled = CompiledDFA.from_automaton(dfa)
+        minimized, engine_time = timed(compiled.minimize)
+        library, library_time = timed(dfa.minify)
+        print(json.dumps({
+            "operation": "minimize", "states": len(dfa.states),
+            "minimized_states": len(minimized["states"]), "library_states": len(library.states),
+            "engine_s": round(engine_time, 3), "library_s": round(library_time, 3),
+            "speedup": round(library_time / engine_time, 1),
+        }))
+
+        other = redundant_dfa(states, args.base, args.symbols, copy_seed=1)  # mesma linguagem
+        (equivalent, _), engine_time = timed(compiled.equivalent_to, CompiledDFA.from_automaton(other))
+        library_equal, library_time = timed(dfa.__eq__, other)
+        print(json.dumps({
+            "operation": "equivalent", "states": len(dfa.states),
+            "equivalent": equivalent, "library_equivalent": library_equal,
+            "engine_s": round(engine_time, 3), "library_s": round(library_time, 3),
+            "speedup": round(library_time / engine_time, 1),
+        }))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Teste de carga com tráfego misto contra um servidor uvicorn real: alguns clientes
+enviam testes pesados de PDA (palíndromos longos, não determinístico) enquanto um
+cliente faz requisições leves (GET /afd/{id} e POST /afd/{id}/test com entrada
+curta). Mede p50/p99 da latência de cada tipo e a vazão dos testes pesados.
+
+O servidor é iniciado num processo separado para cada valor de --workers
+(ACCEPTANCE_WORKERS): 0 executa as simulações no threadpool do próprio servidor,
+como antes; N > 0 usa o pool de processos.
+
+Uso: python bench/bench_mixed_load.py [--workers 0 1 2] [--heavy-clients 4] [--seconds 10]
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import time
+
+import common
+import httpx
+
+DFA = {
+    "states": ["q0", "q1"], "input_symbols": ["0", "1"],
+    "transitions": {"q0": {"0": "q0", "1": "q1"}, "q1": {"0": "q0", "1": "q1"}},
+    "initial_state": "q0", "final_states": ["q1"],
+}
+
+# Palíndromos de tamanho par sobre {a,b}: o meio é adivinhado por uma transição ε
+PALINDROME = {
+    "states": ["q0", "q1", "acc"], "input_symbols": ["a", "b"], "stack_symbols": ["A", "B", "Z"],
+    "transitions": {
+        "q0": {
+            **{f"{c},{X}": [["q0", c.upper() + X]] for c in "ab" for X in "ABZ"},
+            **{f",{X}": [["q1", X]] for X in "ABZ"},
+        },
+        "q1": {"a,A": [["q1", ""]], "b,B": [["q1", ""]], ",Z": [["acc", "Z"]]},
+    },
+    "initial_state": "q0", "initial_stack_symbol": "Z", "final_states": ["acc"],
+}
+
+
+async def heavy_client(http, pda_id, word, deadline, latencies):
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        response = await http.post(f"/pilha/{pda_id}/test", json={"input_string": word})
+        response.raise_for_status()
+        latencies.append(time.perf_counter() - start)
+
+
+async def light_client(http, afd_id, deadline, latencies):
+    rng = random.Random(0)
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        if rng.random() < 0.5:
+            response = await http.get(f"/afd/{afd_id}")
+        else:
+            response = await http.post(f"/afd/{afd_id}/test", json={"input_string": "0110"})
+        response.raise_for_status()
+        latencies.append(time.perf_counter() - start)
+        await asyncio.sleep(0.01)
+
+
+def summary(latencies):
+    if not latencies:
+        return {"requests": 0}
+    return {
+        "requests": len(latencies),
+        "p50_ms": round(common.percentile(latencies, 0.50) * 1000, 1),
+        "p99_ms": round(common.percentile(latencies, 0.99) * 1000, 1),
+    }
+
+
+async def load(base, heavy_clients, seconds, length):
+    async with httpx.AsyncClient(base_url=base, timeout=None) as http:
+        afd_id = (await http.post("/afd/create", json=DFA)).json()["id"]
+        pda_id = (await http.post("/pilha/create", json=PALINDROME)).json()["id"]
+        rng = random.Random(1)
+        half = "".join(rng.choice("ab") for _ in range(length // 2))
+        word = half + half[::-1]
+        await http.post(f"/pilha/{pda_id}/test", json={"input_string": word})  # aquecimento
+
+        heavy, light = [], []
+        deadline = time.perf_counter() + seconds
+        await asyncio.gather(
+            light_client(http, afd_id, deadline, light),
+            *(heavy_client(http, pda_id, word, deadline, heavy) for _ in range(heavy_clients)),
+        )
+        return heavy, light
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--workers", type=int, nargs="+", default=[0, os.cpu_count() or 1, 2])
+    parser.add_argument("--heavy-clients", type=int, default=4)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--length", type=int, default=20000)
+    args = parser.parse_args()
+
+    for workers in args.workers:
+        process, base = common.start_server({"ACCEPTANCE_WORKERS": str(workers)})
+        try:
+            heavy, light = asyncio.run(load(base, args.heavy_clients, args.seconds, args.length))
+        finally:
+            process.terminate()
+            process.wait()
+        print(json.dumps({
+            "acceptance_workers": workers, "cpus": os.cpu_count(),
+            "heavy_per_s": round(len(heavy) / args.seconds, 2),
+            "heavy": summary(heavy), "light": summary(light),
+        }))
+
+
+if __name__ == "__main__":
+    main()
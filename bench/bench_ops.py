@@ -0,0 +1,129 @@
+"""
+Benchmark das operações entre AFDs (CompiledDFA.product / complement, usadas por
+POST /afd/ops): o produto apenas com os pares alcançáveis a partir do par inicial,
+comparado com o produto cartesiano completo, com todos os (n+1)·(m+1) pares
+(incluindo os poços), montado aqui só para comparação. Para cada caso informa o
+número de estados e o tempo de cada construção, o tamanho após minimizar e
+verifica em strings aleatórias que o produto aceita exatamente o esperado.
+
+Casos:
+  - random: dois AFDs aleatórios (gerador de bench_suite) com --states estados;
+    quase todos os pares são alcançáveis, é o pior caso do produto alcançável;
+  - counters: |w| mod n e |w| mod n com outros estados finais; só n pares são
+    alcançáveis dos (n+1)²;
+  - disjoint: AFDs sobre alfabetos diferentes ({0,1} e {a,b}); uma palavra com
+    símbolos dos dois leva ao poço de um deles.
+
+Uso: python bench/bench_ops.py [--states 300 1000] [--strings 2000]
+"""
+import argparse
+import json
+import random
+import sys
+import time
+
+import common  # noqa: F401  (ajusta o sys.path)
+from bench_suite import random_dfa
+from app.engines.dfa import CompiledDFA, PRODUCT_OPERATIONS
+
+
+def counter_dfa(size: int, finals, symbols="01") -> dict:
+    """AFD que conta o tamanho da palavra módulo `size`."""
+    states = [f"c{i}" for i in range(size)]
+    return {
+        "states": states,
+        "input_symbols": list(symbols),
+        "transitions": {state: {symbol: states[(i + 1) % size] for symbol in symbols}
+                        for i, state in enumerate(states)},
+        "initial_state": "c0",
+        "final_states": [states[i] for i in finals],
+    }
+
+
+def renamed(definition: dict, symbols: str) -> dict:
+    """A mesma definição com os símbolos "0" e "1" trocados por `symbols`."""
+    rename = dict(zip("01", symbols))
+    return {**definition, "input_symbols": [rename[s] for s in definition["input_symbols"]],
+            "transitions": {state: {rename[s]: target for s, target in paths.items()}
+                            for state, paths in definition["transitions"].items()}}
+
+
+def full_product(left: CompiledDFA, right: CompiledDFA, operation: str) -> dict:
+    """Produto cartesiano completo: todos os pares, alcançáveis ou não."""
+    symbols = sorted(set(left.symbols) | set(right.symbols), key=str)
+    (left_columns, left_initial, left_accepting) = left._columns(symbols)
+    (right_columns, right_initial, right_accepting) = right._columns(symbols)
+    accept = PRODUCT_OPERATIONS[operation]
+    width = len(right_accepting)
+    names = [f"p{p}_{q}" for p in range(len(left_accepting)) for q in range(width)]
+    return {
+        "states": names,
+        "input_symbols": symbols,
+        "transitions": {
+            names[p * width + q]: {symbol: names[left_column[p] * width + right_column[q]]
+                                   for symbol, left_column, right_column in zip(symbols, left_columns, right_columns)}
+            for p in range(len(left_accepting)) for q in range(width)
+        },
+        "initial_state": names[left_initial * width + right_initial],
+        "final_states": [names[p * width + q] for p in range(len(left_accepting)) for q in range(width)
+                         if accept(left_accepting[p] == 1, right_accepting[q] == 1)],
+    }
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--states", type=int, nargs="+", default=[300, 1000])
+    parser.add_argument("--strings", type=int, default=2000, help="strings aleatórias verificadas por operação")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    failures = 0
+    for states in args.states:
+        cases = {
+            "random": (random_dfa(rng, states), random_dfa(rng, states)),
+            "counters": (counter_dfa(states, [0]), counter_dfa(states, range(0, states, 2))),
+            "disjoint": (random_dfa(rng, states), renamed(random_dfa(rng, states), "ab")),
+        }
+        for case, (left, right) in cases.items():
+            left, right = CompiledDFA.from_dict(left), CompiledDFA.from_dict(right)
+            alphabet = sorted(set(left.symbols) | set(right.symbols))
+            words = ["".join(rng.choice(alphabet) for _ in range(rng.randrange(30))) for _ in range(args.strings)]
+            for operation, accept in PRODUCT_OPERATIONS.items():
+                reachable, reachable_time = timed(left.product, right, operation)
+                full, full_time = timed(full_product, left, right, operation)
+                compiled = CompiledDFA.from_dict(reachable)
+                minimized = compiled.minimize()
+                wrong = sum(compiled.accepts(w) != accept(left.accepts(w), right.accepts(w)) for w in words)
+                equivalent, _ = compiled.equivalent_to(CompiledDFA.from_dict(full))
+                failures += wrong + (not equivalent)
+                print(json.dumps({
+                    "case": case, "states": states, "operation": operation,
+                    "reachable_states": len(reachable["states"]), "full_states": len(full["states"]),
+                    "minimized_states": len(minimized["states"]),
+                    "reachable_ms": round(reachable_time * 1000, 2), "full_ms": round(full_time * 1000, 2),
+                    "speedup": round(full_time / reachable_time, 1),
+                    "equivalent_to_full": equivalent, "wrong": wrong,
+                }), flush=True)
+
+        complement, complement_time = timed(left.complement)
+        compiled = CompiledDFA.from_dict(complement)
+        wrong = sum(compiled.accepts(w) == left.accepts(w) for w in words if set(w) <= set(left.symbols))
+        failures += wrong
+        print(json.dumps({
+            "case": "complement", "states": states, "complement_states": len(complement["states"]),
+            "ms": round(complement_time * 1000, 2), "wrong": wrong,
+        }), flush=True)
+
+    if failures:
+        print(f"{failures} verificações com erro", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+"""
+Benchmark do simulador de Autômatos com Pilha (PDAEngine) contra NPDA.accepts_input
+da biblioteca automata, com APs clássicos:
+  - balanced: parênteses balanceados (determinístico, pilha até n/2);
+  - palindrome: palíndromos de tamanho par sobre {a,b}, adivinhando o meio com
+    uma transição ε em cada posição (não determinístico);
+  - epsilon_push: a^n com ciclo-ε que empilha (formato gerado por convert_transitions);
+    numa entrada rejeitada a biblioteca nunca para, então ela só roda nas aceitas;
+  - anbn_epsilon_loop: a^n b^n com um ciclo-ε q0 --ε,Z/ZZ--> q0 que empilha sem
+    nunca ser necessário; verifica que o ciclo é cortado (aceita a^n b^n sem chegar
+    aos limites e nunca aceita uma entrada fora da linguagem).
+
+A biblioteca copia a pilha a cada passo (custo quadrático), então só é medida
+até --library-max-length símbolos.
+
+Uso: python bench/bench_pda.py [--sizes 1000 10000 100000]
+"""
+import argparse
+import json
+import random
+import sys
+import time
+
+import common  # noqa: F401  (ajusta o sys.path)
+from automata.pda.npda import NPDA
+from app.engines.pda import PDAEngine
+
+
+def pda(states, input_symbols, stack_symbols, transitions, final_states):
+    return NPDA(states=set(states), input_symbols=set(input_symbols), stack_symbols=set(stack_symbols),
+                transitions=transitions, initial_state="q0", initial_stack_symbol="Z",
+                final_states=set(final_states), acceptance_mode="final_state")
+
+
+def balanced():
+    return pda(
+        ["q0", "acc"], "()", "PZ",
+        {
+            "q0": {"(": {"Z": {("q0", "PZ")}, "P": {("q0", "PP")}},
+                   ")": {"P": {("q0", "")}},
+                   "": {"Z": {("acc", "Z")}}},
+        },
+        ["acc"],
+    )
+
+
+def palindrome():
+    push = {c: {X: {("q0", c.upper() + X)} for X in "ABZ"} for c in "ab"}
+    push[""] = {X: {("q1", X)} for X in "ABZ"}
+    return pda(
+        ["q0", "q1", "acc"], "ab", "ABZ",
+        {
+            "q0": push,
+            "q1": {"a": {"A": {("q1", "")}}, "b": {"B": {("q1", "")}}, "": {"Z": {("acc", "Z")}}},
+        },
+        ["acc"],
+    )
+
+
+def epsilon_push():
+    return pda(
+        ["q0", "q1", "acc"], "a", "AZ",
+        {
+            "q0": {"": {"Z": {("q0", "AZ")}, "A": {("q0", "AA"), ("q1", "A")}}},
+            "q1": {"a": {"A": {("q1", "")}}, "": {"Z": {("acc", "Z")}}},
+        },
+        ["acc"],
+    )
+
+
+def anbn_epsilon_loop():
+    return pda(
+        ["q0", "q1", "acc"], "ab", "AZ",
+        {
+            "q0": {"a": {"Z": {("q0", "AZ")}, "A": {("q0", "AA")}},
+                   "b": {"A": {("q1", "")}},
+                   "": {"Z": {("q0", "ZZ")}}},
+            "q1": {"b": {"A": {("q1", "")}}, "": {"Z": {("acc", "Z")}}},
+        },
+        ["acc"],
+    )
+
+
+def balanced_input(n, rng):
+    depth, out = 0, []
+    for i in range(n):
+        if depth and (depth >= n - i or rng.random() < 0.5):
+            out.append(")")
+            depth -= 1
+        else:
+            out.append("(")
+            depth += 1
+    return "".join(out)
+
+
+def palindrome_input(n, rng):
+    half = "".join(rng.choice("ab") for _ in range(n // 2))
+    return half + half[::-1]
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--library-max-length", type=int, default=10000)
+    args = parser.parse_args()
+    rng = random.Random(0)
+
+    cases = [("balanced", balanced, balanced_input), ("palindrome", palindrome, palindrome_input)]
+    for name, build, make_input in cases:
+        machine = build()
+        engine = PDAEngine.from_automaton(machine)
+        for n in args.sizes:
+            accepted_input = make_input(n, rng)
+            for label, input_string in (("accepted", accepted_input), ("rejected", accepted_input + "a")):
+                run, engine_time = timed(lambda: engine.run(input_string, max_stack_depth=10 ** 7,
+                                                            max_configurations=10 ** 7, timeout=600))
+                row = {
+                    "machine": name, "input_length": len(input_string), "expected": label,
+                    "engine": {"result": run["result"], "seconds": round(engine_time, 4),
+                               "symbols_per_s": round(len(input_string) / engine_time),
+                               "peak_configurations": run["stats"]["peak_configurations"],
+                               "duplicates_pruned": run["stats"]["duplicates_pruned"]},
+                }
+                if len(input_string) <= args.library_max_length:
+                    result, library_time = timed(lambda: machine.accepts_input(input_string))
+                    row["library"] = {"accepted": result, "seconds": round(library_time, 4)}
+                print(json.dumps(row))
+
+    machine = epsilon_push()
+    engine = PDAEngine.from_automaton(machine)
+    for n in (10, 100, 1000):
+        for label, input_string in (("accepted", "a" * n), ("rejected", "a" * n + "b")):
+            run, engine_time = timed(lambda: engine.run(input_string, max_stack_depth=2 * n))
+            row = {"machine": "epsilon_push", "input_length": len(input_string), "expected": label,
+                   "engine": {"result": run["result"], "limit": run["limit"], "seconds": round(engine_time, 4),
+                              "epsilon_cycles": run["stats"]["epsilon_cycles"]}}
+            if label == "accepted" and n <= 100:
+                result, library_time = timed(lambda: machine.accepts_input(input_string))
+                row["library"] = {"accepted": result, "seconds": round(library_time, 4)}
+            print(json.dumps(row))
+
+    engine = PDAEngine.from_automaton(anbn_epsilon_loop())
+    failures = 0
+    for n in (1, 50, 1000):
+        for label, input_string in (("accepted", "a" * n + "b" * n), ("rejected", "a" * (n + 1) + "b" * n)):
+            run, engine_time = timed(lambda: engine.run(input_string))
+            if (run["result"] == "accepted") != (label == "accepted") or run["limit"] not in (None, "epsilon_cycle"):
+                failures += 1
+            print(json.dumps({"machine": "anbn_epsilon_loop", "input_length": len(input_string), "expected": label,
+                              "engine": {"result": run["result"], "limit": run["limit"],
+                                         "seconds": round(engine_time, 4),
+                                         "peak_configurations": run["stats"]["peak_configurations"],
+                                         "epsilon_cycles": run["stats"]["epsilon_cycles"]}}))
+    if failures:
+        print(f"{failures} resultados inesperados no ciclo-ε", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Benchmark da persistência: latência de criação conforme o armazenamento cresce.
+
+Compara o journal append-only (JournaledStore) com a reescrita completa do
+arquivo JSON usada anteriormente em save_*_store.
+
+Uso: python bench/bench_persistence.py [--sizes 1000 10000 100000] [--creates 200]
+"""
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import time
+
+from common import percentile
+from app.storage import JournaledStore
+
+
+def sample_automaton(i: int) -> dict:
+    """AFD sintético pequeno (o custo medido é o da persistência, não o da validação)."""
+    return {
+        "states": ["q0", "q1"],
+        "input_symbols": ["0", "1"],
+        "transitions": {"q0": {"0": "q0", "1": "q1"}, "q1": {"0": "q0", "1": f"q{i % 2}"}},
+        "initial_state": "q0",
+        "final_states": ["q1"],
+    }
+
+
+def bench_journal(directory: str, size: int, creates: int) -> list:
+    path = os.path.join(directory, f"journal_{size}.json")
+    with open(path, "w") as f:
+        json.dump({f"id-{i}": sample_automaton(i) for i in range(size)}, f)
+    store = JournaledStore(path, dict, dict)
+    store.load()
+    latencies = []
+    for i in range(creates):
+        key = f"new-{i}"
+        start = time.perf_counter()
+        store[key] = sample_automaton(i)
+        store.persist(key)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def bench_rewrite(directory: str, size: int, creates: int) -> list:
+    path = os.path.join(directory, f"rewrite_{size}.json")
+    store = {f"id-{i}": sample_automaton(i) for i in range(size)}
+    latencies = []
+    for i in range(creates):
+        start = time.perf_counter()
+        store[f"new-{i}"] = sample_automaton(i)
+        with open(path, "w") as f:
+            json.dump(store, f)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--creates", type=int, default=200)
+    parser.add_argument("--rewrite-creates", type=int, default=20,
+                        help="criações medidas no modo de reescrita completa (lento)")
+    args = parser.parse_args()
+
+    report = []
+    with tempfile.TemporaryDirectory() as directory:
+        for size in args.sizes:
+            for mode, fn, creates in (("journal", bench_journal, args.creates),
+                                      ("rewrite", bench_rewrite, args.rewrite_creates)):
+                latencies = fn(directory, size, creates)
+                report.append({
+                    "mode": mode,
+                    "store_size": size,
+                    "creates": creates,
+                    "p50_ms": round(statistics.median(latencies) * 1000, 3),
+                    "p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+                })
+                print(json.dumps(report[-1]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Benchmark da geração de AFDs a partir de expressões regulares (AFN de Thompson +
+construção de subconjuntos sob demanda, app/engines/nfa.py) contra
+NFA.from_regex + DFA.from_nfa da biblioteca automata.
+
+Usa a família (a|b)*a(a|b){n}, cujo AFD mínimo tem 2^(n+1) estados (explosão
+exponencial da construção de subconjuntos). Padrões acima de --max-states são
+interrompidos pelo limite; a biblioteca não é executada acima de --library-max-n.
+Por fim mede POST /afd/from-regex pela API (primeira chamada e chamada em cache).
+
+Uso: python bench/bench_regex.py [--n 4 8 12 14 16 20] [--max-states 100000]
+"""
+import argparse
+import json
+import time
+
+import common
+from automata.fa.dfa import DFA
+from automata.fa.nfa import NFA
+from app.engines.dfa import CompiledDFA
+from app.engines.nfa import CompiledNFA, StateExplosion
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def engine_build(pattern: str, max_states: int):
+    definition = CompiledNFA.from_regex(pattern, ["a", "b"]).determinize(max_states)
+    return CompiledDFA.from_dict(definition).minimize()
+
+
+def library_build(pattern: str):
+    return DFA.from_nfa(NFA.from_regex(pattern, input_symbols={"a", "b"})).minify()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--n", type=int, nargs="+", default=[4, 8, 12, 14, 16, 20])
+    parser.add_argument("--max-states", type=int, default=100000)
+    parser.add_argument("--library-max-n", type=int, default=14)
+    args = parser.parse_args()
+
+    for n in args.n:
+        pattern = f"(a|b)*a(a|b){{{n}}}"
+        row = {"pattern": pattern, "expected_states": 2 ** (n + 1)}
+        start = time.perf_counter()
+        try:
+            minimized = engine_build(pattern, args.max_states)
+            row["engine_states"] = len(minimized["states"])
+        except StateExplosion:
+            row.update({"engine_states": None, "engine_error": "limite de estados"})
+        row["engine_s"] = round(time.perf_counter() - start, 3)
+        if n <= args.library_max_n:
+            library, elapsed = timed(library_build, pattern)
+            row.update({"library_states": len(library.states), "library_s": round(elapsed, 3)})
+        print(json.dumps(row))
+
+    client = common.make_client()
+    pattern = "(a|b)*a(a|b){10}"
+    for call in ("first", "cached"):
+        response, elapsed = timed(client.post, "/afd/from-regex", json={"pattern": pattern})
+        print(json.dumps({"endpoint": "from-regex", "call": call, "pattern": pattern,
+                          "states": len(response.json()["automata"]["states"]),
+                          "ms": round(elapsed * 1000, 2)}))
+
+
+if __name__ == "__main__":
+    main()
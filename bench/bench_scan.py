@@ -0,0 +1,71 @@
+"""
+Benchmark de POST /afd/{id}/scan: busca as ocorrências de a+b+ num texto
+aleatório, lido em streaming e dividido em trechos em paralelo, comparando
+com testar cada substring candidata (o que o scan evita).
+
+Uso: python bench/bench_scan.py [--sizes-mb 1 10] [--workers 4]
+"""
+import argparse
+import json
+import os
+import random
+import time
+
+import common
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes-mb", type=int, nargs="+", default=[1, 10])
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--naive-kb", type=int, default=16, help="tamanho do texto para a busca ingênua")
+    args = parser.parse_args()
+
+    process, base = common.start_server({"ACCEPTANCE_WORKERS": str(args.workers), "SCAN_CHUNK_MIN": "65536"})
+    import httpx
+
+    dfa = {
+        "states": ["q0", "q1", "q2", "d"], "input_symbols": ["a", "b"],
+        "transitions": {"q0": {"a": "q1", "b": "d"}, "q1": {"a": "q1", "b": "q2"},
+                        "q2": {"a": "d", "b": "q2"}, "d": {"a": "d", "b": "d"}},
+        "initial_state": "q0", "final_states": ["q2"],
+    }
+    rng = random.Random(0)
+    try:
+        with httpx.Client(base_url=base, timeout=None) as http:
+            automata_id = http.post("/afd/create", json=dfa).json()["id"]
+
+            for size_mb in args.sizes_mb:
+                text = "".join(rng.choice("aab x") for _ in range(size_mb * 1024 * 1024)).encode()
+                for parallel in (False, True):
+                    start = time.perf_counter()
+                    response = http.post(f"/afd/{automata_id}/scan", params={"parallel": parallel, "limit": 0},
+                                         content=text).json()
+                    elapsed = time.perf_counter() - start
+                    print(json.dumps({
+                        "input_mb": size_mb, "parallel": parallel, "chunks": response.get("chunks"),
+                        "match_count": response["match_count"], "seconds": round(elapsed, 2),
+                        "mb_per_s": round(size_mb / elapsed, 2),
+                    }))
+
+            # Referência: testar em /test cada substring que começa em cada posição
+            text = "".join(rng.choice("aab x") for _ in range(args.naive_kb * 1024))
+            start = time.perf_counter()
+            response = http.post(f"/afd/{automata_id}/scan", params={"limit": 0}, content=text.encode()).json()
+            scan_seconds = time.perf_counter() - start
+            from app.engines.dfa import CompiledDFA
+            compiled = CompiledDFA.from_dict(dfa)
+            start = time.perf_counter()
+            naive = sum(1 for end in range(1, len(text) + 1)
+                        if any(compiled.accepts(text[begin:end]) for begin in range(end)))
+            print(json.dumps({
+                "input_kb": args.naive_kb, "match_count": response["match_count"], "naive_match_count": naive,
+                "scan_seconds": round(scan_seconds, 3), "naive_seconds": round(time.perf_counter() - start, 3),
+            }))
+    finally:
+        process.terminate()
+        process.wait()
+
+
+if __name__ == "__main__":
+    main()
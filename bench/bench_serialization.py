@@ -0,0 +1,120 @@
+"""
+Benchmark do formato binário (app.serialization) contra o JSON, para AFDs, PDAs
+e MTs sintéticos (os mesmos geradores de bench_suite) de vários tamanhos:
+  - verifica o round-trip sem perdas: o autômato exportado em binário (GET com
+    Accept binário) decodifica no mesmo dicionário armazenado e, reenviado a
+    /create, volta com o mesmo id;
+  - compara o tamanho dos registros e o tempo de carga (decodificar; decodificar
+    e reconstruir o autômato; carregar o armazenamento inteiro do disco).
+
+Uso: python bench/bench_serialization.py [--kinds afd pilha turing] [--sizes 10 100 1000] [--automata 50]
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+import common
+from bench_suite import KINDS
+
+
+def timed(fn, repeat: int) -> float:
+    """Melhor tempo (em segundos) de `repeat` execuções de fn()."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--kinds", nargs="+", default=list(KINDS), choices=list(KINDS))
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--automata", type=int, default=50, help="autômatos por tipo e tamanho")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    client = common.make_client()
+    from app import serialization
+    from app.serialization import BINARY_MEDIA_TYPE
+    from app.storage import JournaledStore
+    from app.routers import AFD, pilha, turing
+    routers = {
+        "afd": (AFD.afd_store, AFD.afd_to_dict, AFD.afd_from_dict),
+        "pilha": (pilha.pda_store, pilha.npda_to_dict, pilha.npda_from_dict),
+        "turing": (turing.tm_store, turing.tm_to_dict, turing.tm_from_dict),
+    }
+
+    failures = 0
+    for kind in args.kinds:
+        generate = KINDS[kind][0]
+        store, to_dict, from_dict = routers[kind]
+        for size in args.sizes:
+            rng = random.Random(f"{kind}-{size}")
+            ids = [client.post(f"/{kind}/create", json=generate(rng, size)).json()["id"]
+                   for _ in range(args.automata)]
+
+            # Round-trip pela API
+            stored, encoded = [], []
+            for automata_id in ids:
+                data = json.loads(json.dumps(to_dict(store[automata_id])))
+                binary = client.get(f"/{kind}/{automata_id}", headers={"Accept": BINARY_MEDIA_TYPE}).content
+                again = client.post(f"/{kind}/create", content=binary,
+                                    headers={"Content-Type": BINARY_MEDIA_TYPE}).json()
+                if serialization.decode(binary, kind) != data or again.get("id") != automata_id:
+                    failures += 1
+                    print(json.dumps({"kind": kind, "size": size, "id": automata_id, "error": "round-trip"}))
+                stored.append(data)
+                encoded.append(binary)
+            texts = [json.dumps(data).encode() for data in stored]
+
+            # Carga do armazenamento inteiro (índice + reconstrução de todos os autômatos)
+            load_seconds, file_bytes = {}, {}
+            for record_format in ("json", "binary"):
+                path = os.path.join(os.getcwd(), f"{kind}_{size}_{record_format}.json")
+                writer = JournaledStore(path, dict, dict, kind=kind, record_format=record_format)
+                writer.load()
+                for automata_id, data in zip(ids, stored):
+                    writer[automata_id] = data
+                    writer.persist(automata_id)
+                writer.compact()
+                file_bytes[record_format] = os.path.getsize(writer.path)
+
+                def load_all():
+                    reader = JournaledStore(path, to_dict, from_dict, kind=kind, record_format=record_format)
+                    reader.load()
+                    for automata_id in ids:
+                        reader[automata_id]
+                    reader._close_readers()
+                load_seconds[record_format] = timed(load_all, args.repeat)
+
+            result = {
+                "kind": kind, "size": size, "automata": len(ids),
+                "json_bytes": sum(map(len, texts)),
+                "binary_bytes": sum(map(len, encoded)),
+                "json_decode_ms": round(timed(lambda: [json.loads(t) for t in texts], args.repeat) * 1000, 3),
+                "binary_decode_ms": round(timed(
+                    lambda: [serialization.decode(b, kind) for b in encoded], args.repeat) * 1000, 3),
+                "json_hydrate_ms": round(timed(
+                    lambda: [from_dict(json.loads(t)) for t in texts], args.repeat) * 1000, 3),
+                "binary_hydrate_ms": round(timed(
+                    lambda: [from_dict(serialization.decode(b, kind)) for b in encoded], args.repeat) * 1000, 3),
+                "json_store_bytes": file_bytes["json"],
+                "binary_store_bytes": file_bytes["binary"],
+                "json_store_load_ms": round(load_seconds["json"] * 1000, 3),
+                "binary_store_load_ms": round(load_seconds["binary"] * 1000, 3),
+            }
+            result["size_ratio"] = round(result["binary_bytes"] / result["json_bytes"], 3)
+            print(json.dumps(result), flush=True)
+
+    if failures:
+        print(f"{failures} autômatos sem round-trip idêntico", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Benchmark da inicialização com muitos AFDs armazenados: tempo para importar o
+router (que carrega o armazenamento) e memória residente (RSS) do processo.
+
+Compara o carregamento sob demanda (apenas o índice id -> posição no arquivo)
+com a reconstrução de todos os autômatos na inicialização, como era feito antes.
+Cada medição roda num processo novo.
+
+Uso: python bench/bench_startup.py [--count 100000]
+"""
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import uuid
+
+import common  # noqa: F401  (ajusta o sys.path)
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+# Executado no processo filho, dentro do diretório com o armazenamento
+CHILD = """
+import json, resource, sys, time
+sys.path.insert(0, {root!r})
+start = time.perf_counter()
+from app.routers import AFD
+eager = sys.argv[1] == "eager"
+kept = {{}}
+if eager:
+    # Comportamento anterior: todos os AFDs reconstruídos e compilados em memória
+    for key in AFD.afd_store:
+        afd = AFD.afd_store.from_dict(AFD.afd_store._decode_record(AFD.afd_store._read(AFD.afd_store._index[key])))
+        kept[key] = (afd, AFD.CompiledDFA.from_automaton(afd))
+ready = time.perf_counter() - start
+key = next(iter(AFD.afd_store))
+first = time.perf_counter()
+AFD.get_compiled_afd(key).accepts("0101")
+first_access = time.perf_counter() - first
+print(json.dumps({{
+    "mode": sys.argv[1],
+    "startup_s": round(ready, 3),
+    "first_access_ms": round(first_access * 1000, 3),
+    "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+}}))
+"""
+
+
+def random_afd(rng: random.Random) -> dict:
+    states = [f"q{i}" for i in range(rng.randint(2, 8))]
+    return {
+        "states": states,
+        "input_symbols": ["0", "1"],
+        "transitions": {q: {s: rng.choice(states) for s in "01"} for q in states},
+        "initial_state": "q0",
+        "final_states": rng.sample(states, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--count", type=int, default=100000)
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp(prefix="automata-bench-")
+    rng = random.Random(0)
+    with open(os.path.join(directory, "afd_store.jsonl"), "w") as f:
+        for _ in range(args.count):
+            f.write(json.dumps({"id": str(uuid.uuid4()), "data": random_afd(rng)}) + "\n")
+    size_mb = os.path.getsize(os.path.join(directory, "afd_store.jsonl")) / 2 ** 20
+
+    child = CHILD.format(root=ROOT)
+    for mode in ("lazy", "eager"):
+        output = subprocess.run([sys.executable, "-c", child, mode], cwd=directory,
+                                capture_output=True, text=True, check=True).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        result.update({"stored": args.count, "snapshot_mb": round(size_mb, 1)})
+        print(json.dumps(result))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+Teste de carga do armazenamento com vários processos (como workers do uvicorn).
+
+Para cada backend ("journal" e "sqlite") e cada quantidade de workers:
+  1. cada processo cria --creates autômatos no mesmo diretório/banco, ao mesmo tempo;
+  2. cada processo lê ids aleatórios criados por todos os processos durante --seconds;
+  3. um processo novo recarrega o armazenamento e confere se alguma escrita se perdeu.
+O cache de objetos é desativado para que as leituras sempre cheguem ao backend.
+
+Uso: python bench/bench_storage_mp.py [--workers 1 2 4] [--creates 2000] [--seconds 3]
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import tempfile
+import threading
+import time
+import uuid
+
+import common  # noqa: F401  (ajusta o sys.path)
+from app.storage import JournaledStore, SQLiteStore
+
+
+def open_backend(backend: str, directory: str):
+    if backend == "sqlite":
+        return SQLiteStore("afd", dict, dict, db_path=os.path.join(directory, "automata.db"), cache_size=0)
+    return JournaledStore(os.path.join(directory, "afd_store.json"), dict, dict, cache_size=0)
+
+
+def worker(backend, directory, creates, seconds, barrier, created_queue, all_ids, results):
+    # Com o backend "journal", a compactação de um processo pode apagar arquivos que
+    # outro ainda usa; essas falhas são contadas em vez de derrubar o worker.
+    threading.excepthook = lambda args: None
+    store = open_backend(backend, directory)
+    store.load()
+    barrier.wait()
+
+    ids = []
+    errors = 0
+    start = time.perf_counter()
+    for i in range(creates):
+        key = str(uuid.uuid4())
+        try:
+            store[key] = {"states": ["q0"], "n": i}
+            store.persist(key)
+            ids.append(key)
+        except Exception:
+            errors += 1
+    create_time = time.perf_counter() - start
+    created_queue.put(ids)
+
+    keys = all_ids.get()  # ids criados por todos os workers
+    rng = random.Random()
+    reads = misses = 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        for key in rng.sample(keys, min(100, len(keys))):
+            try:
+                if store.get(key) is None:
+                    misses += 1
+            except Exception:
+                errors += 1
+            reads += 1
+    results.put({"creates_per_s": creates / create_time, "reads": reads, "misses": misses, "errors": errors})
+
+
+def run(backend: str, workers: int, creates: int, seconds: float) -> dict:
+    directory = tempfile.mkdtemp(prefix="automata-bench-")
+    open_backend(backend, directory).load()  # cria o banco/arquivos antes dos workers
+    barrier = multiprocessing.Barrier(workers)
+    created_queue, results = multiprocessing.Queue(), multiprocessing.Queue()
+    id_queues = [multiprocessing.Queue() for _ in range(workers)]
+    processes = [
+        multiprocessing.Process(target=worker, args=(backend, directory, creates, seconds, barrier,
+                                                     created_queue, id_queues[i], results))
+        for i in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    created = [key for _ in range(workers) for key in created_queue.get()]
+    for queue in id_queues:
+        queue.put(created)
+    stats = [results.get() for _ in range(workers)]
+    for process in processes:
+        process.join()
+
+    time.sleep(1)  # compactações em segundo plano que ainda estejam terminando
+    reloaded = open_backend(backend, directory)
+    try:
+        reloaded.load()
+        persisted = sum(1 for key in created if key in reloaded)
+    except Exception:
+        persisted = 0
+    reads = sum(s["reads"] for s in stats)
+    return {
+        "backend": backend,
+        "workers": workers,
+        "created": len(created),
+        "lost_writes": len(created) - persisted,
+        "creates_per_s": round(sum(s["creates_per_s"] for s in stats)),
+        "reads_per_s": round(reads / seconds),
+        "read_misses": sum(s["misses"] for s in stats),
+        "errors": sum(s["errors"] for s in stats),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--creates", type=int, default=2000)
+    parser.add_argument("--seconds", type=float, default=3)
+    args = parser.parse_args()
+
+    for backend in ("journal", "sqlite"):
+        for workers in args.workers:
+            print(json.dumps(run(backend, workers, args.creates, args.seconds)))
+
+
+if __name__ == "__main__":
+    main()
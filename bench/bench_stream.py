@@ -0,0 +1,93 @@
+"""
+Benchmark de POST /afd/{id}/test-stream com um servidor uvicorn real (o TestClient
+lê o corpo inteiro antes de chamar a rota, então não serve para medir memória).
+O cliente envia a entrada em trechos gerados na hora; o script mede a vazão e o
+aumento do pico de memória (RSS) do processo, comparando com POST /afd/{id}/test,
+que recebe a entrada inteira num JSON.
+
+Uso: python bench/bench_stream.py [--sizes-mb 10 100 500] [--json-mb 20]
+"""
+import argparse
+import json
+import resource
+import socket
+import threading
+import time
+
+import common  # noqa: F401  (ajusta o sys.path)
+import httpx
+import uvicorn
+
+CHUNK = 64 * 1024
+
+
+def peak_rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server():
+    client = common.make_client()  # monta o app num diretório temporário
+    port = free_port()
+    server = uvicorn.Server(uvicorn.Config(client.app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return f"http://127.0.0.1:{port}"
+
+
+def body(size: int):
+    block = b"01" * (CHUNK // 2)
+    sent = 0
+    while sent < size:
+        part = block[: min(CHUNK, size - sent)]
+        sent += len(part)
+        yield part
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes-mb", type=int, nargs="+", default=[10, 100, 500])
+    parser.add_argument("--json-mb", type=int, default=20)
+    args = parser.parse_args()
+
+    base = start_server()
+    dfa = {
+        "states": ["q0", "q1"], "input_symbols": ["0", "1"],
+        "transitions": {"q0": {"0": "q0", "1": "q1"}, "q1": {"0": "q0", "1": "q1"}},
+        "initial_state": "q0", "final_states": ["q1"],
+    }
+    with httpx.Client(base_url=base, timeout=None) as http:
+        automata_id = http.post("/afd/create", json=dfa).json()["id"]
+
+        for size_mb in args.sizes_mb:
+            size = size_mb * 1024 * 1024
+            before = peak_rss_mb()
+            start = time.perf_counter()
+            response = http.post(f"/afd/{automata_id}/test-stream", content=body(size)).json()
+            elapsed = time.perf_counter() - start
+            print(json.dumps({
+                "endpoint": "test-stream", "input_mb": size_mb, "accepted": response["accepted"],
+                "bytes_processed": response["bytes_processed"], "seconds": round(elapsed, 2),
+                "mb_per_s": round(size_mb / elapsed, 1), "peak_rss_growth_mb": round(peak_rss_mb() - before, 1),
+            }))
+
+        size = args.json_mb * 1024 * 1024
+        before = peak_rss_mb()
+        start = time.perf_counter()
+        response = http.post(f"/afd/{automata_id}/test", json={"input_string": "01" * (size // 2)})
+        elapsed = time.perf_counter() - start
+        print(json.dumps({
+            "endpoint": "test", "input_mb": args.json_mb, "accepted": response.json()["accepted"],
+            "seconds": round(elapsed, 2), "mb_per_s": round(args.json_mb / elapsed, 1),
+            "peak_rss_growth_mb": round(peak_rss_mb() - before, 1),
+        }))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,269 @@
+"""
+Suíte de benchmarks da API: gera AFDs, PDAs e MTs sintéticos (aleatórios, com
+semente fixa) de vários tamanhos e mede create, get, test e visualize de cada
+router, no próprio processo (TestClient) e, com --server, também por HTTP contra
+um servidor uvicorn local (com --concurrency clientes simultâneos).
+
+Cada medição vira uma linha JSON (vazão, latência p50/p90/p99 e erros) e o
+relatório completo é gravado em --output. Com --baseline, compara com um
+relatório anterior e termina com código 1 se alguma operação ficou mais lenta
+que a tolerância (--tolerance, fração) permite.
+
+Uso: python bench/bench_suite.py [--kinds afd pilha turing] [--sizes 10 100 1000]
+                                 [--requests 200] [--server] [--output bench_report.json]
+                                 [--baseline relatorio_anterior.json]
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import shutil
+import sys
+import time
+
+import common
+import httpx
+
+OPERATIONS = ("create", "get", "test", "visualize")
+
+
+# Geradores de autômatos sintéticos
+def random_dfa(rng, size: int) -> dict:
+    """AFD completo sobre {0,1} com `size` estados."""
+    states = [f"q{i}" for i in range(size)]
+    return {
+        "states": states,
+        "input_symbols": ["0", "1"],
+        "transitions": {state: {symbol: rng.choice(states) for symbol in "01"} for state in states},
+        "initial_state": "q0",
+        "final_states": [state for state in states if rng.random() < 0.5],
+    }
+
+
+def random_pda(rng, size: int) -> dict:
+    """
+    PDA determinístico sobre {a,b} com `size` estados: cada transição desempilha,
+    mantém ou empilha "A" sobre o topo (a execução é linear na entrada).
+    """
+    states = [f"q{i}" for i in range(size)]
+    transitions = {}
+    for state in states:
+        paths = {}
+        for symbol in "ab":
+            for top in "ZA":
+                push = rng.choice(["", top, "A" + top]) if top == "A" else rng.choice([top, "A" + top])
+                paths[f"{symbol},{top}"] = [[rng.choice(states), push]]
+        transitions[state] = paths
+    return {
+        "states": states,
+        "input_symbols": ["a", "b"],
+        "stack_symbols": ["Z", "A"],
+        "transitions": transitions,
+        "initial_state": "q0",
+        "initial_stack_symbol": "Z",
+        "final_states": [state for state in states if rng.random() < 0.5],
+    }
+
+
+def random_tm(rng, size: int) -> dict:
+    """MT determinística sobre {0,1} com `size` estados mais um estado de aceitação."""
+    states = [f"q{i}" for i in range(size)] + ["acc"]
+    tape = ["0", "1", "_"]
+    return {
+        "states": states,
+        "input_symbols": ["0", "1"],
+        "tape_symbols": tape,
+        "transitions": {
+            state: {symbol: [[rng.choice(states), rng.choice(tape), rng.choice("LR")]] for symbol in tape}
+            for state in states[:-1]
+        },
+        "initial_state": "q0",
+        "blank_symbol": "_",
+        "final_states": ["acc"],
+    }
+
+
+KINDS = {
+    # tipo: (gerador, alfabeto das entradas, tamanho padrão da entrada, payload extra do teste)
+    "afd": (random_dfa, "01", 1000, {}),
+    "pilha": (random_pda, "ab", 1000, {}),
+    "turing": (random_tm, "01", 50, {"max_steps": 1000}),
+}
+
+
+# Execução de uma lista de requisições (método, url, json)
+def run_inprocess(client, requests: list):
+    latencies, errors, bodies = [], 0, []
+    start = time.perf_counter()
+    for method, url, payload in requests:
+        before = time.perf_counter()
+        response = client.request(method, url, json=payload)
+        latencies.append(time.perf_counter() - before)
+        if response.status_code >= 400:
+            errors += 1
+        bodies.append(response.json() if response.headers.get("content-type", "").startswith("application/json") else None)
+    return latencies, errors, time.perf_counter() - start, bodies
+
+
+async def _run_server(base: str, requests: list, concurrency: int):
+    latencies, bodies = [], [None] * len(requests)
+    errors = 0
+    pending = iter(enumerate(requests))
+
+    async def worker(http):
+        nonlocal errors
+        for index, (method, url, payload) in pending:
+            before = time.perf_counter()
+            response = await http.request(method, url, json=payload)
+            latencies.append(time.perf_counter() - before)
+            if response.status_code >= 400:
+                errors += 1
+            if response.headers.get("content-type", "").startswith("application/json"):
+                bodies[index] = response.json()
+
+    async with httpx.AsyncClient(base_url=base, timeout=None) as http:
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(http) for _ in range(concurrency)))
+        return latencies, errors, time.perf_counter() - start, bodies
+
+
+def run_server(base: str, requests: list, concurrency: int):
+    return asyncio.run(_run_server(base, requests, concurrency))
+
+
+def summary(mode: str, kind: str, size: int, operation: str, latencies, errors: int, elapsed: float) -> dict:
+    return {
+        "mode": mode, "kind": kind, "size": size, "op": operation,
+        "requests": len(latencies), "errors": errors,
+        "throughput_per_s": round(len(latencies) / elapsed, 1) if elapsed else None,
+        "p50_ms": round(common.percentile(latencies, 0.50) * 1000, 3),
+        "p90_ms": round(common.percentile(latencies, 0.90) * 1000, 3),
+        "p99_ms": round(common.percentile(latencies, 0.99) * 1000, 3),
+    }
+
+
+def run_suite(mode: str, run, args) -> list:
+    """
+    Executa as operações de cada tipo e tamanho com `run(requests)`. Os autômatos
+    são sempre criados primeiro (a medição de create só é informada se pedida) e
+    cada operação começa com uma requisição de aquecimento, fora da medição.
+    """
+    results = []
+    for kind in args.kinds:
+        generate, alphabet, length, extra = KINDS[kind]
+        length = args.length or length
+        for size in args.sizes:
+            rng = random.Random(f"{kind}-{size}")
+            definitions = [generate(rng, size) for _ in range(args.automata)]
+            requests = [("POST", f"/{kind}/create", definitions[i % len(definitions)])
+                        for i in range(args.requests)]
+            latencies, errors, elapsed, bodies = run(requests)
+            ids = list(dict.fromkeys(body["id"] for body in bodies if body and "id" in body))
+            if not ids:
+                print(json.dumps({"mode": mode, "kind": kind, "size": size, "error": "nenhum autômato criado"}))
+                continue
+            measured = {"create": (latencies, errors, elapsed)}
+
+            for operation in args.ops:
+                if operation == "get":
+                    requests = [("GET", f"/{kind}/{rng.choice(ids)}", None) for _ in range(args.requests + 1)]
+                elif operation == "test":
+                    requests = [("POST", f"/{kind}/{rng.choice(ids)}/test",
+                                 {"input_string": "".join(rng.choice(alphabet) for _ in range(length)), **extra})
+                                for _ in range(args.requests + 1)]
+                elif operation == "visualize":
+                    # Cada autômato é renderizado na primeira vez; as seguintes vêm do cache
+                    requests = [("GET", f"/{kind}/{ids[i % len(ids)]}/visualize", None)
+                                for i in range(args.requests + 1)]
+                else:
+                    continue
+                run(requests[:1])
+                latencies, errors, elapsed, _ = run(requests[1:])
+                measured[operation] = (latencies, errors, elapsed)
+
+            for operation in args.ops:
+                result = summary(mode, kind, size, operation, *measured[operation])
+                print(json.dumps(result), flush=True)
+                results.append(result)
+    return results
+
+
+def compare(results: list, baseline: dict, tolerance: float) -> list:
+    """Operações com p50 maior ou vazão menor que a do relatório anterior além da tolerância."""
+    previous = {(r["mode"], r["kind"], r["size"], r["op"]): r for r in baseline["results"]}
+    regressions = []
+    for result in results:
+        before = previous.get((result["mode"], result["kind"], result["size"], result["op"]))
+        if before is None:
+            continue
+        slower = result["p50_ms"] > before["p50_ms"] * (1 + tolerance)
+        fewer = (result["throughput_per_s"] or 0) < (before["throughput_per_s"] or 0) * (1 - tolerance)
+        if slower or fewer:
+            regressions.append({
+                "mode": result["mode"], "kind": result["kind"], "size": result["size"], "op": result["op"],
+                "p50_ms": [before["p50_ms"], result["p50_ms"]],
+                "throughput_per_s": [before["throughput_per_s"], result["throughput_per_s"]],
+            })
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--kinds", nargs="+", default=list(KINDS), choices=list(KINDS))
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--ops", nargs="+", default=list(OPERATIONS), choices=OPERATIONS)
+    parser.add_argument("--requests", type=int, default=200, help="requisições por operação")
+    parser.add_argument("--automata", type=int, default=None,
+                        help="autômatos distintos por tipo e tamanho (padrão: --requests)")
+    parser.add_argument("--length", type=int, default=None, help="tamanho das entradas de teste")
+    parser.add_argument("--server", action="store_true", help="também mede por HTTP contra um uvicorn local")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--output", default="bench_report.json")
+    parser.add_argument("--baseline", default=None)
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    args = parser.parse_args()
+
+    if "visualize" in args.ops and shutil.which("dot") is None:
+        print("Graphviz ('dot') não encontrado: visualize ignorado", file=sys.stderr)
+        args.ops = [op for op in args.ops if op != "visualize"]
+
+    args.automata = args.automata or args.requests
+    output = os.path.abspath(args.output)
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    client = common.make_client()
+    results = run_suite("inprocess", lambda requests: run_inprocess(client, requests), args)
+    if args.server:
+        process, base = common.start_server()
+        try:
+            results += run_suite("server", lambda requests: run_server(base, requests, args.concurrency), args)
+        finally:
+            process.terminate()
+            process.wait()
+
+    report = {
+        "meta": {
+            "python": platform.python_version(), "platform": platform.platform(), "cpus": os.cpu_count(),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "args": {k: v for k, v in vars(args).items() if k not in ("output", "baseline")},
+        },
+        "results": results,
+    }
+    if baseline is not None:
+        report["regressions"] = compare(results, baseline, args.tolerance)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+
+    if report.get("regressions"):
+        for regression in report["regressions"]:
+            print("regressão:", json.dumps(regression), file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""
+Benchmark do simulador de Máquinas de Turing (TMEngine) contra NTM da biblioteca
+automata, com MTs clássicas:
+  - palindrome: reconhece palíndromos sobre {0,1} (determinística, O(n²) passos);
+  - binary_increment: soma 1 a um número binário até estourar (2^n adições);
+  - subset_sum: escolhe de forma não determinística um subconjunto não vazio dos
+    dígitos cuja soma seja múltipla de 7 (duas ramificações em cada dígito);
+  - wander: anda não deterministicamente sobre a entrada procurando um "2"; sem "2"
+    a biblioteca nunca para, enquanto o TMEngine detecta o ciclo e rejeita.
+
+Para cada caso mede passos por segundo e o pico de memória (tracemalloc).
+
+Uso: python bench/bench_tm.py [--max-steps 20000]
+"""
+import argparse
+import json
+import time
+import tracemalloc
+
+import common  # noqa: F401  (ajusta o sys.path)
+from automata.base.exceptions import RejectionException
+from automata.tm.ntm import NTM
+from app.engines.tm import TMEngine
+
+
+def tm(states, input_symbols, tape_symbols, transitions, initial_state="q0", final_states=("acc",)):
+    return NTM(states=set(states), input_symbols=set(input_symbols), tape_symbols=set(tape_symbols),
+               transitions=transitions, initial_state=initial_state, blank_symbol="_",
+               final_states=set(final_states))
+
+
+def palindrome():
+    return tm(
+        ["q0", "r0", "r1", "c0", "c1", "back", "acc"], "01", "01_",
+        {
+            "q0": {"0": [("r0", "_", "R")], "1": [("r1", "_", "R")], "_": [("acc", "_", "N")]},
+            "r0": {"0": [("r0", "0", "R")], "1": [("r0", "1", "R")], "_": [("c0", "_", "L")]},
+            "r1": {"0": [("r1", "0", "R")], "1": [("r1", "1", "R")], "_": [("c1", "_", "L")]},
+            "c0": {"0": [("back", "_", "L")], "_": [("acc", "_", "N")]},
+            "c1": {"1": [("back", "_", "L")], "_": [("acc", "_", "N")]},
+            "back": {"0": [("back", "0", "L")], "1": [("back", "1", "L")], "_": [("q0", "_", "R")]},
+        },
+    )
+
+
+def binary_increment():
+    return tm(
+        ["q0", "carry", "ret", "acc"], "01", "01_",
+        {
+            "q0": {"0": [("q0", "0", "R")], "1": [("q0", "1", "R")], "_": [("carry", "_", "L")]},
+            "carry": {"1": [("carry", "0", "L")], "0": [("ret", "1", "L")], "_": [("acc", "_", "N")]},
+            "ret": {"0": [("ret", "0", "L")], "1": [("ret", "1", "L")], "_": [("q0", "_", "R")]},
+        },
+    )
+
+
+def subset_sum(modulus: int = 7):
+    # s: nenhum dígito escolhido ainda; t{i}: soma dos escolhidos ≡ i (mod modulus)
+    states = ["s"] + [f"t{i}" for i in range(modulus)]
+    transitions = {"s": {}}
+    for digit in "123":
+        transitions["s"][digit] = [("s", digit, "R"), (f"t{int(digit) % modulus}", digit, "R")]
+    for i in range(modulus):
+        row = {"_": [("acc", "_", "N")]} if i == 0 else {}
+        for digit in "123":
+            row[digit] = [(f"t{i}", digit, "R"), (f"t{(i + int(digit)) % modulus}", digit, "R")]
+        transitions[f"t{i}"] = row
+    return tm(states + ["acc"], "123", "123_", transitions, initial_state="s")
+
+
+def wander():
+    # Anda sobre os "1"; no branco da esquerda volta para a entrada, no da direita para
+    return tm(
+        ["q0", "q1", "acc"], "12", "12_",
+        {"q0": {"1": [("q0", "1", "L"), ("q0", "1", "R")], "_": [("q1", "_", "R")],
+                "2": [("acc", "2", "N")]},
+         "q1": {"1": [("q0", "1", "R")], "2": [("acc", "2", "N")]}},
+    )
+
+
+# (nome, construtor, entrada, teto de passos da biblioteca): no "wander" a biblioteca
+# nunca para, então ela é limitada a poucos passos
+CASES = [
+    ("palindrome", palindrome, "0110" * 25 + "0110"[::-1] * 25, None),
+    ("binary_increment", binary_increment, "0" * 10, None),
+    ("subset_sum", subset_sum, "3122313221" * 200, None),
+    ("wander", wander, "1" * 10, 40),
+]
+
+
+def run_library(machine, input_string, max_steps):
+    steps = 0
+    try:
+        for configurations in machine.read_input_stepwise(input_string):
+            if any(c.state in machine.final_states for c in configurations):
+                return "accepted", steps
+            if steps >= max_steps:
+                return "undecided", steps
+            steps += 1
+    except RejectionException:
+        return "rejected", steps
+    return "accepted", steps
+
+
+def measure(fn):
+    # O tempo é medido sem o tracemalloc, que deixa as alocações bem mais lentas
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--max-steps", type=int, default=20000)
+    args = parser.parse_args()
+
+    for name, build, input_string, library_cap in CASES:
+        machine = build()
+        engine = TMEngine.from_automaton(machine)
+        library_steps = min(args.max_steps, library_cap or args.max_steps)
+        (lib_result, lib_steps), lib_time, lib_peak = measure(
+            lambda: run_library(machine, input_string, library_steps))
+        run, engine_time, engine_peak = measure(
+            lambda: engine.run(input_string, max_steps=args.max_steps, max_configurations=10 ** 7,
+                               max_tape_length=10 ** 7, timeout=600))
+        print(json.dumps({
+            "machine": name,
+            "input_length": len(input_string),
+            "library": {"result": lib_result, "steps": lib_steps,
+                        "steps_per_s": round(lib_steps / lib_time), "peak_kib": lib_peak // 1024},
+            "engine": {"result": run["result"], "steps": run["stats"]["steps"],
+                       "steps_per_s": round(run["stats"]["steps"] / engine_time) if engine_time else None,
+                       "peak_kib": engine_peak // 1024,
+                       "duplicates_pruned": run["stats"]["duplicates_pruned"]},
+        }))
+
+
+if __name__ == "__main__":
+    main()
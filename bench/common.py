@@ -0,0 +1,71 @@
+"""Utilitários compartilhados pelos scripts de benchmark."""
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+
+def percentile(values, p):
+    """Percentil simples (sem interpolação) de uma lista de amostras."""
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))]
+
+
+def make_client():
+    """
+    Cria um TestClient com os routers da API, executando num diretório temporário
+    para que os arquivos de persistência do benchmark não se misturem aos reais.
+    Os routers são importados pelo nome dos arquivos (app/routers/AFD.py).
+    """
+    os.chdir(tempfile.mkdtemp(prefix="automata-bench-"))
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from app.routers import AFD, afn, pilha, turing
+
+    app = FastAPI()
+    app.include_router(AFD.router, prefix="/afd")
+    app.include_router(afn.router, prefix="/afn")
+    app.include_router(pilha.router, prefix="/pilha")
+    app.include_router(turing.router, prefix="/turing")
+    return TestClient(app)
+
+
+# Executado no processo do servidor (ver start_server)
+SERVER = """
+import sys
+sys.path.insert(0, {bench!r})
+import common, uvicorn
+client = common.make_client()
+uvicorn.run(client.app, host="127.0.0.1", port={port}, log_level="warning")
+"""
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(env: dict = None):
+    """
+    Inicia a API (os mesmos routers de make_client) num servidor uvicorn em outro
+    processo, com as variáveis de ambiente extras `env`. Retorna (processo, url base).
+    """
+    import httpx
+
+    port = free_port()
+    code = SERVER.format(bench=os.path.dirname(os.path.abspath(__file__)), port=port)
+    process = subprocess.Popen([sys.executable, "-c", code], env=dict(os.environ, **(env or {})))
+    base = f"http://127.0.0.1:{port}"
+    for _ in range(200):
+        try:
+            httpx.get(base + "/afd/none", timeout=1)
+            return process, base
+        except httpx.TransportError:
+            time.sleep(0.1)
+    process.kill()
+    raise RuntimeError("o servidor não iniciou")
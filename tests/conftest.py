@@ -0,0 +1,31 @@
+"""
+Configuração compartilhada dos testes: os arquivos de persistência ficam num
+diretório temporário e a aceitação roda no próprio processo (ACCEPTANCE_WORKERS=0).
+Os routers são importados pelo nome dos arquivos (app/routers/AFD.py), como em
+bench/common.py.
+"""
+import os
+import sys
+import tempfile
+
+import pytest
+
+os.environ.setdefault("ACCEPTANCE_WORKERS", "0")
+os.chdir(tempfile.mkdtemp(prefix="automata-tests-"))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+
+@pytest.fixture(scope="session")
+def client():
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from app.routers import AFD, afn, pilha, turing, jobs
+
+    app = FastAPI()
+    app.include_router(AFD.router, prefix="/afd")
+    app.include_router(afn.router, prefix="/afn")
+    app.include_router(pilha.router, prefix="/pilha")
+    app.include_router(turing.router, prefix="/turing")
+    app.include_router(jobs.router, prefix="/jobs")
+    with TestClient(app) as client:
+        yield client
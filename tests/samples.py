@@ -0,0 +1,39 @@
+"""Autômatos de exemplo (os do README) no formato JSON de /create."""
+
+# Termina em 1
+DFA = {
+    "states": ["q0", "q1"], "input_symbols": ["0", "1"],
+    "transitions": {"q0": {"0": "q0", "1": "q1"}, "q1": {"0": "q0", "1": "q1"}},
+    "initial_state": "q0", "final_states": ["q1"],
+}
+
+# a^n b^m c^n
+PDA = {
+    "states": ["q0", "q1", "q2", "q_accept"], "input_symbols": ["a", "b", "c"], "stack_symbols": ["a", "Z"],
+    "transitions": {
+        "q0": {"a,Z": [["q0", "aZ"]], "a,a": [["q0", "aa"]], "b,a": [["q1", "a"]], "b,Z": [["q1", "Z"]]},
+        "q1": {"b,a": [["q1", "a"]], "b,Z": [["q1", "Z"]], "c,a": [["q2", ""]]},
+        "q2": {"c,a": [["q2", ""]], ",Z": [["q_accept", "Z"]]},
+    },
+    "initial_state": "q0", "initial_stack_symbol": "Z", "final_states": ["q_accept"],
+}
+
+# 0^n 1^n (parcial, como no README)
+TM = {
+    "states": ["q0", "q1", "q2", "q3", "q_accept", "q_reject"], "input_symbols": ["0", "1"],
+    "tape_symbols": ["0", "1", "X", "Y", "_"],
+    "transitions": {
+        "q0": {"X": [["q0", "X", "R"]], "Y": [["q0", "Y", "R"]], "0": [["q1", "X", "R"]],
+               "1": [["q_reject", "1", "R"]], "_": [["q3", "_", "R"]]},
+        "q1": {"1": [["q2", "Y", "L"]]},
+        "q3": {"_": [["q_accept", "_", "R"]]},
+    },
+    "initial_state": "q0", "blank_symbol": "_", "final_states": ["q_accept"],
+}
+
+# Contém 01, com uma transição ε
+AFN = {
+    "states": ["q0", "q1", "q2"], "input_symbols": ["0", "1"],
+    "transitions": {"q0": {"0": ["q0", "q1"], "1": ["q0"]}, "q1": {"1": ["q2"]}, "q2": {"": ["q0"]}},
+    "initial_state": "q0", "final_states": ["q2"],
+}
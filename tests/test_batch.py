@@ -0,0 +1,51 @@
+import json
+
+import pytest
+
+from app.batch import NDJSON_MEDIA_TYPE
+from samples import DFA
+
+WORDS = ["1", "10", "", "0101", "11é1", "0" * 500 + "1"]
+
+
+@pytest.fixture(scope="module")
+def afd_id(client):
+    return client.post("/afd/create", json=DFA).json()["id"]
+
+
+def chunked(body: bytes, size: int):
+    """Corpo enviado em trechos de `size` bytes (cortando linhas e caracteres UTF-8)."""
+    for start in range(0, len(body), size):
+        yield body[start:start + size]
+
+
+def ndjson(client, afd_id: str, body: bytes, size: int):
+    return client.post(f"/afd/{afd_id}/test-batch", content=chunked(body, size),
+                       headers={"Content-Type": NDJSON_MEDIA_TYPE})
+
+
+@pytest.mark.parametrize("size", [1, 3, 7, 4096])
+@pytest.mark.parametrize("newline", ["\n", "\r\n"])
+def test_streamed_ndjson_matches_json(client, afd_id, size, newline):
+    expected = client.post(f"/afd/{afd_id}/test-batch", json={"input_strings": WORDS}).json()
+    lines = [json.dumps(word, ensure_ascii=False) if i % 2 else json.dumps({"input_string": word})
+             for i, word in enumerate(WORDS)]
+    body = (newline.join(lines[:3]) + newline + newline + newline.join(lines[3:])).encode()
+    for ending in (b"", newline.encode()):
+        response = ndjson(client, afd_id, body + ending, size)
+        assert response.status_code == 200
+        assert response.json() == expected
+
+
+@pytest.mark.parametrize("size", [1, 4096])
+def test_ndjson_errors_report_the_line(client, afd_id, size):
+    response = ndjson(client, afd_id, b'"1"\n\n{"input_string": "0"}\n{oops\n"1"\n', size)
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Linha 4 não é um JSON válido"
+    response = ndjson(client, afd_id, b'"1"\n{"other": 1}', size)
+    assert response.json()["detail"] == "Linha 2 não contém uma 'input_string'"
+
+
+def test_empty_ndjson(client, afd_id):
+    response = ndjson(client, afd_id, b"", 1)
+    assert response.json()["total"] == 0
@@ -0,0 +1,55 @@
+import copy
+
+from app.routers import AFD, pilha
+from samples import DFA, PDA, TM
+
+
+def reordered(definition: dict) -> dict:
+    """A mesma definição com os conjuntos (estados, símbolos, destinos) em ordem inversa."""
+    data = copy.deepcopy(definition)
+    for field, value in data.items():
+        if isinstance(value, list):
+            data[field] = value[::-1]
+    data["transitions"] = {
+        state: {key: targets[::-1] if isinstance(targets, list) else targets
+                for key, targets in reversed(list(paths.items()))}
+        for state, paths in reversed(list(data["transitions"].items()))
+    }
+    return data
+
+
+def test_identical_afd_reuses_id_and_compiled_table(client):
+    before = AFD.afd_dedup.stats()
+    first = client.post("/afd/create", json=DFA).json()
+    second = client.post("/afd/create", json=reordered(DFA)).json()
+    assert second["id"] == first["id"]
+    assert second["deduplicated"] is True
+    assert AFD.get_compiled_afd(first["id"]) is AFD.get_compiled_afd(second["id"])
+
+    after = AFD.afd_dedup.stats()
+    assert after["created"] == before["created"] + 2
+    assert after["deduplicated"] >= before["deduplicated"] + 1
+    assert 0 < after["dedup_ratio"] <= 1
+
+
+def test_different_afd_gets_another_id(client):
+    first = client.post("/afd/create", json=DFA).json()
+    other = client.post("/afd/create", json={**DFA, "final_states": ["q0"]}).json()
+    assert other["id"] != first["id"]
+
+
+def test_pda_with_reordered_transitions_is_deduplicated(client):
+    nondeterministic = copy.deepcopy(PDA)
+    nondeterministic["transitions"]["q1"]["b,a"].append(["q2", "a"])
+    first = client.post("/pilha/create", json=nondeterministic).json()
+    second = client.post("/pilha/create", json=reordered(nondeterministic)).json()
+    assert second["id"] == first["id"]
+    assert second["deduplicated"] is True
+    assert pilha.pda_dedup.stats()["deduplicated"] >= 1
+
+
+def test_tm_with_reordered_definition_is_deduplicated(client):
+    first = client.post("/turing/create", json=TM).json()
+    second = client.post("/turing/create", json=reordered(TM)).json()
+    assert second["id"] == first["id"]
+    assert second["deduplicated"] is True
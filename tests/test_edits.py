@@ -0,0 +1,91 @@
+import copy
+
+from app.routers import AFD
+from app.routers.AFD import afd_apply_edit, afd_from_dict, afd_to_dict
+from app.storage import JournaledStore
+from samples import DFA, PDA, TM
+
+# Termina em 01 (usado só por estes testes, já que eles alteram o AFD armazenado)
+ENDS_01 = {
+    "states": ["a", "b", "c"], "input_symbols": ["0", "1"],
+    "transitions": {"a": {"0": "b", "1": "a"}, "b": {"0": "b", "1": "c"}, "c": {"0": "b", "1": "a"}},
+    "initial_state": "a", "final_states": ["c"],
+}
+
+
+def accepted(client, kind: str, automata_id: str, word: str):
+    return client.post(f"/{kind}/{automata_id}/test", json={"input_string": word}).json()["accepted"]
+
+
+def test_afd_patch_changes_language_and_revision(client):
+    automata_id = client.post("/afd/create", json=ENDS_01).json()["id"]
+    assert accepted(client, "afd", automata_id, "01") is True
+    assert accepted(client, "afd", automata_id, "0") is False
+
+    response = client.patch(f"/afd/{automata_id}", json={"add_final_states": ["b"]})
+    assert response.status_code == 200
+    assert response.json()["revision"] == 1
+    assert accepted(client, "afd", automata_id, "0") is True
+
+    response = client.patch(f"/afd/{automata_id}?revision=1",
+                            json={"add_states": ["d"], "add_transitions": {"d": {"0": "d", "1": "d"},
+                                                                           "c": {"1": "d"}}})
+    assert response.json()["revision"] == 2
+    assert accepted(client, "afd", automata_id, "011") is False
+    assert sorted(client.get(f"/afd/{automata_id}").json()["states"]) == ["a", "b", "c", "d"]
+
+    # A definição original não reaproveita o id do AFD alterado
+    recreated = client.post("/afd/create", json=ENDS_01).json()
+    assert recreated["id"] != automata_id
+    assert recreated["deduplicated"] is False
+
+
+def test_afd_patch_errors(client):
+    automata_id = client.post("/afd/create", json={**ENDS_01, "final_states": ["a", "c"]}).json()["id"]
+    assert client.patch(f"/afd/{automata_id}", json={}).status_code == 400
+    assert client.patch(f"/afd/{automata_id}", json={"add_transitions": {"x": {"0": "a"}}}).status_code == 400
+    assert client.patch(f"/afd/{automata_id}", json={"remove_states": ["a"]}).status_code == 400
+    assert client.patch(f"/afd/{automata_id}?revision=5", json={"remove_final_states": ["c"]}).status_code == 409
+    assert client.patch("/afd/nope", json={"add_final_states": ["a"]}).status_code == 404
+
+
+def test_edits_are_replayed_after_reload(client):
+    automata_id = client.post("/afd/create", json={**ENDS_01, "final_states": ["b"]}).json()["id"]
+    client.patch(f"/afd/{automata_id}", json={"add_transitions": {"a": {"1": "c"}}})
+    client.patch(f"/afd/{automata_id}", json={"remove_final_states": ["b"], "add_final_states": ["c"]})
+    store = AFD.afd_store
+    if isinstance(store, JournaledStore):
+        reloaded = JournaledStore(AFD.AFD_FILE, afd_to_dict, afd_from_dict, kind="afd",
+                                  record_format=store.record_format, apply_edit=afd_apply_edit)
+        reloaded.load()
+        assert reloaded.revision(automata_id) == 2
+        assert afd_to_dict(reloaded[automata_id]) == afd_to_dict(store[automata_id])
+
+
+def test_pda_patch(client):
+    definition = copy.deepcopy(PDA)
+    definition["final_states"] = ["q0"]
+    automata_id = client.post("/pilha/create", json=definition).json()["id"]
+    assert accepted(client, "pilha", automata_id, "abc") is False
+    response = client.patch(f"/pilha/{automata_id}", json={"add_final_states": ["q_accept"]})
+    assert response.json()["revision"] == 1
+    assert accepted(client, "pilha", automata_id, "abc") is True
+    missing = {"remove_transitions": {"q0": {"a,Z": [["q1", "Z"]]}}}
+    assert client.patch(f"/pilha/{automata_id}", json=missing).status_code == 400
+
+
+def test_tm_patch(client):
+    definition = copy.deepcopy(TM)
+    del definition["transitions"]["q3"]
+    definition["states"].append("q4")
+    automata_id = client.post("/turing/create", json=definition).json()["id"]
+    assert accepted(client, "turing", automata_id, "") is False
+    edit = {"add_transitions": {"q3": {"_": [["q_accept", "_", "R"]]}}}
+    assert client.patch(f"/turing/{automata_id}", json=edit).status_code == 200
+    assert accepted(client, "turing", automata_id, "") is True
+    assert client.patch(f"/turing/{automata_id}", json={"add_final_states": ["q0"]}).status_code == 400
+
+
+def test_unrelated_afd_is_not_touched(client):
+    automata_id = client.post("/afd/create", json=DFA).json()["id"]
+    assert client.get(f"/afd/{automata_id}").json()["final_states"] == ["q1"]
@@ -0,0 +1,84 @@
+import time
+
+import pytest
+
+from app.engines.tm import TMEngine
+from app.jobs import JobManager
+from app.routers.turing import tm_job
+from samples import PDA, TM
+
+# Anda para a direita para sempre (só para num limite ou cancelamento)
+RUNAWAY = {
+    "states": ["q0", "qa"], "input_symbols": ["0"], "tape_symbols": ["0", "_"],
+    "transitions": {"q0": {"0": [["q0", "0", "R"]], "_": [["q0", "0", "R"]]}},
+    "initial_state": "q0", "blank_symbol": "_", "final_states": ["qa"],
+}
+RUNAWAY_LIMITS = {"max_steps": 10 ** 9, "max_configurations": 10, "max_tape_length": 10 ** 9, "timeout": 60}
+
+
+def wait_for(client, job_id: str, condition, timeout: float = 30):
+    deadline = time.monotonic() + timeout
+    while True:
+        job = client.get(f"/jobs/{job_id}").json()
+        if condition(job) or time.monotonic() > deadline:
+            return job
+        time.sleep(0.05)
+
+
+@pytest.mark.parametrize("kind, definition, word", [("turing", TM, "0"), ("pilha", PDA, "aabcc")])
+def test_job_result_matches_test(client, kind, definition, word):
+    automata_id = client.post(f"/{kind}/create", json=definition).json()["id"]
+    response = client.post(f"/{kind}/{automata_id}/test-async", json={"input_string": word})
+    assert response.status_code == 202
+    job = wait_for(client, response.json()["job_id"], lambda job: job["status"] not in ("queued", "running"))
+    assert job["status"] == "done"
+    expected = client.post(f"/{kind}/{automata_id}/test", json={"input_string": word}).json()
+    assert job["result"]["accepted"] == expected["accepted"]
+    assert job["result"]["result"] == expected["result"]
+    assert job["progress"]["steps"] > 0
+
+
+def test_running_job_reports_progress_and_cancels(client):
+    automata_id = client.post("/turing/create", json=RUNAWAY).json()["id"]
+    job_id = client.post(f"/turing/{automata_id}/test-async", json={"input_string": "0", **RUNAWAY_LIMITS}).json()["job_id"]
+    job = wait_for(client, job_id, lambda job: job["progress"]["steps"] > 1000)
+    assert job["status"] == "running"
+
+    assert client.delete(f"/jobs/{job_id}").json()["cancel_requested"] is True
+    job = wait_for(client, job_id, lambda job: job["status"] == "cancelled")
+    assert job["status"] == "cancelled"
+    assert job["result"]["limit"] == "cancelled"
+    assert job["result"]["stats"]["steps"] == job["progress"]["steps"]
+
+
+def test_unknown_job(client):
+    assert client.get("/jobs/nope").status_code == 404
+    assert client.delete("/jobs/nope").status_code == 404
+
+
+def finished(manager: JobManager, job_id: str, timeout: float = 30) -> str:
+    deadline = time.monotonic() + timeout
+    while manager.get(job_id).finished_at is None and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return manager.get(job_id).status
+
+
+def test_thread_jobs_and_full_queue():
+    manager = JobManager(workers=1, queue_depth=1, processes=False)
+    engine = TMEngine.from_dict(RUNAWAY)
+    running = manager.submit("turing", "x", engine, "0", tm_job, "steps", **RUNAWAY_LIMITS)
+    queued = manager.submit("turing", "x", engine, "0", tm_job, "steps", **RUNAWAY_LIMITS)
+    with pytest.raises(Exception) as error:
+        manager.submit("turing", "x", engine, "0", tm_job, "steps", **RUNAWAY_LIMITS)
+    assert error.value.status_code == 503
+
+    assert manager.cancel(queued.id).status == "cancelled"
+    manager.cancel(running.id)
+    assert finished(manager, running.id) == "cancelled"
+    stats = manager.stats()
+    assert (stats["cancelled"], stats["rejected"]) == (2, 1)
+
+    # As posições liberadas voltam a ser usadas
+    done = manager.submit("turing", "x", TMEngine.from_dict(TM), "01", tm_job, "steps")
+    assert finished(manager, done.id) == "done"
+    manager.shutdown()
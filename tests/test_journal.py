@@ -0,0 +1,78 @@
+import os
+
+from app.routers.AFD import afd_from_dict, afd_to_dict
+from app.storage import JournaledStore
+from samples import DFA
+
+
+def definition(number: int) -> dict:
+    """AFD de exemplo com o estado final trocado conforme `number` (ids distintos)."""
+    return {**DFA, "final_states": ["q1"] if number % 2 else ["q0"], "states": DFA["states"] + [f"x{number}"],
+            "transitions": {**DFA["transitions"], f"x{number}": {"0": "q0", "1": "q1"}}}
+
+
+def open_store(tmp_path, **options) -> JournaledStore:
+    store = JournaledStore(str(tmp_path / "afd_store.json"), afd_to_dict, afd_from_dict, kind="afd",
+                           compact_min_records=10 ** 6, **options)
+    store.load()
+    return store
+
+
+def fill(store: JournaledStore, count: int) -> None:
+    for number in range(count):
+        store[f"id{number}"] = afd_from_dict(definition(number))
+        store.persist(f"id{number}")
+
+
+# Cada criação acrescenta uma linha ao journal, sem reescrever o snapshot
+def test_create_only_appends_to_journal(tmp_path):
+    store = open_store(tmp_path)
+    fill(store, 3)
+    assert not os.path.exists(store.path)
+    with open(store.journal_path, "rb") as f:
+        assert len(f.read().splitlines()) == 3
+    before = os.path.getsize(store.journal_path)
+    fill(store, 4)  # id0..id2 de novo e id3
+    assert os.path.getsize(store.journal_path) > before
+
+
+def test_reload_replays_journal(tmp_path):
+    fill(open_store(tmp_path), 5)
+    reloaded = open_store(tmp_path)
+    assert len(reloaded) == 5
+    assert afd_to_dict(reloaded["id3"])["final_states"] == ["q1"]
+
+
+# Uma última linha incompleta (queda durante a escrita) é descartada ao carregar
+def test_truncated_last_record_is_ignored(tmp_path):
+    store = open_store(tmp_path)
+    fill(store, 2)
+    with open(store.journal_path, "ab") as f:
+        f.write(b'{"id": "id9", "data": {"states": ["q')
+    reloaded = open_store(tmp_path)
+    assert sorted(reloaded) == ["id0", "id1"]
+    reloaded["id2"] = afd_from_dict(definition(2))
+    reloaded.persist("id2")
+    assert sorted(open_store(tmp_path)) == ["id0", "id1", "id2"]
+
+
+def test_compaction_moves_journal_into_snapshot(tmp_path):
+    store = open_store(tmp_path)
+    fill(store, 4)
+    store.compact()
+    assert os.path.exists(store.path)
+    assert not os.path.exists(store.journal_path) or os.path.getsize(store.journal_path) == 0
+    reloaded = open_store(tmp_path)
+    assert sorted(reloaded) == ["id0", "id1", "id2", "id3"]
+    assert afd_to_dict(reloaded["id2"]) == afd_to_dict(store["id2"])
+
+
+# Uma compactação interrompida (journal renomeado e snapshot ainda não gravado) é concluída ao carregar
+def test_interrupted_compaction_is_finished_on_load(tmp_path):
+    store = open_store(tmp_path)
+    fill(store, 3)
+    store._close_journal()
+    os.replace(store.journal_path, store.rotated_path)
+    reloaded = open_store(tmp_path)
+    assert sorted(reloaded) == ["id0", "id1", "id2"]
+    assert not os.path.exists(reloaded.rotated_path)
@@ -0,0 +1,64 @@
+import random
+
+from app.engines.dfa import CompiledDFA
+from samples import DFA
+
+# DFA com estados redundantes: p0/p1 e r0/r1 se comportam como q0/q1 (termina em 1)
+REDUNDANT = {
+    "states": ["p0", "p1", "r0", "r1", "dead"], "input_symbols": ["0", "1"],
+    "transitions": {"p0": {"0": "r0", "1": "p1"}, "p1": {"0": "r0", "1": "r1"},
+                    "r0": {"0": "p0", "1": "r1"}, "r1": {"0": "p0", "1": "p1"},
+                    "dead": {"0": "dead", "1": "dead"}},
+    "initial_state": "p0", "final_states": ["p1", "r1"],
+}
+
+
+def words(rng, count=200):
+    return ["".join(rng.choice("01") for _ in range(rng.randrange(12))) for _ in range(count)]
+
+
+def test_minimize_merges_equivalent_states(client):
+    created = client.post("/afd/create", json=REDUNDANT).json()
+    minimized = client.post(f"/afd/{created['id']}/minimize").json()
+    assert minimized["original_states"] == 5
+    assert minimized["minimized_states"] == 2
+    original, smaller = CompiledDFA.from_dict(REDUNDANT), CompiledDFA.from_dict(minimized["automata"])
+    for word in words(random.Random(0)):
+        assert smaller.accepts(word) == original.accepts(word)
+
+
+def test_equivalent_and_counterexample(client):
+    redundant = client.post("/afd/create", json=REDUNDANT).json()["id"]
+    small = client.post("/afd/create", json=DFA).json()["id"]
+    assert client.post(f"/afd/{redundant}/equivalent/{small}").json() == {"equivalent": True, "counterexample": None}
+
+    other = client.post("/afd/create", json={**DFA, "final_states": ["q0"]}).json()["id"]
+    result = client.post(f"/afd/{small}/equivalent/{other}").json()
+    assert result["equivalent"] is False
+    counterexample = result["counterexample"]
+    assert CompiledDFA.from_dict(DFA).accepts(counterexample) != CompiledDFA.from_dict(
+        {**DFA, "final_states": ["q0"]}).accepts(counterexample)
+
+
+def test_create_with_minimize(client):
+    created = client.post("/afd/create?minimize=true", json=REDUNDANT).json()
+    assert len(created["automata"]["states"]) == 2
+
+
+def test_minimize_random_dfas_keeps_language():
+    rng = random.Random(1)
+    for _ in range(50):
+        states = [f"s{i}" for i in range(rng.randint(1, 12))]
+        definition = {"states": states, "input_symbols": ["0", "1"],
+                      "transitions": {q: {s: rng.choice(states) for s in "01"} for q in states},
+                      "initial_state": "s0", "final_states": [q for q in states if rng.random() < 0.4]}
+        original = CompiledDFA.from_dict(definition)
+        minimized = CompiledDFA.from_dict(original.minimize())
+        assert len(minimized.states) <= len(states)
+        assert original.equivalent_to(minimized)[0]
+        # Mínimo: minimizar de novo não reduz mais
+        assert len(CompiledDFA.from_dict(minimized.minimize()).states) == len(minimized.states)
+
+
+def test_minimize_unknown_id(client):
+    assert client.post("/afd/nope/minimize").status_code == 404
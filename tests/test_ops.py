@@ -0,0 +1,91 @@
+import itertools
+
+import pytest
+
+from samples import DFA
+
+# Palavras de tamanho par
+EVEN = {
+    "states": ["e", "o"], "input_symbols": ["0", "1"],
+    "transitions": {"e": {"0": "o", "1": "o"}, "o": {"0": "e", "1": "e"}},
+    "initial_state": "e", "final_states": ["e"],
+}
+
+# Começa com a (alfabeto disjunto dos demais)
+STARTS_A = {
+    "states": ["s", "a", "x"], "input_symbols": ["a", "b"],
+    "transitions": {"s": {"a": "a", "b": "x"}, "a": {"a": "a", "b": "a"}, "x": {"a": "x", "b": "x"}},
+    "initial_state": "s", "final_states": ["a"],
+}
+
+WORDS = ["".join(w) for n in range(6) for w in itertools.product("01", repeat=n)]
+
+EXPECTED = {
+    "union": lambda a, b: a or b,
+    "intersection": lambda a, b: a and b,
+    "difference": lambda a, b: a and not b,
+    "symmetric_difference": lambda a, b: a != b,
+}
+
+
+def ends_in_1(word: str) -> bool:
+    return word.endswith("1")
+
+
+def even(word: str) -> bool:
+    return len(word) % 2 == 0
+
+
+def accepted(client, automata_id: str, word: str) -> bool:
+    return client.post(f"/afd/{automata_id}/test", json={"input_string": word}).json()["accepted"]
+
+
+@pytest.fixture(scope="module")
+def operands(client):
+    return [client.post("/afd/create", json=definition).json()["id"] for definition in (DFA, EVEN, STARTS_A)]
+
+
+@pytest.mark.parametrize("operation", sorted(EXPECTED))
+@pytest.mark.parametrize("minimize", [False, True])
+def test_product_operations(client, operands, operation, minimize):
+    response = client.post("/afd/ops", json={"operation": operation, "ids": operands[:2], "minimize": minimize})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["product_states"] <= 4
+    if minimize:
+        assert len(body["automata"]["states"]) <= body["product_states"]
+    for word in WORDS:
+        assert accepted(client, body["id"], word) == EXPECTED[operation](ends_in_1(word), even(word)), word
+
+
+def test_complement(client, operands):
+    body = client.post("/afd/ops", json={"operation": "complement", "ids": operands[:1]}).json()
+    for word in WORDS:
+        assert accepted(client, body["id"], word) == (not ends_in_1(word))
+
+
+def test_disjoint_alphabets(client, operands):
+    body = client.post("/afd/ops", json={"operation": "union", "ids": [operands[0], operands[2]]}).json()
+    assert sorted(body["automata"]["input_symbols"]) == ["0", "1", "a", "b"]
+    assert accepted(client, body["id"], "01") is True
+    assert accepted(client, body["id"], "ab") is True
+    assert accepted(client, body["id"], "0a1") is False  # símbolo do outro alfabeto leva ao poço de cada um
+
+
+def test_repeated_operation_is_cached(client, operands):
+    request = {"operation": "intersection", "ids": [operands[1], operands[0], operands[1]]}
+    first = client.post("/afd/ops", json=request).json()
+    second = client.post("/afd/ops", json=request).json()
+    assert second["id"] == first["id"]
+    assert second["deduplicated"] is True
+    assert second["message"] == "AFD já gerado para esta operação"
+
+
+def test_operation_errors(client, operands):
+    assert client.post("/afd/ops", json={"operation": "concat", "ids": operands[:2]}).status_code == 400
+    assert client.post("/afd/ops", json={"operation": "union", "ids": operands[:1]}).status_code == 400
+    assert client.post("/afd/ops", json={"operation": "complement", "ids": operands[:2]}).status_code == 400
+    assert client.post("/afd/ops", json={"operation": "union", "ids": [operands[0], "nope"]}).status_code == 404
+    response = client.post("/afd/ops", json={"operation": "union", "ids": operands[:2], "max_states": 2})
+    assert response.status_code == 400
+    assert "2 estados" in response.json()["detail"]
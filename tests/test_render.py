@@ -0,0 +1,65 @@
+import shutil
+
+import pytest
+
+from app import render
+from app.render import RENDER_FORMATS, render_dot
+from samples import DFA
+
+
+@pytest.fixture(scope="module")
+def afd_id(client):
+    return client.post("/afd/create", json=DFA).json()["id"]
+
+
+@pytest.mark.parametrize("format", ["pdf", "json", "svg -o /tmp/x", "../../etc/passwd", "png\n"])
+def test_unsupported_format_is_rejected(client, afd_id, format):
+    response = client.get(f"/afd/{afd_id}/visualize", params={"format": format})
+    assert response.status_code == 400
+    assert "não suportado" in response.json()["detail"]
+
+
+def test_render_dot_only_runs_allowed_formats():
+    with pytest.raises(Exception) as error:
+        render_dot("digraph { a -> b }", "canon")
+    assert error.value.status_code == 400
+
+
+@pytest.mark.skipif(shutil.which("dot") is None, reason="Graphviz não instalado")
+@pytest.mark.parametrize("format", ["svg", "PNG"])
+def test_media_type_matches_format(client, afd_id, format):
+    response = client.get(f"/afd/{afd_id}/visualize", params={"format": format})
+    assert response.status_code == 200
+    assert response.headers["content-type"].split(";")[0] == RENDER_FORMATS[format.lower()]
+
+
+def test_cached_image_keeps_its_media_type(client, afd_id, monkeypatch):
+    monkeypatch.setattr(render, "render_dot", lambda dot_str, format, timeout: f"<{format}>".encode())
+    render.render_cache.invalidate("afd", afd_id)
+    for _ in range(2):
+        for format, media_type in RENDER_FORMATS.items():
+            response = client.get(f"/afd/{afd_id}/visualize", params={"format": format})
+            assert response.content == f"<{format}>".encode()
+            assert response.headers["content-type"].split(";")[0] == media_type
+    render.render_cache.invalidate("afd", afd_id)
+
+
+def test_disk_cache_stays_inside_its_directory(tmp_path):
+    images = tmp_path / "images"
+    images.mkdir()
+    cache = render.RenderCache(disk_dir=str(images))
+    cache.put(("afd", "../../x", "svg"), '"etag"', b"<svg/>")
+    assert [path.parent for path in images.iterdir()] == [images]
+
+    # Outra instância (ex.: após reiniciar) lê a imagem do disco
+    reloaded = render.RenderCache(disk_dir=str(images))
+    assert reloaded.get(("afd", "../../x", "svg")) == ('"etag"', b"<svg/>")
+    assert reloaded.stats()["disk_hits"] == 1
+
+    for key in [("afd", "id", "../../../tmp/evil"), ("afd", "id", "svg/../png"), ("../afd", "id", "svg")]:
+        with pytest.raises(ValueError):
+            cache.put(key, '"etag"', b"x")
+    assert list(tmp_path.iterdir()) == [images]
+
+    reloaded.invalidate("afd", "../../x")
+    assert list(images.iterdir()) == []
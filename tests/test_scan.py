@@ -0,0 +1,62 @@
+import os
+import random
+
+import pytest
+
+import app.scan
+from app.engines.dfa import CompiledDFA
+from app.executor import acceptance_pool
+from app.scan import split_utf8, stitch_scans
+
+
+def random_dfa(rng, symbols: str) -> CompiledDFA:
+    states = [f"q{i}" for i in range(rng.randint(1, 4))]
+    return CompiledDFA(states, symbols, {q: {s: rng.choice(states) for s in symbols} for q in states},
+                       "q0", [q for q in states if rng.random() < 0.5])
+
+
+def serial(dfa: CompiledDFA, text: str) -> list:
+    starts, ends, _ = dfa.scan(text)
+    return [[start, end] for start, end in zip(starts, ends)]
+
+
+# A busca por trechos, juntada por stitch_scans, é igual à busca numa única passada
+@pytest.mark.parametrize("seed", range(200))
+def test_stitch_matches_serial_scan(seed, tmp_path, monkeypatch):
+    rng = random.Random(seed)
+    symbols = rng.choice(["ab", "abé"])
+    dfa = random_dfa(rng, symbols)
+    text = "".join(rng.choice(symbols) for _ in range(rng.randint(1, 40)))
+    path = tmp_path / "text"
+    path.write_bytes(text.encode())
+    size = os.path.getsize(path)
+
+    monkeypatch.setattr(app.scan, "STITCH_BLOCK", rng.choice([1, 2, 3, 64 * 1024]))
+    chunks = split_utf8(str(path), size, rng.randint(1, min(8, size)))
+    results = [dfa.scan_file(str(path), start, end) for start, end in chunks]
+    found, characters = stitch_scans(dfa, str(path), chunks, results, 10 ** 6)
+
+    expected = serial(dfa, text)
+    assert characters == len(text)
+    assert found.count == len(expected)
+    assert found.matches == expected
+
+
+def test_parallel_scan_endpoint_matches_serial(client, monkeypatch):
+    monkeypatch.setattr(app.scan, "SCAN_CHUNK_MIN", 4)
+    monkeypatch.setattr(acceptance_pool, "workers", 5)
+    rng = random.Random(0)
+    for _ in range(20):
+        dfa = random_dfa(rng, "ab")
+        definition = {
+            "states": dfa.states, "input_symbols": list(dfa.symbols),
+            "transitions": {dfa.states[i]: {s: dfa.states[t] for s, t in row.items()} for i, row in enumerate(dfa.rows)},
+            "initial_state": "q0", "final_states": [q for i, q in enumerate(dfa.states) if dfa.accepting[i]],
+        }
+        automata_id = client.post("/afd/create", json=definition).json()["id"]
+        text = "".join(rng.choice("ab") for _ in range(20))
+        parallel = client.post(f"/afd/{automata_id}/scan?parallel=true", content=text).json()
+        sequential = client.post(f"/afd/{automata_id}/scan", content=text).json()
+        assert parallel["chunks"] == 5
+        assert parallel["matches"] == sequential["matches"] == serial(dfa, text)
+        assert parallel["match_count"] == sequential["match_count"]
@@ -0,0 +1,87 @@
+import pytest
+
+from app.serialization import BINARY_MEDIA_TYPE, decode, encode
+from app.routers.AFD import afd_from_dict, afd_to_dict
+from app.routers.afn import afn_from_dict, afn_to_dict
+from app.routers.pilha import npda_from_dict, npda_to_dict
+from app.routers.turing import tm_from_dict, tm_to_dict
+from samples import AFN, DFA, PDA, TM
+
+FIELDS = ("states", "input_symbols", "transitions", "initial_state", "final_states")
+
+
+def pda_dict(data: dict) -> dict:
+    """PDA no formato de npda_to_dict (transições aninhadas entrada -> topo)."""
+    transitions = {}
+    for state, paths in data["transitions"].items():
+        for key, targets in paths.items():
+            input_symbol, stack_symbol = key.split(",")
+            transitions.setdefault(state, {}).setdefault(input_symbol, {})[stack_symbol] = targets
+    return {**data, "transitions": transitions}
+
+
+# Várias entradas de pilha para o mesmo símbolo de entrada (antes reduzidas a uma só)
+PDA_SHARED_INPUT = {
+    "states": ["q0", "q1"], "input_symbols": ["a", "b"], "stack_symbols": ["A", "B", "Z"],
+    "transitions": {
+        "q0": {"a": {"Z": [["q0", "AZ"]], "A": [["q0", "AA"], ["q1", "A"]], "B": [["q0", ""]]},
+               "b": {"A": [["q0", "BA"]], "B": [["q0", "BB"]]},
+               "": {"Z": [["q1", "Z"]]}},
+    },
+    "initial_state": "q0", "initial_stack_symbol": "Z", "final_states": ["q1"],
+}
+
+KINDS = {
+    "afd": (afd_to_dict, afd_from_dict, DFA, ()),
+    "afn": (afn_to_dict, afn_from_dict, AFN, ()),
+    "pilha": (npda_to_dict, npda_from_dict, pda_dict(PDA), ("stack_symbols", "initial_stack_symbol")),
+    "pilha-shared-input": (npda_to_dict, npda_from_dict, PDA_SHARED_INPUT, ("stack_symbols", "initial_stack_symbol")),
+    "turing": (tm_to_dict, tm_from_dict, TM, ("tape_symbols", "blank_symbol")),
+}
+
+
+@pytest.mark.parametrize("name", KINDS)
+def test_binary_round_trip_is_lossless(name):
+    to_dict, from_dict, definition, extra = KINDS[name]
+    kind = name.split("-")[0]
+    automaton = from_dict(definition)
+    restored = from_dict(decode(encode(kind, to_dict(automaton)), kind))
+    for field in FIELDS + extra:
+        assert getattr(restored, field) == getattr(automaton, field), field
+
+
+def test_pda_keeps_every_stack_entry_of_an_input_symbol():
+    automaton = npda_from_dict(PDA_SHARED_INPUT)
+    restored = decode(encode("pilha", npda_to_dict(automaton)), "pilha")
+    assert sorted(restored["transitions"]["q0"]["a"]) == ["A", "B", "Z"]
+    assert sorted(map(tuple, restored["transitions"]["q0"]["a"]["A"])) == [("q0", "AA"), ("q1", "A")]
+
+
+def test_decode_rejects_other_kind_and_corruption():
+    data = encode("afd", DFA)
+    with pytest.raises(ValueError):
+        decode(data, "turing")
+    with pytest.raises(ValueError):
+        decode(data[:-1] + bytes([data[-1] ^ 1]))
+
+
+@pytest.mark.parametrize("kind,definition", [("afd", DFA), ("afn", AFN), ("pilha", PDA), ("turing", TM)])
+def test_binary_export_and_import_over_http(client, kind, definition):
+    created = client.post(f"/{kind}/create", json=definition).json()
+    exported = client.get(f"/{kind}/{created['id']}", headers={"Accept": BINARY_MEDIA_TYPE})
+    assert exported.headers["content-type"] == BINARY_MEDIA_TYPE
+
+    imported = client.post(f"/{kind}/create", content=exported.content,
+                           headers={"Content-Type": BINARY_MEDIA_TYPE})
+    assert imported.status_code == 200
+    assert imported.json()["id"] == created["id"]
+    assert imported.json()["deduplicated"] is True
+    assert client.get(f"/{kind}/{created['id']}").json() == client.get(f"/{kind}/{imported.json()['id']}").json()
+    assert decode(exported.content, kind) == decode(
+        client.get(f"/{kind}/{imported.json()['id']}", headers={"Accept": BINARY_MEDIA_TYPE}).content, kind)
+
+
+def test_binary_import_rejects_garbage(client):
+    response = client.post("/afd/create", content=b"not an automaton",
+                           headers={"Content-Type": BINARY_MEDIA_TYPE})
+    assert response.status_code == 400
@@ -0,0 +1,68 @@
+import multiprocessing
+
+from app.routers.AFD import afd_from_dict, afd_to_dict
+from app.routers.turing import tm_from_dict, tm_to_dict
+from app.storage import JournaledStore, SQLiteStore
+from samples import DFA, TM
+
+
+def open_store(db_path, kind="afd", **options) -> SQLiteStore:
+    to_dict, from_dict = (afd_to_dict, afd_from_dict) if kind == "afd" else (tm_to_dict, tm_from_dict)
+    store = SQLiteStore(kind, to_dict, from_dict, db_path=str(db_path), **options)
+    store.load()
+    return store
+
+
+# Executada em cada processo de test_concurrent_writes_from_processes
+def write_many(db_path: str, worker: int, count: int) -> None:
+    store = open_store(db_path)
+    for number in range(count):
+        key = f"w{worker}-{number}"
+        store[key] = afd_from_dict(DFA)
+        store.persist(key)
+
+
+def test_writes_are_visible_to_another_connection(tmp_path):
+    db_path = tmp_path / "automata.db"
+    first, second = open_store(db_path), open_store(db_path)
+    first["a"] = afd_from_dict(DFA)
+    first.persist("a")
+    assert "a" in second
+    assert afd_to_dict(second["a"])["final_states"] == ["q1"]
+    assert len(second) == 1
+
+
+def test_kinds_share_the_database_without_mixing(tmp_path):
+    db_path = tmp_path / "automata.db"
+    afd, tm = open_store(db_path), open_store(db_path, kind="turing")
+    afd["x"] = afd_from_dict(DFA)
+    afd.persist("x")
+    tm["y"] = tm_from_dict(TM)
+    tm.persist("y")
+    assert list(afd) == ["x"]
+    assert list(tm) == ["y"]
+
+
+def test_concurrent_writes_from_processes(tmp_path):
+    db_path = str(tmp_path / "automata.db")
+    open_store(db_path)  # cria as tabelas
+    context = multiprocessing.get_context("spawn")
+    workers = [context.Process(target=write_many, args=(db_path, worker, 25)) for worker in range(4)]
+    for process in workers:
+        process.start()
+    for process in workers:
+        process.join(60)
+        assert process.exitcode == 0
+    store = open_store(db_path)
+    assert len(store) == 100
+    assert afd_to_dict(store["w3-24"])["initial_state"] == "q0"
+
+
+def test_imports_journal_files_on_first_load(tmp_path):
+    journal = JournaledStore(str(tmp_path / "afd_store.json"), afd_to_dict, afd_from_dict, kind="afd")
+    journal.load()
+    journal["old"] = afd_from_dict(DFA)
+    journal.persist("old")
+    store = open_store(tmp_path / "automata.db", import_path=str(tmp_path / "afd_store.json"))
+    assert list(store) == ["old"]
+    assert afd_to_dict(store["old"])["transitions"] == afd_to_dict(journal["old"])["transitions"]
@@ -0,0 +1,43 @@
+import pytest
+
+from app.engines.tm import ACCEPTED, REJECTED, TMEngine
+
+
+def eraser(size: int) -> dict:
+    """
+    Reescreve cada s<i> como t<i> indo para a direita e apaga tudo voltando para a
+    esquerda; aceita ao chegar ao branco do início. Com `size` símbolos de entrada,
+    a fita tem 2·size + 1 símbolos.
+    """
+    inputs = [f"s{i}" for i in range(size)]
+    marks = [f"t{i}" for i in range(size)]
+    return {
+        "states": ["q0", "q1", "qa"], "input_symbols": inputs, "tape_symbols": inputs + marks + ["_"],
+        "transitions": {
+            "q0": {**{s: [["q0", t, "R"]] for s, t in zip(inputs, marks)}, "_": [["q1", "_", "L"]]},
+            "q1": {**{t: [["q1", "_", "L"]] for t in marks}, "_": [["qa", "_", "R"]]},
+        },
+        "initial_state": "q0", "blank_symbol": "_", "final_states": ["qa"],
+    }
+
+
+@pytest.mark.parametrize("size", [3, 300])
+def test_engine_runs_any_alphabet_size(size):
+    engine = TMEngine.from_dict(eraser(size))
+    assert engine.wide == (size > 127)
+    word = [f"s{i % size}" for i in range(0, 7 * size, 5)][:40]
+    run = engine.run(word)
+    assert run["result"] == ACCEPTED
+    assert run["stats"]["steps"] == 2 * len(word) + 2
+    assert engine.run(word[:3] + ["zz"])["result"] == REJECTED  # símbolo fora da fita
+    result, trace = engine.trace(word)
+    assert result["result"] == ACCEPTED
+
+
+def test_wide_tape_over_http(client):
+    definition = eraser(300)
+    response = client.post("/turing/create", json=definition)
+    assert response.status_code == 200
+    automata_id = response.json()["id"]
+    body = client.post(f"/turing/{automata_id}/test", json={"input_string": ["s299", "s256", "s0"]}).json()
+    assert body["accepted"] is True
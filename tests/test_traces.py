@@ -0,0 +1,47 @@
+import pytest
+
+from app.traces import TRACE_PAGE_SIZE
+from samples import DFA
+
+WORD = "01" * (TRACE_PAGE_SIZE + 250)
+
+
+@pytest.fixture(scope="module")
+def trace_url(client):
+    afd_id = client.post("/afd/create", json=DFA).json()["id"]
+    body = client.post(f"/afd/{afd_id}/test", json={"input_string": WORD, "trace": True}).json()
+    assert body["trace"]["steps"] == len(WORD)
+    return body["trace"]["url"]
+
+
+@pytest.mark.parametrize("page", [None, 7, 1000, 10 ** 6])
+def test_following_next_reads_every_step_once(client, trace_url, page):
+    path, start = [], 1
+    while start is not None:
+        params = {"from": start} if page is None else {"from": start, "to": start + page}
+        body = client.get(trace_url, params=params).json()
+        assert body["from"] == start
+        assert body["next"] is None or body["next"] > start
+        path.extend(body["path"])
+        start = body["next"]
+    assert [step["step"] for step in path] == list(range(1, len(WORD) + 1))
+    assert "".join(step["symbol"] for step in path) == WORD
+    assert [step["state"] for step in path[-2:]] == ["q0", "q1"]
+
+
+def test_page_bounds(client, trace_url):
+    body = client.get(trace_url, params={"from": 5, "to": 8}).json()
+    assert (body["to"], body["next"], len(body["path"])) == (8, 8, 3)
+    body = client.get(trace_url, params={"from": len(WORD) - 1, "to": len(WORD) + 50}).json()
+    assert (body["to"], body["next"], len(body["path"])) == (len(WORD) + 1, None, 2)
+    assert client.get(trace_url, params={"from": len(WORD) + 10}).json()["path"] == []
+
+
+@pytest.mark.parametrize("params", [{"from": 0}, {"from": 3, "to": 2}, {"from": 10, "to": 1}])
+def test_invalid_range(client, trace_url, params):
+    response = client.get(trace_url, params=params)
+    assert response.status_code == 400
+
+
+def test_unknown_trace(client, trace_url):
+    assert client.get(trace_url.rsplit("/", 1)[0] + "/nope").status_code == 404